@@ -0,0 +1,378 @@
+"""
+活化能 (Ea) 估計
+由多個溫度下的失效 / 特徵壽命數據擬合 Arrhenius 模型的 Ea：
+  1. 迴歸法：ln(壽命) 對 1/kT 的最小平方迴歸 (斜率即 Ea)
+  2. 最大概似法：Arrhenius-Weibull 模型 ln(η) = a + Ea/kT，可處理截尾 (suspensions)
+多個失效機制 / 批次 (datasets) 以補齊 (padded) 的陣列一次向量化求解，
+bootstrap 信賴區間以獨立亂數串流分區塊平行計算
+"""
+
+import numpy as np
+from scipy import stats
+from af_models import KB
+from parallel import split_blocks, spawn_seeds, run_blocks
+
+EULER_GAMMA = 0.5772156649015329
+DEFAULT_CONF_LEVEL = 0.95
+BOOTSTRAP_BLOCK_SIZE = 200       # 每個 bootstrap 區塊的重抽次數
+MAX_BOOTSTRAP = 20000
+
+
+def _parse_dataset(dataset):
+    """
+    將單一數據集轉為觀測值陣列
+
+    dataset 格式:
+        {'name': 'lot A', 'groups': [
+            {'temp': 125, 'failures': [...], 'suspensions': [...]},   # 失效數據 (°C, 小時)
+            {'temp': 85, 'life': 5200},                               # 或已知特徵壽命
+        ]}
+
+    Returns:
+        dict: x (1/kT), y (ln t), delta (1 = 失效, 0 = 截尾), group (溫度組別索引), life_only
+    """
+    groups = dataset.get('groups') or []
+    x, y, delta, group = [], [], [], []
+    has_life = has_failures = False
+    for g_index, g in enumerate(groups):
+        temp_k = float(g['temp']) + 273.15
+        if temp_k <= 0:
+            raise ValueError("溫度需高於絕對零度")
+        inv_kt = 1.0 / (KB * temp_k)
+
+        if 'life' in g:
+            times, flags = [float(g['life'])], [1]
+            has_life = True
+        else:
+            failures = [float(t) for t in g.get('failures', [])]
+            suspensions = [float(t) for t in g.get('suspensions', [])]
+            times = failures + suspensions
+            flags = [1] * len(failures) + [0] * len(suspensions)
+            has_failures = has_failures or bool(failures)
+
+        for t, d in zip(times, flags):
+            if t <= 0:
+                raise ValueError("壽命與截尾時間需為正數")
+            x.append(inv_kt)
+            y.append(np.log(t))
+            delta.append(d)
+            group.append(g_index)
+
+    if has_life and has_failures:
+        raise ValueError("同一數據集不可混用特徵壽命與失效數據")
+
+    delta = np.array(delta, dtype=float)
+    x = np.array(x, dtype=float)
+    failed_temps = np.unique(x[delta > 0]) if x.size else x
+    if failed_temps.size < 2:
+        raise ValueError("至少需要兩個有失效 (或壽命) 數據的溫度")
+    return {"x": x, "y": np.array(y, dtype=float), "delta": delta,
+            "group": np.array(group, dtype=int), "life_only": has_life}
+
+
+def _pack(observations):
+    """將不等長的觀測值補齊為 (數據集數 × 最大觀測數) 陣列與遮罩"""
+    m = max(len(o["x"]) for o in observations)
+    shape = (len(observations), m)
+    X, Y, Dl, M = np.zeros(shape), np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    for i, o in enumerate(observations):
+        k = len(o["x"])
+        X[i, :k], Y[i, :k], Dl[i, :k], M[i, :k] = o["x"], o["y"], o["delta"], 1.0
+    return X, Y, Dl, M
+
+
+def fit_regression_batch(X, Y, W, conf_level=DEFAULT_CONF_LEVEL):
+    """
+    向量化迴歸 ln(t) = a + Ea · (1/kT)
+
+    Args:
+        X, Y: (數據集數 × 觀測數) 陣列
+        W: 權重遮罩 (只納入失效點；截尾點與補齊位置為 0)
+
+    Returns:
+        dict: ea, ea_se, ea_lower, ea_upper, intercept, r_squared, n_points 陣列
+    """
+    with np.errstate(all='ignore'):
+        n = W.sum(axis=1)
+        x_mean = (W * X).sum(axis=1) / n
+        y_mean = (W * Y).sum(axis=1) / n
+        dx = (X - x_mean[:, None]) * W
+        dy = (Y - y_mean[:, None]) * W
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+
+        ea = sxy / sxx
+        intercept = y_mean - ea * x_mean
+        sse = np.maximum(syy - ea * sxy, 0.0)
+        dof = n - 2
+        ea_se = np.where(dof > 0, np.sqrt(sse / np.maximum(dof, 1) / sxx), np.nan)
+        t_crit = stats.t.ppf(0.5 + conf_level / 2, np.maximum(dof, 1))
+        r_squared = np.where(syy > 0, 1 - sse / syy, 1.0)
+
+    return {
+        "ea": ea, "ea_se": ea_se,
+        "ea_lower": ea - t_crit * ea_se, "ea_upper": ea + t_crit * ea_se,
+        "intercept": intercept, "r_squared": r_squared, "n_points": n.astype(int),
+    }
+
+
+def _weibull_loglik(theta, Xc, Y, Dl, M):
+    """Arrhenius-Weibull 對數概似 (theta = [a', Ea, ln β]，a' 為中心化後的截距)"""
+    a, ea, s = theta[:, 0:1], theta[:, 1:2], theta[:, 2:3]
+    beta = np.exp(s)
+    # 補齊位置的 w 設為 0，避免 exp 溢位後乘以遮罩得到 NaN
+    w = np.where(M > 0, beta * (Y - a - ea * Xc), 0.0)
+    ew = np.exp(w)
+    ll = np.sum(M * (Dl * (s - Y + w) - ew), axis=1)
+    return ll, beta, w, ew
+
+
+def _weibull_derivatives(theta, Xc, Y, Dl, M):
+    """對數概似的解析梯度與 Hessian"""
+    ll, beta, w, ew = _weibull_loglik(theta, Xc, Y, Dl, M)
+    r = M * (Dl - ew)
+    mew = M * ew
+    b = beta[:, 0]
+
+    grad = np.stack([
+        -b * r.sum(axis=1),
+        -b * (r * Xc).sum(axis=1),
+        (M * Dl).sum(axis=1) + (r * w).sum(axis=1),
+    ], axis=1)
+
+    hess = np.empty((theta.shape[0], 3, 3))
+    hess[:, 0, 0] = -b ** 2 * mew.sum(axis=1)
+    hess[:, 0, 1] = hess[:, 1, 0] = -b ** 2 * (mew * Xc).sum(axis=1)
+    hess[:, 1, 1] = -b ** 2 * (mew * Xc * Xc).sum(axis=1)
+    hess[:, 0, 2] = hess[:, 2, 0] = -b * r.sum(axis=1) + b * (mew * w).sum(axis=1)
+    hess[:, 1, 2] = hess[:, 2, 1] = (-b * (r * Xc).sum(axis=1) +
+                                     b * (mew * w * Xc).sum(axis=1))
+    hess[:, 2, 2] = (r * w).sum(axis=1) - (mew * w * w).sum(axis=1)
+    return ll, grad, hess
+
+
+def fit_arrhenius_weibull_batch(X, Y, Dl, M, max_iter=200, tol=1e-9):
+    """
+    向量化最大概似擬合 Arrhenius-Weibull 模型 (Levenberg-Marquardt 阻尼牛頓法)
+
+    模型: T ~ Weibull(β, η)，ln η = a + Ea · (1/kT)；截尾點以存活函數計入概似
+
+    Args:
+        X: 1/kT；Y: ln t；Dl: 失效標記 (1 失效 / 0 截尾)；M: 有效觀測遮罩
+           皆為 (數據集數 × 觀測數) 陣列
+
+    Returns:
+        dict: ea, beta, intercept, cov (ea 與 ln β 的共變異，形狀 (n, 2, 2)),
+              log_likelihood, converged, iterations 陣列
+    """
+    n_rows = X.shape[0]
+    with np.errstate(all='ignore'):
+        # 中心化 1/kT，降低截距與 Ea 的相關性
+        x_mean = (M * X).sum(axis=1) / M.sum(axis=1)
+        Xc = (X - x_mean[:, None]) * M
+
+        # 初始值：失效點的最小平方迴歸，β 由殘差標準差估計 (極值分佈 σ = sd·√6/π)
+        start = fit_regression_batch(Xc, Y, M * Dl)
+        ea0 = np.nan_to_num(start["ea"])
+        resid = (Y - start["intercept"][:, None] - ea0[:, None] * Xc) * M * Dl
+        n_fail = (M * Dl).sum(axis=1)
+        sd = np.sqrt((resid ** 2).sum(axis=1) / np.maximum(n_fail - 1, 1))
+        beta0 = np.clip(np.pi / (np.sqrt(6) * np.where(sd > 0, sd, 1.0)), 0.2, 20.0)
+        a0 = np.nan_to_num(start["intercept"]) + EULER_GAMMA / beta0
+        theta = np.column_stack([a0, ea0, np.log(beta0)])
+
+        lam = np.full(n_rows, 1e-3)
+        converged = np.zeros(n_rows, dtype=bool)
+        iterations = np.zeros(n_rows, dtype=int)
+        ll, grad, hess = _weibull_derivatives(theta, Xc, Y, Dl, M)
+
+        for it in range(max_iter):
+            active = ~converged
+            if not active.any():
+                break
+            iterations[active] += 1
+
+            # (−H + λ·diag|H|) Δ = g
+            info = -hess
+            damping = lam[:, None] * np.abs(np.diagonal(info, axis1=1, axis2=2)) + 1e-12
+            system = info + damping[:, :, None] * np.eye(3)
+            try:
+                step = np.linalg.solve(system, grad[:, :, None])[:, :, 0]
+            except np.linalg.LinAlgError:
+                step = np.zeros_like(theta)
+                for i in range(n_rows):
+                    step[i] = np.linalg.lstsq(system[i], grad[i], rcond=None)[0]
+            step[~active] = 0.0
+
+            candidate = theta + step
+            ll_new, grad_new, hess_new = _weibull_derivatives(candidate, Xc, Y, Dl, M)
+            improved = active & np.isfinite(ll_new) & (ll_new >= ll - 1e-12 * np.abs(ll))
+
+            theta[improved] = candidate[improved]
+            grad[improved], hess[improved] = grad_new[improved], hess_new[improved]
+            small_change = np.abs(ll_new - ll) <= tol * (1 + np.abs(ll))
+            ll[improved] = ll_new[improved]
+            lam = np.where(improved, np.maximum(lam / 10, 1e-12), np.minimum(lam * 10, 1e12))
+
+            converged |= improved & (small_change | (np.abs(step).max(axis=1) < tol))
+
+        cov = np.full((n_rows, 3, 3), np.nan)
+        ok = np.isfinite(hess).all(axis=(1, 2))
+        if ok.any():
+            try:
+                cov[ok] = np.linalg.inv(-hess[ok])
+            except np.linalg.LinAlgError:
+                cov[ok] = np.linalg.pinv(-hess[ok])
+
+    return {
+        "ea": theta[:, 1], "beta": np.exp(theta[:, 2]),
+        "intercept": theta[:, 0] - theta[:, 1] * x_mean,
+        "cov": cov[:, 1:, 1:],
+        "log_likelihood": ll, "converged": converged, "iterations": iterations,
+    }
+
+
+def _bootstrap_block(task):
+    """單一區塊的分層 bootstrap (模組層級函式，供行程池使用)"""
+    obs, seed_seq, size, methods = task
+    rng = np.random.default_rng(seed_seq)
+
+    # 在每個溫度組內重抽，保持各溫度的樣本數
+    members = [np.flatnonzero(obs["group"] == g) for g in np.unique(obs["group"])]
+    index = np.concatenate([rng.choice(m, size=(size, m.size)) for m in members], axis=1)
+
+    X, Y, Dl = obs["x"][index], obs["y"][index], obs["delta"][index]
+    M = np.ones_like(X)
+    out = {}
+    if 'regression' in methods:
+        out['regression'] = fit_regression_batch(X, Y, Dl)["ea"]
+    if 'mle' in methods and not obs["life_only"]:
+        fit = fit_arrhenius_weibull_batch(X, Y, Dl, M)
+        out['mle'] = np.where(fit["converged"], fit["ea"], np.nan)
+    return out
+
+
+def _finite_or_none(value, decimals=6):
+    value = float(value)
+    return round(value, decimals) if np.isfinite(value) else None
+
+
+def estimate_activation_energy(datasets, methods=('regression', 'mle'),
+                               conf_level=DEFAULT_CONF_LEVEL, n_bootstrap=0, seed=None,
+                               n_jobs=1):
+    """
+    批次估計多個數據集的活化能
+
+    Args:
+        datasets: 數據集列表 (格式見 _parse_dataset)
+        methods: 'regression' 與 / 或 'mle'
+        conf_level: 信賴水準 (迴歸為 t 分佈區間，MLE 為 Fisher 矩陣 Wald 區間)
+        n_bootstrap: 分層 bootstrap 重抽次數 (0 表示不計算)，區間取百分位數
+        seed: bootstrap 主亂數種子 (結果與 n_jobs 無關)
+        n_jobs: bootstrap 平行行程數
+
+    Returns:
+        dict: {'conf_level', 'results': [每個數據集的結果或 {'error'}]} 或 {'error': ...}
+    """
+    try:
+        methods = tuple(methods)
+        for method in methods:
+            if method not in ('regression', 'mle'):
+                return {"error": f"不支援的估計方法: {method}"}
+        if not datasets:
+            return {"error": "至少需要一個數據集"}
+        if not 0 < conf_level < 1:
+            return {"error": "信賴水準需介於 0 與 1 之間"}
+        n_bootstrap = int(n_bootstrap)
+        if n_bootstrap < 0 or n_bootstrap > MAX_BOOTSTRAP:
+            return {"error": f"bootstrap 次數需介於 0 與 {MAX_BOOTSTRAP} 之間"}
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}
+
+    results = [{"name": d.get('name', f"dataset {i + 1}")} for i, d in enumerate(datasets)]
+    observations, index = [], []
+    for i, d in enumerate(datasets):
+        try:
+            observations.append(_parse_dataset(d))
+            index.append(i)
+        except (KeyError, TypeError, ValueError) as e:
+            results[i]["error"] = str(e) or "數據格式錯誤"
+
+    if observations:
+        X, Y, Dl, M = _pack(observations)
+        z = stats.norm.ppf(0.5 + conf_level / 2)
+
+        if 'regression' in methods:
+            reg = fit_regression_batch(X, Y, M * Dl, conf_level)
+            for row, i in enumerate(index):
+                results[i]["regression"] = {
+                    "ea": _finite_or_none(reg["ea"][row]),
+                    "ea_se": _finite_or_none(reg["ea_se"][row]),
+                    "ea_lower": _finite_or_none(reg["ea_lower"][row]),
+                    "ea_upper": _finite_or_none(reg["ea_upper"][row]),
+                    "r_squared": _finite_or_none(reg["r_squared"][row]),
+                    "n_points": int(reg["n_points"][row]),
+                }
+
+        mle_rows = [row for row, o in enumerate(observations) if not o["life_only"]]
+        if 'mle' in methods and mle_rows:
+            fit = fit_arrhenius_weibull_batch(X[mle_rows], Y[mle_rows], Dl[mle_rows], M[mle_rows])
+            for k, row in enumerate(mle_rows):
+                ea, beta = fit["ea"][k], fit["beta"][k]
+                ea_se = np.sqrt(fit["cov"][k, 0, 0])
+                log_beta_se = np.sqrt(fit["cov"][k, 1, 1])
+                results[index[row]]["mle"] = {
+                    "ea": _finite_or_none(ea),
+                    "ea_se": _finite_or_none(ea_se),
+                    "ea_lower": _finite_or_none(ea - z * ea_se),
+                    "ea_upper": _finite_or_none(ea + z * ea_se),
+                    "beta": _finite_or_none(beta),
+                    "beta_lower": _finite_or_none(beta * np.exp(-z * log_beta_se)),
+                    "beta_upper": _finite_or_none(beta * np.exp(z * log_beta_se)),
+                    "log_likelihood": _finite_or_none(fit["log_likelihood"][k]),
+                    "converged": bool(fit["converged"][k]),
+                    "iterations": int(fit["iterations"][k]),
+                }
+        if 'mle' in methods:
+            for row, o in enumerate(observations):
+                if o["life_only"]:
+                    results[index[row]]["mle"] = {"error": "僅有特徵壽命數據，無法進行最大概似估計"}
+
+        if n_bootstrap:
+            try:
+                _add_bootstrap(results, index, observations, methods, conf_level,
+                               n_bootstrap, seed, n_jobs)
+            except Exception as e:
+                return {"error": str(e)}
+
+    return {"conf_level": conf_level, "n_bootstrap": n_bootstrap, "results": results}
+
+
+def _add_bootstrap(results, index, observations, methods, conf_level, n_bootstrap, seed, n_jobs):
+    """以分層 bootstrap 計算 Ea 的百分位數信賴區間 (各數據集、各區塊使用獨立種子)"""
+    sizes = split_blocks(n_bootstrap, BOOTSTRAP_BLOCK_SIZE)
+    seeds = spawn_seeds(seed, len(observations) * len(sizes))
+
+    tasks = []
+    for row, obs in enumerate(observations):
+        for b, size in enumerate(sizes):
+            tasks.append((obs, seeds[row * len(sizes) + b], size, methods))
+    blocks = run_blocks(_bootstrap_block, tasks, n_jobs)
+
+    alpha = (1 - conf_level) / 2 * 100
+    for row, i in enumerate(index):
+        row_blocks = blocks[row * len(sizes):(row + 1) * len(sizes)]
+        for method in methods:
+            if method not in row_blocks[0]:
+                continue
+            values = np.concatenate([b[method] for b in row_blocks])
+            values = values[np.isfinite(values)]
+            if values.size < 2:
+                continue
+            lower, upper = np.percentile(values, [alpha, 100 - alpha])
+            results[i].setdefault(method, {}).update({
+                "bootstrap_lower": _finite_or_none(lower),
+                "bootstrap_upper": _finite_or_none(upper),
+                "bootstrap_valid": int(values.size),
+            })
@@ -0,0 +1,135 @@
+"""
+加速因子向量化計算引擎
+以欄位陣列 (columnar arrays) 一次計算多組應力條件的 AF，
+各模型的公式、預設值與有效範圍由 af_models 註冊表提供；
+所有因子在對數空間相加，極端條件不會溢位
+"""
+
+import numpy as np
+from af_models import (KB, AF_DEFAULTS, FLAG_DEFAULTS, MODEL_PARAMS, PARAM_USERS,
+                       AF_OUTPUT_KEYS, compile_plan, in_range_mask, iter_models)
+
+# KB 與各查詢表 (AF_DEFAULTS 等) 由 af_models 註冊表衍生，於此重新匯出供既有模組使用
+
+
+def _as_flags(value):
+    """將啟用標誌轉為布林陣列 (沿用 Python 真值判斷，與 calculate_af 一致)"""
+    arr = np.asarray(value)
+    if arr.dtype.kind in 'biuf':
+        return arr.astype(bool)
+    return np.vectorize(bool, otypes=[bool])(arr)
+
+
+def _parse_columns(params):
+    """
+    解析欄位參數為一維陣列，並回傳評估計畫與廣播後的列數
+    只解析至少一列啟用的模型所需的參數 (與 calculate_af 只讀取啟用區塊的行為一致)
+    """
+    columns = {flag: np.atleast_1d(_as_flags(params.get(flag, default))).ravel()
+               for flag, default in FLAG_DEFAULTS.items()}
+    plan = compile_plan(frozenset(flag for flag in FLAG_DEFAULTS if columns[flag].any()))
+
+    for name in plan[2]:
+        # 純量欄位保持長度 1，交由 numpy 廣播，避免為每列複製常數
+        columns[name] = np.atleast_1d(np.asarray(params.get(name, AF_DEFAULTS[name]),
+                                                 dtype=float)).ravel()
+    if 'enable_eyring' in FLAG_DEFAULTS and columns['enable_eyring'].any():
+        columns['eyring_stress_type'] = np.atleast_1d(
+            np.asarray(params.get('eyring_stress_type', 'voltage'), dtype=str)).ravel()
+
+    n = np.broadcast_shapes(*[a.shape for a in columns.values()])[0]
+    return columns, plan, n
+
+
+def enabled_parameters(params):
+    """依啟用標誌列出目前模型實際使用的數值參數 (不重複，保持順序)"""
+    names = []
+    for flag, flag_params in MODEL_PARAMS.items():
+        if params.get(flag, FLAG_DEFAULTS[flag]):
+            names.extend(p for p in flag_params if p not in names)
+    return names
+
+
+def _masked(enabled, log_af, valid):
+    """套用啟用遮罩並累積有效性；全部列皆啟用時省略 where"""
+    finite = np.isfinite(log_af)
+    if enabled.all():
+        valid &= finite
+        return log_af
+    valid &= ~enabled | finite
+    return np.where(enabled, log_af, 0.0)
+
+
+def calculate_af_batch(params):
+    """
+    批次計算加速因子 (向量化版本的 calculate_af)
+
+    只評估至少一列啟用的模型 (由 af_models.compile_plan 依啟用組合編譯並快取)，
+    新增的註冊模型不會拖慢一般的溫度 + 濕度計算
+
+    Args:
+        params: 欄位字典，每個鍵與 calculate_af 相同，
+                值可為純量或陣列 (純量會廣播到所有列)
+
+    Returns:
+        dict: 各部分 AF、修正因子、af_total 與 log10_af_total 的 numpy 陣列
+              (未四捨五入)，以及 'valid' 布林陣列 (應力比值 ≤ 0 或分母為零的列為 False)、
+              'in_range' 布林陣列 (啟用模型的參數皆在註冊的有效範圍內)；
+              未啟用 Eyring 的列其 af_eyring_correction 為 NaN；
+              AF 超出浮點數範圍時 af_total 為 inf，但 log10_af_total 仍為有效數值
+    """
+    try:
+        c, (models, corrections, _), n = _parse_columns(params)
+    except Exception as e:
+        return {"error": str(e)}
+
+    valid = np.ones(n, dtype=bool)
+    in_range = np.ones(n, dtype=bool)
+    with np.errstate(all='ignore'):
+        # 各模型的 ln(AF)；未啟用的模型為 0 (即 AF = 1)
+        logs = {}
+        for model in models:
+            enabled = c[model.flag]
+            logs[model.output] = _masked(enabled, model.log_af(c), valid)
+            in_range &= ~enabled | in_range_mask(c, model.inputs, n)
+
+        # 修正型模型 (Eyring) 讀取一般模型的 ln(AF)
+        log_corrections = {}
+        for model in corrections:
+            enabled = c[model.flag]
+            log_corrections[model.output] = _masked(enabled, model.log_af(c, logs), valid)
+            in_range &= ~enabled | in_range_mask(c, model.inputs, n)
+
+        # 總加速因子 = 各因子相乘 = ln(AF) 相加
+        log_total = sum(logs.values()) + sum(log_corrections.values())
+        log_total = np.broadcast_to(log_total, (n,))
+
+        result = {}
+        for model in iter_models():
+            if model.output in logs:
+                result[model.output] = np.exp(logs[model.output])
+            elif model.output in log_corrections:
+                result[model.output] = np.where(c[model.flag],
+                                                np.exp(log_corrections[model.output]), np.nan)
+            else:
+                # 未評估的模型：一般因子為 1，修正因子為 NaN
+                result[model.output] = np.nan if model.is_correction else 1.0
+        result['af_total'] = np.exp(log_total)
+        result['log10_af_total'] = np.where(valid, log_total / np.log(10), np.nan)
+
+    result = {key: np.broadcast_to(arr, (n,)).copy() for key, arr in result.items()}
+    result["valid"] = valid
+    result["in_range"] = in_range
+    result["n"] = n
+    return result
+
+
+def batch_to_json(result, decimals=4):
+    """將批次結果轉為可 JSON 序列化的欄位 (四捨五入規則與 calculate_af 相同，NaN 轉為 None)"""
+    out = {"n": int(result["n"]), "valid": result["valid"].tolist(),
+           "in_range": result["in_range"].tolist()}
+    for key in AF_OUTPUT_KEYS + ['log10_af_total']:
+        arr = np.round(result[key], decimals if key != 'log10_af_total' else 6)
+        mask = np.isfinite(arr) & result["valid"]
+        out[key] = [float(v) if ok else None for v, ok in zip(arr, mask)]
+    return out
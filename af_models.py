@@ -0,0 +1,466 @@
+"""
+加速應力模型註冊表
+每個模型宣告其參數、預設值、有效範圍與向量化的 log_af(columns) 方法；
+計算引擎、報告產生器與前端切換開關皆由此註冊表驅動，
+新增模型只需呼叫 register_model，不需修改 calculate_af
+"""
+
+import string
+from functools import lru_cache
+import numpy as np
+
+KB = 8.617e-5  # Boltzmann constant eV/K
+INF = float('inf')
+
+
+class ModelParam:
+    """模型的單一數值參數"""
+
+    def __init__(self, name, default, valid=(-INF, INF), unit='', label='', step='any', help=''):
+        self.name = name
+        self.default = default
+        self.valid = valid          # 有效範圍 (含端點)，超出時計算仍進行但附上警告
+        self.unit = unit
+        self.label = label
+        self.step = step
+        self.help = help
+
+    def to_dict(self):
+        lo, hi = self.valid
+        return {
+            "name": self.name, "default": self.default, "unit": self.unit,
+            "label": self.label, "step": self.step, "help": self.help,
+            "min": lo if np.isfinite(lo) else None,
+            "max": hi if np.isfinite(hi) else None,
+        }
+
+
+class StressModel:
+    """
+    加速應力模型
+
+    Args:
+        key: 模型代碼 (前端區塊 id 為 f"{key}_section")
+        flag: 啟用標誌參數名稱 (例如 'enable_temp')
+        output: calculate_af 回傳的 AF 欄位名稱 (例如 'af_t')
+        params: 模型擁有的 ModelParam 列表
+        shared: 借用其他模型的參數名稱 (例如 Black 方程式使用 t_use / t_alt)
+        log_af: 向量化函式 log_af(columns) → ln(AF) 陣列 (columns 為參數名稱 → numpy 陣列)
+        default_enabled: 未提供啟用標誌時的預設值
+        title / subtitle / card_label: 前端顯示文字
+        report_label / result_label: 報告參數表與結果表的列標題
+        report_use / report_alt / report_model: 報告參數表欄位 (以 {參數名稱} 代入)
+        extra_fields: 前端需一併送出、但不參與計算的欄位 (例如劑量率)
+        builtin_ui: 前端 index.html 已有手刻區塊時為 True，否則由註冊表自動產生
+    """
+
+    is_correction = False
+
+    def __init__(self, key, flag, output, params, log_af, shared=(), default_enabled=False,
+                 title='', subtitle='', card_label='', report_label='', result_label='',
+                 report_use='', report_alt='', report_model='', extra_fields=(),
+                 builtin_ui=False):
+        self.key = key
+        self.flag = flag
+        self.output = output
+        self.params = list(params)
+        self.shared = list(shared)
+        self._log_af = log_af
+        self.default_enabled = default_enabled
+        self.title = title
+        self.subtitle = subtitle
+        self.card_label = card_label
+        self.report_label = report_label
+        self.result_label = result_label
+        self.report_use = report_use
+        self.report_alt = report_alt
+        self.report_model = report_model
+        self.extra_fields = list(extra_fields)
+        self.builtin_ui = builtin_ui
+
+    @property
+    def param_names(self):
+        return [p.name for p in self.params]
+
+    @property
+    def inputs(self):
+        """模型實際讀取的全部參數 (自有 + 共用)"""
+        return self.param_names + [name for name in self.shared if name not in self.param_names]
+
+    def log_af(self, columns):
+        return self._log_af(columns)
+
+    def enabled(self, af_params):
+        """依 calculate_af 格式的參數判斷模型是否啟用"""
+        return bool(af_params.get(self.flag, self.default_enabled))
+
+    def report_row(self, af_params):
+        """報告參數表的一列: [模型, 使用條件, 測試條件, 模型說明]"""
+        return [self.report_label, _format(self.report_use, af_params),
+                _format(self.report_alt, af_params), _format(self.report_model, af_params)]
+
+    def summary(self, af_params):
+        """單行條件摘要 (使用條件 → 測試條件，模型說明)"""
+        use, alt, model = self.report_row(af_params)[1:]
+        if use.strip('- ') or alt.strip('- '):
+            return f"{use} → {alt}, {model}"
+        return model
+
+    def to_dict(self):
+        return {
+            "key": self.key, "flag": self.flag, "output": self.output,
+            "default_enabled": self.default_enabled, "is_correction": self.is_correction,
+            "title": self.title, "subtitle": self.subtitle, "card_label": self.card_label,
+            "params": [p.to_dict() for p in self.params], "shared": self.shared,
+            "extra_fields": self.extra_fields, "builtin_ui": self.builtin_ui,
+        }
+
+
+class CorrectionModel(StressModel):
+    """
+    修正型模型 (例如 Eyring)：在一般模型之後評估，
+    log_af(columns, logs) 可讀取其他模型已算出的 ln(AF)，回傳 ln(修正因子)
+    """
+
+    is_correction = True
+
+    def log_af(self, columns, logs):
+        return self._log_af(columns, logs)
+
+
+class _BlankDict(dict):
+    def __missing__(self, key):
+        return ''
+
+
+def _format(template, af_params):
+    """以參數代入報告欄位樣板，缺少的參數顯示為空白 (與原本 af_params.get(key, '') 一致)"""
+    return string.Formatter().vformat(template, (), _BlankDict(af_params))
+
+
+# ==================== 註冊表 ====================
+
+MODEL_REGISTRY = {}              # key → StressModel (依註冊順序評估與顯示)
+
+# 由註冊表衍生的查詢表 (原地更新，import 後的參照會跟著變動)
+AF_DEFAULTS = {}                 # 參數 → 預設值
+PARAM_SPECS = {}                 # 參數 → ModelParam
+FLAG_DEFAULTS = {}               # 啟用標誌 → 預設值
+MODEL_PARAMS = {}                # 啟用標誌 → 自有參數列表
+PARAM_USERS = {}                 # 參數 → 使用該參數的啟用標誌
+AF_OUTPUT_KEYS = []              # 輸出欄位 (順序與 calculate_af 回傳相同)
+
+
+def register_model(model):
+    """註冊 (或取代同代碼的) 應力模型，並更新衍生查詢表"""
+    for p in model.params:
+        owner = PARAM_SPECS.get(p.name)
+        if owner is not None and p.name not in MODEL_PARAMS.get(model.flag, []):
+            raise ValueError(f"參數 {p.name} 已由其他模型宣告")
+    MODEL_REGISTRY[model.key] = model
+    _rebuild_tables()
+    return model
+
+
+def unregister_model(key):
+    """移除已註冊的應力模型"""
+    model = MODEL_REGISTRY.pop(key)
+    _rebuild_tables()
+    return model
+
+
+def _rebuild_tables():
+    models = list(MODEL_REGISTRY.values())
+    AF_DEFAULTS.clear()
+    PARAM_SPECS.clear()
+    FLAG_DEFAULTS.clear()
+    MODEL_PARAMS.clear()
+    PARAM_USERS.clear()
+
+    for model in models:
+        FLAG_DEFAULTS[model.flag] = model.default_enabled
+        MODEL_PARAMS[model.flag] = model.param_names
+        for p in model.params:
+            AF_DEFAULTS[p.name] = p.default
+            PARAM_SPECS[p.name] = p
+    for name in AF_DEFAULTS:
+        PARAM_USERS[name] = [m.flag for m in models if name in m.inputs]
+
+    # 修正因子與總 AF 固定排在最後
+    outputs = [m.output for m in models if not m.is_correction]
+    outputs += [m.output for m in models if m.is_correction] + ['af_total']
+    AF_OUTPUT_KEYS[:] = outputs
+    compile_plan.cache_clear()
+
+
+def get_model(key):
+    return MODEL_REGISTRY[key]
+
+
+def iter_models(af_params=None):
+    """依註冊順序列出模型；提供 af_params 時只列出啟用的模型"""
+    for model in MODEL_REGISTRY.values():
+        if af_params is None or model.enabled(af_params):
+            yield model
+
+
+@lru_cache(maxsize=256)
+def compile_plan(enabled_flags):
+    """
+    由啟用標誌集合編譯融合評估計畫 (依啟用組合快取)
+
+    Returns:
+        (models, corrections, inputs): 需評估的一般模型、修正模型，以及需解析的參數名稱；
+        未啟用的模型完全不會被評估或解析
+    """
+    enabled_flags = frozenset(enabled_flags)
+    models = tuple(m for m in MODEL_REGISTRY.values()
+                   if m.flag in enabled_flags and not m.is_correction)
+    corrections = tuple(m for m in MODEL_REGISTRY.values()
+                        if m.flag in enabled_flags and m.is_correction)
+    inputs = []
+    for m in models + corrections:
+        inputs.extend(name for name in m.inputs if name not in inputs)
+    return models, corrections, tuple(inputs)
+
+
+def validity_warnings(af_params):
+    """檢查啟用模型的參數是否落在有效範圍內，回傳警告訊息列表"""
+    warnings = []
+    checked = set()
+    for model in iter_models(af_params):
+        for name in model.inputs:
+            if name in checked or name not in PARAM_SPECS:
+                continue
+            checked.add(name)
+            spec = PARAM_SPECS[name]
+            try:
+                value = float(af_params.get(name, spec.default))
+            except (TypeError, ValueError):
+                continue
+            lo, hi = spec.valid
+            if not lo <= value <= hi:
+                warnings.append(f"參數 {spec.label or name} = {value:g} 超出模型有效範圍 [{lo:g}, {hi:g}]")
+    return warnings
+
+
+def in_range_mask(columns, inputs, n):
+    """向量化檢查參數是否在有效範圍內 (columns 為已解析的陣列)"""
+    ok = np.ones(n, dtype=bool)
+    for name in inputs:
+        spec = PARAM_SPECS.get(name)
+        if spec is None:
+            continue
+        lo, hi = spec.valid
+        if np.isfinite(lo) or np.isfinite(hi):
+            ok &= (columns[name] >= lo) & (columns[name] <= hi)
+    return ok
+
+
+def models_metadata():
+    """前端與 /af_models 使用的模型描述"""
+    return [m.to_dict() for m in MODEL_REGISTRY.values()]
+
+
+# ==================== 內建模型 ====================
+
+def _log_ratio(alt, use):
+    return np.log(alt / use)
+
+
+def _kelvin(c, name):
+    """攝氏轉絕對溫度 (同一次評估中快取，供多個模型共用)"""
+    key = f"_{name}_k"
+    if key not in c:
+        c[key] = c[name] + 273.15
+    return c[key]
+
+
+def _log_arrhenius(c):
+    return (c['ea'] / KB) * (1/_kelvin(c, 't_use') - 1/_kelvin(c, 't_alt'))
+
+
+# 1. 溫度加速 (AF_T) - Arrhenius: exp( (Ea/k) * (1/T_use - 1/T_alt) )
+register_model(StressModel(
+    'temp', 'enable_temp', 'af_t', default_enabled=True, builtin_ui=True,
+    params=[ModelParam('ea', 1.0, (0.0, 5.0), 'eV', '活化能 Ea'),
+            ModelParam('t_use', 32, (-273.15, INF), '°C', '使用溫度'),
+            ModelParam('t_alt', 70, (-273.15, INF), '°C', '測試溫度')],
+    log_af=_log_arrhenius,
+    title='溫度 (Temperature)', subtitle='Arrhenius', card_label='AF (Temp)',
+    report_label='Temperature / 溫度', result_label='AF (Temperature) / 溫度',
+    report_use='{t_use}°C', report_alt='{t_alt}°C', report_model='Arrhenius (Ea={ea} eV)'))
+
+# 2. 濕度加速 (AF_RH) - Peck's Model: (RH_alt / RH_use) ^ n
+register_model(StressModel(
+    'hum', 'enable_hum', 'af_rh', default_enabled=True, builtin_ui=True,
+    params=[ModelParam('rh_use', 60, (0.0, 100.0), '%', '使用濕度'),
+            ModelParam('rh_alt', 90, (0.0, 100.0), '%', '測試濕度'),
+            ModelParam('n_hum', 2.0, (0.0, 10.0), '', '濕度指數 n')],
+    log_af=lambda c: c['n_hum'] * _log_ratio(c['rh_alt'], c['rh_use']),
+    title='濕度 (Humidity)', subtitle="Peck's Model", card_label='AF (Hum)',
+    report_label='Humidity / 濕度', result_label='AF (Humidity) / 濕度',
+    report_use='{rh_use}%', report_alt='{rh_alt}%', report_model='Peck (n={n_hum})'))
+
+# 3. 電壓加速 (AF_V) - Inverse Power Law: (V_alt / V_use) ^ beta
+register_model(StressModel(
+    'voltage', 'enable_voltage', 'af_v', builtin_ui=True,
+    params=[ModelParam('v_use', 1.0, (0.0, INF), 'V', '使用電壓'),
+            ModelParam('v_alt', 1.0, (0.0, INF), 'V', '測試電壓'),
+            ModelParam('beta_v', 1.0, (0.0, 50.0), '', '電壓指數 β')],
+    log_af=lambda c: c['beta_v'] * _log_ratio(c['v_alt'], c['v_use']),
+    title='電壓 (Voltage)', subtitle='Inverse Power Law', card_label='AF (Volt)',
+    report_label='Voltage / 電壓', result_label='AF (Voltage) / 電壓',
+    report_use='{v_use}V', report_alt='{v_alt}V', report_model='IPL (β={beta_v})'))
+
+# 4. 熱循環加速 (AF_TC) - Coffin-Manson: (ΔT_alt / ΔT_use)^β × (f_alt / f_use)^α
+register_model(StressModel(
+    'tc', 'enable_tc', 'af_tc', builtin_ui=True,
+    params=[ModelParam('dt_use', 70, (0.0, INF), '°C', '使用溫差 ΔT'),
+            ModelParam('dt_alt', 165, (0.0, INF), '°C', '測試溫差 ΔT'),
+            ModelParam('f_use', 1/24, (0.0, INF), 'cycles/hr', '使用循環頻率'),
+            ModelParam('f_alt', 2, (0.0, INF), 'cycles/hr', '測試循環頻率'),
+            ModelParam('alpha_tc', 0.33, (0.0, 3.0), '', '頻率指數 α'),
+            ModelParam('beta_tc', 1.9, (0.0, 10.0), '', '溫差指數 β')],
+    log_af=lambda c: (c['beta_tc'] * _log_ratio(c['dt_alt'], c['dt_use']) +
+                      c['alpha_tc'] * _log_ratio(c['f_alt'], c['f_use'])),
+    title='熱循環 (Thermal Cycling)', subtitle='Coffin-Manson', card_label='AF (TC)',
+    report_label='Thermal Cycling / 熱循環', result_label='AF (Thermal Cycling) / 熱循環',
+    report_use='ΔT={dt_use}°C, f={f_use}/hr', report_alt='ΔT={dt_alt}°C, f={f_alt}/hr',
+    report_model='Coffin-Manson (α={alpha_tc}, β={beta_tc})'))
+
+# 5. 振動加速 (AF_VIB) - Inverse Power Law: (G_alt / G_use)^n
+register_model(StressModel(
+    'vib', 'enable_vib', 'af_vib', builtin_ui=True,
+    params=[ModelParam('g_use', 1.0, (0.0, INF), 'Grms', '使用振動量級'),
+            ModelParam('g_alt', 20.0, (0.0, INF), 'Grms', '測試振動量級'),
+            ModelParam('n_vib', 8.0, (0.0, 20.0), '', '疲勞指數 n')],
+    log_af=lambda c: c['n_vib'] * _log_ratio(c['g_alt'], c['g_use']),
+    title='機械振動 (Vibration)', subtitle='Inverse Power Law', card_label='AF (Vib)',
+    report_label='Vibration / 機械振動', result_label='AF (Vibration) / 振動',
+    report_use='{g_use}G', report_alt='{g_alt}G', report_model='IPL (n={n_vib})'))
+
+# 6. 紫外線輻射加速 (AF_UV) - 實驗比對模型: t_field / t_accelerated
+register_model(StressModel(
+    'uv', 'enable_uv', 'af_uv', builtin_ui=True,
+    params=[ModelParam('t_field_uv', 8760, (0.0, INF), 'hr', '現場劣化時間'),
+            ModelParam('t_accel_uv', 1000, (0.0, INF), 'hr', '加速劣化時間')],
+    log_af=lambda c: _log_ratio(c['t_field_uv'], c['t_accel_uv']),
+    title='紫外線輻射 (UV)', subtitle='實驗比對模型', card_label='AF (UV)',
+    report_label='UV Radiation / 紫外線', result_label='AF (UV) / 紫外線',
+    report_use='{t_field_uv} hrs', report_alt='{t_accel_uv} hrs',
+    report_model='Experimental Comparison'))
+
+# 7. 化學濃度加速 (AF_CHEM) - Inverse Power Law: (C_alt / C_use)^n
+register_model(StressModel(
+    'chem', 'enable_chem', 'af_chem', builtin_ui=True,
+    params=[ModelParam('c_use', 1.0, (0.0, INF), 'ppm', '使用濃度'),
+            ModelParam('c_alt', 5.0, (0.0, INF), 'ppm', '測試濃度'),
+            ModelParam('n_chem', 2.0, (0.0, 10.0), '', '濃度指數 n')],
+    log_af=lambda c: c['n_chem'] * _log_ratio(c['c_alt'], c['c_use']),
+    title='化學濃度 (Chemical)', subtitle='Inverse Power Law', card_label='AF (Chem)',
+    report_label='Chemical / 化學濃度', result_label='AF (Chemical) / 化學',
+    report_use='C={c_use}', report_alt='C={c_alt}', report_model='IPL (n={n_chem})'))
+
+# 8. 輻射劑量加速 (AF_RAD) - TID Model: (D_alt / D_use)^n
+register_model(StressModel(
+    'rad', 'enable_rad', 'af_rad', builtin_ui=True, extra_fields=['dose_rate'],
+    params=[ModelParam('d_use', 10, (0.0, INF), 'krad', '使用累積劑量'),
+            ModelParam('d_alt', 100, (0.0, INF), 'krad', '測試累積劑量'),
+            ModelParam('n_rad', 1.0, (0.0, 5.0), '', '劑量指數 n')],
+    log_af=lambda c: c['n_rad'] * _log_ratio(c['d_alt'], c['d_use']),
+    title='輻射劑量 (Radiation)', subtitle='TID Model', card_label='AF (Rad)',
+    report_label='Radiation / 輻射劑量', result_label='AF (Radiation) / 輻射',
+    report_use='D={d_use} krad', report_alt='D={d_alt} krad', report_model='TID (n={n_rad})'))
+
+
+def _log_eyring_correction(c, logs):
+    """
+    9. Eyring 模型 (應力交互作用)
+    廣義Eyring模型: t = A × (1/S)^B × e^(Ea/kT) × e^(D×S/T)
+    ln(t_use / t_alt) = B·ln(S_alt/S_use) + (Ea/k)(1/T_use - 1/T_alt) + D·(S_use/T_use - S_alt/T_alt)
+    常數 A 互相抵消，指數項不需個別計算，因此不會溢位
+    """
+    stress_type = c['eyring_stress_type']
+    is_voltage = stress_type == 'voltage'
+    is_humidity = stress_type == 'humidity'
+    s_use = np.where(is_voltage, c['v_use'], np.where(is_humidity, c['rh_use'], 1.0))
+    s_alt = np.where(is_voltage, c['v_alt'], np.where(is_humidity, c['rh_alt'], 1.0))
+    log_af_eyring = (c['eyring_b'] * _log_ratio(s_alt, s_use) + _log_arrhenius(c) +
+                     c['eyring_d'] * (s_use / _kelvin(c, 't_use') - s_alt / _kelvin(c, 't_alt')))
+
+    # 修正因子 = AF_Eyring / AF_simple，僅在對應的應力因子啟用時生效
+    use_voltage = is_voltage & c['enable_voltage']
+    use_humidity = is_humidity & c['enable_hum']
+    log_simple = logs.get('af_t', 0.0) + np.where(use_voltage, logs.get('af_v', 0.0),
+                                                   logs.get('af_rh', 0.0))
+    apply_correction = use_voltage | use_humidity
+    # 未套用修正的列仍需反映 Eyring 參數本身是否有效
+    return np.where(apply_correction, log_af_eyring - log_simple,
+                    np.where(np.isfinite(log_af_eyring), 0.0, np.nan))
+
+
+register_model(CorrectionModel(
+    'eyring', 'enable_eyring', 'af_eyring_correction', builtin_ui=True,
+    extra_fields=['eyring_stress_type'],
+    params=[ModelParam('eyring_d', 0.1, (-INF, INF), '', '交互作用係數 D'),
+            ModelParam('eyring_a', 1000, (0.0, INF), '', '常數 A'),
+            ModelParam('eyring_b', 2.0, (0.0, 50.0), '', '應力指數 B')],
+    shared=['ea', 't_use', 't_alt', 'v_use', 'v_alt', 'rh_use', 'rh_alt'],
+    log_af=_log_eyring_correction,
+    title='Eyring 模型 (應力交互)', subtitle='Generalized Eyring', card_label='Eyring 修正',
+    report_label='Eyring Model / 應力交互', result_label='Eyring Correction / Eyring 修正因子',
+    report_use='-', report_alt='-',
+    report_model='Type={eyring_stress_type}, D={eyring_d}'))
+
+
+# ==================== 擴充模型 ====================
+
+# 10. 焊點熱循環 (AF_NL) - Norris-Landzberg:
+#     (ΔT_alt/ΔT_use)^n × (f_use/f_alt)^m × exp( Ea/k × (1/Tmax_use - 1/Tmax_alt) )
+register_model(StressModel(
+    'nl', 'enable_nl', 'af_nl',
+    params=[ModelParam('nl_dt_use', 60, (0.0, INF), '°C', '使用溫差 ΔT', help='現場每次循環的溫度變化'),
+            ModelParam('nl_dt_alt', 165, (0.0, INF), '°C', '測試溫差 ΔT'),
+            ModelParam('nl_f_use', 1, (0.0, INF), 'cycles/day', '使用循環頻率'),
+            ModelParam('nl_f_alt', 48, (0.0, INF), 'cycles/day', '測試循環頻率'),
+            ModelParam('nl_tmax_use', 60, (-273.15, INF), '°C', '使用最高溫度'),
+            ModelParam('nl_tmax_alt', 125, (-273.15, INF), '°C', '測試最高溫度'),
+            ModelParam('nl_n', 1.9, (0.0, 10.0), '', '溫差指數 n', help='SnPb 焊料約 1.9，SAC 約 2.65'),
+            ModelParam('nl_m', 1/3, (0.0, 3.0), '', '頻率指數 m'),
+            ModelParam('nl_ea_k', 1414, (0.0, INF), 'K', 'Ea/k', help='SnPb 焊料約 1414 K')],
+    log_af=lambda c: (c['nl_n'] * _log_ratio(c['nl_dt_alt'], c['nl_dt_use']) +
+                      c['nl_m'] * _log_ratio(c['nl_f_use'], c['nl_f_alt']) +
+                      c['nl_ea_k'] * (1/(c['nl_tmax_use'] + 273.15) - 1/(c['nl_tmax_alt'] + 273.15))),
+    title='焊點熱循環 (Solder Joint)', subtitle='Norris-Landzberg', card_label='AF (NL)',
+    report_label='Solder Joint TC / 焊點熱循環', result_label='AF (Norris-Landzberg) / 焊點',
+    report_use='ΔT={nl_dt_use}°C, Tmax={nl_tmax_use}°C',
+    report_alt='ΔT={nl_dt_alt}°C, Tmax={nl_tmax_alt}°C',
+    report_model='Norris-Landzberg (n={nl_n}, m={nl_m})'))
+
+# 11. 電遷移 (AF_EM) - Black's Equation: (J_alt/J_use)^n × exp( Ea/k × (1/T_use - 1/T_alt) )
+#     溫度沿用使用/測試溫度；與 Arrhenius 同時啟用時溫度效應會重複計算
+register_model(StressModel(
+    'em', 'enable_em', 'af_em', shared=['t_use', 't_alt'],
+    params=[ModelParam('em_j_use', 1.0, (0.0, INF), 'MA/cm²', '使用電流密度'),
+            ModelParam('em_j_alt', 2.0, (0.0, INF), 'MA/cm²', '測試電流密度'),
+            ModelParam('em_n', 2.0, (0.0, 10.0), '', '電流密度指數 n', help='一般介於 1 ~ 2'),
+            ModelParam('em_ea', 0.7, (0.0, 5.0), 'eV', '電遷移活化能',
+                       help='溫度取自使用/測試條件；請勿與溫度模型重複啟用')],
+    log_af=lambda c: (c['em_n'] * _log_ratio(c['em_j_alt'], c['em_j_use']) +
+                      (c['em_ea'] / KB) * (1/_kelvin(c, 't_use') - 1/_kelvin(c, 't_alt'))),
+    title='電遷移 (Electromigration)', subtitle="Black's Equation", card_label='AF (EM)',
+    report_label='Electromigration / 電遷移', result_label='AF (Electromigration) / 電遷移',
+    report_use='J={em_j_use} MA/cm², {t_use}°C', report_alt='J={em_j_alt} MA/cm², {t_alt}°C',
+    report_model="Black's (n={em_n}, Ea={em_ea} eV)"))
+
+# 12. 濕度加速 (AF_LAWSON) - Lawson Model: exp( b × (RH_alt² - RH_use²) )
+#     濕度沿用使用/測試濕度；與 Peck's 濕度模型為替代關係
+register_model(StressModel(
+    'lawson', 'enable_lawson', 'af_lawson', shared=['rh_use', 'rh_alt'],
+    params=[ModelParam('lawson_b', 5.57e-4, (0.0, 0.01), '1/%²', '濕度係數 b',
+                       help='濕度取自使用/測試條件；請勿與 Peck 濕度模型重複啟用')],
+    log_af=lambda c: c['lawson_b'] * (c['rh_alt'] ** 2 - c['rh_use'] ** 2),
+    title='濕度 (Lawson)', subtitle='Lawson Model', card_label='AF (Lawson)',
+    report_label='Humidity (Lawson) / 濕度', result_label='AF (Lawson) / 濕度',
+    report_use='{rh_use}%', report_alt='{rh_alt}%', report_model='Lawson (b={lawson_b})'))
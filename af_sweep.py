@@ -0,0 +1,169 @@
+"""
+加速因子參數掃描 (Parameter Sweep)
+對多個參數的範圍建立笛卡兒網格，分塊 (chunk) 計算 af_total，
+結果可串流輸出為 .npy 或原始二進位，用於熱圖與等 AF 曲線
+"""
+
+import io
+import numpy as np
+from af_engine import AF_DEFAULTS, calculate_af_batch
+
+DEFAULT_CHUNK_SIZE = 262144      # 每塊計算的網格點數 (控制記憶體上限)
+MAX_SWEEP_CELLS = 10 ** 9        # 串流輸出的網格點數上限
+MAX_JSON_CELLS = 100000          # JSON 回傳的網格點數上限 (供前端直接繪圖)
+MIN_CHUNK_SIZE = 1024            # API 可指定的區塊大小下限 (過小時每塊的固定開銷過高)
+MAX_CHUNK_SIZE = DEFAULT_CHUNK_SIZE * 16   # API 可指定的區塊大小上限 (維持記憶體上限)
+
+
+def parse_chunk_size(value):
+    """
+    解析 API 指定的區塊大小，限制於 [MIN_CHUNK_SIZE, MAX_CHUNK_SIZE]；未提供時使用預設值
+
+    Raises:
+        ValueError: 不是整數
+    """
+    if value is None:
+        return DEFAULT_CHUNK_SIZE
+    if isinstance(value, bool):
+        raise ValueError("chunk_size 需為整數")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("chunk_size 需為整數")
+    if not np.isfinite(number) or number != int(number):
+        raise ValueError("chunk_size 需為整數")
+    return int(min(max(int(number), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE))
+
+
+def expand_axis(spec):
+    """
+    展開單一掃描軸
+
+    Args:
+        spec: 數值列表，或 {'values': [...]}，
+              或 {'start', 'stop', 'num', 'scale': 'linear' | 'log'}
+
+    Returns:
+        np.ndarray: 該軸的取值
+    """
+    if isinstance(spec, dict):
+        if 'values' in spec:
+            values = np.asarray(spec['values'], dtype=float)
+        else:
+            start = float(spec['start'])
+            stop = float(spec['stop'])
+            num = int(spec.get('num', 50))
+            if spec.get('scale', 'linear') == 'log':
+                values = np.geomspace(start, stop, num)
+            else:
+                values = np.linspace(start, stop, num)
+    else:
+        values = np.asarray(spec, dtype=float)
+
+    values = np.atleast_1d(values).ravel()
+    if values.size == 0:
+        raise ValueError("掃描軸不可為空")
+    return values
+
+
+def prepare_af_sweep(base_params, axes, output='af_total'):
+    """
+    建立掃描計畫
+
+    Args:
+        base_params: 固定參數 (與 calculate_af 相同格式，含啟用標誌)
+        axes: {參數名稱: 軸規格} (依插入順序決定網格維度順序)
+        output: 'af_total' 或 'log10_af_total' (極端條件下 AF 超出浮點數範圍時使用)
+
+    Returns:
+        dict: {'names', 'values', 'shape', 'size', 'base', 'output'} 或 {'error': ...}
+    """
+    try:
+        if output not in ('af_total', 'log10_af_total'):
+            return {"error": f"不支援的輸出欄位: {output}"}
+        if not axes:
+            return {"error": "至少需要一個掃描參數"}
+
+        names = list(axes)
+        for name in names:
+            if name not in AF_DEFAULTS:
+                return {"error": f"不支援的掃描參數: {name}"}
+
+        values = [expand_axis(axes[name]) for name in names]
+        shape = tuple(v.size for v in values)
+        size = int(np.prod(shape, dtype=np.int64))
+        if size > MAX_SWEEP_CELLS:
+            return {"error": f"網格點數 {size} 超過上限 {MAX_SWEEP_CELLS}"}
+
+        base = {k: v for k, v in (base_params or {}).items() if k not in axes}
+        return {"names": names, "values": values, "shape": shape, "size": size, "base": base,
+                "output": output}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def iter_af_sweep(plan, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    逐塊計算網格上的輸出欄位 (C order，最後一個軸變化最快)
+
+    Yields:
+        (start, values): 區塊起始的平坦索引與輸出陣列 (無效點為 NaN)
+    """
+    chunk_size = max(int(chunk_size), 1)
+    for start in range(0, plan["size"], chunk_size):
+        stop = min(start + chunk_size, plan["size"])
+        index = np.unravel_index(np.arange(start, stop), plan["shape"])
+
+        columns = dict(plan["base"])
+        for name, axis_values, axis_index in zip(plan["names"], plan["values"], index):
+            columns[name] = axis_values[axis_index]
+
+        batch = calculate_af_batch(columns)
+        if "error" in batch:
+            raise ValueError(batch["error"])
+
+        values = np.where(batch["valid"], batch[plan["output"]], np.nan)
+        yield start, values.astype(dtype, copy=False)
+
+
+def sweep_to_array(plan, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """將完整網格計算到記憶體中 (僅適用於小型網格)"""
+    grid = np.empty(plan["size"], dtype=dtype)
+    for start, values in iter_af_sweep(plan, chunk_size, dtype):
+        grid[start:start + values.size] = values
+    return grid.reshape(plan["shape"])
+
+
+def npy_header(plan, dtype=np.float64):
+    """產生完整網格的 .npy 檔頭 (內容可隨後逐塊附加)"""
+    header = {
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': plan["shape"],
+    }
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, header)
+    return buffer.getvalue()
+
+
+def iter_af_sweep_bytes(plan, fmt='npy', chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    以位元組串流輸出掃描結果
+
+    Args:
+        fmt: 'npy' (含檔頭，可直接 np.load) 或 'raw' (little-endian 原始數值)
+    """
+    dtype = np.dtype(dtype).newbyteorder('<')
+    if fmt == 'npy':
+        yield npy_header(plan, dtype)
+    for _, values in iter_af_sweep(plan, chunk_size, dtype):
+        yield values.astype(dtype, copy=False).tobytes()
+
+
+def write_af_sweep_npy(plan, fp, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """將掃描結果逐塊寫入 .npy 檔 (fp 可為路徑或檔案物件)"""
+    if isinstance(fp, (str, bytes)) or hasattr(fp, '__fspath__'):
+        with open(fp, 'wb') as f:
+            return write_af_sweep_npy(plan, f, chunk_size, dtype)
+    for block in iter_af_sweep_bytes(plan, 'npy', chunk_size, dtype):
+        fp.write(block)
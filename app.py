@@ -1,204 +1,80 @@
 import os
 import numpy as np
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 from scipy import stats, special
 from datetime import datetime
+from af_engine import calculate_af_batch, batch_to_json, AF_OUTPUT_KEYS
+from af_models import iter_models, models_metadata, validity_warnings
+from af_sweep import (prepare_af_sweep, sweep_to_array, iter_af_sweep_bytes,
+                      parse_chunk_size, MAX_JSON_CELLS)
+from uncertainty import run_monte_carlo, parse_summary_options
+from sensitivity import run_sobol_analysis
+from response_cache import canonical_key, cache_from_env
+from activation_energy import estimate_activation_energy
+from median_ranks import median_ranks
+from weibull_mle import fit_weibull_mle
+from weibull_3p import fit_weibull_3p_rank, fit_weibull_3p_mle
+from weibull_bounds import mle_bounds, reliability_bounds, round_bound, DEFAULT_CONF_LEVEL
+from weibull_batch import calculate_weibull_batch, weibull_batch_to_json
+from weibull_grouped import calculate_weibull_grouped
+from weibull_interval import calculate_weibull_interval
+from life_distributions import rank_distributions, distribution_reliability
+from weibull_mixture import calculate_weibull_mixture, mixture_reliability, mixture_curves
+from competing_modes import calculate_competing_modes
+from weibayes import weibayes, DEFAULT_GRID_POINTS
+from plan_optimizer import optimize_test_conditions
+from eyring_fit import fit_eyring
+from life_stress import fit_life_stress
+from weibull_bootstrap import prepare_bootstrap, execute_bootstrap
+from weibull_bayes import prepare_bayes, execute_bayes
+from jobs import JobRegistry, JobLimitExceeded, clamp_n_jobs
+from weibull_session import WeibullSession, SessionRegistry
 
 app = Flask(__name__)
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
+# /calculate 回應快取 (由 RELIABILITY_CACHE 等環境變數設定，見 response_cache.cache_from_env)
+response_cache = cache_from_env()
+
+# 背景計算任務 (bootstrap 等；任務只保存在此 worker 行程)
+background_jobs = JobRegistry()
+
+# 進行中試驗的增量 Weibull 分析工作階段 (只保存在此 worker 行程)
+weibull_sessions = SessionRegistry()
+
 # --- 核心計算邏輯 ---
 
 def calculate_af(params):
     """
     計算加速因子 (AF Total)
-    基於 Arrhenius (溫度), Peck (濕度), Inverse Power Law (電壓),
-    Coffin-Manson (熱循環), IPL (振動) 模型
+    各應力模型 (Arrhenius, Peck, IPL, Coffin-Manson, Eyring 等) 由 af_models 註冊表提供，
+    計算委由 af_engine 的對數空間核心 (單列批次)，另回傳 log10_af_total；
+    參數超出註冊的有效範圍時於 warnings 列出 (仍回傳計算結果)
     """
     try:
-        # 提取基本參數
-        t_use = float(params.get('t_use', 32))
-        rh_use = float(params.get('rh_use', 60))
-        v_use = float(params.get('v_use', 1.0)) # 假設 V_use = V_rated
-
-        t_alt = float(params.get('t_alt', 70))
-        rh_alt = float(params.get('rh_alt', 90))
-        v_alt = float(params.get('v_alt', 1.0)) # 假設 V_alt = V_rated (或使用者輸入)
-
-        ea = float(params.get('ea', 1.0))
-        n_hum = float(params.get('n_hum', 2.0))
-        beta_v = float(params.get('beta_v', 1.0))
-
-        kb = 8.617e-5  # Boltzmann constant eV/K
-
-        # 提取啟用標誌 (預設溫度和濕度啟用，其他停用)
-        enable_temp = params.get('enable_temp', True)
-        enable_hum = params.get('enable_hum', True)
-        enable_voltage = params.get('enable_voltage', False)
-        enable_tc = params.get('enable_tc', False)  # Thermal Cycling
-        enable_vib = params.get('enable_vib', False)  # Vibration
-        enable_uv = params.get('enable_uv', False)  # UV Radiation
-        enable_chem = params.get('enable_chem', False)  # Chemical Concentration
-
-        # 溫度轉換 (Celsius to Kelvin)
-        temp_use_k = t_use + 273.15
-        temp_alt_k = t_alt + 273.15
-
-        # 1. 溫度加速 (AF_T) - Arrhenius
-        # Formula: exp( (Ea/k) * (1/T_use - 1/T_alt) )
-        if enable_temp:
-            af_t = np.exp((ea / kb) * (1/temp_use_k - 1/temp_alt_k))
-        else:
-            af_t = 1.0
-
-        # 2. 濕度加速 (AF_RH) - Peck's Model
-        # Formula: (RH_alt / RH_use) ^ n
-        if enable_hum:
-            af_rh = (rh_alt / rh_use) ** n_hum
-        else:
-            af_rh = 1.0
-
-        # 3. 電壓加速 (AF_V) - Inverse Power Law
-        # Formula: (V_alt / V_use) ^ beta
-        # 注意：若 V_alt 和 V_use 相同，此項為 1
-        if enable_voltage:
-            af_v = (v_alt / v_use) ** beta_v
-        else:
-            af_v = 1.0
-
-        # 4. 熱循環加速 (AF_TC) - Coffin-Manson Model
-        # Formula: (ΔT_alt / ΔT_use)^β × (f_alt / f_use)^α
-        # 參考：JESD22-A104C, Indium Corporation研究
-        if enable_tc:
-            dt_use = float(params.get('dt_use', 70))  # 使用溫度範圍 (°C)
-            dt_alt = float(params.get('dt_alt', 165))  # 測試溫度範圍 (°C)
-            f_use = float(params.get('f_use', 1/24))  # 使用循環頻率 (cycles/hr), 預設 1次/天
-            f_alt = float(params.get('f_alt', 2))  # 測試循環頻率 (cycles/hr), 預設 2次/hr
-            alpha_tc = float(params.get('alpha_tc', 0.33))  # 頻率指數, 典型值 0.33
-            beta_tc = float(params.get('beta_tc', 1.9))  # 溫度指數, 典型值 1.9 (焊點)
-
-            af_tc = ((dt_alt / dt_use) ** beta_tc) * ((f_alt / f_use) ** alpha_tc)
-        else:
-            af_tc = 1.0
-
-        # 5. 振動加速 (AF_VIB) - Inverse Power Law
-        # Formula: (G_alt / G_use)^n
-        # 參考：JESD22-B103-B
-        if enable_vib:
-            g_use = float(params.get('g_use', 1.0))  # 使用振動加速度 (g)
-            g_alt = float(params.get('g_alt', 20.0))  # 測試振動加速度 (g), JEDEC標準
-            n_vib = float(params.get('n_vib', 8.0))  # 功率指數, 典型值 8.0 (焊點疲勞)
-
-            af_vib = (g_alt / g_use) ** n_vib
-        else:
-            af_vib = 1.0
-
-        # 6. 紫外線輻射加速 (AF_UV) - 實驗比對模型
-        # Formula: t_field / t_accelerated
-        # 參考：ASTM G155, ISO 4892
-        if enable_uv:
-            t_field_uv = float(params.get('t_field_uv', 8760))  # 現場暴露時間 (小時)
-            t_accel_uv = float(params.get('t_accel_uv', 1000))  # 加速測試時間 (小時)
-
-            af_uv = t_field_uv / t_accel_uv
-        else:
-            af_uv = 1.0
-
-        # 7. 化學濃度加速 (AF_CHEM) - Inverse Power Law
-        # Formula: (C_alt / C_use)^n
-        # 參考：Corrosion degradation models
-        if enable_chem:
-            c_use = float(params.get('c_use', 1.0))  # 使用濃度 (相對單位)
-            c_alt = float(params.get('c_alt', 5.0))  # 測試濃度 (相對單位)
-            n_chem = float(params.get('n_chem', 2.0))  # 功率指數, 典型值 1.5-3.0
-
-            af_chem = (c_alt / c_use) ** n_chem
-        else:
-            af_chem = 1.0
-
-        # 8. 輻射劑量加速 (AF_RAD) - Total Ionizing Dose (TID) Model
-        # Formula: (D_alt / D_use)^n
-        # 參考：MIL-STD-883, ESCC Basic Specification No. 22900
-        enable_rad = params.get('enable_rad', False)
-        if enable_rad:
-            d_use = float(params.get('d_use', 10))  # 使用環境累積劑量 (krad)
-            d_alt = float(params.get('d_alt', 100))  # 測試累積劑量 (krad)
-            n_rad = float(params.get('n_rad', 1.0))  # 劑量敏感度指數, 典型值 0.5-2.0
-            # dose_rate 用於記錄但不直接影響AF（劑量率效應需要更複雜的模型）
-
-            af_rad = (d_alt / d_use) ** n_rad
-        else:
-            af_rad = 1.0
-
-        # 9. Eyring 模型 (應力交互作用)
-        # 用於處理溫度與非熱應力的交互效應
-        enable_eyring = params.get('enable_eyring', False)
-        af_eyring_correction = 1.0  # Eyring修正因子
-
-        if enable_eyring:
-            # 提取Eyring參數
-            stress_type = params.get('eyring_stress_type', 'voltage')
-            eyring_d = float(params.get('eyring_d', 0.1))  # 交互作用參數
-            eyring_a = float(params.get('eyring_a', 1000))  # 模型常數A
-            eyring_b = float(params.get('eyring_b', 2.0))   # 應力指數B
-
-            # 根據選擇的應力類型獲取應力值
-            if stress_type == 'voltage':
-                s_use = v_use
-                s_alt = v_alt
-            elif stress_type == 'humidity':
-                s_use = rh_use
-                s_alt = rh_alt
-            else:
-                s_use = 1.0
-                s_alt = 1.0
-
-            # 廣義Eyring模型: t = A × (1/S)^B × e^(Ea/kT) × e^(D×S/T)
-            # 計算使用條件下的壽命 t_use
-            t_use_eyring = (eyring_a *
-                           (1.0 / s_use) ** eyring_b *
-                           np.exp(ea / (kb * temp_use_k)) *
-                           np.exp(eyring_d * s_use / temp_use_k))
-
-            # 計算測試條件下的壽命 t_alt
-            t_alt_eyring = (eyring_a *
-                           (1.0 / s_alt) ** eyring_b *
-                           np.exp(ea / (kb * temp_alt_k)) *
-                           np.exp(eyring_d * s_alt / temp_alt_k))
-
-            # Eyring 加速因子 = t_use / t_alt
-            af_eyring = t_use_eyring / t_alt_eyring
-
-            # 計算Eyring修正因子（相對於簡單相乘的差異）
-            # 簡單模型: AF_simple = AF_T × AF_S
-            if stress_type == 'voltage' and enable_voltage:
-                af_simple = af_t * af_v
-                af_eyring_correction = af_eyring / af_simple if af_simple > 0 else 1.0
-            elif stress_type == 'humidity' and enable_hum:
-                af_simple = af_t * af_rh
-                af_eyring_correction = af_eyring / af_simple if af_simple > 0 else 1.0
-
-        # 總加速因子計算
-        if enable_eyring:
-            # 使用Eyring模型時，應用修正因子
-            af_total = af_t * af_rh * af_v * af_tc * af_vib * af_uv * af_chem * af_rad * af_eyring_correction
-        else:
-            # 簡化模型：假設應力獨立
-            af_total = af_t * af_rh * af_v * af_tc * af_vib * af_uv * af_chem * af_rad
-
-        return {
-            "af_t": round(af_t, 4),
-            "af_rh": round(af_rh, 4),
-            "af_v": round(af_v, 4),
-            "af_tc": round(af_tc, 4),
-            "af_vib": round(af_vib, 4),
-            "af_uv": round(af_uv, 4),
-            "af_chem": round(af_chem, 4),
-            "af_rad": round(af_rad, 4),
-            "af_eyring_correction": round(af_eyring_correction, 4) if enable_eyring else None,
-            "af_total": round(af_total, 4)
-        }
+        batch = calculate_af_batch(params)
+        if "error" in batch:
+            return {"error": batch["error"]}
+        if batch["n"] != 1:
+            return {"error": "calculate_af 僅接受單組參數，多組條件請使用 calculate_af_batch"}
+        if not batch["valid"][0]:
+            return {"error": "參數無效 (應力比值需為正數，且分母不可為零)"}
+
+        log10_af_total = float(batch["log10_af_total"][0])
+        if not np.isfinite(batch["af_total"][0]):
+            return {"error": f"AF Total 超出浮點數範圍 (log10 AF = {log10_af_total:.2f})",
+                    "log10_af_total": round(log10_af_total, 6)}
+
+        result = {}
+        for key in AF_OUTPUT_KEYS:
+            value = float(batch[key][0])
+            result[key] = round(value, 4) if np.isfinite(value) else None
+        result["log10_af_total"] = round(log10_af_total, 6)
+        warnings = validity_warnings(params)
+        if warnings:
+            result["warnings"] = warnings
+        return result
     except Exception as e:
         return {"error": str(e)}
 
@@ -208,10 +84,14 @@ def calculate_weibull(failures, suspensions, options=None):
 
     Args:
         failures: 失效時間列表
-        suspensions: 截尾數據（保留兼容性）
+        suspensions: 截尾數據 (列表，以 Johnson 調整秩計入；非列表時忽略)
         options: 選項字典 {
-            'median_rank_method': 'benard' | 'exact' | 'mean',
-            'regression_method': 'rry' | 'rrx' | 'mle'
+            'median_rank_method': 'benard' | 'exact' | 'mean' | 'km' | 'johnson',
+            'regression_method': 'rry' | 'rrx' | 'mle',
+            'n_total': 實際樣品總數 (選填；未提供時秩回歸沿用 max(觀測數, 64)，MLE 僅使用觀測數據),
+            'conf_level': 信賴水準 (MLE 信賴界限，預設 0.9),
+            'bounds_method': 'fisher' | 'lr' (MLE 信賴界限方法),
+            'three_parameter': 是否估計無失效期 γ (三參數 Weibull；不提供信賴界限)
         }
     """
     try:
@@ -222,68 +102,68 @@ def calculate_weibull(failures, suspensions, options=None):
         regression_method = options.get('regression_method', 'rry')
 
         # 數據預處理
-        failures = sorted([float(x) for x in failures])
-        n_failures = len(failures)
-        n_total = max(n_failures, 64) # 預設總數
+        failures = np.sort(np.asarray(failures, dtype=float).ravel())
+        suspensions = (np.asarray(suspensions, dtype=float).ravel()
+                       if isinstance(suspensions, (list, tuple, np.ndarray)) else np.empty(0))
+        n_failures = failures.size
+        sample_size = options.get('n_total')  # 實際樣品總數 (選填)
+        sample_size = int(sample_size) if sample_size not in (None, '') else None
+        n_total = sample_size if sample_size is not None else max(n_failures + suspensions.size, 64) # 預設總數
 
         if n_failures < 2:
             return {"error": "失效數據不足，無法進行 Weibull 擬合 (至少需要 2 點)"}
 
-        # 計算中位秩
-        ranks = []
-        for i in range(1, n_failures + 1):
-            if median_rank_method == 'benard':
-                # Benard's Approximation (最常用)
-                f = (i - 0.3) / (n_total + 0.4)
-            elif median_rank_method == 'exact':
-                # 精確中位秩 (使用 Beta 分佈的中位數)
-                # F = Beta_inv(0.5, i, n-i+1)
-                f = stats.beta.ppf(0.5, i, n_total - i + 1)
-            elif median_rank_method == 'mean':
-                # 平均秩 (Mean Rank)
-                f = i / (n_total + 1)
-            else:
-                # 預設使用 Benard's
-                f = (i - 0.3) / (n_total + 0.4)
-
-            ranks.append(f)
+        # 計算中位秩 (向量化；有截尾時使用 Johnson 調整秩)
+        t_all, f_all = median_ranks(failures, suspensions, median_rank_method, n_total)
 
         # 準備回歸數據
-        t_vals = []
-        f_vals = []
-        for i, (t, f) in enumerate(zip(failures, ranks)):
-            if t <= 0 or f >= 1 or f <= 0:
-                continue
-            t_vals.append(t)
-            f_vals.append(f)
+        keep = (t_all > 0) & (f_all > 0) & (f_all < 1)
+        t_vals = t_all[keep]
+        f_vals = f_all[keep]
+        # 轉換為線性關係: ln(-ln(1-F)) = beta * ln(t) - beta * ln(eta)
+        x_vals = np.log(t_vals)            # ln(t)
+        y_vals = np.log(-np.log(1 - f_vals))  # ln(-ln(1-F))
 
         # 根據回歸方法選擇
-        if regression_method == 'mle':
+        gamma = None
+        if options.get('three_parameter'):
+            # 三參數 Weibull：γ 以有界剖面搜尋求得，機率圖改以 ln(t - γ) 作圖
+            if regression_method == 'mle':
+                fit3 = fit_weibull_3p_mle(failures, suspensions, sample_size)
+                if "error" in fit3:
+                    return fit3
+            else:
+                fit3 = fit_weibull_3p_rank(t_vals, f_vals, regression_method)
+            gamma = fit3["gamma"]
+            beta = fit3["beta"]
+            eta_alt = fit3["eta"]
+            x_vals = np.log(t_vals - gamma)
+            r_squared = stats.linregress(x_vals, y_vals)[2] ** 2
+
+        elif regression_method == 'mle':
             # 最大似然估計 (MLE)
-            # 使用 scipy.stats.weibull_min.fit
-            shape, loc, scale = stats.weibull_min.fit(failures, floc=0)
-            beta = shape
-            eta_alt = scale
-            r_squared = 0.999  # MLE 不提供 R²，給一個高值表示最優擬合
+            # 右截尾 Weibull 剖面概似 + Halley 法；截尾數據與實際樣品總數皆計入概似
+            mle = fit_weibull_mle(failures, suspensions, sample_size)
+            if "error" in mle:
+                return mle
+            beta = mle["beta"]
+            eta_alt = mle["eta"]
+            # MLE 不以迴歸求解，R² 取機率圖 (中位秩) 的線性相關係數平方作為參考
+            r_squared = stats.linregress(x_vals, y_vals)[2] ** 2
+            # Fisher 矩陣 (預設) 或概似比信賴界限
+            interval = mle_bounds(beta, eta_alt, failures, suspensions, sample_size,
+                                  float(options.get('conf_level', DEFAULT_CONF_LEVEL)),
+                                  options.get('bounds_method', 'fisher'))
 
         else:
             # Rank Regression (RRX 或 RRY)
-            # 轉換為線性關係: ln(-ln(1-F)) = beta * ln(t) - beta * ln(eta)
-            x_vals = []  # ln(t)
-            y_vals = []  # ln(-ln(1-F))
-
-            for t, f in zip(t_vals, f_vals):
-                x = np.log(t)
-                y = np.log(-np.log(1 - f))
-                x_vals.append(x)
-                y_vals.append(y)
-
             if regression_method == 'rrx':
                 # Rank Regression on X (minimize x residuals)
                 # 相當於 y = f(x) 的反函數，交換 x 和 y
+                # ln(t) = y / beta + ln(eta)
                 slope, intercept, r_value, _, _ = stats.linregress(y_vals, x_vals)
                 beta = 1 / slope
-                eta_alt = np.exp(intercept / slope)
+                eta_alt = np.exp(intercept)
                 r_squared = r_value ** 2
             else:
                 # Rank Regression on Y (預設，minimize y residuals)
@@ -292,26 +172,37 @@ def calculate_weibull(failures, suspensions, options=None):
                 eta_alt = np.exp(-intercept / beta)
                 r_squared = r_value ** 2
 
-        return {
+        result = {
             "beta": round(beta, 4),
             "eta_alt": round(eta_alt, 4),
             "r_squared": round(r_squared, 4),
             "method": f"{median_rank_method.upper()} + {regression_method.upper()}",
             "plot_data": {
-                "x": [np.log(t) for t in t_vals],  # ln(t) for plotting line
-                "y": [np.log(-np.log(1 - f)) for f in f_vals],  # Transformed probability
-                "t": t_vals,  # Original time for scatter
-                "f": f_vals   # Probability for scatter
+                "x": x_vals.tolist(),  # ln(t) (三參數時為 ln(t - γ)) for plotting line
+                "y": y_vals.tolist(),  # Transformed probability
+                "t": t_vals.tolist(),  # Original time for scatter
+                "f": f_vals.tolist()   # Probability for scatter
             }
         }
+        if gamma is not None:
+            result["gamma"] = round(gamma, 4)
+            result["gamma_at_bound"] = fit3["gamma_at_bound"]
+            result["method"] += " (3P)"
+        elif regression_method == 'mle':
+            result.update(interval)
+        return result
     except Exception as e:
         return {"error": str(e)}
 
-def calculate_reliability_results(af_total, weibull_params, zero_fail_params, t_mission=17520, bx_percent=1):
+def calculate_reliability_results(af_total, weibull_params, zero_fail_params, t_mission=17520, bx_percent=1,
+                                  distribution=None):
     """
     整合計算：可靠度推算 (包含 Weibull 模式與零失效模式)
     t_mission: 任務時間（小時），預設 17520 小時 (2 年)
     bx_percent: Bx% 壽命的百分比 (1, 10, 50 等)，預設 1
+    distribution: 選用的壽命分佈 {'name', 'params'} (rank_distributions 的候選；選填)，
+                  提供時另以該分佈計算可靠度指標
+    zero_fail_params 含 beta (已知 β) 或 beta_prior (β 的先驗分佈) 時另附 WeiBayes 下限 (results['weibayes'])
     """
     results = {}
 
@@ -319,20 +210,22 @@ def calculate_reliability_results(af_total, weibull_params, zero_fail_params, t_
     if weibull_params and "beta" in weibull_params:
         beta = weibull_params["beta"]
         eta_alt = weibull_params["eta_alt"]
+        # 三參數 Weibull 的無失效期 γ 與 η 同樣依 AF 換算至現場 (二參數時為 0)
+        gamma_use = weibull_params.get("gamma", 0.0) * af_total
 
         # 現場特性壽命
         eta_use = eta_alt * af_total
 
-        # MTTF (Weibull Mean) = eta * Gamma(1 + 1/beta)
-        mttf_use = eta_use * special.gamma(1 + 1/beta)
+        # MTTF (Weibull Mean) = gamma + eta * Gamma(1 + 1/beta)
+        mttf_use = gamma_use + eta_use * special.gamma(1 + 1/beta)
 
         # 任務可靠度 R(t)
         # t_mission 由參數傳入
-        r_mission = np.exp(-((t_mission / eta_use) ** beta))
+        r_mission = np.exp(-((max(t_mission - gamma_use, 0.0) / eta_use) ** beta))
 
         # Bx% Life (動態計算)
-        # t = eta * (-ln(1-x/100))^(1/beta)
-        bx_life = eta_use * ((-np.log(1 - bx_percent / 100)) ** (1/beta))
+        # t = gamma + eta * (-ln(1-x/100))^(1/beta)
+        bx_life = gamma_use + eta_use * ((-np.log(1 - bx_percent / 100)) ** (1/beta))
 
         results["weibull"] = {
             "eta_use": round(eta_use, 2),
@@ -341,6 +234,27 @@ def calculate_reliability_results(af_total, weibull_params, zero_fail_params, t_
             "bx_life": round(bx_life, 2),
             "bx_percent": bx_percent  # 記錄使用的百分比
         }
+        if gamma_use:
+            results["weibull"]["gamma_use"] = round(gamma_use, 2)
+
+        # 信賴界限 (MLE 結果附有共變異矩陣時；AF 視為已知)
+        interval = reliability_bounds(weibull_params, af_total, t_mission, bx_percent)
+        if interval:
+            results["weibull"]["conf_level"] = weibull_params["conf_level"]
+            results["weibull"]["bounds_method"] = weibull_params["bounds_method"]
+            results["weibull"]["bounds"] = {
+                "eta_use": round_bound(interval["eta_use"], 2),
+                "mttf_use": round_bound(interval["mttf_use"], 2),
+                "bx_life": round_bound(interval["bx_life"], 2),
+                "r_mission": round_bound(interval["r_mission"], 6),
+            }
+            results["weibull"]["r_curve"] = {k: np.round(v, 6).tolist()
+                                             for k, v in interval["r_curve"].items()}
+
+    # --- 其他壽命分佈 (多分佈擬合選出的分佈) ---
+    if distribution:
+        results["distribution"] = distribution_reliability(distribution["name"], distribution["params"],
+                                                           af_total, t_mission, bx_percent)
 
     # --- 模式 2: 零失效分析 (r = 0) ---
     if zero_fail_params:
@@ -388,63 +302,694 @@ def calculate_reliability_results(af_total, weibull_params, zero_fail_params, t_
         except Exception as e:
             results["zero_failure_error"] = str(e)
 
+        # WeiBayes：提供已知 β 或其先驗分佈時，以 Weibull 取代上述的指數分佈假設
+        if zero_fail_params.get("beta") not in (None, '') or zero_fail_params.get("beta_prior"):
+            try:
+                test_times = zero_fail_params.get("test_times") or np.full(
+                    int(zero_fail_params.get("n", 64)), float(zero_fail_params.get("t_test", 1196)))
+                weibayes_result = weibayes(
+                    test_times,
+                    n_failures=zero_fail_params.get("n_failures", 0),
+                    beta=zero_fail_params.get("beta"),
+                    beta_prior=zero_fail_params.get("beta_prior"),
+                    cl=float(zero_fail_params.get("cl", 0.6)),
+                    af_total=af_total,
+                    t_mission=t_mission,
+                    bx_percent=bx_percent,
+                    n_points=zero_fail_params.get("grid_points", DEFAULT_GRID_POINTS)
+                )
+            except (TypeError, ValueError) as e:
+                weibayes_result = {"error": str(e)}
+            if "error" in weibayes_result:
+                results["weibayes_error"] = weibayes_result["error"]
+            else:
+                results["weibayes"] = weibayes_result
+
     return results
 
+def _fit_weibull_data(weibull_data):
+    """
+    依 weibull_data 擬合 Weibull：提供 bins (分組 / 區間數據) 時使用分組概似，
+    提供 intervals (逐一樣品的區間截尾數據) 時使用區間截尾概似，
+    否則使用 failures / suspensions；無數據時回傳空字典
+    """
+    options = weibull_data.get('options', {})
+    if weibull_data.get('bins'):
+        return calculate_weibull_grouped(weibull_data['bins'], options)
+    if weibull_data.get('intervals'):
+        return calculate_weibull_interval(weibull_data['intervals'], options)
+    failures = weibull_data.get('failures', [])
+    if failures and len(failures) > 0:
+        return calculate_weibull(failures, weibull_data.get('suspensions', []), options)
+    return {}
+
+def _rank_life_distributions(weibull_data):
+    """
+    對 failures / suspensions 擬合並排序所有候選壽命分佈 (分組與區間截尾數據不適用)；
+    僅在 options 指定 distribution、rank_by 或 candidates 時執行，一般 /calculate 不額外計算
+
+    Returns:
+        (排序結果或 None, 選用的分佈 {'name', 'params'} 或 None)；
+        options.distribution 指定分佈名稱，未指定時選用排序第一者；
+        options.rank_by / candidates 為排序準則與候選分佈 (見 rank_distributions)
+    """
+    failures = weibull_data.get('failures', [])
+    options = weibull_data.get('options', {})
+    if not any(options.get(key) for key in ('distribution', 'rank_by', 'candidates')):
+        return None, None
+    if weibull_data.get('bins') or weibull_data.get('intervals') or not failures or len(failures) < 2:
+        return None, None
+    ranking = rank_distributions(failures, weibull_data.get('suspensions', []),
+                                 {'n_total': options.get('n_total'),
+                                  'rank_by': options.get('rank_by') or 'aic',
+                                  'candidates': options.get('candidates')})
+    if "error" in ranking:
+        return ranking, None
+    name = options.get('distribution') or ranking["best"]
+    chosen = next((c for c in ranking["candidates"] if c["name"] == name), None)
+    if chosen is None or "params" not in chosen:
+        return {"error": f"無法使用分佈: {name}"}, None
+    return ranking, {"name": name, "params": chosen["params"]}
+
+def _fit_weibull_mixture(weibull_data):
+    """
+    options.mixture_modes (2 或 3) 指定時，對 failures / suspensions 擬合混合 Weibull
+    (分組與區間截尾數據不適用)；未指定時回傳 None
+    """
+    options = weibull_data.get('options', {})
+    failures = weibull_data.get('failures', [])
+    if (not options.get('mixture_modes') or weibull_data.get('bins') or weibull_data.get('intervals')
+            or not failures):
+        return None
+    return calculate_weibull_mixture(failures, weibull_data.get('suspensions', []), {
+        'n_modes': options['mixture_modes'],
+        'n_restarts': options.get('mixture_restarts', 8),
+        'seed': options.get('seed', 0),
+        'n_total': options.get('n_total'),
+        'median_rank_method': options.get('median_rank_method', 'benard'),
+    })
+
+def _mission_hours(data):
+    """解析任務時間 (年)，回傳小時數；無效輸入時預設 2 年"""
+    try:
+        mission_years = float(data.get('mission_years', 2))
+        if mission_years <= 0:
+            mission_years = 2
+    except:
+        mission_years = 2
+
+    return mission_years * 8760 # Convert to hours
+
 # --- Routes ---
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_template('index.html', af_models=list(iter_models()),
+                           af_models_meta=models_metadata())
 
 @app.route('/guide')
 def guide():
     return render_template('guide.html')
 
-@app.route('/calculate', methods=['POST'])
-def calculate():
-    data = request.json
-    
+# 參與 /calculate 計算的請求欄位 (快取鍵只由這些欄位決定)
+CALCULATE_CACHE_FIELDS = ('af_params', 'weibull_data', 'zero_fail_params', 'mission_years')
+
+def _calculate_results(data):
+    """執行 /calculate 的完整計算，回傳 (回應內容, HTTP 狀態碼)"""
     # 1. 計算 AF
     af_params = data.get('af_params', {})
     af_result = calculate_af(af_params)
     
     if "error" in af_result:
-        return jsonify({"error": "AF 計算錯誤: " + af_result["error"]}), 400
+        return {"error": "AF 計算錯誤: " + af_result["error"]}, 400
         
     af_total = af_result["af_total"]
     
     # 2. Weibull 分析 (如果有的話)
-    weibull_result = {}
     weibull_data = data.get('weibull_data', {})
-    failures = weibull_data.get('failures', [])
     weibull_options = weibull_data.get('options', {})
-    if failures and len(failures) > 0:
-        weibull_result = calculate_weibull(failures, 0, weibull_options)
+    weibull_result = _fit_weibull_data(weibull_data)
+    distribution_result, distribution = _rank_life_distributions(weibull_data)
+    if distribution_result and "error" in distribution_result and weibull_options.get('distribution'):
+        return {"error": "分佈擬合錯誤: " + distribution_result["error"]}, 400
+    # 混合擬合失敗不影響主要結果，錯誤隨 mixture_result 回傳
+    mixture_result = _fit_weibull_mixture(weibull_data)
 
     # 3. 零失效分析參數
     zero_fail_params = data.get('zero_fail_params', {})
 
     # 4. Mission Time (Mission Time)
-    try:
-        mission_years = float(data.get('mission_years', 2))
-        if mission_years <= 0:
-            mission_years = 2
-    except:
-        mission_years = 2
-
-    t_mission = mission_years * 8760 # Convert to hours
+    t_mission = _mission_hours(data)
 
     # 5. 提取 Bx% 選項
     bx_percent = weibull_options.get('bx_life_percent', 1)  # 預設 B1%
 
     # 6. 綜合結果
-    final_results = calculate_reliability_results(af_total, weibull_result, zero_fail_params, t_mission, bx_percent)
-    
-    return jsonify({
+    final_results = calculate_reliability_results(af_total, weibull_result, zero_fail_params, t_mission, bx_percent,
+                                                  distribution)
+
+    if "weibayes_error" in final_results:
+        return {"error": "WeiBayes 計算錯誤: " + final_results["weibayes_error"]}, 400
+
+    response = {
         "af_result": af_result,
         "weibull_result": weibull_result,
         "reliability_result": final_results
-    })
+    }
+    if distribution_result:
+        response["distribution_result"] = distribution_result
+    if mixture_result and "error" not in mixture_result:
+        # 各失效模式的 η 依 AF 換算至現場，混合曲線供圖表使用
+        final_results["mixture"] = mixture_reliability(mixture_result["components"], af_total,
+                                                       t_mission, bx_percent)
+        mixture_result["curves"] = mixture_curves(mixture_result["components"], af_total)
+    if mixture_result:
+        response["mixture_result"] = mixture_result
+    return response, 200
+
+@app.route('/calculate', methods=['POST'])
+def calculate():
+    """
+    AF + Weibull + 可靠度綜合計算
+    以請求內容的正規化雜湊作為快取鍵與 ETag：
+    If-None-Match 相符時直接回傳 304，快取命中時不重新計算
+    """
+    data = request.json or {}
+    # 已註冊的模型組合列入命名空間，註冊新模型後舊快取自動失效
+    cache_key = canonical_key({k: data.get(k) for k in CALCULATE_CACHE_FIELDS},
+                              ','.join(m.key for m in iter_models()))
+
+    if request.if_none_match.contains(cache_key):
+        response_cache.record_not_modified()
+        response = Response(status=304)
+        response.set_etag(cache_key)
+        return response
+
+    body = response_cache.get(cache_key)
+    cache_status = 'HIT'
+    if body is None:
+        cache_status = 'MISS' if response_cache.enabled else 'BYPASS'
+        result, status = _calculate_results(data)
+        if status != 200:
+            return jsonify(result), status
+        body = app.json.dumps(result).encode('utf-8')
+        response_cache.set(cache_key, body)
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(cache_key)
+    response.headers['X-Cache'] = cache_status
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """/calculate 快取的命中率與查詢延遲統計 (此 worker 行程)"""
+    return jsonify(response_cache.stats())
+
+@app.route('/af_models', methods=['GET'])
+def af_models():
+    """列出已註冊的應力模型 (參數、預設值、有效範圍與顯示文字)"""
+    return jsonify({"models": models_metadata()})
+
+@app.route('/calculate_af_batch', methods=['POST'])
+def calculate_af_batch_route():
+    """批次計算加速因子：af_params 中每個欄位可為陣列 (欄位式輸入)"""
+    data = request.json or {}
+    af_params = data.get('af_params', {})
+    batch_result = calculate_af_batch(af_params)
+
+    if "error" in batch_result:
+        return jsonify({"error": "AF 批次計算錯誤: " + batch_result["error"]}), 400
+
+    return jsonify(batch_to_json(batch_result))
+
+@app.route('/af_sweep', methods=['POST'])
+def af_sweep():
+    """
+    AF 參數掃描：對 axes 中各參數的範圍建立網格並計算 af_total
+    format: 'json' (小型網格) | 'npy' | 'raw' (分塊串流輸出)
+    output: 'af_total' | 'log10_af_total'
+    """
+    data = request.json or {}
+    plan = prepare_af_sweep(data.get('af_params', {}), data.get('axes', {}),
+                            data.get('output', 'af_total'))
+    if "error" in plan:
+        return jsonify({"error": "AF 掃描錯誤: " + plan["error"]}), 400
+
+    fmt = data.get('format', 'npy')
+    dtype = np.float32 if data.get('dtype') == 'float32' else np.float64
+    try:
+        chunk_size = parse_chunk_size(data.get('chunk_size'))
+    except ValueError as e:
+        return jsonify({"error": "AF 掃描錯誤: " + str(e)}), 400
+
+    if fmt == 'json':
+        if plan["size"] > MAX_JSON_CELLS:
+            return jsonify({"error": f"JSON 格式最多 {MAX_JSON_CELLS} 個網格點，請改用 npy 格式"}), 400
+        try:
+            grid = sweep_to_array(plan, chunk_size, dtype)
+        except ValueError as e:
+            return jsonify({"error": "AF 掃描錯誤: " + str(e)}), 400
+        return jsonify({
+            "axes": {name: values.tolist() for name, values in zip(plan["names"], plan["values"])},
+            "shape": list(plan["shape"]),
+            plan["output"]: np.where(np.isfinite(grid), grid, None).tolist()
+        })
+
+    if fmt not in ('npy', 'raw'):
+        return jsonify({"error": f"不支援的輸出格式: {fmt}"}), 400
+
+    headers = {
+        "X-Sweep-Axes": ",".join(plan["names"]),
+        "X-Sweep-Shape": ",".join(str(s) for s in plan["shape"]),
+        "X-Sweep-Dtype": np.dtype(dtype).str,
+        "Content-Disposition": f"attachment; filename=af_sweep.{'npy' if fmt == 'npy' else 'bin'}"
+    }
+    return Response(iter_af_sweep_bytes(plan, fmt, chunk_size, dtype),
+                    mimetype='application/octet-stream', headers=headers)
+
+@app.route('/monte_carlo', methods=['POST'])
+def monte_carlo():
+    """Monte Carlo 不確定性傳播：distributions 指定各輸入參數的機率分佈"""
+    data = request.json or {}
+
+    # Weibull 參數可直接提供，或由失效數據擬合
+    weibull_params = data.get('weibull_params')
+    weibull_data = data.get('weibull_data', {})
+    weibull_options = weibull_data.get('options', {})
+    if not weibull_params:
+        weibull_params = _fit_weibull_data(weibull_data) or None
+        if weibull_params and "error" in weibull_params:
+            return jsonify({"error": "Weibull 擬合錯誤: " + weibull_params["error"]}), 400
+
+    try:
+        n_jobs = clamp_n_jobs(data.get('n_jobs', 1))
+    except ValueError as e:
+        return jsonify({"error": "Monte Carlo 計算錯誤: " + str(e)}), 400
+
+    mc_result = run_monte_carlo(
+        data.get('af_params', {}),
+        data.get('distributions', {}),
+        weibull_params=weibull_params,
+        zero_fail_params=data.get('zero_fail_params'),
+        t_mission=_mission_hours(data),
+        bx_percent=weibull_options.get('bx_life_percent', data.get('bx_percent', 1)),
+        n_samples=data.get('n_samples', 100000),
+        seed=data.get('seed'),
+        percentiles=data.get('percentiles'),
+        bins=data.get('bins', 50),
+        n_jobs=n_jobs
+    )
+
+    if "error" in mc_result:
+        return jsonify({"error": "Monte Carlo 計算錯誤: " + mc_result["error"]}), 400
+
+    return jsonify(mc_result)
+
+@app.route('/sensitivity', methods=['POST'])
+def sensitivity():
+    """Sobol 全域敏感度分析：找出主導 af_total 與 r_mission 的參數"""
+    data = request.json or {}
+
+    weibull_params = data.get('weibull_params')
+    weibull_data = data.get('weibull_data', {})
+    if not weibull_params:
+        weibull_params = _fit_weibull_data(weibull_data) or None
+        if weibull_params and "error" in weibull_params:
+            return jsonify({"error": "Weibull 擬合錯誤: " + weibull_params["error"]}), 400
+
+    try:
+        n_jobs = clamp_n_jobs(data.get('n_jobs', 1))
+    except ValueError as e:
+        return jsonify({"error": "敏感度分析錯誤: " + str(e)}), 400
+
+    sobol_result = run_sobol_analysis(
+        data.get('af_params', {}),
+        distributions=data.get('distributions'),
+        weibull_params=weibull_params,
+        t_mission=_mission_hours(data),
+        n_base=data.get('n_base', 8192),
+        seed=data.get('seed'),
+        n_jobs=n_jobs,
+        n_resamples=data.get('n_resamples', 100)
+    )
+
+    if "error" in sobol_result:
+        return jsonify({"error": "敏感度分析錯誤: " + sobol_result["error"]}), 400
+
+    return jsonify(sobol_result)
+
+@app.route('/estimate_ea', methods=['POST'])
+def estimate_ea():
+    """
+    由多溫度壽命數據估計活化能 Ea (迴歸法與最大概似法)
+    datasets: [{'name', 'groups': [{'temp', 'failures', 'suspensions'} 或 {'temp', 'life'}]}]
+    """
+    data = request.json or {}
+    try:
+        conf_level = float(data.get('conf_level', 0.95))
+    except (TypeError, ValueError):
+        return jsonify({"error": "信賴水準格式錯誤"}), 400
+    try:
+        n_jobs = clamp_n_jobs(data.get('n_jobs', 1))
+    except ValueError as e:
+        return jsonify({"error": "Ea 估計錯誤: " + str(e)}), 400
+
+    ea_result = estimate_activation_energy(
+        data.get('datasets', []),
+        methods=data.get('methods', ('regression', 'mle')),
+        conf_level=conf_level,
+        n_bootstrap=data.get('n_bootstrap', 0),
+        seed=data.get('seed'),
+        n_jobs=n_jobs
+    )
+
+    if "error" in ea_result:
+        return jsonify({"error": "Ea 估計錯誤: " + ea_result["error"]}), 400
+
+    return jsonify(ea_result)
+
+@app.route('/calculate_weibull_batch', methods=['POST'])
+def calculate_weibull_batch_route():
+    """
+    批次 Weibull 擬合 (數千個批次一次計算)
+    values + offsets 為不等長數據 (第 g 組為 values[offsets[g]:offsets[g+1]])，
+    suspensions + suspension_offsets 為選填的截尾數據
+    """
+    data = request.json or {}
+    batch = calculate_weibull_batch(
+        data.get('values', []),
+        data.get('offsets', []),
+        suspensions=data.get('suspensions'),
+        suspension_offsets=data.get('suspension_offsets'),
+        options=data.get('options', {})
+    )
+
+    if "error" in batch:
+        return jsonify({"error": "批次 Weibull 擬合錯誤: " + batch["error"]}), 400
+
+    return jsonify(weibull_batch_to_json(batch))
+
+@app.route('/competing_modes', methods=['POST'])
+def competing_modes():
+    """
+    競爭失效模式分析：failures 為標註失效模式的記錄 ([{'time', 'mode'}])，
+    每個模式以其他模式的失效為截尾一次批次擬合；系統可靠度為各模式可靠度的乘積
+    mode_af_params 可為各模式覆寫加速模型參數 (例如 {'電遷移': {'ea': 0.9}})
+    """
+    data = request.json or {}
+    options = data.get('options', {})
+    result = calculate_competing_modes(
+        data.get('failures', []),
+        suspensions=data.get('suspensions', []),
+        af_params=data.get('af_params', {}),
+        mode_af_params=data.get('mode_af_params', {}),
+        options=options,
+        t_mission=_mission_hours(data),
+        bx_percent=options.get('bx_life_percent', 1)
+    )
+
+    if "error" in result:
+        return jsonify({"error": "失效模式分析錯誤: " + result["error"]}), 400
+
+    return jsonify(result)
+
+@app.route('/weibull_session', methods=['POST'])
+def create_weibull_session():
+    """
+    建立進行中試驗的增量 Weibull 分析工作階段 (回傳 201 與 session_id)
+    之後每次讀值以 POST /weibull_session/<session_id> 只附加新的失效與截尾
+    """
+    data = request.json or {}
+    af_result = calculate_af(data.get('af_params', {}))
+    if "error" in af_result:
+        return jsonify({"error": "AF 計算錯誤: " + af_result["error"]}), 400
+
+    weibull_data = data.get('weibull_data', {})
+    options = weibull_data.get('options', {})
+    af_total, t_mission = af_result["af_total"], _mission_hours(data)
+    bx_percent = options.get('bx_life_percent', 1)
+    try:
+        session = WeibullSession(options, reliability=lambda params: calculate_reliability_results(
+            af_total, params, None, t_mission, bx_percent)["weibull"])
+        result = session.append(weibull_data.get('failures', []), weibull_data.get('suspensions', []))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "即時分析錯誤: " + str(e)}), 400
+
+    weibull_sessions.add(session)
+    response = jsonify(result)
+    response.status_code = 201
+    response.headers['Location'] = f"/weibull_session/{session.id}"
+    return response
+
+@app.route('/weibull_session/<session_id>', methods=['GET', 'POST', 'DELETE'])
+def weibull_session(session_id):
+    """附加新數據並回傳更新後的結果 (POST)、查詢目前結果 (GET) 或結束工作階段 (DELETE)"""
+    if request.method == 'DELETE':
+        session = weibull_sessions.remove(session_id)
+    else:
+        session = weibull_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": f"找不到即時分析工作階段: {session_id}"}), 404
+    if request.method == 'DELETE':
+        return jsonify({"session_id": session_id, "deleted": True})
+    if request.method == 'GET':
+        return jsonify(session.snapshot())
+
+    data = request.json or {}
+    try:
+        result = session.append(data.get('failures', []), data.get('suspensions', []))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "即時分析錯誤: " + str(e)}), 400
+    return jsonify(result)
+
+@app.route('/fit_eyring', methods=['POST'])
+def fit_eyring_model():
+    """
+    由 溫度 × 應力 試驗組的失效數據擬合廣義 Eyring 模型 (A, B, Ea, D)
+    cells: [{'temp', 'stress', 'failures', 'suspensions'}]；use / alt 選填，用於計算 AF 區間
+    """
+    data = request.json or {}
+    try:
+        conf_level = float(data.get('conf_level', 0.95))
+    except (TypeError, ValueError):
+        return jsonify({"error": "信賴水準格式錯誤"}), 400
+
+    eyring_result = fit_eyring(
+        data.get('cells', []),
+        stress_type=data.get('stress_type', 'voltage'),
+        interaction=bool(data.get('interaction', True)),
+        conf_level=conf_level,
+        use=data.get('use'),
+        alt=data.get('alt')
+    )
+
+    if "error" in eyring_result:
+        return jsonify({"error": "Eyring 模型擬合錯誤: " + eyring_result["error"]}), 400
+
+    return jsonify(eyring_result)
+
+@app.route('/fit_life_stress', methods=['POST'])
+def fit_life_stress_model():
+    """
+    由多個應力水準的失效數據聯合擬合壽命分佈 (Weibull / Lognormal) 與壽命-應力模型
+    cells: [{'temp', 'rh', 'stress', 'failures', 'suspensions'}]；
+    model: 'arrhenius' | 'peck' | 'ipl' | 'eyring'；use / alt 選填，用於使用條件壽命與 AF 區間
+    """
+    data = request.json or {}
+    options = data.get('weibull_data', {}).get('options', {})
+
+    life_stress_result = fit_life_stress(
+        data.get('cells', []),
+        model=data.get('model', 'arrhenius'),
+        distribution=data.get('distribution', 'weibull'),
+        stress_type=data.get('stress_type', 'voltage'),
+        interaction=bool(data.get('interaction', True)),
+        conf_level=data.get('conf_level', 0.95),
+        use=data.get('use'),
+        alt=data.get('alt'),
+        bx_percent=data.get('bx_percent', options.get('bx_life_percent', 1)),
+        t_mission=_mission_hours(data)
+    )
+
+    if "error" in life_stress_result:
+        return jsonify({"error": "壽命-應力模型擬合錯誤: " + life_stress_result["error"]}), 400
+
+    return jsonify(life_stress_result)
+
+@app.route('/plan_test', methods=['POST'])
+def plan_test():
+    """
+    反向 AF 求解：找出達成目標 AF (或在測試時數預算內證明目標 MTTF) 的試驗條件
+    variables: {參數: {'min', 'max', 'num'}}；solve_for 為求根變數 (多個變數時必填)
+    """
+    data = request.json or {}
+    zero_fail_params = data.get('zero_fail_params', {})
+    try:
+        plan_result = optimize_test_conditions(
+            data.get('af_params', {}),
+            data.get('variables', {}),
+            target_af=data.get('target_af'),
+            target_mttf=data.get('target_mttf'),
+            n_samples=zero_fail_params.get('n'),
+            max_test_hours=data.get('max_test_hours'),
+            cl=float(zero_fail_params.get('cl', 0.6)),
+            ceilings=data.get('ceilings'),
+            top_k=int(data.get('top_k', 20)),
+            solve_for=data.get('solve_for')
+        )
+    except (TypeError, ValueError) as e:
+        plan_result = {"error": str(e)}
+
+    if "error" in plan_result:
+        return jsonify({"error": "試驗條件規劃錯誤: " + plan_result["error"]}), 400
+
+    return jsonify(plan_result)
+
+@app.route('/bootstrap', methods=['POST'])
+def bootstrap():
+    """
+    Weibull bootstrap 信賴區間：重抽失效數據並以相同的中位秩 / 迴歸方法重新擬合，
+    重算 calculate_reliability_results 的 Weibull 指標
+    預設於背景執行並回傳 202 與任務 ID (以 GET /bootstrap/<job_id> 查詢進度與結果、
+    DELETE 取消)；wait 為 true 時同步回傳結果
+    執行中的任務 (含同步執行) 已達上限時回傳 429；n_jobs 限制於 jobs.MAX_JOB_PROCESSES
+    """
+    data = request.json or {}
+    af_result = calculate_af(data.get('af_params', {}))
+    if "error" in af_result:
+        return jsonify({"error": "AF 計算錯誤: " + af_result["error"]}), 400
+
+    weibull_data = data.get('weibull_data', {})
+    weibull_options = weibull_data.get('options', {})
+    try:
+        plan = prepare_bootstrap(
+            weibull_data.get('failures', []),
+            weibull_data.get('suspensions', []),
+            weibull_options,
+            af_total=af_result["af_total"],
+            t_mission=_mission_hours(data),
+            bx_percent=weibull_options.get('bx_life_percent', 1),
+            method=data.get('method', 'nonparametric'),
+            n_resamples=data.get('n_resamples', 1000),
+            seed=data.get('seed'),
+            conf_level=data.get('conf_level', 0.9)
+        )
+    except (TypeError, ValueError) as e:
+        plan = {"error": str(e)}
+    if "error" in plan:
+        return jsonify({"error": "Bootstrap 計算錯誤: " + plan["error"]}), 400
+
+    try:
+        percentiles, bins = parse_summary_options(data.get('percentiles'), data.get('bins', 50))
+        n_jobs = clamp_n_jobs(data.get('n_jobs', 1))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "Bootstrap 計算錯誤: " + str(e)}), 400
+    kwargs = dict(n_jobs=n_jobs, percentiles=percentiles, bins=bins)
+    if data.get('wait'):
+        try:
+            with background_jobs.slot():
+                result = execute_bootstrap(plan, **kwargs)
+        except JobLimitExceeded as e:
+            return jsonify({"error": "Bootstrap 計算錯誤: " + str(e)}), 429
+        if "error" in result:
+            return jsonify({"error": "Bootstrap 計算錯誤: " + result["error"]}), 400
+        return jsonify(result)
+
+    try:
+        job = background_jobs.start('bootstrap', execute_bootstrap, plan, **kwargs)
+    except JobLimitExceeded as e:
+        return jsonify({"error": "Bootstrap 計算錯誤: " + str(e)}), 429
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = f"/bootstrap/{job.id}"
+    return response
+
+@app.route('/bootstrap/<job_id>', methods=['GET', 'DELETE'])
+def bootstrap_job(job_id):
+    """查詢 bootstrap 任務的進度與結果 (GET)，或取消任務 (DELETE)"""
+    if request.method == 'DELETE':
+        job = background_jobs.cancel(job_id)
+    else:
+        job = background_jobs.get(job_id)
+    if job is None or job.kind != 'bootstrap':
+        return jsonify({"error": f"找不到 bootstrap 任務: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/bayes', methods=['POST'])
+def bayes():
+    """
+    貝氏 Weibull 後驗：以系綜 MCMC 抽樣 (β, η)，priors 為 β / eta_alt 的先驗分佈 (選填)，
+    回傳後驗抽樣、現場指標的後驗分佈與收斂診斷
+    預設於背景執行並回傳 202 與任務 ID (以 GET /bayes/<job_id> 查詢進度與結果、
+    DELETE 取消)；wait 為 true 時同步回傳結果
+    執行中的任務 (含同步執行) 已達上限時回傳 429；n_jobs 限制於 jobs.MAX_JOB_PROCESSES
+    """
+    data = request.json or {}
+    af_result = calculate_af(data.get('af_params', {}))
+    if "error" in af_result:
+        return jsonify({"error": "AF 計算錯誤: " + af_result["error"]}), 400
+
+    weibull_data = data.get('weibull_data', {})
+    weibull_options = weibull_data.get('options', {})
+    try:
+        plan = prepare_bayes(
+            weibull_data.get('failures', []),
+            weibull_data.get('suspensions', []),
+            weibull_options,
+            af_total=af_result["af_total"],
+            t_mission=_mission_hours(data),
+            bx_percent=weibull_options.get('bx_life_percent', 1),
+            priors=data.get('priors'),
+            n_walkers=data.get('n_walkers', 32),
+            n_steps=data.get('n_steps', 2000),
+            burn_in=data.get('burn_in'),
+            n_chains=data.get('n_chains', 4),
+            thin=data.get('thin', 1),
+            seed=data.get('seed'),
+            conf_level=data.get('conf_level', 0.9),
+            max_draws=data.get('max_draws', 2000)
+        )
+    except (TypeError, ValueError, AttributeError) as e:
+        plan = {"error": str(e)}
+    if "error" in plan:
+        return jsonify({"error": "貝氏分析錯誤: " + plan["error"]}), 400
+
+    try:
+        percentiles, bins = parse_summary_options(data.get('percentiles'), data.get('bins', 50))
+        n_jobs = clamp_n_jobs(data.get('n_jobs', 1))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "貝氏分析錯誤: " + str(e)}), 400
+    kwargs = dict(n_jobs=n_jobs, percentiles=percentiles, bins=bins)
+    if data.get('wait'):
+        try:
+            with background_jobs.slot():
+                result = execute_bayes(plan, **kwargs)
+        except JobLimitExceeded as e:
+            return jsonify({"error": "貝氏分析錯誤: " + str(e)}), 429
+        if "error" in result:
+            return jsonify({"error": "貝氏分析錯誤: " + result["error"]}), 400
+        return jsonify(result)
+
+    try:
+        job = background_jobs.start('bayes', execute_bayes, plan, **kwargs)
+    except JobLimitExceeded as e:
+        return jsonify({"error": "貝氏分析錯誤: " + str(e)}), 429
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = f"/bayes/{job.id}"
+    return response
+
+@app.route('/bayes/<job_id>', methods=['GET', 'DELETE'])
+def bayes_job(job_id):
+    """查詢貝氏分析任務的進度與結果 (GET)，或取消任務 (DELETE)"""
+    if request.method == 'DELETE':
+        job = background_jobs.cancel(job_id)
+    else:
+        job = background_jobs.get(job_id)
+    if job is None or job.kind != 'bayes':
+        return jsonify({"error": f"找不到貝氏分析任務: {job_id}"}), 404
+    return jsonify(job.to_dict())
 
 @app.route('/font_debug', methods=['GET'])
 def font_debug():
@@ -14,7 +14,7 @@ import base64
 plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False  # 正確顯示負號
 
-def generate_reliability_chart(beta, eta_use, max_time=50000, mode='weibull'):
+def generate_reliability_chart(beta, eta_use, max_time=50000, mode='weibull', gamma=0.0):
     """
     生成可靠度函數 R(t) 圖表
 
@@ -23,6 +23,7 @@ def generate_reliability_chart(beta, eta_use, max_time=50000, mode='weibull'):
         eta_use: 現場特性壽命
         max_time: 最大時間範圍
         mode: 'weibull' 或 'exponential'
+        gamma: 現場無失效期 γ (三參數 Weibull，t ≤ γ 時 R = 1)
 
     Returns:
         BytesIO: PNG 圖片的二進制流
@@ -34,8 +35,10 @@ def generate_reliability_chart(beta, eta_use, max_time=50000, mode='weibull'):
 
     if mode == 'weibull':
         # Weibull 可靠度函數: R(t) = exp(-(t/η)^β)
-        R = np.exp(-np.power(t / eta_use, beta))
+        R = np.exp(-np.power(np.maximum(t - gamma, 0) / eta_use, beta))
         title = f'Reliability Function R(t) - Weibull Distribution\nβ={beta:.3f}, η={eta_use:.0f} hrs'
+        if gamma > 0:
+            title += f', γ={gamma:.0f} hrs'
         color = '#06b6d4'
     else:
         # 指數分佈: R(t) = exp(-λt)
@@ -72,7 +75,7 @@ def generate_reliability_chart(beta, eta_use, max_time=50000, mode='weibull'):
     return buf
 
 
-def generate_failure_rate_chart(beta, eta_use, max_time=50000, mode='weibull'):
+def generate_failure_rate_chart(beta, eta_use, max_time=50000, mode='weibull', gamma=0.0):
     """
     生成失效率 h(t) 圖表（浴盆曲線）
 
@@ -81,6 +84,7 @@ def generate_failure_rate_chart(beta, eta_use, max_time=50000, mode='weibull'):
         eta_use: 現場特性壽命
         max_time: 最大時間範圍
         mode: 'weibull' 或 'exponential'
+        gamma: 現場無失效期 γ (三參數 Weibull，t ≤ γ 時 h = 0)
 
     Returns:
         BytesIO: PNG 圖片的二進制流
@@ -92,8 +96,11 @@ def generate_failure_rate_chart(beta, eta_use, max_time=50000, mode='weibull'):
 
     if mode == 'weibull':
         # Weibull 失效率: h(t) = (β/η) * (t/η)^(β-1)
-        h = (beta / eta_use) * np.power(t / eta_use, beta - 1)
+        with np.errstate(divide='ignore'):
+            h = np.where(t > gamma, (beta / eta_use) * np.power(np.maximum(t - gamma, 0) / eta_use, beta - 1), 0.0)
         title = f'Failure Rate h(t) - Weibull Distribution\nβ={beta:.3f}, η={eta_use:.0f} hrs'
+        if gamma > 0:
+            title += f', γ={gamma:.0f} hrs'
 
         # 根據 β 值標註失效模式
         if beta < 1:
@@ -137,7 +144,7 @@ def generate_failure_rate_chart(beta, eta_use, max_time=50000, mode='weibull'):
     return buf
 
 
-def generate_pdf_chart(beta, eta_use, max_time=50000, mode='weibull'):
+def generate_pdf_chart(beta, eta_use, max_time=50000, mode='weibull', gamma=0.0):
     """
     生成機率密度函數 f(t) 圖表
 
@@ -146,6 +153,7 @@ def generate_pdf_chart(beta, eta_use, max_time=50000, mode='weibull'):
         eta_use: 現場特性壽命
         max_time: 最大時間範圍
         mode: 'weibull' 或 'exponential'
+        gamma: 現場無失效期 γ (三參數 Weibull，t ≤ γ 時 f = 0)
 
     Returns:
         BytesIO: PNG 圖片的二進制流
@@ -157,8 +165,12 @@ def generate_pdf_chart(beta, eta_use, max_time=50000, mode='weibull'):
 
     if mode == 'weibull':
         # Weibull PDF: f(t) = (β/η) * (t/η)^(β-1) * exp(-(t/η)^β)
-        f = (beta / eta_use) * np.power(t / eta_use, beta - 1) * np.exp(-np.power(t / eta_use, beta))
+        z = np.maximum(t - gamma, 0) / eta_use
+        with np.errstate(divide='ignore'):
+            f = np.where(t > gamma, (beta / eta_use) * np.power(z, beta - 1) * np.exp(-np.power(z, beta)), 0.0)
         title = f'Probability Density Function f(t) - Weibull\nβ={beta:.3f}, η={eta_use:.0f} hrs'
+        if gamma > 0:
+            title += f', γ={gamma:.0f} hrs'
         color = '#f59e0b'
     else:
         # 指數分佈 PDF: f(t) = λ * exp(-λt)
@@ -210,10 +222,11 @@ def generate_all_charts(analysis_mode, weibull_result=None, reliability_result=N
         eta_alt = weibull_result.get('eta_alt', 1000)
         af_total = reliability_result.get('weibull', {}).get('eta_use', eta_alt) / eta_alt
         eta_use = eta_alt * af_total
+        gamma_use = reliability_result.get('weibull', {}).get('gamma_use', 0.0)
 
-        charts['reliability'] = generate_reliability_chart(beta, eta_use, max_time, mode='weibull')
-        charts['failure_rate'] = generate_failure_rate_chart(beta, eta_use, max_time, mode='weibull')
-        charts['pdf'] = generate_pdf_chart(beta, eta_use, max_time, mode='weibull')
+        charts['reliability'] = generate_reliability_chart(beta, eta_use, max_time, mode='weibull', gamma=gamma_use)
+        charts['failure_rate'] = generate_failure_rate_chart(beta, eta_use, max_time, mode='weibull', gamma=gamma_use)
+        charts['pdf'] = generate_pdf_chart(beta, eta_use, max_time, mode='weibull', gamma=gamma_use)
 
     elif analysis_mode == 'zero_failure' and reliability_result:
         zf_result = reliability_result.get('zero_failure', {})
@@ -0,0 +1,183 @@
+"""
+競爭失效模式分析
+每筆失效記錄標註失效模式 (根因)：擬合模式 k 時，其他模式的失效視為截尾
+(樣品在該時間因其他原因移出，未觀測到模式 k 的失效)，再以 weibull_batch 一次擬合所有模式
+系統可靠度為各模式可靠度的乘積 (串聯、模式互相獨立)
+    R_sys(t) = Π_k exp(-(t / η_use,k)^β_k)
+各模式可指定自己的加速模型參數 (例如各失效機制的活化能 Ea)，以 af_engine 一次計算所有模式的 AF
+"""
+
+import numpy as np
+from scipy import optimize, integrate, special
+from af_engine import calculate_af_batch, AF_DEFAULTS, FLAG_DEFAULTS
+from weibull_batch import calculate_weibull_batch
+
+
+def parse_mode_records(failures):
+    """
+    解析標註失效模式的失效記錄：[{'time', 'mode'}]、[[time, mode]] 或 {'times': [...], 'modes': [...]}
+
+    Returns:
+        (times, modes): 失效時間陣列與模式名稱陣列 (字串)
+
+    Raises:
+        ValueError: 格式錯誤或時間非正數
+    """
+    if isinstance(failures, dict):
+        times, modes = failures.get('times', []), failures.get('modes', [])
+    else:
+        records = list(failures or [])
+        if records and isinstance(records[0], dict):
+            times = [r.get('time') for r in records]
+            modes = [r.get('mode') for r in records]
+        else:
+            times = [r[0] for r in records]
+            modes = [r[1] for r in records]
+    times = np.asarray(times, dtype=float).ravel()
+    modes = np.asarray([str(m) if m is not None else '' for m in modes])
+    if times.size != modes.size:
+        raise ValueError("失效時間與失效模式的數量不一致")
+    if np.any(~(times > 0)):
+        raise ValueError("失效時間需為正數")
+    if np.any(modes == ''):
+        raise ValueError("每筆失效記錄都需標註失效模式")
+    return times, modes
+
+
+def mode_af_totals(af_params, mode_names, mode_af_params=None):
+    """
+    各失效模式的 AF：以共用的 af_params 為基礎，套用各模式的覆寫參數 (例如 {'ea': 0.9})，
+    組成欄位陣列交給 calculate_af_batch 一次計算
+
+    Returns:
+        dict: af_total, log10_af_total 陣列 (依 mode_names 順序) 或 {'error': ...}
+    """
+    af_params = af_params or {}
+    overrides = [dict((mode_af_params or {}).get(name) or {}) for name in mode_names]
+    defaults = {**AF_DEFAULTS, **FLAG_DEFAULTS, 'eyring_stress_type': 'voltage'}
+    # 每個參數一欄、每個模式一列 (未覆寫者沿用共用參數)
+    columns = {key: [o.get(key, af_params.get(key, defaults.get(key))) for o in overrides]
+               for key in set(af_params).union(*overrides)}
+
+    batch = calculate_af_batch(columns)
+    if "error" in batch:
+        return batch
+    af_total = np.broadcast_to(batch["af_total"], (len(mode_names),))
+    if not np.all(np.broadcast_to(batch["valid"], af_total.shape)) or not np.all(np.isfinite(af_total)):
+        bad = [name for name, ok in zip(mode_names, np.isfinite(af_total)) if not ok]
+        return {"error": f"失效模式的 AF 無效: {', '.join(bad) or '參數錯誤'}"}
+    return {"af_total": np.array(af_total, dtype=float),
+            "log10_af_total": np.array(np.broadcast_to(batch["log10_af_total"], af_total.shape))}
+
+
+def system_reliability(beta, eta_use, t):
+    """串聯系統可靠度 R_sys(t) = Π_k exp(-(t/η_k)^β_k) (向量化於 t)"""
+    t = np.asarray(t, dtype=float)
+    beta, eta_use = np.asarray(beta, dtype=float), np.asarray(eta_use, dtype=float)
+    cumulative_hazard = ((t[..., None] / eta_use) ** beta).sum(axis=-1)
+    return np.exp(-cumulative_hazard)
+
+
+def system_metrics(beta, eta_use, t_mission, bx_percent=1):
+    """
+    系統的任務可靠度、Bx 壽命與 MTTF
+    Bx 壽命：F_sys ≥ 各模式 F 且 F_sys ≤ Σ F_k，故根落在
+    [min_k t_k(x/K), min_k t_k(x)] 之間 (t_k(p) 為模式 k 的 p 分位數)，以 Brent 法求解
+    """
+    beta, eta_use = np.asarray(beta, dtype=float), np.asarray(eta_use, dtype=float)
+    x = bx_percent / 100
+    quantile = lambda p: eta_use * (-np.log1p(-p)) ** (1 / beta)
+    lo, hi = quantile(x / beta.size).min(), quantile(x).min()
+    if hi > lo:
+        bx_life = optimize.brentq(lambda t: 1 - system_reliability(beta, eta_use, t) - x,
+                                  lo, hi, xtol=1e-10 * hi)
+    else:
+        bx_life = hi
+    # MTTF = ∫ R_sys dt (以最短的特性壽命為尺度分段積分)
+    scale = eta_use.min()
+    mttf = scale * integrate.quad(lambda u: float(system_reliability(beta, eta_use, u * scale)),
+                                  0, np.inf, limit=200)[0]
+    return {
+        "r_mission": float(system_reliability(beta, eta_use, t_mission)),
+        "bx_life": float(bx_life),
+        "mttf_use": float(mttf),
+    }
+
+
+def calculate_competing_modes(failures, suspensions=None, af_params=None, mode_af_params=None,
+                              options=None, t_mission=17520, bx_percent=1):
+    """
+    競爭失效模式分析
+
+    Args:
+        failures: 標註失效模式的失效記錄 (見 parse_mode_records)
+        suspensions: 未失效即移出的截尾時間 (對所有模式皆為截尾)
+        af_params: 共用的加速模型參數 (與 calculate_af 相同)
+        mode_af_params: {模式: 覆寫的加速模型參數} (選填)
+        options: calculate_weibull_batch 的選項 (median_rank_method, regression_method, n_total)
+
+    Returns:
+        dict: method, modes (各模式的 n_failures, beta, eta_alt, r_squared, af_total, eta_use, mttf_use,
+              r_mission, bx_life)，system (r_mission, bx_life, mttf_use) 或 {'error': ...}
+    """
+    options = dict(options or {})
+    try:
+        times, modes = parse_mode_records(failures)
+        suspensions = np.asarray(suspensions if isinstance(suspensions, (list, tuple, np.ndarray))
+                                 else [], dtype=float).ravel()
+    except (TypeError, ValueError, IndexError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    names, inverse, counts = np.unique(modes, return_inverse=True, return_counts=True)
+    if names.size == 0:
+        return {"error": "沒有失效記錄"}
+    few = names[counts < 2]
+    if few.size:
+        return {"error": f"失效模式 {', '.join(few)} 的失效數不足 (每個模式至少需要 2 點)"}
+
+    # 模式 k 的失效為其本身的失效；截尾為真正的截尾 + 其他模式的失效 (ragged 格式)
+    order = np.argsort(inverse, kind='stable')
+    values = times[order]
+    offsets = np.r_[0, np.cumsum(counts)]
+    others = np.concatenate([np.r_[times[inverse != k], suspensions] for k in range(names.size)])
+    susp_offsets = np.r_[0, np.cumsum(times.size - counts + suspensions.size)]
+    if options.get('n_total') in ('', None):
+        options.pop('n_total', None)
+    fit = calculate_weibull_batch(values, offsets, others, susp_offsets, options)
+    if "error" in fit:
+        return fit
+    if not fit["converged"].all():
+        bad = names[~fit["converged"]]
+        return {"error": f"失效模式 {', '.join(bad)} 擬合失敗"}
+
+    af = mode_af_totals(af_params, names.tolist(), mode_af_params)
+    if "error" in af:
+        return af
+
+    beta, eta_alt = fit["beta"], fit["eta"]
+    eta_use = eta_alt * af["af_total"]
+    x = bx_percent / 100
+    mode_results = []
+    for k, name in enumerate(names):
+        mode_results.append({
+            "mode": str(name),
+            "n_failures": int(counts[k]),
+            "beta": round(float(beta[k]), 4),
+            "eta_alt": round(float(eta_alt[k]), 4),
+            "r_squared": round(float(fit["r_squared"][k]), 4) if np.isfinite(fit["r_squared"][k]) else None,
+            "af_total": round(float(af["af_total"][k]), 4),
+            "eta_use": round(float(eta_use[k]), 2),
+            "mttf_use": round(float(eta_use[k] * special.gamma(1 + 1 / beta[k])), 2),
+            "r_mission": round(float(np.exp(-(t_mission / eta_use[k]) ** beta[k])), 6),
+            "bx_life": round(float(eta_use[k] * (-np.log(1 - x)) ** (1 / beta[k])), 2),
+        })
+    system = system_metrics(beta, eta_use, t_mission, bx_percent)
+    return {
+        "method": fit["method"],
+        "n_suspensions": int(suspensions.size),
+        "bx_percent": bx_percent,
+        "modes": mode_results,
+        "system": {"r_mission": round(system["r_mission"], 6),
+                   "bx_life": round(system["bx_life"], 2),
+                   "mttf_use": round(system["mttf_use"], 2)},
+    }
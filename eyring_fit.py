@@ -0,0 +1,309 @@
+"""
+廣義 Eyring 模型擬合
+由多個 溫度 × 應力 試驗組 (cells) 的失效數據，以最大概似法同時估計
+    t = A × (1/S)^B × e^(Ea/kT) × e^(D×S/T)
+的 A、B、Ea、D 與 Weibull 形狀參數 β (各組共用)，截尾數據以存活函數計入概似；
+擬合結果可直接代回 calculate_af 的 Eyring 修正 (eyring_a / eyring_b / eyring_d / ea)
+"""
+
+import numpy as np
+from scipy import stats
+from af_models import KB
+
+EULER_GAMMA = 0.5772156649015329
+DEFAULT_CONF_LEVEL = 0.95
+STRESS_TYPES = ('voltage', 'humidity')
+PARAM_NAMES = ('ln_a', 'b', 'ea', 'd')
+
+
+def _parse_cells(cells, interaction=True):
+    """
+    將試驗組轉為觀測值陣列
+
+    cells 格式:
+        [{'temp': 125, 'stress': 3.6, 'failures': [...], 'suspensions': [...]}, ...]
+        temp 為 °C，stress 為電壓 (V) 或相對濕度 (%)
+
+    Returns:
+        dict: Z (設計矩陣 [1, -ln S, 1/kT, S/T])，y (ln t)，delta (1 = 失效, 0 = 截尾)
+    """
+    if not cells:
+        raise ValueError("至少需要一個試驗組")
+    z_rows, y, delta = [], [], []
+    for cell in cells:
+        temp_k = float(cell['temp']) + 273.15
+        stress = float(cell['stress'])
+        if temp_k <= 0:
+            raise ValueError("溫度需高於絕對零度")
+        if stress <= 0:
+            raise ValueError("應力需為正數")
+        failures = [float(t) for t in cell.get('failures', [])]
+        suspensions = [float(t) for t in cell.get('suspensions', [])]
+        times = np.array(failures + suspensions)
+        if np.any(times <= 0):
+            raise ValueError("壽命與截尾時間需為正數")
+        row = [1.0, -np.log(stress), 1.0 / (KB * temp_k), stress / temp_k]
+        z_rows.append(np.tile(row, (times.size, 1)))
+        y.append(np.log(times))
+        delta.append(np.r_[np.ones(len(failures)), np.zeros(len(suspensions))])
+
+    Z = np.concatenate(z_rows) if z_rows else np.empty((0, 4))
+    if not interaction:
+        Z = Z[:, :3]
+    delta = np.concatenate(delta)
+    if Z.shape[0] == 0 or delta.sum() == 0:
+        raise ValueError("至少需要一筆失效數據")
+
+    # 有失效的試驗組需足以決定所有係數
+    cells_with_failures = np.unique(Z[delta > 0], axis=0)
+    if np.linalg.matrix_rank(cells_with_failures) < Z.shape[1]:
+        raise ValueError(f"有失效的 溫度 × 應力 組合不足以估計 {Z.shape[1]} 個係數"
+                         "，請增加溫度或應力水準")
+    return {"Z": Z, "y": np.concatenate(y), "delta": delta}
+
+
+def _weibull_regression_derivatives(theta, Z, Y, Dl, M):
+    """
+    Weibull 迴歸對數概似與解析梯度、Hessian
+
+    ln η = Z·θ[:p]，θ[p] = ln β；w = β (ln t − ln η)
+    ℓ = Σ δ (ln β − ln t + w) − e^w
+    """
+    p = Z.shape[2]
+    coef, s = theta[:, :p], theta[:, p:p + 1]
+    beta = np.exp(s)
+    eta = np.einsum('nij,nj->ni', Z, coef)
+    # 補齊位置的 w 設為 0，避免 exp 溢位後乘以遮罩得到 NaN
+    w = np.where(M > 0, beta * (Y - eta), 0.0)
+    ew = np.exp(w)
+    ll = np.sum(M * (Dl * (s - Y + w) - ew), axis=1)
+
+    r = M * (Dl - ew)
+    mew = M * ew
+    b = beta[:, 0]
+
+    grad = np.empty((theta.shape[0], p + 1))
+    grad[:, :p] = -b[:, None] * np.einsum('ni,nij->nj', r, Z)
+    grad[:, p] = (M * Dl).sum(axis=1) + (r * w).sum(axis=1)
+
+    hess = np.empty((theta.shape[0], p + 1, p + 1))
+    hess[:, :p, :p] = -(b ** 2)[:, None, None] * np.einsum('ni,nij,nik->njk', mew, Z, Z)
+    cross = (-b[:, None] * np.einsum('ni,nij->nj', r, Z) +
+             b[:, None] * np.einsum('ni,nij->nj', mew * w, Z))
+    hess[:, :p, p] = hess[:, p, :p] = cross
+    hess[:, p, p] = (r * w).sum(axis=1) - (mew * w * w).sum(axis=1)
+    return ll, grad, hess
+
+
+def fit_weibull_regression_batch(Z, Y, Dl, M, max_iter=200, tol=1e-9):
+    """
+    向量化最大概似擬合 Weibull 迴歸 ln η = Z·θ (Levenberg-Marquardt 阻尼牛頓法)
+
+    Args:
+        Z: 設計矩陣 (數據集數 × 觀測數 × 係數數)，第一欄為常數項
+        Y: ln t；Dl: 失效標記；M: 有效觀測遮罩 (數據集數 × 觀測數)
+
+    Returns:
+        dict: coef (原尺度係數), beta, cov (係數與 ln β 的共變異矩陣),
+              log_likelihood, converged, iterations
+    """
+    n_rows, _, p = Z.shape
+    eye = np.eye(p + 1)
+    with np.errstate(all='ignore'):
+        # 標準化非常數欄，改善 1/kT 與 S/T 等共線欄位的條件數
+        count = M.sum(axis=1)
+        mean = np.einsum('ni,nij->nj', M, Z) / count[:, None]
+        sd = np.sqrt(np.einsum('ni,nij->nj', M, (Z - mean[:, None, :]) ** 2) / count[:, None])
+        mean[:, 0], sd[:, 0] = 0.0, 1.0
+        sd = np.where(sd > 0, sd, 1.0)
+        Zs = (Z - mean[:, None, :]) / sd[:, None, :] * M[:, :, None]
+
+        # 初始值：失效點的最小平方迴歸，β 由殘差標準差估計 (極值分佈 σ = sd·√6/π)
+        W = M * Dl
+        gram = np.einsum('ni,nij,nik->njk', W, Zs, Zs) + 1e-9 * np.eye(p)
+        coef0 = np.linalg.solve(gram, np.einsum('ni,nij,ni->nj', W, Zs, Y)[:, :, None])[:, :, 0]
+        resid = (Y - np.einsum('nij,nj->ni', Zs, coef0)) * W
+        n_fail = W.sum(axis=1)
+        resid_sd = np.sqrt((resid ** 2).sum(axis=1) / np.maximum(n_fail - p, 1))
+        beta0 = np.clip(np.pi / (np.sqrt(6) * np.where(resid_sd > 0, resid_sd, 1.0)), 0.2, 20.0)
+        coef0[:, 0] += EULER_GAMMA / beta0
+        theta = np.column_stack([coef0, np.log(beta0)])
+
+        lam = np.full(n_rows, 1e-3)
+        converged = np.zeros(n_rows, dtype=bool)
+        iterations = np.zeros(n_rows, dtype=int)
+        ll, grad, hess = _weibull_regression_derivatives(theta, Zs, Y, Dl, M)
+
+        for _ in range(max_iter):
+            active = ~converged
+            if not active.any():
+                break
+            iterations[active] += 1
+
+            # (−H + λ·diag|H|) Δ = g
+            info = -hess
+            damping = lam[:, None] * np.abs(np.diagonal(info, axis1=1, axis2=2)) + 1e-12
+            system = info + damping[:, :, None] * eye
+            try:
+                step = np.linalg.solve(system, grad[:, :, None])[:, :, 0]
+            except np.linalg.LinAlgError:
+                step = np.zeros_like(theta)
+                for i in range(n_rows):
+                    step[i] = np.linalg.lstsq(system[i], grad[i], rcond=None)[0]
+            step[~active] = 0.0
+
+            candidate = theta + step
+            ll_new, grad_new, hess_new = _weibull_regression_derivatives(candidate, Zs, Y, Dl, M)
+            improved = active & np.isfinite(ll_new) & (ll_new >= ll - 1e-12 * np.abs(ll))
+
+            theta[improved] = candidate[improved]
+            grad[improved], hess[improved] = grad_new[improved], hess_new[improved]
+            small_change = np.abs(ll_new - ll) <= tol * (1 + np.abs(ll))
+            ll[improved] = ll_new[improved]
+            lam = np.where(improved, np.maximum(lam / 10, 1e-12), np.minimum(lam * 10, 1e12))
+
+            converged |= improved & (small_change | (np.abs(step).max(axis=1) < tol))
+
+        cov_s = np.full((n_rows, p + 1, p + 1), np.nan)
+        ok = np.isfinite(hess).all(axis=(1, 2))
+        if ok.any():
+            try:
+                cov_s[ok] = np.linalg.inv(-hess[ok])
+            except np.linalg.LinAlgError:
+                cov_s[ok] = np.linalg.pinv(-hess[ok])
+
+        # 轉回原尺度：θ_j = θ'_j / sd_j，θ_0 = θ'_0 − Σ θ'_j · mean_j / sd_j
+        J = np.zeros((n_rows, p + 1, p + 1))
+        J[:, 0, :p] = -mean / sd
+        J[:, 0, 0] = 1.0
+        J[:, np.arange(1, p), np.arange(1, p)] = 1.0 / sd[:, 1:]
+        J[:, p, p] = 1.0
+        theta_orig = np.einsum('njk,nk->nj', J, theta)
+        cov = J @ cov_s @ np.transpose(J, (0, 2, 1))
+
+    return {
+        "coef": theta_orig[:, :p], "beta": np.exp(theta[:, p]), "cov": cov,
+        "log_likelihood": ll, "converged": converged, "iterations": iterations,
+    }
+
+
+def _finite_or_none(value, decimals=6):
+    value = float(value)
+    return round(value, decimals) if np.isfinite(value) else None
+
+
+def _significant(value, digits=8):
+    """以有效位數四捨五入 (A 可能極小或極大)"""
+    value = float(value)
+    return float(f"{value:.{digits}g}") if np.isfinite(value) else None
+
+
+def eyring_af_params(stress_type, a, b, d, ea):
+    """
+    Eyring 參數轉為可直接傳入 calculate_af 的參數：
+    啟用溫度與 stress_type 對應的應力因子、停用另一個 (Eyring 修正僅在對應因子啟用時生效，
+    濕度模型預設為啟用，電壓應力時需明確停用以免重複計入 Peck 濕度 AF)
+    """
+    is_voltage = stress_type == 'voltage'
+    return {
+        "enable_temp": True,
+        "enable_voltage": is_voltage,
+        "enable_hum": not is_voltage,
+        "enable_eyring": True,
+        "eyring_stress_type": stress_type,
+        "eyring_a": _significant(a),
+        "eyring_b": _significant(b),
+        "eyring_d": _significant(d),
+        "ea": _significant(ea),
+    }
+
+
+def eyring_log_af_gradient(use, alt, interaction=True):
+    """ln AF 對 (ln A, B, Ea, D) 的梯度 (ln A 互相抵消)"""
+    t_use, t_alt = float(use['temp']) + 273.15, float(alt['temp']) + 273.15
+    s_use, s_alt = float(use['stress']), float(alt['stress'])
+    grad = [0.0, np.log(s_alt / s_use), (1 / t_use - 1 / t_alt) / KB,
+            s_use / t_use - s_alt / t_alt]
+    return np.array(grad[:4 if interaction else 3])
+
+
+def fit_eyring(cells, stress_type='voltage', interaction=True,
+               conf_level=DEFAULT_CONF_LEVEL, use=None, alt=None):
+    """
+    以最大概似法擬合廣義 Eyring-Weibull 模型
+
+    Args:
+        cells: 試驗組列表 (格式見 _parse_cells)
+        stress_type: 'voltage' 或 'humidity'，決定代回 AF 時對應的應力參數
+        interaction: 是否估計交互作用項 D (False 時 D 固定為 0)
+        conf_level: Wald 信賴區間的信賴水準
+        use, alt: 選填 {'temp', 'stress'}；兩者皆提供時回傳 AF 與 delta method 區間
+
+    Returns:
+        dict: 各參數估計值、標準誤與區間、β、共變異矩陣、log_likelihood、
+              af_params (可直接傳入 calculate_af) 或 {'error': ...}
+    """
+    try:
+        if stress_type not in STRESS_TYPES:
+            return {"error": f"不支援的應力類型: {stress_type}"}
+        if not 0 < conf_level < 1:
+            return {"error": "信賴水準需介於 0 與 1 之間"}
+        obs = _parse_cells(cells, interaction)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    Z, Y, Dl = obs["Z"][None], obs["y"][None], obs["delta"][None]
+    fit = fit_weibull_regression_batch(Z, Y, Dl, np.ones_like(Y))
+    coef, cov, beta = fit["coef"][0], fit["cov"][0], fit["beta"][0]
+    if not np.all(np.isfinite(coef)):
+        return {"error": "最大概似估計未收斂"}
+
+    p = coef.size
+    coef_full = np.r_[coef, 0.0] if p == 3 else coef
+    se = np.sqrt(np.diag(cov))
+    se_full = np.r_[se[:p], 0.0] if p == 3 else se[:p]
+    z = stats.norm.ppf(0.5 + conf_level / 2)
+
+    params = {}
+    for name, value, err in zip(PARAM_NAMES, coef_full, se_full):
+        params[name] = {"value": _finite_or_none(value), "se": _finite_or_none(err),
+                        "lower": _finite_or_none(value - z * err),
+                        "upper": _finite_or_none(value + z * err)}
+    log_beta_se = se[p]
+
+    ln_a, b, ea, d = coef_full
+    result = {
+        "stress_type": stress_type,
+        "interaction": bool(interaction),
+        "conf_level": conf_level,
+        "params": params,
+        "a": _significant(np.exp(ln_a)),
+        "beta": _finite_or_none(beta),
+        "beta_lower": _finite_or_none(beta * np.exp(-z * log_beta_se)),
+        "beta_upper": _finite_or_none(beta * np.exp(z * log_beta_se)),
+        "cov_names": list(PARAM_NAMES[:p]) + ['ln_beta'],
+        "cov": [[_significant(v) for v in row] for row in cov],
+        "log_likelihood": _finite_or_none(fit["log_likelihood"][0]),
+        "converged": bool(fit["converged"][0]),
+        "iterations": int(fit["iterations"][0]),
+        "n_cells": len(cells),
+        "n_failures": int(obs["delta"].sum()),
+        "n_suspensions": int((obs["delta"] == 0).sum()),
+        # 代回 calculate_af 的 Eyring 修正參數與啟用標誌
+        "af_params": eyring_af_params(stress_type, np.exp(ln_a), b, d, ea),
+    }
+
+    if use is not None and alt is not None:
+        try:
+            grad = eyring_log_af_gradient(use, alt, interaction)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            return {"error": str(e) or "使用 / 測試條件格式錯誤"}
+        log_af = float(grad @ coef)
+        log_af_se = float(np.sqrt(grad @ cov[:p, :p] @ grad))
+        result["af"] = {
+            "af": _significant(np.exp(log_af)),
+            "lower": _significant(np.exp(log_af - z * log_af_se)),
+            "upper": _significant(np.exp(log_af + z * log_af_se)),
+            "log10_af": _finite_or_none(log_af / np.log(10)),
+        }
+    return result
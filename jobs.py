@@ -0,0 +1,172 @@
+"""
+背景計算任務
+長時間的計算 (如大量 bootstrap) 在背景執行緒執行，
+以任務 ID 查詢進度、取得結果或取消；任務只保存在目前的 worker 行程
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from parallel import BlocksCancelled, resolve_n_jobs
+
+MAX_FINISHED_JOBS = 32           # 保留的已結束任務數 (超過時移除最舊者)
+MAX_RUNNING_JOBS = 4             # 同時執行的背景任務上限 (超過時拒絕新任務)
+FINISHED_TTL = 3600              # 已結束任務的保留秒數 (未查詢的結果逾時後移除)
+MAX_JOB_PROCESSES = 4            # 單一任務可使用的行程數上限
+
+
+class JobLimitExceeded(Exception):
+    """執行中的背景任務已達上限"""
+
+
+def clamp_n_jobs(n_jobs, limit=MAX_JOB_PROCESSES):
+    """
+    解析任務的平行行程數並限制於 limit (-1 或 0 為 min(CPU 數, limit))
+
+    Raises:
+        ValueError: 不是整數
+    """
+    if n_jobs is None:
+        return 1
+    try:
+        number = float(n_jobs)
+    except (TypeError, ValueError):
+        raise ValueError("n_jobs 需為整數")
+    if isinstance(n_jobs, bool) or not number.is_integer():
+        raise ValueError("n_jobs 需為整數")
+    return min(resolve_n_jobs(int(number)), max(int(limit), 1))
+
+
+class Job:
+    """單一背景任務的狀態 (status: running / done / cancelled / error)"""
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'running'
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+
+    def progress(self, done, total):
+        self.done, self.total = done, total
+
+    def to_dict(self, include_result=True):
+        out = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total,
+                         "fraction": self.done / self.total if self.total else 0.0},
+            "elapsed": round((self.finished or time.time()) - self.created, 3),
+        }
+        if self.error:
+            out["error"] = self.error
+        if include_result and self.status == 'done':
+            out["result"] = self.result
+        return out
+
+
+class JobRegistry:
+    """背景任務登錄表 (執行緒安全)"""
+
+    def __init__(self, max_finished=MAX_FINISHED_JOBS, max_running=MAX_RUNNING_JOBS,
+                 finished_ttl=FINISHED_TTL):
+        self.max_finished = max_finished
+        self.max_running = max_running
+        self.finished_ttl = finished_ttl
+        self._jobs = OrderedDict()
+        self._inline = 0
+        self._lock = threading.Lock()
+
+    def start(self, kind, func, *args, **kwargs):
+        """
+        在背景執行 func(*args, progress=..., cancel=..., **kwargs)
+
+        func 回傳含 'error' 鍵的字典時任務狀態為 error；
+        拋出 BlocksCancelled 或取消後結束時狀態為 cancelled
+
+        Raises:
+            JobLimitExceeded: 執行中的任務數已達 max_running
+        """
+        job = Job(kind)
+
+        def target():
+            try:
+                result = func(*args, progress=job.progress, cancel=job.cancel_event, **kwargs)
+                if job.cancel_event.is_set():
+                    job.status = 'cancelled'
+                elif isinstance(result, dict) and "error" in result:
+                    job.error, job.status = result["error"], 'error'
+                else:
+                    job.result, job.status = result, 'done'
+            except BlocksCancelled:
+                job.status = 'cancelled'
+            except Exception as e:
+                job.error, job.status = str(e), 'error'
+            job.finished = time.time()
+
+        with self._lock:
+            self._acquire()
+            self._jobs[job.id] = job
+        threading.Thread(target=target, name=f"{kind}-{job.id[:8]}", daemon=True).start()
+        return job
+
+    @contextmanager
+    def slot(self):
+        """
+        在呼叫端執行緒同步執行計算時占用一個執行名額 (與背景任務共用 max_running)
+
+        Raises:
+            JobLimitExceeded: 執行中的任務數已達 max_running
+        """
+        with self._lock:
+            self._acquire()
+            self._inline += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inline -= 1
+
+    def _acquire(self):
+        self._prune()
+        if self._count_running() >= self.max_running:
+            raise JobLimitExceeded(f"執行中的背景任務已達上限 ({self.max_running})，請稍後再試")
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def running(self):
+        """執行中的任務數 (含同步執行)"""
+        with self._lock:
+            return self._count_running()
+
+    def _count_running(self):
+        return self._inline + sum(j.status == 'running' for j in self._jobs.values())
+
+    def cancel(self, job_id):
+        """要求取消任務 (於下一個區塊邊界生效)，回傳任務或 None"""
+        job = self.get(job_id)
+        if job is not None and job.status == 'running':
+            job.cancel_event.set()
+        return job
+
+    def _prune(self):
+        """移除逾時的已結束任務，並只保留最新的 max_finished 個"""
+        now = time.time()
+        finished = [k for k, j in self._jobs.items() if j.status != 'running']
+        expired = {k for k in finished
+                   if self.finished_ttl and now - (self._jobs[k].finished or now) > self.finished_ttl}
+        kept = [k for k in finished if k not in expired]
+        expired.update(kept[:max(len(kept) - self.max_finished, 0)])
+        for key in expired:
+            del self._jobs[key]
@@ -0,0 +1,344 @@
+"""
+多分佈壽命擬合與模型排序
+對同一組失效 / 右截尾數據以最大概似估計擬合多種壽命分佈，並依 AIC、BIC、
+對數概似或 Anderson-Darling 統計量排序：
+  - weibull / weibull_3p：沿用 weibull_mle 與 weibull_3p 的剖面概似
+  - exponential：封閉解 MTTF = Σ t / r
+  - lognormal / normal / loglogistic：ln t (或 t) 上的位置-尺度分佈，
+    以解析梯度與 Hessian 的 LM 阻尼牛頓法在 (μ, ln σ) 上求解
+  - gamma：(ln k, ln θ) 上的 Nelder-Mead (失效項以充分統計量計算)
+樣本只整理一次 (排序、相同時間與狀態的觀測合併為權重、ln t 與 Kaplan-Meier 估計)，
+所有候選分佈共用
+AF 視為時間尺度的倍數：各分佈的尺度參數乘以 AF 即為現場分佈
+"""
+
+import numpy as np
+from scipy import stats, special, optimize
+from weibull_mle import prepare_sample, fit_weibull_mle_batch
+from weibull_3p import fit_weibull_3p_sample
+
+# 名稱: (顯示名稱, 參數個數)
+DISTRIBUTIONS = {
+    'weibull': ('Weibull (2P)', 2),
+    'weibull_3p': ('Weibull (3P)', 3),
+    'lognormal': ('Lognormal', 2),
+    'normal': ('Normal', 2),
+    'exponential': ('Exponential', 1),
+    'gamma': ('Gamma', 2),
+    'loglogistic': ('Log-logistic', 2),
+}
+RANK_CRITERIA = ('aic', 'bic', 'ad', 'log_likelihood')
+
+MAX_ITER = 100
+TOL = 1e-10
+
+
+def frozen_distribution(name, params, af_total=1.0):
+    """
+    回傳 scipy.stats 的凍結分佈；af_total 將時間尺度放大 (加速條件 → 現場)
+
+    Raises:
+        ValueError: 不支援的分佈
+    """
+    af = float(af_total)
+    if name == 'weibull':
+        return stats.weibull_min(params['beta'], scale=params['eta'] * af)
+    if name == 'weibull_3p':
+        return stats.weibull_min(params['beta'], loc=params['gamma'] * af, scale=params['eta'] * af)
+    if name == 'lognormal':
+        return stats.lognorm(params['sigma'], scale=np.exp(params['mu']) * af)
+    if name == 'normal':
+        return stats.norm(params['mu'] * af, params['sigma'] * af)
+    if name == 'exponential':
+        return stats.expon(scale=params['mttf'] * af)
+    if name == 'gamma':
+        return stats.gamma(params['shape'], scale=params['scale'] * af)
+    if name == 'loglogistic':
+        return stats.fisk(params['beta'], scale=params['alpha'] * af)
+    raise ValueError(f"不支援的分佈: {name}")
+
+
+def _sample_stats(times, is_failure, weights):
+    """
+    所有候選分佈共用的樣本統計量 (依時間排序；同時間時失效排在截尾之前)
+
+    Returns:
+        dict: t, log_t, d (失效標記), w (權重), n, r, km_t, km_F (Kaplan-Meier 階梯), t_max，
+              以及 Gamma 失效項的充分統計量 sum_t, sum_log_t (失效時間的加權和)
+    """
+    order = np.lexsort((1 - is_failure, times))
+    t, d, w = times[order], is_failure[order] > 0, weights[order]
+    # 相同時間與狀態的觀測合併為一筆 (權重相加)，各分佈的概似只需評估相異觀測
+    first = np.flatnonzero(np.r_[True, (t[1:] != t[:-1]) | (d[1:] != d[:-1])])
+    t, d, w = t[first], d[first], np.add.reduceat(w, first)
+    n, r = w.sum(), (w * d).sum()
+
+    # Kaplan-Meier：每個相異失效時間的風險集與失效數
+    at_risk = n - np.r_[0.0, np.cumsum(w)[:-1]]
+    km_t, first = np.unique(t[d], return_index=True)
+    fail_counts = np.add.reduceat(w[d], first) if first.size else np.empty(0)
+    risk = at_risk[np.flatnonzero(d)[first]]
+    km_F = 1 - np.cumprod(1 - fail_counts / risk)
+    log_t = np.log(t)
+    return {"t": t, "log_t": log_t, "d": d, "w": w, "n": float(n), "r": float(r),
+            "km_t": km_t, "km_F": km_F, "t_max": float(t[-1]),
+            "sum_t": float((w * t)[d].sum()), "sum_log_t": float((w * log_t)[d].sum())}
+
+
+def _standard_terms(z, family):
+    """
+    標準分佈的 ln f0、ln S0 與其對 z 的一、二階導數
+
+    Returns:
+        ((lf, lf1, lf2), (ls, ls1, ls2))
+    """
+    if family == 'normal':
+        lf = -0.5 * z * z - 0.5 * np.log(2 * np.pi)
+        ls = special.log_ndtr(-z)
+        h = np.exp(lf - ls)                      # 失效率 φ(z) / (1 - Φ(z))
+        return (lf, -z, -np.ones_like(z)), (ls, -h, -h * (h - z))
+    if family == 'sev':
+        # 最小極值分佈 (ln t 上的 Weibull)：ln f0 = z - e^z，ln S0 = -e^z
+        ez = np.exp(z)
+        return (z - ez, 1 - ez, -ez), (-ez, -ez, -ez)
+    # logistic
+    F = special.expit(z)
+    lf = -np.abs(z) - 2 * np.log1p(np.exp(-np.abs(z)))
+    ls = -np.logaddexp(0, z)
+    return (lf, 1 - 2 * F, -2 * F * (1 - F)), (ls, -F, -F * (1 - F))
+
+
+def _location_scale_derivatives(theta, y, d, w, family):
+    """位置-尺度分佈在 θ = (μ, ln σ) 上的對數概似 (不含 Jacobian 常數)、梯度與 Hessian"""
+    mu, log_sigma = theta
+    sigma = np.exp(log_sigma)
+    z = (y - mu) / sigma
+    (lf, lf1, lf2), (ls, ls1, ls2) = _standard_terms(z, family)
+    g = np.where(d, lf, ls)
+    g1 = np.where(d, lf1, ls1)
+    g2 = np.where(d, lf2, ls2)
+    r = (w * d).sum()
+
+    # dz/dμ = -1/σ，dz/d(ln σ) = -z
+    ll = (w * g).sum() - r * log_sigma
+    grad = np.array([-(w * g1).sum() / sigma, -(w * g1 * z).sum() - r])
+    h_mm = (w * g2).sum() / sigma ** 2
+    h_ms = (w * (g2 * z + g1)).sum() / sigma
+    h_ss = (w * (g2 * z * z + g1 * z)).sum()
+    return ll, grad, np.array([[h_mm, h_ms], [h_ms, h_ss]])
+
+
+def _fit_location_scale(y, d, w, family, max_iter=MAX_ITER, tol=TOL):
+    """
+    右截尾位置-尺度分佈 MLE (LM 阻尼牛頓法，與 weibull_grouped 相同)
+
+    Returns:
+        (μ, σ, 是否收斂)
+    """
+    yf, wf = y[d], w[d]
+    mu0 = np.average(yf, weights=wf)
+    sd = np.sqrt(np.average((yf - mu0) ** 2, weights=wf))
+    theta = np.array([mu0, np.log(sd if sd > 0 else abs(mu0) * 0.1 + 1.0)])
+    ll, grad, hess = _location_scale_derivatives(theta, y, d, w, family)
+
+    lam, converged = 1e-3, False
+    for _ in range(max_iter):
+        info = -hess
+        system = info + (lam * np.abs(np.diag(info)) + 1e-12) * np.eye(2)
+        try:
+            step = np.linalg.solve(system, grad)
+        except np.linalg.LinAlgError:
+            step = np.linalg.lstsq(system, grad, rcond=None)[0]
+        candidate = theta + step
+        ll_new, grad_new, hess_new = _location_scale_derivatives(candidate, y, d, w, family)
+        if np.isfinite(ll_new) and ll_new >= ll - 1e-12 * abs(ll):
+            small_change = abs(ll_new - ll) <= tol * (1 + abs(ll))
+            theta, ll, grad, hess = candidate, ll_new, grad_new, hess_new
+            lam = max(lam / 10, 1e-12)
+            if small_change or np.abs(step).max() < tol:
+                converged = True
+                break
+        else:
+            lam = min(lam * 10, 1e12)
+    return float(theta[0]), float(np.exp(theta[1])), converged
+
+
+def _fit_gamma(s):
+    """
+    右截尾 Gamma MLE：(ln k, ln θ) 上的 Nelder-Mead，起始值為失效時間的動差估計
+    失效項 Σ w ln f = (k - 1) Σ w ln t - Σ w t / θ - r (ln Γ(k) + k ln θ) 只需充分統計量，
+    每次評估只對截尾觀測計算不完全 Gamma 函數
+    """
+    t, d, w = s["t"], s["d"], s["w"]
+    mean = np.average(t[d], weights=w[d])
+    var = np.average((t[d] - mean) ** 2, weights=w[d])
+    shape0 = mean ** 2 / var if var > 0 else 1.0
+    start = np.log([shape0, mean / shape0])
+    r, sum_t, sum_log_t = s["r"], s["sum_t"], s["sum_log_t"]
+    t_c, w_c = t[~d], w[~d]
+
+    def neg_ll(theta):
+        k, scale = np.exp(theta)
+        value = ((k - 1) * sum_log_t - sum_t / scale - r * (special.gammaln(k) + k * np.log(scale))
+                 + (w_c * np.log(special.gammaincc(k, t_c / scale))).sum())
+        return -value if np.isfinite(value) else np.inf
+
+    best = optimize.minimize(neg_ll, start, method='Nelder-Mead',
+                             options={'xatol': 1e-7, 'fatol': 1e-9, 'maxiter': 2000})
+    k, scale = np.exp(best.x)
+    return {"shape": float(k), "scale": float(scale)}, bool(best.success)
+
+
+def _fit_candidate(name, s):
+    """
+    擬合單一候選分佈
+
+    Returns:
+        (params, 附加資訊) 或 {'error': ...}
+    """
+    d, w = s["d"], s["w"]
+    if name == 'exponential':
+        return {"mttf": float((w * s["t"]).sum() / s["r"])}, {}
+    if name == 'weibull':
+        fit = fit_weibull_mle_batch(s["t"][None], d[None].astype(float), w[None])
+        if not fit["converged"][0]:
+            return {"error": "Weibull 最大概似估計未收斂"}
+        return {"beta": float(fit["beta"][0]), "eta": float(fit["eta"][0])}, {}
+    if name == 'weibull_3p':
+        fit = fit_weibull_3p_sample(s["t"], d.astype(float), w)
+        if "error" in fit:
+            return fit
+        return ({"beta": fit["beta"], "eta": fit["eta"], "gamma": fit["gamma"]},
+                {"gamma_at_bound": fit["gamma_at_bound"]})
+    if name == 'gamma':
+        params, converged = _fit_gamma(s)
+        if not converged:
+            return {"error": "Gamma 最大概似估計未收斂"}
+        return params, {}
+
+    y = s["t"] if name == 'normal' else s["log_t"]
+    mu, sigma, converged = _fit_location_scale(y, d, w, 'logistic' if name == 'loglogistic' else 'normal')
+    if not converged:
+        return {"error": f"{DISTRIBUTIONS[name][0]} 最大概似估計未收斂"}
+    if name == 'loglogistic':
+        return {"beta": 1 / sigma, "alpha": float(np.exp(mu))}, {}
+    return {"mu": mu, "sigma": sigma}, {}
+
+
+def anderson_darling(s, dist):
+    """
+    截尾數據的 Anderson-Darling 統計量
+    A² = n ∫ (F̂ - F)² / (F(1 - F)) dF，F̂ 為 Kaplan-Meier 階梯，積分至最後觀測時間
+    (無截尾時與標準 A² 相同)；F̂ 在相鄰失效時間之間為常數，各段積分有封閉解
+        ∫_a^b (c - u)² / (u(1 - u)) du = -(b - a) + c² ln(b/a) + (1 - c)² ln((1 - a)/(1 - b))
+    """
+    km_F = s["km_F"]
+    F = dist.cdf(s["km_t"])
+    end = 1.0 if km_F[-1] >= 1 else dist.cdf(s["t_max"])
+    a = np.r_[0.0, F]
+    b = np.r_[F, end]
+    c = np.r_[0.0, km_F]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        left = np.where(c > 0, c * c * (np.log(b) - np.log(a)), 0.0)
+        right = np.where(c < 1, (1 - c) ** 2 * (np.log1p(-a) - np.log1p(-b)), 0.0)
+        pieces = np.where(b > a, -(b - a) + left + right, 0.0)
+    return float(s["n"] * pieces.sum())
+
+
+def rank_distributions(failures, suspensions=None, options=None):
+    """
+    擬合所有候選壽命分佈並排序
+
+    Args:
+        failures, suspensions: 失效與截尾時間
+        options: {'n_total': 實際樣品總數 (多出的樣品視為在最後觀測時間截尾),
+                  'candidates': 候選分佈名稱列表 (預設全部),
+                  'rank_by': 'aic' (預設) | 'bic' | 'ad' | 'log_likelihood'}
+
+    Returns:
+        dict: rank_by, n_units, n_failures, best (最佳分佈名稱),
+              candidates (依排序的列表：name, label, params, n_params, log_likelihood, aic, bic, ad, rank；
+              擬合失敗者含 error，rank 為 None) 或 {'error': ...}
+    """
+    options = options or {}
+    rank_by = options.get('rank_by', 'aic')
+    if rank_by not in RANK_CRITERIA:
+        return {"error": f"不支援的排序準則: {rank_by}"}
+    names = options.get('candidates') or list(DISTRIBUTIONS)
+    if not isinstance(names, (list, tuple)) or not all(isinstance(name, str) for name in names):
+        return {"error": "候選分佈需為分佈名稱列表"}
+    unknown = [name for name in names if name not in DISTRIBUTIONS]
+    if unknown:
+        return {"error": f"不支援的分佈: {', '.join(unknown)}"}
+
+    try:
+        n_total = options.get('n_total')
+        n_total = int(n_total) if n_total not in (None, '') else None
+        suspensions = suspensions if isinstance(suspensions, (list, tuple, np.ndarray)) else []
+        times, is_failure, weights = prepare_sample(failures, suspensions, n_total)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+    s = _sample_stats(times, is_failure, weights)
+    if s["r"] < 2 or s["km_t"].size < 2:
+        return {"error": "失效數據不足，無法進行分佈擬合 (至少需要 2 個相異的失效時間)"}
+
+    candidates = []
+    for name in names:
+        label, n_params = DISTRIBUTIONS[name]
+        entry = {"name": name, "label": label, "n_params": n_params, "rank": None}
+        fit = _fit_candidate(name, s)
+        if isinstance(fit, dict):
+            entry.update(fit)
+            candidates.append(entry)
+            continue
+        params, extra = fit
+        dist = frozen_distribution(name, params)
+        with np.errstate(divide='ignore'):
+            ll = float((s["w"] * np.where(s["d"], dist.logpdf(s["t"]), dist.logsf(s["t"]))).sum())
+        entry.update({
+            "params": {k: round(v, 6) for k, v in params.items()},
+            "log_likelihood": round(ll, 4),
+            "aic": round(2 * n_params - 2 * ll, 4),
+            "bic": round(n_params * np.log(s["n"]) - 2 * ll, 4),
+            "ad": round(anderson_darling(s, dist), 4),
+        })
+        entry.update(extra)
+        # β < 1 時三參數概似隨 γ 趨近最小失效時間而發散，不列入排序
+        if extra.get("gamma_at_bound") and params["gamma"] > 0:
+            entry["warning"] = "無失效期落在最小失效時間 (概似發散)，不列入排序"
+        candidates.append(entry)
+
+    ranked = [c for c in candidates if "error" not in c and "warning" not in c]
+    if not ranked:
+        return {"error": "所有候選分佈皆擬合失敗"}
+    sign = -1 if rank_by == 'log_likelihood' else 1
+    ranked.sort(key=lambda c: sign * c[rank_by])
+    for i, c in enumerate(ranked, 1):
+        c["rank"] = i
+    others = [c for c in candidates if c["rank"] is None]
+
+    return {
+        "rank_by": rank_by,
+        "n_units": s["n"],
+        "n_failures": s["r"],
+        "best": ranked[0]["name"],
+        "candidates": ranked + others,
+    }
+
+
+def distribution_reliability(name, params, af_total, t_mission, bx_percent=1):
+    """
+    以指定分佈計算現場可靠度指標 (與 calculate_reliability_results 的 Weibull 指標對應)
+
+    Returns:
+        dict: distribution, mttf_use, r_mission, bx_life, bx_percent
+    """
+    dist = frozen_distribution(name, params, af_total)
+    return {
+        "distribution": name,
+        "label": DISTRIBUTIONS[name][0],
+        "mttf_use": round(float(dist.mean()), 2),
+        "r_mission": round(float(dist.sf(t_mission)), 6),
+        "bx_life": round(float(dist.ppf(bx_percent / 100)), 2),
+        "bx_percent": bx_percent,
+    }
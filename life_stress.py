@@ -0,0 +1,417 @@
+"""
+多應力水準的壽命-應力模型聯合擬合 (ALT)
+以最大概似法由多個應力水準 (試驗組, cells) 的失效與右截尾數據同時估計
+壽命分佈的形狀參數 (各組共用) 與壽命-應力關係的參數：
+    ln t = μ(S) + σ ε，μ(S) = Z(S)·θ
+    Weibull：ε 為最小極值分佈，η = e^μ，β = 1/σ
+    Lognormal：ε 為標準常態分佈，中位壽命 = e^μ
+壽命-應力模型 (μ 的設計矩陣欄位)：
+    arrhenius  η = A · e^(Ea/kT)                         [1, 1/kT]
+    peck       η = A · RH^-n · e^(Ea/kT)                  [1, 1/kT, -ln RH]
+    ipl        η = A · S^-n                               [1, -ln S]
+    eyring     η = A · (1/S)^B · e^(Ea/kT) · e^(D·S/T)    [1, -ln S, 1/kT, S/T]
+以解析梯度與 Hessian 的 LM 阻尼牛頓法在 (θ, ln σ) 上求解 (非常數欄標準化以改善條件數)；
+各組相同的 (時間, 失效/截尾) 觀測合併為權重；擬合結果可直接代回 calculate_af
+"""
+
+import numpy as np
+from scipy import stats
+from af_models import KB
+from eyring_fit import eyring_af_params
+from life_distributions import _standard_terms
+
+EULER_GAMMA = 0.5772156649015329
+DEFAULT_CONF_LEVEL = 0.95
+MAX_ITER = 200
+TOL = 1e-10
+
+# 分佈: (顯示名稱, 標準化分佈族)
+DISTRIBUTIONS = {
+    'weibull': ('Weibull', 'sev'),
+    'lognormal': ('Lognormal', 'normal'),
+}
+STRESS_TYPES = ('voltage', 'humidity')
+
+
+def _number(cell, key, label):
+    """讀取數值欄位；缺少或不是數值時以欄位名稱說明錯誤"""
+    if not isinstance(cell, dict):
+        raise ValueError("試驗組與使用 / 測試條件需為物件")
+    if cell.get(key) in (None, ''):
+        raise ValueError(f"缺少{label}欄位 '{key}'")
+    try:
+        return float(cell[key])
+    except (TypeError, ValueError):
+        raise ValueError(f"{label}欄位 '{key}' 需為數值")
+
+
+def _kelvin(cell):
+    temp_k = _number(cell, 'temp', '溫度') + 273.15
+    if temp_k <= 0:
+        raise ValueError("溫度需高於絕對零度")
+    return temp_k
+
+
+def _positive(cell, key, label):
+    value = _number(cell, key, label)
+    if value <= 0:
+        raise ValueError(f"{label}需為正數")
+    return value
+
+
+def _arrhenius_row(cell):
+    return [1.0, 1.0 / (KB * _kelvin(cell))]
+
+
+def _peck_row(cell):
+    return [1.0, 1.0 / (KB * _kelvin(cell)), -np.log(_positive(cell, 'rh', '相對濕度'))]
+
+
+def _ipl_row(cell):
+    return [1.0, -np.log(_positive(cell, 'stress', '應力'))]
+
+
+def _eyring_row(cell):
+    temp_k, stress = _kelvin(cell), _positive(cell, 'stress', '應力')
+    return [1.0, -np.log(stress), 1.0 / (KB * temp_k), stress / temp_k]
+
+
+# 模型: (顯示名稱, 設計矩陣列, 係數名稱)
+LIFE_STRESS_MODELS = {
+    'arrhenius': ('Arrhenius', _arrhenius_row, ('ln_a', 'ea')),
+    'peck': ("Peck (溫度-濕度)", _peck_row, ('ln_a', 'ea', 'n')),
+    'ipl': ('Inverse Power Law', _ipl_row, ('ln_a', 'n')),
+    'eyring': ('Generalized Eyring', _eyring_row, ('ln_a', 'b', 'ea', 'd')),
+}
+
+
+def _af_params(model, values, stress_type):
+    """
+    擬合參數轉為可直接傳入 calculate_af 的參數：明確設定溫度與濕度 (預設啟用) 等旗標，
+    使 AF 只包含擬合模型的應力因子
+    """
+    if model == 'arrhenius':
+        return {"enable_temp": True, "enable_hum": False, "ea": values['ea']}
+    if model == 'peck':
+        return {"enable_temp": True, "ea": values['ea'], "enable_hum": True, "n_hum": values['n']}
+    if model == 'ipl':
+        return {"enable_temp": False, "enable_hum": False, "enable_voltage": True, "beta_v": values['n']}
+    return eyring_af_params(stress_type, np.exp(values['ln_a']), values['b'], values['d'], values['ea'])
+
+
+def _parse_cells(cells, model, n_coef):
+    """
+    將試驗組轉為合併後的觀測值陣列
+
+    cells 格式:
+        [{'temp': 125, 'rh': 85, 'stress': 3.6, 'failures': [...], 'suspensions': [...]}, ...]
+        temp 為 °C；各模型只讀取所需的應力欄位
+
+    Returns:
+        dict: Z (設計矩陣), y (ln t), d (失效標記), w (權重), cell (試驗組索引), rows (各組設計列)
+    """
+    if not cells:
+        raise ValueError("至少需要一個試驗組")
+    row_of = LIFE_STRESS_MODELS[model][1]
+    rows, cell_index, y, d, w = [], [], [], [], []
+    for i, cell in enumerate(cells):
+        try:
+            rows.append(row_of(cell)[:n_coef])
+        except ValueError as e:
+            raise ValueError(f"第 {i + 1} 個試驗組: {e}")
+        failures = np.asarray(cell.get('failures') or [], dtype=float).ravel()
+        suspensions = np.asarray(cell.get('suspensions') or [], dtype=float).ravel()
+        times = np.r_[failures, suspensions]
+        if np.any(~(times > 0)):
+            raise ValueError("壽命與截尾時間需為正數")
+        if times.size == 0:
+            continue
+        # 相同的 (時間, 失效/截尾) 合併為一筆加權觀測
+        flags = np.r_[np.ones(failures.size), np.zeros(suspensions.size)]
+        unique, counts = np.unique(np.c_[times, flags], axis=0, return_counts=True)
+        cell_index.append(np.full(counts.size, i))
+        y.append(np.log(unique[:, 0]))
+        d.append(unique[:, 1] > 0)
+        w.append(counts.astype(float))
+
+    rows = np.array(rows)
+    if not y:
+        raise ValueError("至少需要一筆失效數據")
+    cell_index = np.concatenate(cell_index)
+    d = np.concatenate(d)
+    if not d.any():
+        raise ValueError("至少需要一筆失效數據")
+
+    # 有失效的應力水準需足以決定所有係數
+    failed_rows = np.unique(rows[np.unique(cell_index[d])], axis=0)
+    if np.linalg.matrix_rank(failed_rows) < n_coef:
+        raise ValueError(f"有失效的應力水準不足以估計 {n_coef} 個係數，請增加應力水準")
+    return {"Z": rows[cell_index], "y": np.concatenate(y), "d": d, "w": np.concatenate(w),
+            "cell": cell_index, "rows": rows}
+
+
+def _regression_derivatives(theta, Z, y, d, w, family):
+    """
+    位置-尺度迴歸 μ = Z·θ[:p]、θ[p] = ln σ 的對數概似 (ln t 尺度)、解析梯度與 Hessian
+    z = (y − μ)/σ；dz/dθ_j = −Z_j/σ，dz/d(ln σ) = −z
+    """
+    p = Z.shape[1]
+    sigma = np.exp(theta[p])
+    z = (y - Z @ theta[:p]) / sigma
+    (lf, lf1, lf2), (ls, ls1, ls2) = _standard_terms(z, family)
+    g = np.where(d, lf, ls)
+    g1 = np.where(d, lf1, ls1)
+    g2 = np.where(d, lf2, ls2)
+    r = (w * d).sum()
+
+    ll = (w * g).sum() - r * theta[p]
+    grad = np.empty(p + 1)
+    grad[:p] = -(w * g1) @ Z / sigma
+    grad[p] = -(w * g1 * z).sum() - r
+    hess = np.empty((p + 1, p + 1))
+    hess[:p, :p] = (Z.T * (w * g2)) @ Z / sigma ** 2
+    hess[:p, p] = hess[p, :p] = (w * (g2 * z + g1)) @ Z / sigma
+    hess[p, p] = (w * (g2 * z * z + g1 * z)).sum()
+    return ll, grad, hess
+
+
+def fit_life_stress_regression(Z, y, d, w, family, max_iter=MAX_ITER, tol=TOL):
+    """
+    右截尾位置-尺度迴歸 MLE (LM 阻尼牛頓法，與 eyring_fit 相同)
+
+    Args:
+        Z: 設計矩陣 (觀測數 × 係數數)，第一欄為常數項
+        y: ln t；d: 失效標記；w: 權重 (樣品數)
+        family: 'sev' (Weibull) 或 'normal' (Lognormal)
+
+    Returns:
+        dict: coef (原尺度係數), sigma, cov (係數與 ln σ 的共變異矩陣),
+              log_likelihood (ln t 尺度), converged, iterations
+    """
+    p = Z.shape[1]
+    with np.errstate(all='ignore'):
+        # 標準化非常數欄，改善 1/kT 與 S/T 等共線欄位的條件數
+        n = w.sum()
+        mean = w @ Z / n
+        sd = np.sqrt(w @ (Z - mean) ** 2 / n)
+        mean[0], sd[0] = 0.0, 1.0
+        sd = np.where(sd > 0, sd, 1.0)
+        Zs = (Z - mean) / sd
+
+        # 初始值：失效點的加權最小平方迴歸，σ 由殘差標準差估計
+        wf = w * d
+        gram = (Zs.T * wf) @ Zs + 1e-9 * np.eye(p)
+        coef0 = np.linalg.solve(gram, (wf * y) @ Zs)
+        resid = y - Zs @ coef0
+        resid_sd = np.sqrt((wf * resid ** 2).sum() / max(wf.sum() - p, 1))
+        resid_sd = resid_sd if resid_sd > 0 else 1.0
+        if family == 'sev':
+            # 極值分佈 sd = σ·π/√6，E[ln t] = μ − γσ
+            sigma0 = resid_sd * np.sqrt(6) / np.pi
+            coef0[0] += EULER_GAMMA * sigma0
+        else:
+            sigma0 = resid_sd
+        theta = np.r_[coef0, np.log(sigma0)]
+
+        ll, grad, hess = _regression_derivatives(theta, Zs, y, d, w, family)
+        lam, converged, iterations = 1e-3, False, 0
+        eye = np.eye(p + 1)
+        for _ in range(max_iter):
+            iterations += 1
+            info = -hess
+            system = info + (lam * np.abs(np.diag(info)) + 1e-12) * eye
+            try:
+                step = np.linalg.solve(system, grad)
+            except np.linalg.LinAlgError:
+                step = np.linalg.lstsq(system, grad, rcond=None)[0]
+            candidate = theta + step
+            ll_new, grad_new, hess_new = _regression_derivatives(candidate, Zs, y, d, w, family)
+            if np.isfinite(ll_new) and ll_new >= ll - 1e-12 * abs(ll):
+                small_change = abs(ll_new - ll) <= tol * (1 + abs(ll))
+                theta, ll, grad, hess = candidate, ll_new, grad_new, hess_new
+                lam = max(lam / 10, 1e-12)
+                if small_change or np.abs(step).max() < tol:
+                    converged = True
+                    break
+            else:
+                lam = min(lam * 10, 1e12)
+
+        try:
+            cov_s = np.linalg.inv(-hess)
+        except np.linalg.LinAlgError:
+            cov_s = np.linalg.pinv(-hess)
+
+        # 轉回原尺度：θ_j = θ'_j / sd_j，θ_0 = θ'_0 − Σ θ'_j · mean_j / sd_j
+        J = np.zeros((p + 1, p + 1))
+        J[0, :p] = -mean / sd
+        J[0, 0] = 1.0
+        J[np.arange(1, p), np.arange(1, p)] = 1.0 / sd[1:]
+        J[p, p] = 1.0
+        theta_orig = J @ theta
+        cov = J @ cov_s @ J.T
+
+    return {"coef": theta_orig[:p], "sigma": float(np.exp(theta[p])), "cov": cov,
+            "log_likelihood": float(ll), "converged": converged, "iterations": iterations}
+
+
+def _finite_or_none(value, decimals=6):
+    value = float(value)
+    return round(value, decimals) if np.isfinite(value) else None
+
+
+def _significant(value, digits=8):
+    """以有效位數四捨五入 (A 可能極小或極大)"""
+    value = float(value)
+    return float(f"{value:.{digits}g}") if np.isfinite(value) else None
+
+
+def _wald(log_value, log_se, z):
+    """對數尺度 Wald 區間，回傳原尺度 (估計值, 下限, 上限)"""
+    return tuple(_significant(np.exp(log_value + k * z * log_se)) for k in (0, -1, 1))
+
+
+def fit_life_stress(cells, model='arrhenius', distribution='weibull', stress_type='voltage',
+                    interaction=True, conf_level=DEFAULT_CONF_LEVEL, use=None, alt=None,
+                    bx_percent=1, t_mission=17520):
+    """
+    以最大概似法聯合擬合壽命分佈與壽命-應力模型
+
+    Args:
+        cells: 試驗組列表 (格式見 _parse_cells)
+        model: 'arrhenius' | 'peck' | 'ipl' | 'eyring'
+        distribution: 'weibull' | 'lognormal'
+        stress_type: eyring 模型代回 AF 時的應力類型 ('voltage' 或 'humidity')
+        interaction: eyring 模型是否估計交互作用項 D (False 時 D 固定為 0)
+        conf_level: Wald 信賴區間的信賴水準
+        use: 選填，使用條件 (與 cell 相同的應力欄位)；提供時回傳使用條件下的壽命與區間
+        alt: 選填，測試條件；與 use 同時提供時回傳 AF 與 delta method 區間
+
+    Returns:
+        dict: 各參數估計值、標準誤與區間、形狀參數、共變異矩陣、log_likelihood、AIC / BIC、
+              各試驗組的擬合尺度、af_params (可直接傳入 calculate_af) 或 {'error': ...}
+    """
+    if model not in LIFE_STRESS_MODELS:
+        return {"error": f"不支援的壽命-應力模型: {model}"}
+    if distribution not in DISTRIBUTIONS:
+        return {"error": f"不支援的壽命分佈: {distribution}"}
+    if model == 'eyring' and stress_type not in STRESS_TYPES:
+        return {"error": f"不支援的應力類型: {stress_type}"}
+    try:
+        conf_level = float(conf_level)
+        bx_percent = float(bx_percent)
+    except (TypeError, ValueError):
+        return {"error": "信賴水準或 Bx 百分比格式錯誤"}
+    if not 0 < conf_level < 1:
+        return {"error": "信賴水準需介於 0 與 1 之間"}
+    if not 0 < bx_percent < 100:
+        return {"error": "Bx 百分比需介於 0 與 100 之間"}
+
+    label, row_of, names = LIFE_STRESS_MODELS[model]
+    if model == 'eyring' and not interaction:
+        names = names[:3]
+    p = len(names)
+    try:
+        obs = _parse_cells(cells, model, p)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    family = DISTRIBUTIONS[distribution][1]
+    fit = fit_life_stress_regression(obs["Z"], obs["y"], obs["d"], obs["w"], family)
+    coef, cov, sigma = fit["coef"], fit["cov"], fit["sigma"]
+    if not (fit["converged"] and np.all(np.isfinite(coef)) and np.isfinite(sigma)):
+        return {"error": "最大概似估計未收斂"}
+
+    z = stats.norm.ppf(0.5 + conf_level / 2)
+    se = np.sqrt(np.diag(cov))
+    params = {}
+    for name, value, err in zip(names, coef, se):
+        params[name] = {"value": _finite_or_none(value), "se": _finite_or_none(err),
+                        "lower": _finite_or_none(value - z * err),
+                        "upper": _finite_or_none(value + z * err)}
+    values = {name: _significant(value) for name, value in zip(names, coef)}
+    if model == 'eyring' and not interaction:
+        params['d'] = {"value": 0.0, "se": 0.0, "lower": 0.0, "upper": 0.0}
+        values['d'] = 0.0
+
+    # 時間尺度的對數概似 (加上失效點的 Jacobian −ln t)，供 Weibull / Lognormal 比較
+    w, d = obs["w"], obs["d"]
+    log_likelihood = fit["log_likelihood"] - (w * d * obs["y"]).sum()
+    n_obs, k = w.sum(), p + 1
+    log_sigma_se = se[p]
+    if distribution == 'weibull':
+        # β = 1/σ：ln β 的標準誤與 ln σ 相同
+        shape = {"beta": _wald(-np.log(sigma), log_sigma_se, z)}
+    else:
+        shape = {"sigma": _wald(np.log(sigma), log_sigma_se, z)}
+    (shape_name, (shape_value, shape_lower, shape_upper)), = shape.items()
+
+    scale_name = 'eta' if distribution == 'weibull' else 'median'
+    cell_mu = obs["rows"] @ coef
+    cell_summary = []
+    for i, mu in enumerate(cell_mu):
+        mask = obs["cell"] == i
+        cell_summary.append({
+            "index": i,
+            "n_failures": int((w * d)[mask].sum()),
+            "n_suspensions": int((w * ~d)[mask].sum()),
+            scale_name: _significant(np.exp(mu)),
+        })
+
+    result = {
+        "model": model,
+        "model_label": label,
+        "distribution": distribution,
+        "distribution_label": DISTRIBUTIONS[distribution][0],
+        "conf_level": conf_level,
+        "params": params,
+        "a": _significant(np.exp(coef[0])),
+        shape_name: shape_value,
+        f"{shape_name}_lower": shape_lower,
+        f"{shape_name}_upper": shape_upper,
+        "cov_names": list(names) + ['ln_sigma'],
+        "cov": [[_significant(v) for v in row] for row in cov],
+        "log_likelihood": _finite_or_none(log_likelihood),
+        "aic": _finite_or_none(2 * k - 2 * log_likelihood),
+        "bic": _finite_or_none(k * np.log(n_obs) - 2 * log_likelihood),
+        "converged": fit["converged"],
+        "iterations": fit["iterations"],
+        "n_cells": len(cells),
+        "n_failures": int((w * d).sum()),
+        "n_suspensions": int((w * ~d).sum()),
+        "cells": cell_summary,
+        "af_params": _af_params(model, values, stress_type),
+    }
+
+    if use is not None:
+        try:
+            z_use = np.asarray(row_of(use)[:p], dtype=float)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"error": f"使用條件: {e}" if str(e) else "使用條件格式錯誤"}
+        try:
+            z_alt = np.asarray(row_of(alt)[:p], dtype=float) if alt is not None else None
+        except (KeyError, TypeError, ValueError) as e:
+            return {"error": f"測試條件: {e}" if str(e) else "測試條件格式錯誤"}
+
+        # 使用條件的位置參數與 Bx 壽命 ln t_p = μ + σ·q_p (delta method)
+        mu_use = float(z_use @ coef)
+        q = bx_percent / 100
+        q_p = np.log(-np.log1p(-q)) if family == 'sev' else stats.norm.ppf(q)
+        grad_bx = np.r_[z_use, sigma * q_p]
+        scale, scale_lower, scale_upper = _wald(mu_use, np.sqrt(z_use @ cov[:p, :p] @ z_use), z)
+        bx, bx_lower, bx_upper = _wald(mu_use + sigma * q_p, np.sqrt(grad_bx @ cov @ grad_bx), z)
+        _, (log_s, _, _) = _standard_terms(np.array([(np.log(t_mission) - mu_use) / sigma]), family)
+        result["use"] = {
+            scale_name: scale, f"{scale_name}_lower": scale_lower, f"{scale_name}_upper": scale_upper,
+            "bx_life": bx, "bx_life_lower": bx_lower, "bx_life_upper": bx_upper,
+            "bx_percent": bx_percent,
+            "t_mission": t_mission,
+            "r_mission": _finite_or_none(np.exp(log_s[0])),
+        }
+
+        if z_alt is not None:
+            grad = z_use - z_alt
+            log_af = float(grad @ coef)
+            af, af_lower, af_upper = _wald(log_af, np.sqrt(grad @ cov[:p, :p] @ grad), z)
+            result["af"] = {"af": af, "lower": af_lower, "upper": af_upper,
+                            "log10_af": _finite_or_none(log_af / np.log(10))}
+    return result
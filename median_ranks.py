@@ -0,0 +1,97 @@
+"""
+中位秩計算引擎
+以向量化陣列運算計算 Weibull 機率圖的累積失效機率 F：
+  - benard:  (i - 0.3) / (n + 0.4)
+  - exact:   Beta(i, n - i + 1) 的中位數
+  - mean:    i / (n + 1)
+  - km:      Kaplan-Meier 乘積極限估計 1 - Π (1 - 1/r)
+  - johnson: Johnson 調整秩 + Benard 近似
+有截尾 (suspensions) 時，benard / exact / mean 皆以 Johnson 調整後的秩次 i 計算；
+無截尾時的秩表依 (n, method) 快取 (LRU，有上限)
+"""
+
+from functools import lru_cache
+import numpy as np
+from scipy import special
+
+RANK_METHODS = ('benard', 'exact', 'mean', 'km', 'johnson')
+RANK_CACHE_SIZE = 64             # 快取的 (n, method) 秩表數量上限
+EXACT_SWITCH = 2000              # min(a, b) 以上改用 Kerman 近似 (絕對誤差 < 1e-9，相對誤差 < 5e-9)
+
+
+def beta_median(a, b):
+    """
+    Beta(a, b) 分佈的中位數 (向量化，a、b ≥ 1，可為非整數的調整秩)
+
+    min(a, b) 較小時以 Beta 反函數精確求解；其餘使用 Kerman (2011) 近似
+    (a - 1/3) / (a + b - 2/3)，相對誤差約 0.02 / min(a, b)²；
+    於切換點 min(a, b) = 2000 實測 (b/a 由 1e-3 至 1e3) 最大絕對誤差 9.2e-10、相對誤差 4.9e-9
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    median = (a - 1 / 3) / (a + b - 2 / 3)
+    small = np.minimum(a, b) < EXACT_SWITCH
+    if small.any():
+        median = median.copy()
+        median[small] = special.betaincinv(a[small], b[small], 0.5)
+    return median
+
+
+def ranks_from_order(order, n, method):
+    """由 (可能為非整數的) 秩次計算 F"""
+    if method == 'exact':
+        return beta_median(order, n - order + 1)
+    if method == 'mean':
+        return order / (n + 1)
+    # benard 與 johnson 皆使用 Benard 近似
+    return (order - 0.3) / (n + 0.4)
+
+
+@lru_cache(maxsize=RANK_CACHE_SIZE)
+def rank_table(n, method):
+    """
+    無截尾時秩次 1..n 的 F 值表 (唯讀陣列，依 (n, method) 快取)
+    """
+    if method == 'km':
+        table = np.arange(1, n + 1) / n
+    else:
+        table = ranks_from_order(np.arange(1, n + 1, dtype=float), n, method)
+    table.setflags(write=False)
+    return table
+
+
+def median_ranks(failures, suspensions=None, method='benard', n_total=None):
+    """
+    計算失效點的累積失效機率 F
+
+    Args:
+        failures: 失效時間
+        suspensions: 截尾時間 (未失效即移出試驗的樣品)
+        method: RANK_METHODS 之一 (未知方法視為 benard)
+        n_total: 樣品總數；大於失效數 + 截尾數時，其餘樣品視為在所有觀測之後仍未失效
+
+    Returns:
+        (t, F): 依時間排序的失效時間與對應 F (皆為 numpy 陣列)
+    """
+    failures = np.sort(np.asarray(failures, dtype=float))
+    suspensions = np.asarray(suspensions if suspensions is not None else [], dtype=float)
+    n_observed = failures.size + suspensions.size
+    n = n_observed if n_total is None else max(int(n_total), n_observed)
+    if method not in RANK_METHODS:
+        method = 'benard'
+
+    if suspensions.size == 0:
+        return failures, rank_table(n, method)[:failures.size].copy()
+
+    # 失效與截尾合併排序 (同時間時失效排在截尾之前)，r 為反向秩
+    times = np.concatenate([failures, suspensions])
+    is_failure = np.r_[np.ones(failures.size, dtype=bool), np.zeros(suspensions.size, dtype=bool)]
+    order = np.lexsort((~is_failure, times))
+    reverse_rank = (n - np.arange(n_observed))[is_failure[order]].astype(float)
+
+    if method == 'km':
+        return failures, 1 - np.cumprod((reverse_rank - 1) / reverse_rank)
+
+    # Johnson 調整秩: O_k = O_{k-1} + (n + 1 - O_{k-1}) / (r_k + 1)
+    # 等價於 n + 1 - O_k = (n + 1) · Π r_j / (r_j + 1)，可用累積乘積一次求得
+    adjusted = (n + 1) * (1 - np.cumprod(reverse_rank / (reverse_rank + 1)))
+    return failures, ranks_from_order(adjusted, n, method)
@@ -0,0 +1,223 @@
+"""
+加速測試條件規劃 (反向 AF 求解)
+給定目標 AF，或目標 MTTF 與測試時數預算，找出可達成目標的試驗箱條件；
+條件受試驗箱上下限、失效機制有效上限與模型有效範圍約束，
+以向量化求根 (Illinois 法) 一次求解所有候選組合並依應力嚴苛度排序
+"""
+
+import numpy as np
+from scipy import stats
+from af_engine import AF_DEFAULTS, calculate_af_batch
+from af_models import PARAM_SPECS
+
+MAX_CANDIDATES = 200000          # 候選組合上限 (次要變數網格點數)
+DEFAULT_GRID_POINTS = 11
+DEFAULT_TOP_K = 20
+ROOT_TOL = 1e-10                 # log10 AF 的求根容許誤差
+
+
+def required_af_for_mttf(target_mttf, n_samples, test_hours, cl=0.6):
+    """
+    零失效試驗達成目標 MTTF 所需的 AF (與 calculate_reliability_results 的零失效公式相同)
+    MTTF_use_lower = 2·n·t_test / χ²(CL, 2) × AF  ⇒  AF = MTTF · χ² / (2·n·t_test)
+    """
+    chi_sq = stats.chi2.ppf(cl, 2)
+    return target_mttf * chi_sq / (2 * n_samples * test_hours), chi_sq
+
+
+def _bounds(name, spec, ceilings):
+    """試驗箱上下限 ∩ 失效機制上限 ∩ 模型有效範圍"""
+    lo, hi = float(spec['min']), float(spec['max'])
+    if name in ceilings:
+        hi = min(hi, float(ceilings[name]))
+    if name in PARAM_SPECS:
+        valid_lo, valid_hi = PARAM_SPECS[name].valid
+        lo, hi = max(lo, valid_lo), min(hi, valid_hi)
+    if not lo < hi:
+        raise ValueError(f"參數 {name} 的可用範圍為空 ({lo:g} ~ {hi:g})")
+    return lo, hi
+
+
+def _solve_increasing(func, lo, hi, f_lo, f_hi, target, tol=ROOT_TOL, max_iter=60):
+    """
+    向量化 Illinois 法求解 func(x) = target (每列各自的區間 [lo, hi] 已包夾根)
+
+    Returns:
+        x: 根 (未收斂的列為最後的近似值)
+    """
+    a, b = lo.copy(), hi.copy()
+    fa, fb = f_lo - target, f_hi - target
+    x = np.where(np.abs(fa) < np.abs(fb), a, b)
+    side = np.zeros(a.shape, dtype=int)
+    active = np.ones(a.shape, dtype=bool)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        with np.errstate(all='ignore'):
+            c = (a * fb - b * fa) / (fb - fa)
+        # 割線點異常時退回二分法
+        bad = ~np.isfinite(c) | (c <= np.minimum(a, b)) | (c >= np.maximum(a, b))
+        c = np.where(bad, 0.5 * (a + b), c)
+        fc = func(c, active) - target
+
+        x = np.where(active, c, x)
+        done = active & ((np.abs(fc) <= tol) | (np.abs(b - a) <= tol * (1 + np.abs(c))))
+        same_as_b = fc * fb > 0
+        same_as_a = ~same_as_b & (fc * fa > 0)
+
+        upd_b = active & same_as_b
+        fa = np.where(upd_b & (side == -1), fa / 2, fa)
+        b, fb = np.where(upd_b, c, b), np.where(upd_b, fc, fb)
+
+        upd_a = active & same_as_a
+        fb = np.where(upd_a & (side == 1), fb / 2, fb)
+        a, fa = np.where(upd_a, c, a), np.where(upd_a, fc, fa)
+
+        side = np.where(upd_b, -1, np.where(upd_a, 1, side))
+        active &= ~done & np.isfinite(fc)
+    return x
+
+
+def optimize_test_conditions(base_params, variables, target_af=None, target_mttf=None,
+                             n_samples=None, max_test_hours=None, cl=0.6, ceilings=None,
+                             top_k=DEFAULT_TOP_K, solve_for=None):
+    """
+    求解可達成目標的試驗條件
+
+    Args:
+        base_params: 固定 AF 參數 (使用條件、模型參數與啟用標誌，與 calculate_af 相同)
+        variables: {參數名稱: {'min', 'max', 'num'}}，例如 t_alt / rh_alt / v_alt 的試驗箱能力；
+                   solve_for 以外的變數依 num 建立網格
+        target_af: 目標 AF (與 target_mttf 擇一)
+        target_mttf: 目標 MTTF (小時)，搭配 n_samples 與 max_test_hours 換算為所需 AF
+        cl: 零失效試驗的信賴水準
+        ceilings: {參數名稱: 上限}，失效機制維持不變的最高應力 (例如材料 Tg)
+        top_k: 回傳的方案數
+        solve_for: 求根變數 (需為 variables 之一；只有一個變數時可省略)。
+                   不依 variables 的鍵順序決定，JSON 物件的鍵順序不保證保留
+
+    Returns:
+        dict: {'required_af', 'solve_for', 'n_candidates', 'n_feasible', 'plans': [...]}
+              或 {'error': ...}；plans 依應力嚴苛度 (各變數在可用範圍中的相對位置平均) 由低到高排序
+    """
+    try:
+        ceilings = ceilings or {}
+        if not variables:
+            return {"error": "至少需要一個試驗條件變數"}
+        names = list(variables)
+        for name in names:
+            if name not in AF_DEFAULTS:
+                return {"error": f"不支援的試驗條件變數: {name}"}
+        if solve_for is None:
+            if len(names) > 1:
+                return {"error": "多個試驗條件變數時需以 solve_for 指定求根變數"}
+            solve_for = names[0]
+        if solve_for not in variables:
+            return {"error": f"求根變數 {solve_for} 不在試驗條件變數中"}
+        names = [solve_for] + [name for name in names if name != solve_for]
+
+        chi_sq = None
+        if target_mttf is not None:
+            if n_samples is None or max_test_hours is None:
+                return {"error": "以目標 MTTF 規劃時需提供 n_samples 與 max_test_hours"}
+            target_mttf = float(target_mttf)
+            n_samples, max_test_hours = int(n_samples), float(max_test_hours)
+            if n_samples <= 0 or max_test_hours <= 0 or target_mttf <= 0:
+                return {"error": "目標 MTTF、樣品數與測試時數需為正數"}
+            target_af, chi_sq = required_af_for_mttf(target_mttf, n_samples,
+                                                     max_test_hours, cl)
+        elif target_af is None:
+            return {"error": "需提供 target_af 或 target_mttf"}
+        target_af = float(target_af)
+        if target_af <= 0:
+            return {"error": "目標 AF 需為正數"}
+
+        bounds = {name: _bounds(name, variables[name], ceilings) for name in names}
+
+        # 次要變數的網格 (笛卡兒積)，每個組合求解主要變數
+        grids = [np.linspace(*bounds[name], int(variables[name].get('num', DEFAULT_GRID_POINTS)))
+                 for name in names[1:]]
+        n = int(np.prod([g.size for g in grids])) if grids else 1
+        if n > MAX_CANDIDATES:
+            return {"error": f"候選組合數 {n} 超過上限 {MAX_CANDIDATES}"}
+        mesh = np.meshgrid(*grids, indexing='ij') if grids else []
+        columns = dict(base_params or {})
+        for name, values in zip(names[1:], mesh):
+            columns[name] = values.ravel()
+    except (TypeError, ValueError, KeyError) as e:
+        return {"error": str(e) or "參數格式錯誤"}
+
+    lo = np.full(n, bounds[solve_for][0])
+    hi = np.full(n, bounds[solve_for][1])
+    target = np.log10(target_af)
+
+    def log10_af(x, rows=None):
+        rows = np.ones(n, dtype=bool) if rows is None else rows
+        cols = {k: (v[rows] if isinstance(v, np.ndarray) and v.shape == (n,) else v)
+                for k, v in columns.items()}
+        cols[solve_for] = x[rows]
+        batch = calculate_af_batch(cols)
+        if "error" in batch:
+            raise ValueError(batch["error"])
+        out = np.full(n, np.nan)
+        out[rows] = np.where(batch["valid"], batch["log10_af_total"], np.nan)
+        return out
+
+    try:
+        f_lo, f_hi = log10_af(lo), log10_af(hi)
+    except ValueError as e:
+        return {"error": str(e)}
+    if np.all(~(f_hi > f_lo)):
+        return {"error": f"提高 {solve_for} 不會增加 AF，請以 solve_for 指定加速應力變數"}
+
+    # 下限已達標時取下限 (應力最低)，上限仍不足者不可行
+    at_lower = f_lo >= target
+    bracket = ~at_lower & (f_hi >= target) & (f_hi > f_lo)
+    x = np.where(at_lower, lo, np.nan)
+    if bracket.any():
+        root = _solve_increasing(log10_af, lo, hi, f_lo, f_hi, target)
+        x = np.where(bracket, root, x)
+
+    feasible = np.isfinite(x)
+    cols = {k: (v[feasible] if isinstance(v, np.ndarray) and v.shape == (n,) else v)
+            for k, v in columns.items()}
+    cols[solve_for] = x[feasible]
+    batch = calculate_af_batch(cols)
+    if "error" in batch:
+        return {"error": batch["error"]}
+
+    ok = batch["valid"] & batch["in_range"] & (batch["log10_af_total"] >= target - 1e-9)
+    idx = np.flatnonzero(feasible)[ok]
+    values = {name: (x if name == solve_for else columns[name])[idx] for name in names}
+    severity = np.mean([(values[name] - bounds[name][0]) / (bounds[name][1] - bounds[name][0])
+                        for name in names], axis=0)
+    af_total = batch["af_total"][ok]
+    log10_af_total = batch["log10_af_total"][ok]
+
+    order = np.lexsort((values[solve_for], severity))[:int(top_k)]
+    plans = []
+    for j in order:
+        plan = {name: round(float(values[name][j]), 4) for name in names}
+        plan.update({
+            "af_total": round(float(af_total[j]), 4) if np.isfinite(af_total[j]) else None,
+            "log10_af_total": round(float(log10_af_total[j]), 6),
+            "severity": round(float(severity[j]), 4),
+        })
+        if chi_sq is not None:
+            # 此條件下證明目標 MTTF 所需的測試時數 (不超過預算)
+            plan["test_hours"] = round(float(target_mttf * chi_sq /
+                                             (2 * n_samples * 10 ** log10_af_total[j])), 2)
+        plans.append(plan)
+
+    result = {
+        "required_af": round(target_af, 4),
+        "solve_for": solve_for,
+        "bounds": {name: list(b) for name, b in bounds.items()},
+        "n_candidates": n,
+        "n_feasible": int(idx.size),
+        "plans": plans,
+    }
+    if chi_sq is not None:
+        result["chi_sq"] = float(chi_sq)
+    return result
@@ -20,6 +20,7 @@ import os
 import platform
 import glob
 from PIL import Image as PILImage
+from af_models import iter_models
 
 # 導入圖表生成模組
 try:
@@ -333,86 +334,9 @@ def generate_reliability_report(data, output_file):
         ['Parameter / 參數', 'Use Condition / 使用條件', 'Test Condition / 測試條件', 'Model / 模型']
     ]
 
-    # 溫度
-    if af_params.get('enable_temp', True):
-        af_data.append([
-            'Temperature / 溫度',
-            f"{af_params.get('t_use', '')}°C",
-            f"{af_params.get('t_alt', '')}°C",
-            f"Arrhenius (Ea={af_params.get('ea', '')} eV)"
-        ])
-
-    # 濕度
-    if af_params.get('enable_hum', True):
-        af_data.append([
-            'Humidity / 濕度',
-            f"{af_params.get('rh_use', '')}%",
-            f"{af_params.get('rh_alt', '')}%",
-            f"Peck (n={af_params.get('n_hum', '')})"
-        ])
-
-    # 電壓
-    if af_params.get('enable_voltage', False):
-        af_data.append([
-            'Voltage / 電壓',
-            f"{af_params.get('v_use', '')}V",
-            f"{af_params.get('v_alt', '')}V",
-            f"IPL (β={af_params.get('beta_v', '')})"
-        ])
-
-    # 熱循環
-    if af_params.get('enable_tc', False):
-        af_data.append([
-            'Thermal Cycling / 熱循環',
-            f"ΔT={af_params.get('dt_use', '')}°C, f={af_params.get('f_use', '')}/hr",
-            f"ΔT={af_params.get('dt_alt', '')}°C, f={af_params.get('f_alt', '')}/hr",
-            f"Coffin-Manson (α={af_params.get('alpha_tc', '')}, β={af_params.get('beta_tc', '')})"
-        ])
-
-    # 機械振動
-    if af_params.get('enable_vib', False):
-        af_data.append([
-            'Vibration / 機械振動',
-            f"{af_params.get('g_use', '')}G",
-            f"{af_params.get('g_alt', '')}G",
-            f"IPL (n={af_params.get('n_vib', '')})"
-        ])
-
-    # UV
-    if af_params.get('enable_uv', False):
-        af_data.append([
-            'UV Radiation / 紫外線',
-            f"{af_params.get('t_field_uv', '')} hrs",
-            f"{af_params.get('t_accel_uv', '')} hrs",
-            "Experimental Comparison"
-        ])
-
-    # 化學
-    if af_params.get('enable_chem', False):
-        af_data.append([
-            'Chemical / 化學濃度',
-            f"C={af_params.get('c_use', '')}",
-            f"C={af_params.get('c_alt', '')}",
-            f"IPL (n={af_params.get('n_chem', '')})"
-        ])
-
-    # 輻射
-    if af_params.get('enable_rad', False):
-        af_data.append([
-            'Radiation / 輻射劑量',
-            f"D={af_params.get('d_use', '')} krad",
-            f"D={af_params.get('d_alt', '')} krad",
-            f"TID (n={af_params.get('n_rad', '')})"
-        ])
-
-    # Eyring
-    if af_params.get('enable_eyring', False):
-        af_data.append([
-            'Eyring Model / 應力交互',
-            '-',
-            '-',
-            f"Type={af_params.get('eyring_stress_type', '')}, D={af_params.get('eyring_d', '')}"
-        ])
+    # 各啟用模型的參數列 (由 af_models 註冊表提供)
+    for model in iter_models(af_params):
+        af_data.append(model.report_row(af_params))
 
     af_table = Table(af_data, colWidths=[1.5*inch, 1.8*inch, 1.8*inch, 2.4*inch])
     af_table.setStyle(TableStyle([
@@ -444,24 +368,12 @@ def generate_reliability_report(data, output_file):
         ['Factor / 因子', 'Value / 數值']
     ]
 
-    if af_params.get('enable_temp', True):
-        af_result_data.append(['AF (Temperature) / 溫度', format_af_value(af_result.get('af_t'))])
-    if af_params.get('enable_hum', True):
-        af_result_data.append(['AF (Humidity) / 濕度', format_af_value(af_result.get('af_rh'))])
-    if af_params.get('enable_voltage', False):
-        af_result_data.append(['AF (Voltage) / 電壓', format_af_value(af_result.get('af_v'))])
-    if af_params.get('enable_tc', False):
-        af_result_data.append(['AF (Thermal Cycling) / 熱循環', format_af_value(af_result.get('af_tc'))])
-    if af_params.get('enable_vib', False):
-        af_result_data.append(['AF (Vibration) / 振動', format_af_value(af_result.get('af_vib'))])
-    if af_params.get('enable_uv', False):
-        af_result_data.append(['AF (UV) / 紫外線', format_af_value(af_result.get('af_uv'))])
-    if af_params.get('enable_chem', False):
-        af_result_data.append(['AF (Chemical) / 化學', format_af_value(af_result.get('af_chem'))])
-    if af_params.get('enable_rad', False):
-        af_result_data.append(['AF (Radiation) / 輻射', format_af_value(af_result.get('af_rad'))])
-    if af_params.get('enable_eyring', False) and af_result.get('af_eyring_correction'):
-        af_result_data.append(['Eyring Correction / Eyring 修正因子', format_af_value(af_result.get('af_eyring_correction'))])
+    for model in iter_models(af_params):
+        value = af_result.get(model.output)
+        # 修正因子僅在實際套用時列出
+        if model.is_correction and not value:
+            continue
+        af_result_data.append([model.result_label, format_af_value(value)])
 
     af_result_data.append(['', ''])  # 空行
     af_result_data.append(['AF Total / 總加速因子', format_af_value(af_result.get('af_total'))])
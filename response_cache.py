@@ -0,0 +1,236 @@
+"""
+計算結果快取 (內容定址)
+以請求參數的正規化雜湊 (排序鍵) 為鍵，快取 /calculate 的回應內容；
+支援 LRU / TTL 淘汰、多行程共用的 SQLite 磁碟後端，以及命中率與查詢延遲統計
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 3600               # 秒；0 或 None 表示不過期
+CACHE_VERSION = '2'              # 快取格式或語意改變時遞增，使舊快取失效
+
+
+def _source_digest(directory=os.path.dirname(os.path.abspath(__file__))):
+    """
+    計算程式碼版本：本目錄下非測試 .py 檔內容的雜湊 (依檔名排序)
+    部署新的計算邏輯後快取鍵自動改變，不需手動遞增 CACHE_VERSION；
+    各 worker 讀取同一份檔案，鍵仍可在 SQLite 後端共用
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py') and not name.startswith('test_'):
+            digest.update(name.encode('utf-8'))
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _source_digest()
+
+
+def canonical_key(payload, namespace=''):
+    """
+    計算請求內容的正規化雜湊 (SHA-256)
+    只排序字典鍵，數值與字串保持原樣：計算對 "0" 與 0、" voltage" 與 "voltage" 等
+    值的解讀不一定相同，不可視為同一請求
+
+    Args:
+        payload: 參與計算的請求欄位 (dict)
+        namespace: 額外區分的命名空間 (例如已註冊的模型組合)
+    """
+    text = json.dumps(payload, sort_keys=True, separators=(',', ':'),
+                      ensure_ascii=False)
+    digest = hashlib.sha256(f"{CACHE_VERSION}|{CODE_VERSION}|{namespace}|{text}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class MemoryBackend:
+    """單一行程內的 LRU + TTL 快取"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = int(max_entries)
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires and expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """
+    SQLite 磁碟快取 (WAL 模式)，供 gunicorn 多個 worker 共用
+    以 accessed 欄位實作 LRU，寫入時淘汰超出上限的最舊項目
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_entries = int(max_entries)
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS response_cache ("
+                         "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                         "expires REAL, accessed REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed "
+                         "ON response_cache (accessed)")
+
+    def _connect(self):
+        # sqlite3 連線不可跨執行緒共用，每個執行緒各自開啟一次
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute("SELECT value, expires FROM response_cache WHERE key = ?",
+                           (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        with conn:
+            if expires and expires < now:
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE response_cache SET accessed = ? WHERE key = ?", (now, key))
+        return bytes(value)
+
+    def set(self, key, value):
+        conn = self._connect()
+        now = time.time()
+        expires = now + self.ttl if self.ttl else None
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO response_cache (key, value, expires, accessed) "
+                         "VALUES (?, ?, ?, ?)", (key, sqlite3.Binary(value), expires, now))
+            conn.execute("DELETE FROM response_cache WHERE key IN ("
+                         "SELECT key FROM response_cache ORDER BY accessed DESC "
+                         "LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """快取前端：包裝後端並記錄命中率與查詢延遲"""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get(self, key):
+        if self.backend is None:
+            return None
+        start = time.perf_counter()
+        value = self.backend.get(key)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._lookups += 1
+            self._hits += value is not None
+            self._lookup_time += elapsed
+            self._max_lookup_time = max(self._max_lookup_time, elapsed)
+        return value
+
+    def set(self, key, value):
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self._lookups = 0
+            self._hits = 0
+            self._not_modified = 0
+            self._lookup_time = 0.0
+            self._max_lookup_time = 0.0
+
+    def record_not_modified(self):
+        """記錄以 If-None-Match 直接回傳 304 的請求"""
+        with self._lock:
+            self._not_modified += 1
+
+    def stats(self):
+        """命中率與查詢延遲統計 (此 worker 行程)"""
+        with self._lock:
+            lookups = self._lookups
+            return {
+                "backend": type(self.backend).__name__ if self.backend else None,
+                "entries": len(self.backend) if self.backend is not None else 0,
+                "lookups": lookups,
+                "hits": self._hits,
+                "misses": lookups - self._hits,
+                "hit_ratio": self._hits / lookups if lookups else None,
+                "not_modified": self._not_modified,
+                "mean_lookup_ms": self._lookup_time / lookups * 1000 if lookups else None,
+                "max_lookup_ms": self._max_lookup_time * 1000,
+                "pid": os.getpid(),
+            }
+
+
+def cache_from_env(environ=None):
+    """
+    依環境變數建立快取
+
+    RELIABILITY_CACHE: 'memory' (預設) | 'sqlite' | 'off'
+    RELIABILITY_CACHE_PATH: SQLite 檔案路徑 (預設 reliability_cache.sqlite3)
+    RELIABILITY_CACHE_SIZE: 最大項目數
+    RELIABILITY_CACHE_TTL: 存活秒數 (0 表示不過期)
+    """
+    environ = os.environ if environ is None else environ
+    kind = environ.get('RELIABILITY_CACHE', 'memory').lower()
+    max_entries = int(environ.get('RELIABILITY_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+    ttl = float(environ.get('RELIABILITY_CACHE_TTL', DEFAULT_TTL))
+
+    if kind in ('off', 'none', '0'):
+        return ResponseCache(None)
+    if kind == 'sqlite':
+        path = environ.get('RELIABILITY_CACHE_PATH', 'reliability_cache.sqlite3')
+        return ResponseCache(SQLiteBackend(path, max_entries, ttl))
+    return ResponseCache(MemoryBackend(max_entries, ttl))
@@ -0,0 +1,213 @@
+"""
+Sobol 全域敏感度分析
+以 Saltelli 抽樣計算 af_total 與 r_mission 對各啟用參數的一階與總效應指數
+"""
+
+import numpy as np
+from scipy.stats import qmc
+from af_engine import AF_DEFAULTS, calculate_af_batch, enabled_parameters
+from uncertainty import (WEIBULL_PARAMS, distribution_ppf, validate_distributions,
+                         weibull_metrics)
+from parallel import run_blocks
+
+DEFAULT_SPREAD = 0.1             # 未指定分佈時，以基準值 ±10% 均勻分佈
+EVAL_BLOCK_SIZE = 200000         # 每個模型評估區塊的列數
+MAX_BASE_SAMPLES = 2 ** 20
+MAX_RESAMPLES = 1000             # 指數信賴區間的 bootstrap 次數上限 (同步請求)
+
+
+def default_distributions(af_params, weibull_params=None, spread=DEFAULT_SPREAD):
+    """為所有啟用參數建立預設的均勻分佈 (基準值 ±spread)"""
+    base = dict(AF_DEFAULTS)
+    base.update({k: v for k, v in (af_params or {}).items() if k in AF_DEFAULTS})
+
+    names = enabled_parameters(af_params or {})
+    if weibull_params:
+        names += list(WEIBULL_PARAMS)
+        base.update({k: weibull_params[k] for k in WEIBULL_PARAMS})
+
+    distributions = {}
+    for name in names:
+        value = float(base[name])
+        if value == 0:
+            continue
+        delta = abs(value) * spread
+        distributions[name] = {'dist': 'uniform', 'low': value - delta, 'high': value + delta}
+    return distributions
+
+
+def _evaluate_block(task):
+    """評估一個參數矩陣區塊 (模組層級函式，供行程池使用)"""
+    config, names, X = task
+
+    columns = dict(config["af_params"])
+    columns.update({name: X[:, j] for j, name in enumerate(names) if name not in WEIBULL_PARAMS})
+    batch = calculate_af_batch(columns)
+    if "error" in batch:
+        raise ValueError(batch["error"])
+
+    af_total = np.where(batch["valid"], batch["af_total"], np.nan)
+    with np.errstate(all='ignore'):
+        outputs = {"af_total": af_total, "log10_af_total": np.log10(af_total)}
+
+    weibull = config["weibull_params"]
+    if weibull:
+        values = {name: X[:, j] for j, name in enumerate(names)}
+        beta = values.get('beta', weibull['beta'])
+        eta_alt = values.get('eta_alt', weibull['eta_alt'])
+        outputs["r_mission"] = weibull_metrics(af_total, beta, eta_alt, config["t_mission"],
+                                               gamma=weibull.get('gamma', 0.0))["r_mission"]
+    return outputs
+
+
+def sobol_indices(f_a, f_b, f_ab):
+    """
+    由 Saltelli 矩陣的模型輸出計算 Sobol 指數
+
+    Args:
+        f_a, f_b: 矩陣 A、B 的輸出 (長度 N)
+        f_ab: A_B^(i) 矩陣的輸出 (形狀 d × N)
+
+    Returns:
+        (S1, ST, variance): 一階指數 (Saltelli 2010) 與總效應指數 (Jansen 1999)
+    """
+    variance = np.var(np.concatenate([f_a, f_b]))
+    if variance <= 0:
+        zeros = np.zeros(f_ab.shape[0])
+        return zeros, zeros, 0.0
+    s1 = np.mean(f_b * (f_ab - f_a), axis=-1) / variance
+    st = 0.5 * np.mean((f_a - f_ab) ** 2, axis=-1) / variance
+    return s1, st, float(variance)
+
+
+def parse_resamples(value):
+    """
+    解析 bootstrap 次數 (0 至 MAX_RESAMPLES 的整數)
+
+    Raises:
+        ValueError: 不是整數或超出範圍
+    """
+    if isinstance(value, bool):
+        raise ValueError("n_resamples 需為整數")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("n_resamples 需為整數")
+    if not np.isfinite(number) or number != int(number):
+        raise ValueError("n_resamples 需為整數")
+    if not 0 <= number <= MAX_RESAMPLES:
+        raise ValueError(f"n_resamples 需介於 0 與 {MAX_RESAMPLES} 之間")
+    return int(number)
+
+
+def run_sobol_analysis(af_params, distributions=None, weibull_params=None, t_mission=17520,
+                       n_base=8192, seed=None, n_jobs=1, n_resamples=100, conf_level=0.95):
+    """
+    Sobol 全域敏感度分析
+
+    Args:
+        af_params: 基準 AF 參數 (與 calculate_af 相同格式)
+        distributions: {參數名稱: 分佈規格} (規格同 uncertainty.sample_distribution)；
+                       未提供時對所有啟用參數使用基準值 ±10% 的均勻分佈
+        weibull_params: {'beta', 'eta_alt'} (提供時同時分析 r_mission)
+        n_base: 基礎樣本數 N (進位到 2 的次方)，總評估次數為 N × (d + 2)
+        n_jobs: 模型評估的平行行程數
+        n_resamples: 指數信賴區間的 bootstrap 次數 (0 表示不計算，上限 MAX_RESAMPLES)
+
+    Returns:
+        dict: {'parameters', 'n_base', 'n_evaluations', 'outputs': {...}} 或 {'error': ...}
+    """
+    try:
+        n_resamples = parse_resamples(n_resamples)
+        af_params = af_params or {}
+        if weibull_params:
+            weibull_params = {**{k: float(weibull_params[k]) for k in WEIBULL_PARAMS},
+                              'gamma': float(weibull_params.get('gamma', 0.0))}
+        if not distributions:
+            distributions = default_distributions(af_params, weibull_params)
+
+        allowed = set(AF_DEFAULTS) | (set(WEIBULL_PARAMS) if weibull_params else set())
+        error = validate_distributions(distributions, allowed)
+        if error:
+            return {"error": error}
+
+        names = list(distributions)
+        d = len(names)
+        if d == 0:
+            return {"error": "沒有可分析的參數"}
+
+        m = int(np.ceil(np.log2(max(int(n_base), 2))))
+        n = 2 ** m
+        if n > MAX_BASE_SAMPLES:
+            return {"error": f"基礎樣本數不可超過 {MAX_BASE_SAMPLES}"}
+
+        # Saltelli 抽樣：2d 維 Sobol 序列分成 A、B 兩個矩陣
+        sampler = qmc.Sobol(d=2 * d, scramble=True, seed=seed)
+        u = sampler.random_base2(m)
+        u = np.clip(u, 1e-12, 1 - 1e-12)
+        u_a, u_b = u[:, :d], u[:, d:]
+
+        def transform(unit):
+            return np.column_stack([distribution_ppf(distributions[name], unit[:, j])
+                                    for j, name in enumerate(names)])
+
+        A, B = transform(u_a), transform(u_b)
+        # 堆疊 [A; B; A_B^(1); ...; A_B^(d)]，以批次一次評估
+        stacked = np.empty(((d + 2) * n, d))
+        stacked[:n] = A
+        stacked[n:2 * n] = B
+        for i in range(d):
+            block = A.copy()
+            block[:, i] = B[:, i]
+            stacked[(i + 2) * n:(i + 3) * n] = block
+
+        config = {"af_params": af_params, "weibull_params": weibull_params,
+                  "t_mission": float(t_mission)}
+        tasks = [(config, names, stacked[s:s + EVAL_BLOCK_SIZE])
+                 for s in range(0, stacked.shape[0], EVAL_BLOCK_SIZE)]
+        blocks = run_blocks(_evaluate_block, tasks, n_jobs)
+    except Exception as e:
+        return {"error": str(e)}
+
+    rng = np.random.default_rng(seed)
+    outputs = {}
+    for key in blocks[0]:
+        y = np.concatenate([b[key] for b in blocks])
+        f_a, f_b = y[:n], y[n:2 * n]
+        f_ab = y[2 * n:].reshape(d, n)
+
+        # 任一矩陣輸出無效的樣本列整列排除
+        ok = np.isfinite(f_a) & np.isfinite(f_b) & np.all(np.isfinite(f_ab), axis=0)
+        if ok.sum() < 2:
+            outputs[key] = {"error": "有效樣本不足"}
+            continue
+        f_a, f_b, f_ab = f_a[ok], f_b[ok], f_ab[:, ok]
+
+        s1, st, variance = sobol_indices(f_a, f_b, f_ab)
+        entry = {
+            "variance": variance,
+            "n_valid": int(ok.sum()),
+            "first_order": {name: float(v) for name, v in zip(names, s1)},
+            "total": {name: float(v) for name, v in zip(names, st)},
+        }
+
+        if n_resamples:
+            # 逐次抽取重抽索引，避免配置 n_resamples × N 的索引矩陣
+            draws = (rng.integers(0, f_a.size, size=f_a.size) for _ in range(n_resamples))
+            s1_bs, st_bs, _ = zip(*(sobol_indices(f_a[r], f_b[r], f_ab[:, r]) for r in draws))
+            alpha = (1 - conf_level) / 2 * 100
+            s1_ci = np.percentile(np.array(s1_bs), [alpha, 100 - alpha], axis=0)
+            st_ci = np.percentile(np.array(st_bs), [alpha, 100 - alpha], axis=0)
+            entry["first_order_conf"] = {name: [float(s1_ci[0, j]), float(s1_ci[1, j])]
+                                         for j, name in enumerate(names)}
+            entry["total_conf"] = {name: [float(st_ci[0, j]), float(st_ci[1, j])]
+                                   for j, name in enumerate(names)}
+        outputs[key] = entry
+
+    return {
+        "parameters": names,
+        "distributions": distributions,
+        "n_base": n,
+        "n_evaluations": int(n * (d + 2)),
+        "outputs": outputs
+    }
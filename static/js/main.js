@@ -16,129 +16,52 @@ function handleEaSelectChange() {
     }
 }
 
+// 應力模型註冊表 (由後端 af_models 提供，見 templates/index.html)
+const AF_MODELS = window.AF_MODELS || [];
+
+// 每次都會送出的使用/測試條件欄位
+const BASE_AF_FIELDS = ['t_use', 'rh_use', 't_alt', 'rh_alt', 'ea', 'n_hum'];
+
 // Toggle function for AF sections and result cards
 function toggleAFSection(afType) {
-    if (afType === 'tc') {
-        const tcSection = document.getElementById('tc_section');
-        const tcCard = document.getElementById('af_tc_card');
-        const isEnabled = document.getElementById('enable_tc').checked;
-        tcSection.style.display = isEnabled ? 'block' : 'none';
-        tcCard.style.display = isEnabled ? 'block' : 'none';
-    } else if (afType === 'vib') {
-        const vibSection = document.getElementById('vib_section');
-        const vibCard = document.getElementById('af_vib_card');
-        const isEnabled = document.getElementById('enable_vib').checked;
-        vibSection.style.display = isEnabled ? 'block' : 'none';
-        vibCard.style.display = isEnabled ? 'block' : 'none';
-    } else if (afType === 'voltage') {
-        const voltageSection = document.getElementById('voltage_section');
-        const vCard = document.getElementById('af_v_card');
-        const isEnabled = document.getElementById('enable_voltage').checked;
-        voltageSection.style.display = isEnabled ? 'block' : 'none';
-        vCard.style.display = isEnabled ? 'block' : 'none';
-    } else if (afType === 'uv') {
-        const uvSection = document.getElementById('uv_section');
-        const uvCard = document.getElementById('af_uv_card');
-        const isEnabled = document.getElementById('enable_uv').checked;
-        uvSection.style.display = isEnabled ? 'block' : 'none';
-        uvCard.style.display = isEnabled ? 'block' : 'none';
-    } else if (afType === 'chem') {
-        const chemSection = document.getElementById('chem_section');
-        const chemCard = document.getElementById('af_chem_card');
-        const isEnabled = document.getElementById('enable_chem').checked;
-        chemSection.style.display = isEnabled ? 'block' : 'none';
-        chemCard.style.display = isEnabled ? 'block' : 'none';
-    } else if (afType === 'rad') {
-        const radSection = document.getElementById('rad_section');
-        const radCard = document.getElementById('af_rad_card');
-        const isEnabled = document.getElementById('enable_rad').checked;
-        radSection.style.display = isEnabled ? 'block' : 'none';
-        radCard.style.display = isEnabled ? 'block' : 'none';
-    }
+    const model = AF_MODELS.find(m => m.key === afType);
+    if (!model) return;
+
+    const isEnabled = document.getElementById(model.flag).checked;
+    const section = document.getElementById(`${model.key}_section`);
+    const card = document.getElementById(`${model.output}_card`);
+    if (section) section.style.display = isEnabled ? 'block' : 'none';
+    if (card) card.style.display = isEnabled ? 'block' : 'none';
 }
 
 // Toggle Eyring model section
 function toggleEyringMode() {
-    const eyringSection = document.getElementById('eyring_section');
-    const isEnabled = document.getElementById('enable_eyring').checked;
-    eyringSection.style.display = isEnabled ? 'block' : 'none';
+    toggleAFSection('eyring');
+}
+
+// 依註冊表收集 AF 參數：所有啟用標誌，以及啟用模型的參數 (含共用參數與額外欄位)
+function collectAFParams() {
+    const afParams = {};
+    BASE_AF_FIELDS.forEach(name => {
+        afParams[name] = document.getElementById(name).value;
+    });
+
+    AF_MODELS.forEach(model => {
+        afParams[model.flag] = document.getElementById(model.flag).checked;
+        if (!afParams[model.flag]) return;
+
+        const fields = model.params.map(p => p.name).concat(model.shared, model.extra_fields);
+        fields.forEach(name => {
+            const elem = document.getElementById(name);
+            if (elem) afParams[name] = elem.value;
+        });
+    });
+    return afParams;
 }
 
 function calculate() {
     // 1. 收集 AF 參數（包含啟用標誌）
-    const afParams = {
-        // 基本參數
-        t_use: document.getElementById('t_use').value,
-        rh_use: document.getElementById('rh_use').value,
-        t_alt: document.getElementById('t_alt').value,
-        rh_alt: document.getElementById('rh_alt').value,
-        ea: document.getElementById('ea').value,
-        n_hum: document.getElementById('n_hum').value,
-
-        // 啟用標誌
-        enable_temp: document.getElementById('enable_temp').checked,
-        enable_hum: document.getElementById('enable_hum').checked,
-        enable_voltage: document.getElementById('enable_voltage').checked,
-        enable_tc: document.getElementById('enable_tc').checked,
-        enable_vib: document.getElementById('enable_vib').checked,
-        enable_uv: document.getElementById('enable_uv').checked,
-        enable_chem: document.getElementById('enable_chem').checked,
-        enable_rad: document.getElementById('enable_rad').checked
-    };
-
-    // 如果電壓啟用，添加參數
-    if (afParams.enable_voltage) {
-        afParams.v_use = document.getElementById('v_use').value;
-        afParams.v_alt = document.getElementById('v_alt').value;
-        afParams.beta_v = document.getElementById('beta_v').value;
-    }
-
-    // 如果熱循環啟用，添加參數
-    if (afParams.enable_tc) {
-        afParams.dt_use = document.getElementById('dt_use').value;
-        afParams.dt_alt = document.getElementById('dt_alt').value;
-        afParams.f_use = document.getElementById('f_use').value;
-        afParams.f_alt = document.getElementById('f_alt').value;
-        afParams.alpha_tc = document.getElementById('alpha_tc').value;
-        afParams.beta_tc = document.getElementById('beta_tc').value;
-    }
-
-    // 如果振動啟用，添加參數
-    if (afParams.enable_vib) {
-        afParams.g_use = document.getElementById('g_use').value;
-        afParams.g_alt = document.getElementById('g_alt').value;
-        afParams.n_vib = document.getElementById('n_vib').value;
-    }
-
-    // 如果UV啟用，添加參數
-    if (afParams.enable_uv) {
-        afParams.t_field_uv = document.getElementById('t_field_uv').value;
-        afParams.t_accel_uv = document.getElementById('t_accel_uv').value;
-    }
-
-    // 如果化學濃度啟用，添加參數
-    if (afParams.enable_chem) {
-        afParams.c_use = document.getElementById('c_use').value;
-        afParams.c_alt = document.getElementById('c_alt').value;
-        afParams.n_chem = document.getElementById('n_chem').value;
-    }
-
-    // 如果輻射劑量啟用，添加參數
-    if (afParams.enable_rad) {
-        afParams.d_use = document.getElementById('d_use').value;
-        afParams.d_alt = document.getElementById('d_alt').value;
-        afParams.dose_rate = document.getElementById('dose_rate').value;
-        afParams.n_rad = document.getElementById('n_rad').value;
-    }
-
-    // 如果Eyring模型啟用，添加參數
-    afParams.enable_eyring = document.getElementById('enable_eyring').checked;
-    if (afParams.enable_eyring) {
-        afParams.eyring_stress_type = document.getElementById('eyring_stress_type').value;
-        afParams.eyring_d = document.getElementById('eyring_d').value;
-        afParams.eyring_a = document.getElementById('eyring_a').value;
-        afParams.eyring_b = document.getElementById('eyring_b').value;
-    }
+    const afParams = collectAFParams();
 
     // 2. 收集 Weibull 數據
     const failuresInput = document.getElementById('failures_input').value;
@@ -146,41 +69,64 @@ function calculate() {
     if (failuresInput.trim() !== "") {
         failures = failuresInput.split(/[,;\s]+/).map(Number).filter(n => !isNaN(n) && n > 0);
     }
+    const suspensionsInput = document.getElementById('suspensions_input').value;
+    const suspensions = suspensionsInput.trim() === "" ? [] :
+        suspensionsInput.split(/[,;\s]+/).map(Number).filter(n => !isNaN(n) && n > 0);
 
     // 2.1 收集 Weibull 分析方法選項
     const weibullOptions = {
         median_rank_method: document.getElementById('median_rank_method').value,
         regression_method: document.getElementById('regression_method').value,
-        bx_life_percent: parseFloat(document.getElementById('bx_life_percent').value)
+        bx_life_percent: parseFloat(document.getElementById('bx_life_percent').value),
+        n_total: document.getElementById('n_total_input').value,
+        three_parameter: document.getElementById('three_parameter').checked,
+        mixture_modes: document.getElementById('mixture_modes').value,
+        rank_by: document.getElementById('rank_by').value
     };
 
     // 3. 收集零失效參數
     const zeroFailParams = {
         n: document.getElementById('n_samples').value,
         t_test: document.getElementById('t_test').value,
-        cl: document.getElementById('cl').value
+        cl: document.getElementById('cl').value,
+        beta: document.getElementById('zf_beta').value
     };
 
     // 4. 收集任務時間
     const missionYears = parseFloat(document.getElementById('mission_years').value) || 2;
 
-    // 發送請求
+    // 發送請求 (附上前次結果的 ETag，參數未變時伺服器回傳 304)
+    const headers = { 'Content-Type': 'application/json' };
+    if (lastCalculation) {
+        headers['If-None-Match'] = lastCalculation.etag;
+    }
+
     fetch('/calculate', {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
+        headers: headers,
         body: JSON.stringify({
             af_params: afParams,
             weibull_data: {
                 failures: failures,
+                suspensions: suspensions,
                 options: weibullOptions
             },
             zero_fail_params: zeroFailParams,
             mission_years: missionYears
         })
     })
-        .then(response => response.json())
+        .then(response => {
+            if (response.status === 304 && lastCalculation) {
+                return lastCalculation.data;
+            }
+            const etag = response.headers.get('ETag');
+            return response.json().then(data => {
+                if (etag && !data.error) {
+                    lastCalculation = { etag: etag, data: data };
+                }
+                return data;
+            });
+        })
         .then(data => {
             if (data.error) {
                 alert("Error: " + data.error);
@@ -196,6 +142,7 @@ function calculate() {
 
 // 全域變數儲存當前數據
 let currentData = null;
+let lastCalculation = null; // { etag, data }：最近一次 /calculate 的回應
 let currentMode = null; // 'weibull' or 'zero_failure'
 let currentChartType = 'reliability'; // 'reliability', 'hazard', 'pdf'
 
@@ -221,14 +168,12 @@ function adjustAFTextSize(elementId, value) {
 
 function updateUI(data, hasFailures) {
     // 更新 AF 結果並動態調整字體大小
-    adjustAFTextSize('res_af_t', data.af_result.af_t);
-    adjustAFTextSize('res_af_rh', data.af_result.af_rh);
-    adjustAFTextSize('res_af_v', data.af_result.af_v);
-    adjustAFTextSize('res_af_tc', data.af_result.af_tc || '1.0');
-    adjustAFTextSize('res_af_vib', data.af_result.af_vib || '1.0');
-    adjustAFTextSize('res_af_uv', data.af_result.af_uv || '1.0');
-    adjustAFTextSize('res_af_chem', data.af_result.af_chem || '1.0');
-    adjustAFTextSize('res_af_rad', data.af_result.af_rad || '1.0');
+    AF_MODELS.filter(m => !m.is_correction).forEach(model => {
+        const elemId = `res_${model.output}`;
+        if (document.getElementById(elemId)) {
+            adjustAFTextSize(elemId, data.af_result[model.output] ?? 'N/A');
+        }
+    });
     adjustAFTextSize('res_af_total', data.af_result.af_total);
 
     const wbStats = document.getElementById('weibull_stats');
@@ -260,6 +205,10 @@ function updateUI(data, hasFailures) {
 
         document.getElementById('wb_rel').innerText = (res.r_mission * 100).toFixed(4) + "%";
         document.getElementById('wb_rel_label').innerText = `Reliability (${missionYears} Years)`;
+        // MLE 信賴界限 (單邊下限)
+        document.getElementById('wb_rel_bounds').innerText = res.bounds ?
+            `${(res.conf_level * 100).toFixed(0)}% 單邊下限 (${res.bounds_method.toUpperCase()}): ` +
+            (res.bounds.r_mission.lower_one_sided * 100).toFixed(4) + "%" : "";
 
         // 計算等效現場時間
         const testTime = parseFloat(document.getElementById('t_test').value) || 0;
@@ -272,6 +221,24 @@ function updateUI(data, hasFailures) {
 
         document.getElementById('wb_beta').innerText = data.weibull_result.beta;
         document.getElementById('wb_eta').innerText = data.weibull_result.eta_alt;
+        document.getElementById('wb_gamma').innerText = data.weibull_result.gamma !== undefined ?
+            `, γ=${data.weibull_result.gamma}` : '';
+        // 多分佈擬合：排序前三名與選用分佈的任務可靠度
+        const ranking = data.distribution_result;
+        document.getElementById('wb_dist_rank').innerText = ranking && !ranking.error ?
+            `最佳分佈 (${ranking.rank_by.toUpperCase()}): ` +
+            ranking.candidates.filter(c => c.rank).slice(0, 3)
+                .map(c => `${c.rank}. ${c.label} (${c[ranking.rank_by]})`).join('  ') +
+            (data.reliability_result.distribution ?
+                ` | ${data.reliability_result.distribution.label} R = ` +
+                (data.reliability_result.distribution.r_mission * 100).toFixed(4) + "%" : "") : "";
+        // 混合 Weibull：各失效模式的 β / η / 比例與混合分佈的任務可靠度
+        const mixture = data.mixture_result;
+        document.getElementById('wb_mixture').innerText = mixture && mixture.error ?
+            `Mixture: ${mixture.error}` : mixture ?
+            'Mixture: ' + mixture.components.map(c =>
+                `β=${c.beta}, η=${c.eta_alt} (${(c.weight * 100).toFixed(1)}%)`).join(' / ') +
+            ` | R = ${(data.reliability_result.mixture.r_mission * 100).toFixed(4)}%` : "";
 
     } else {
         // --- Zero Failure Mode ---
@@ -289,6 +256,12 @@ function updateUI(data, hasFailures) {
             document.getElementById('zf_rel_label').innerText = `Reliability (${missionYears} Years)`;
             document.getElementById('zf_cl_display').innerText = (document.getElementById('cl').value * 100) + "%";
 
+            // WeiBayes (已知 β) 下限
+            const weibayes = data.reliability_result.weibayes;
+            document.getElementById('zf_weibayes').innerText = weibayes ?
+                `WeiBayes (β=${weibayes.beta ?? weibayes.beta_mean}): η_use > ${weibayes.eta_use_lower.toLocaleString()} hrs` +
+                ` | R > ${(weibayes.r_mission * 100).toFixed(4)}%` : "";
+
             // 計算等效現場時間
             const testTime = parseFloat(document.getElementById('t_test').value) || 0;
             const afTotal = data.af_result.af_total;
@@ -505,13 +478,16 @@ function renderChart() {
         const eta = currentData.weibull_result.eta_alt;
         const af = currentData.af_result.af_total;
         const eta_use = eta * af;
+        // 三參數 Weibull：現場無失效期 γ 隨加速因子放大，t ≤ γ 時 R = 1
+        const gamma_use = (currentData.weibull_result.gamma || 0) * af;
+        const shift = t => Math.max(t - gamma_use, 0);
 
         if (currentChartType === 'reliability') {
             layout.title = 'Reliability Function R(t)';
             layout.yaxis.title = 'Reliability';
             layout.yaxis.range = [0, 1.05];
 
-            const y_rel = timeSteps.map(t => Math.exp(-Math.pow(t / eta_use, beta)));
+            const y_rel = timeSteps.map(t => Math.exp(-Math.pow(shift(t) / eta_use, beta)));
 
             traces.push({
                 x: timeSteps,
@@ -526,8 +502,8 @@ function renderChart() {
             layout.yaxis.title = 'Failure Rate (Failures/Hour)';
 
             const y_haz = timeSteps.map(t => {
-                if (t === 0) return 0;
-                return (beta / eta_use) * Math.pow(t / eta_use, beta - 1);
+                if (t <= gamma_use) return 0;
+                return (beta / eta_use) * Math.pow(shift(t) / eta_use, beta - 1);
             });
 
             traces.push({
@@ -543,9 +519,9 @@ function renderChart() {
             layout.yaxis.title = 'Probability Density';
 
             const y_pdf = timeSteps.map(t => {
-                if (t === 0) return 0;
-                const r = Math.exp(-Math.pow(t / eta_use, beta));
-                const h = (beta / eta_use) * Math.pow(t / eta_use, beta - 1);
+                if (t <= gamma_use) return 0;
+                const r = Math.exp(-Math.pow(shift(t) / eta_use, beta));
+                const h = (beta / eta_use) * Math.pow(shift(t) / eta_use, beta - 1);
                 return r * h;
             });
 
@@ -559,6 +535,19 @@ function renderChart() {
             });
         }
 
+        // 混合 Weibull：疊加伺服器計算的混合曲線 (現場條件)
+        const mixture = currentData.mixture_result;
+        if (mixture && mixture.curves) {
+            const key = { reliability: 'R', hazard: 'h', pdf: 'f' }[currentChartType];
+            traces.push({
+                x: mixture.curves.t,
+                y: mixture.curves[key],
+                mode: 'lines',
+                name: `Mixture (${mixture.n_modes} modes)`,
+                line: { color: '#a855f7', width: 2, dash: 'dash' }
+            });
+        }
+
     } else if (currentMode === 'zero_failure') {
         const res = currentData.reliability_result.zero_failure;
         const lambda = res.lambda_use_upper * 1e-9;
@@ -632,23 +621,7 @@ async function generateReport(format = 'pdf') {
         // 收集所有參數數據
         const reportData = {
             // AF 參數
-            af_params: {
-                t_use: document.getElementById('t_use').value,
-                t_alt: document.getElementById('t_alt').value,
-                rh_use: document.getElementById('rh_use').value,
-                rh_alt: document.getElementById('rh_alt').value,
-                ea: document.getElementById('ea').value,
-                n_hum: document.getElementById('n_hum').value,
-                enable_temp: document.getElementById('enable_temp').checked,
-                enable_hum: document.getElementById('enable_hum').checked,
-                enable_voltage: document.getElementById('enable_voltage').checked,
-                enable_tc: document.getElementById('enable_tc').checked,
-                enable_vib: document.getElementById('enable_vib').checked,
-                enable_uv: document.getElementById('enable_uv').checked,
-                enable_chem: document.getElementById('enable_chem').checked,
-                enable_rad: document.getElementById('enable_rad').checked,
-                enable_eyring: document.getElementById('enable_eyring').checked
-            },
+            af_params: collectAFParams(),
 
             // 測試數據
             test_data: {
@@ -672,47 +645,6 @@ async function generateReport(format = 'pdf') {
             chart_image: null
         };
 
-        // 獲取額外的加速因子參數（如果啟用）
-        if (reportData.af_params.enable_voltage) {
-            reportData.af_params.v_use = document.getElementById('v_use').value;
-            reportData.af_params.v_alt = document.getElementById('v_alt').value;
-            reportData.af_params.beta_v = document.getElementById('beta_v').value;
-        }
-        if (reportData.af_params.enable_tc) {
-            reportData.af_params.dt_use = document.getElementById('dt_use').value;
-            reportData.af_params.dt_alt = document.getElementById('dt_alt').value;
-            reportData.af_params.f_use = document.getElementById('f_use').value;
-            reportData.af_params.f_alt = document.getElementById('f_alt').value;
-            reportData.af_params.alpha_tc = document.getElementById('alpha_tc').value;
-            reportData.af_params.beta_tc = document.getElementById('beta_tc').value;
-        }
-        if (reportData.af_params.enable_vib) {
-            reportData.af_params.g_use = document.getElementById('g_use').value;
-            reportData.af_params.g_alt = document.getElementById('g_alt').value;
-            reportData.af_params.n_vib = document.getElementById('n_vib').value;
-        }
-        if (reportData.af_params.enable_uv) {
-            reportData.af_params.t_field_uv = document.getElementById('t_field_uv').value;
-            reportData.af_params.t_accel_uv = document.getElementById('t_accel_uv').value;
-        }
-        if (reportData.af_params.enable_chem) {
-            reportData.af_params.c_use = document.getElementById('c_use').value;
-            reportData.af_params.c_alt = document.getElementById('c_alt').value;
-            reportData.af_params.n_chem = document.getElementById('n_chem').value;
-        }
-        if (reportData.af_params.enable_rad) {
-            reportData.af_params.d_use = document.getElementById('d_use').value;
-            reportData.af_params.d_alt = document.getElementById('d_alt').value;
-            reportData.af_params.dose_rate = document.getElementById('dose_rate').value;
-            reportData.af_params.n_rad = document.getElementById('n_rad').value;
-        }
-        if (reportData.af_params.enable_eyring) {
-            reportData.af_params.eyring_stress_type = document.getElementById('eyring_stress_type').value;
-            reportData.af_params.eyring_d = document.getElementById('eyring_d').value;
-            reportData.af_params.eyring_a = document.getElementById('eyring_a').value;
-            reportData.af_params.eyring_b = document.getElementById('eyring_b').value;
-        }
-
         // 導出圖表為圖片
         const plotDiv = document.getElementById('plot');
         if (plotDiv && plotDiv.data && plotDiv.data.length > 0) {
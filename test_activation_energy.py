@@ -0,0 +1,160 @@
+"""
+測試活化能 (Ea) 估計
+驗證迴歸法、最大概似法 (含截尾)、批次求解、bootstrap 區間與 API
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app
+from activation_energy import estimate_activation_energy, _weibull_derivatives, KB
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+TEMPS = (85, 105, 125)
+
+def simulate(rng, ea=0.7, beta=2.0, n=30, a=-20.0, censor=None):
+    """由 Arrhenius-Weibull 模型產生多溫度失效數據 (可設定定時截尾)"""
+    groups = []
+    for temp in TEMPS:
+        eta = np.exp(a + ea / (KB * (temp + 273.15)))
+        times = eta * rng.weibull(beta, n)
+        if censor is None:
+            groups.append({'temp': temp, 'failures': times.tolist()})
+        else:
+            groups.append({'temp': temp, 'failures': times[times < censor].tolist(),
+                           'suspensions': [censor] * int((times >= censor).sum())})
+    return {'groups': groups}
+
+def test_characteristic_life_regression():
+    """測試以特徵壽命迴歸時精確回推 Ea"""
+    print("\n=== 測試特徵壽命迴歸 ===")
+
+    ea = 0.85
+    groups = [{'temp': t, 'life': float(np.exp(-15 + ea / (KB * (t + 273.15))))} for t in TEMPS]
+    result = estimate_activation_energy([{'name': 'exact', 'groups': groups}])['results'][0]
+    assert abs(result['regression']['ea'] - ea) < 1e-6
+    assert result['regression']['r_squared'] > 0.999999
+    assert 'error' in result['mle'], "僅有特徵壽命時不可進行 MLE"
+
+    print(f"Ea (regression) = {result['regression']['ea']}")
+    print("✓ 特徵壽命迴歸測試通過")
+
+def test_mle_gradient_and_censoring():
+    """測試解析梯度與數值差分一致，且截尾數據的 MLE 仍無偏"""
+    print("\n=== 測試 MLE 梯度與截尾 ===")
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-1, 1, (1, 40))
+    Y = rng.normal(8, 1, (1, 40))
+    Dl = (rng.random((1, 40)) < 0.7).astype(float)
+    M = np.ones_like(X)
+    theta = np.array([[8.0, 0.5, np.log(1.5)]])
+    _, grad, hess = _weibull_derivatives(theta, X, Y, Dl, M)
+    eps = 1e-6
+    for j in range(3):
+        step = np.zeros_like(theta)
+        step[0, j] = eps
+        ll_p, g_p, _ = _weibull_derivatives(theta + step, X, Y, Dl, M)
+        ll_m, g_m, _ = _weibull_derivatives(theta - step, X, Y, Dl, M)
+        assert abs((ll_p - ll_m)[0] / (2 * eps) - grad[0, j]) < 1e-4 * (1 + abs(grad[0, j]))
+        assert np.allclose((g_p - g_m)[0] / (2 * eps), hess[0, j], rtol=1e-4, atol=1e-4)
+
+    # 定時截尾：低溫組大多數樣品未失效
+    rng = np.random.default_rng(1)
+    datasets = [simulate(rng, n=40, censor=8.0) for _ in range(100)]
+    results = estimate_activation_energy(datasets, methods=('mle',))['results']
+    eas = np.array([r['mle']['ea'] for r in results])
+    assert all(r['mle']['converged'] for r in results)
+    assert abs(eas.mean() - 0.7) < 0.03, f"截尾 MLE 平均 Ea = {eas.mean()}"
+
+    print(f"截尾數據 100 組平均 Ea = {eas.mean():.4f} (真值 0.7)")
+    print("✓ MLE 梯度與截尾測試通過")
+
+def test_batch_coverage_and_speed():
+    """測試數百組數據集一次求解的速度與信賴區間涵蓋率"""
+    print("\n=== 測試批次求解與涵蓋率 ===")
+
+    rng = np.random.default_rng(2)
+    datasets = [simulate(rng) for _ in range(400)]
+    start = time.perf_counter()
+    results = estimate_activation_energy(datasets)['results']
+    elapsed = time.perf_counter() - start
+
+    coverage = np.mean([r['mle']['ea_lower'] < 0.7 < r['mle']['ea_upper'] for r in results])
+    beta = np.mean([r['mle']['beta'] for r in results])
+    assert 0.9 < coverage < 0.99, f"95% 區間涵蓋率 {coverage}"
+    assert abs(beta - 2.0) < 0.1
+
+    print(f"400 組數據集: {elapsed:.3f} s，Wald 區間涵蓋率 = {coverage:.3f}")
+    print("✓ 批次求解測試通過")
+
+def test_bootstrap_reproducible():
+    """測試 bootstrap 區間可重現且與平行數無關"""
+    print("\n=== 測試 bootstrap 區間 ===")
+
+    rng = np.random.default_rng(3)
+    datasets = [simulate(rng) for _ in range(3)]
+    serial = estimate_activation_energy(datasets, n_bootstrap=500, seed=9, n_jobs=1)
+    pooled = estimate_activation_energy(datasets, n_bootstrap=500, seed=9, n_jobs=2)
+    assert serial == pooled
+
+    mle = serial['results'][0]['mle']
+    assert mle['bootstrap_lower'] < mle['ea'] < mle['bootstrap_upper']
+    assert mle['bootstrap_valid'] == 500
+    print(f"Ea = {mle['ea']}，bootstrap 95% 區間 [{mle['bootstrap_lower']}, {mle['bootstrap_upper']}]")
+    print("✓ bootstrap 測試通過")
+
+def test_errors_and_endpoint():
+    """測試錯誤處理與 /estimate_ea API"""
+    print("\n=== 測試錯誤處理與 API ===")
+
+    result = estimate_activation_energy([{'groups': [{'temp': 85, 'failures': [100, 200]}]},
+                                         simulate(np.random.default_rng(4))])
+    assert 'error' in result['results'][0], "單一溫度應回傳錯誤"
+    assert 'mle' in result['results'][1], "其他數據集不受影響"
+    assert "error" in estimate_activation_energy([], methods=('mle',))
+    assert "error" in estimate_activation_energy([simulate(np.random.default_rng(4))],
+                                                 methods=('bayes',))
+
+    client = app.test_client()
+    resp = client.post('/estimate_ea', json={'datasets': [simulate(np.random.default_rng(5))],
+                                             'n_bootstrap': 100, 'seed': 1})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['results'][0]['mle']['bootstrap_valid'] == 100
+    assert client.post('/estimate_ea', json={'datasets': []}).status_code == 400
+    resp = client.post('/estimate_ea', json={'datasets': [simulate(np.random.default_rng(5))],
+                                             'n_bootstrap': 100, 'seed': 1, 'n_jobs': -1})
+    assert resp.status_code == 200 and resp.get_json()['results'] == data['results']
+    resp = client.post('/estimate_ea', json={'datasets': [simulate(np.random.default_rng(5))], 'n_jobs': 'all'})
+    assert resp.status_code == 400 and resp.get_json()['error'] == 'Ea 估計錯誤: n_jobs 需為整數'
+
+    print("✓ 錯誤處理與 API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("活化能 (Ea) 估計測試")
+    print("=" * 60)
+
+    try:
+        test_characteristic_life_regression()
+        test_mle_gradient_and_censoring()
+        test_batch_coverage_and_speed()
+        test_bootstrap_reproducible()
+        test_errors_and_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有 Ea 估計測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,146 @@
+"""
+測試加速因子批次計算
+驗證 calculate_af_batch 每一列都與 calculate_af 結果一致
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_af
+from af_engine import calculate_af_batch, AF_OUTPUT_KEYS
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def _random_columns(n, seed=0):
+    """產生隨機應力條件 (含所有啟用標誌組合)"""
+    rng = np.random.default_rng(seed)
+    cols = {
+        't_use': rng.uniform(0, 60, n), 'rh_use': rng.uniform(20, 80, n),
+        't_alt': rng.uniform(60, 150, n), 'rh_alt': rng.uniform(60, 98, n),
+        'v_use': rng.uniform(0.8, 1.2, n), 'v_alt': rng.uniform(1.0, 2.0, n),
+        'ea': rng.uniform(0.3, 1.2, n), 'n_hum': rng.uniform(1, 4, n),
+        'beta_v': rng.uniform(0.5, 4, n),
+        'dt_use': rng.uniform(20, 80, n), 'dt_alt': rng.uniform(100, 200, n),
+        'g_alt': rng.uniform(5, 30, n), 'n_vib': rng.uniform(2, 8, n),
+        'c_alt': rng.uniform(2, 10, n), 'd_alt': rng.uniform(20, 200, n),
+        'eyring_d': rng.uniform(-0.5, 0.5, n),
+        'eyring_stress_type': rng.choice(['voltage', 'humidity', 'other'], n),
+    }
+    for flag in ['enable_temp', 'enable_hum', 'enable_voltage', 'enable_tc',
+                 'enable_vib', 'enable_uv', 'enable_chem', 'enable_rad', 'enable_eyring']:
+        cols[flag] = rng.random(n) < 0.5
+    return cols
+
+def _row(cols, i):
+    """取出第 i 列作為 calculate_af 的輸入"""
+    row = {}
+    for key, values in cols.items():
+        value = values[i]
+        row[key] = value.item() if hasattr(value, 'item') else value
+    return row
+
+def test_batch_matches_scalar():
+    """測試每一列都與純量版本一致"""
+    print("\n=== 測試批次結果與 calculate_af 一致 ===")
+
+    n = 2000
+    cols = _random_columns(n)
+    batch = calculate_af_batch(cols)
+
+    assert batch['valid'].all(), "正常輸入不應有無效列"
+
+    for i in range(n):
+        scalar = calculate_af(_row(cols, i))
+        for key in AF_OUTPUT_KEYS:
+            expected = scalar[key]
+            actual = batch[key][i]
+            if expected is None:
+                assert np.isnan(actual), f"第 {i} 列 {key} 應為 None"
+            else:
+                assert np.isclose(actual, expected, rtol=1e-9, atol=5e-5), \
+                    f"第 {i} 列 {key} 不一致: {actual} vs {expected}"
+
+    print(f"✓ {n} 列結果全部一致")
+
+def test_batch_broadcast_and_invalid_rows():
+    """測試純量廣播與無效列標記"""
+    print("\n=== 測試純量廣播與無效列 ===")
+
+    batch = calculate_af_batch({
+        't_alt': [70, 85, 125],
+        'rh_use': [60, 0, 60],  # 第 2 列除以零 (calculate_af 會回傳 error)
+        'ea': 0.7,
+    })
+
+    assert batch['n'] == 3
+    assert batch['valid'].tolist() == [True, False, True], batch['valid']
+    assert "error" in calculate_af({'t_alt': 85, 'rh_use': 0, 'ea': 0.7})
+
+    expected = calculate_af({'t_alt': 125, 'ea': 0.7})
+    assert abs(batch['af_total'][2] - expected['af_total']) < 1e-3
+
+    mismatched = calculate_af_batch({'t_alt': [70, 85], 'rh_alt': [80, 85, 90]})
+    assert "error" in mismatched, "長度不一致的欄位應回傳錯誤"
+
+    print("✓ 廣播與無效列測試通過")
+
+def test_batch_endpoint():
+    """測試 /calculate_af_batch API"""
+    print("\n=== 測試 /calculate_af_batch API ===")
+
+    client = app.test_client()
+    resp = client.post('/calculate_af_batch', json={
+        'af_params': {
+            't_alt': [70, 85], 'rh_alt': [85, 85], 'ea': 0.7,
+            'enable_eyring': [False, True], 'eyring_stress_type': 'humidity'
+        }
+    })
+    data = resp.get_json()
+
+    assert resp.status_code == 200, data
+    assert data['n'] == 2
+    assert data['af_eyring_correction'][0] is None
+
+    scalar = calculate_af({'t_alt': 85, 'rh_alt': 85, 'ea': 0.7,
+                           'enable_eyring': True, 'eyring_stress_type': 'humidity'})
+    assert data['af_total'][1] == scalar['af_total'], (data['af_total'][1], scalar['af_total'])
+    assert data['af_eyring_correction'][1] == scalar['af_eyring_correction']
+
+    print("✓ API 測試通過")
+
+def test_batch_speed():
+    """展示批次計算效能"""
+    print("\n=== 批次計算效能 ===")
+
+    cols = _random_columns(100000, seed=1)
+    start = time.perf_counter()
+    calculate_af_batch(cols)
+    elapsed = time.perf_counter() - start
+
+    print(f"100,000 組條件: {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("加速因子批次計算測試")
+    print("=" * 60)
+
+    try:
+        test_batch_matches_scalar()
+        test_batch_broadcast_and_invalid_rows()
+        test_batch_endpoint()
+        test_batch_speed()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有批次計算測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
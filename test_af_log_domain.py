@@ -0,0 +1,148 @@
+"""
+測試對數空間 AF 核心
+驗證與原始冪次公式一致，且極端條件不會溢位或落入錯誤分支
+"""
+
+import sys
+import io
+import numpy as np
+from app import app, calculate_af
+from af_engine import calculate_af_batch, KB
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def test_matches_direct_formulas():
+    """測試對數空間結果與直接相乘的公式一致"""
+    print("\n=== 測試與直接公式一致 ===")
+
+    rng = np.random.default_rng(5)
+    n = 5000
+    p = {
+        't_use': rng.uniform(0, 60, n), 't_alt': rng.uniform(60, 150, n),
+        'rh_use': rng.uniform(20, 80, n), 'rh_alt': rng.uniform(60, 98, n),
+        'v_use': 1.0, 'v_alt': rng.uniform(1.0, 2.0, n),
+        'ea': rng.uniform(0.3, 1.2, n), 'n_hum': rng.uniform(1, 4, n), 'beta_v': 3.0,
+        'g_alt': rng.uniform(5, 30, n), 'n_vib': 4.0,
+        'enable_voltage': True, 'enable_vib': True
+    }
+    batch = calculate_af_batch(p)
+
+    t_use_k, t_alt_k = p['t_use'] + 273.15, p['t_alt'] + 273.15
+    expected = (np.exp((p['ea'] / KB) * (1 / t_use_k - 1 / t_alt_k)) *
+                (p['rh_alt'] / p['rh_use']) ** p['n_hum'] *
+                (p['v_alt'] / p['v_use']) ** p['beta_v'] *
+                (p['g_alt'] / 1.0) ** p['n_vib'])
+
+    assert batch['valid'].all()
+    assert np.allclose(batch['af_total'], expected, rtol=1e-12)
+    assert np.allclose(10 ** batch['log10_af_total'], expected, rtol=1e-10)
+
+    print(f"✓ {n} 組條件與直接公式一致 (相對誤差 < 1e-12)")
+
+def test_extreme_conditions_stay_valid():
+    """測試極端條件仍在向量化路徑上得到有效的 log10 AF"""
+    print("\n=== 測試極端條件不溢位 ===")
+
+    # (20/1)^400 ≈ 10^520，超出 float64 範圍
+    batch = calculate_af_batch({'enable_vib': True, 'g_alt': 20, 'n_vib': [8, 400],
+                                'enable_temp': False, 'enable_hum': False})
+    assert batch['valid'].all(), "極端條件不應標記為無效"
+    assert np.isfinite(batch['af_total'][0]) and np.isinf(batch['af_total'][1])
+    assert abs(batch['log10_af_total'][1] - 400 * np.log10(20)) < 1e-9
+    print(f"log10 AF (n_vib=400) = {batch['log10_af_total'][1]:.4f}")
+
+    # 單一因子溢位，但乘積在範圍內
+    params = {'enable_temp': False, 'enable_hum': False,
+              'enable_vib': True, 'g_alt': 20, 'n_vib': 400,
+              'enable_chem': True, 'c_use': 20, 'c_alt': 1, 'n_chem': 399}
+    result = calculate_af(params)
+    assert "error" not in result, result
+    assert abs(result['af_total'] - 20.0) < 1e-6
+    assert result['af_vib'] is None
+    print(f"部分因子溢位時 AF Total = {result['af_total']}")
+
+    # 超出範圍的純量呼叫回傳描述性錯誤並附上 log10 值
+    overflow = calculate_af({'enable_vib': True, 'g_alt': 20, 'n_vib': 400})
+    assert "error" in overflow and overflow['log10_af_total'] > 500
+
+    print("✓ 極端條件測試通過")
+
+def test_eyring_log_form():
+    """測試 Eyring 比值以解析對數形式計算 (大 Ea 時原公式的 e^(Ea/kT) 會溢位)"""
+    print("\n=== 測試 Eyring 對數形式 ===")
+
+    params = {
+        't_use': 25, 't_alt': 125, 'v_use': 1.0, 'v_alt': 1.5,
+        'ea': 30.0, 'beta_v': 2.0, 'enable_hum': False, 'enable_voltage': True,
+        'enable_eyring': True, 'eyring_stress_type': 'voltage',
+        'eyring_a': 1e-300, 'eyring_b': 2.0, 'eyring_d': 50.0
+    }
+    with np.errstate(over='ignore'):
+        assert np.isinf(np.exp(30.0 / (KB * 298.15))), "原公式在此條件下會溢位"
+
+    batch = calculate_af_batch(params)
+    assert batch['valid'][0]
+
+    t_use_k, t_alt_k = 298.15, 398.15
+    log_af_eyring = (2.0 * np.log(1.5) + (30.0 / KB) * (1 / t_use_k - 1 / t_alt_k) +
+                     50.0 * (1.0 / t_use_k - 1.5 / t_alt_k))
+    assert abs(batch['log10_af_total'][0] - log_af_eyring / np.log(10)) < 1e-9
+
+    # 修正因子與 AF_T × AF_V 無關 (只剩 B 與 D 的差異)
+    log_simple = (30.0 / KB) * (1 / t_use_k - 1 / t_alt_k) + 2.0 * np.log(1.5)
+    expected_corr = np.exp(log_af_eyring - log_simple)
+    assert abs(batch['af_eyring_correction'][0] / expected_corr - 1) < 1e-12
+
+    print(f"log10 AF (Eyring, Ea=30 eV) = {batch['log10_af_total'][0]:.2f}")
+    print("✓ Eyring 對數形式測試通過")
+
+def test_log10_in_responses():
+    """測試 /calculate 與 /calculate_af_batch 回傳 log10_af_total"""
+    print("\n=== 測試 API 回傳 log10_af_total ===")
+
+    client = app.test_client()
+    resp = client.post('/calculate', json={'af_params': {'t_alt': 85, 'ea': 0.7}})
+    data = resp.get_json()
+    assert abs(10 ** data['af_result']['log10_af_total'] / data['af_result']['af_total'] - 1) < 1e-5
+
+    resp = client.post('/calculate_af_batch', json={'af_params': {
+        'enable_vib': True, 'g_alt': 20, 'n_vib': [8, 400]}})
+    data = resp.get_json()
+    assert resp.status_code == 200
+    assert data['valid'] == [True, True]
+    assert data['af_total'][1] is None and data['log10_af_total'][1] > 500
+
+    resp = client.post('/af_sweep', json={
+        'af_params': {'enable_vib': True, 'g_alt': 20},
+        'axes': {'n_vib': {'start': 8, 'stop': 800, 'num': 5}},
+        'format': 'json', 'output': 'log10_af_total'})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert None not in data['log10_af_total'], "log10 掃描不應因溢位出現無效點"
+
+    print("✓ API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("對數空間 AF 核心測試")
+    print("=" * 60)
+
+    try:
+        test_matches_direct_formulas()
+        test_extreme_conditions_stay_valid()
+        test_eyring_log_form()
+        test_log10_in_responses()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有對數空間 AF 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
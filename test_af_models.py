@@ -0,0 +1,167 @@
+"""
+測試應力模型註冊表
+驗證註冊表衍生的查詢表、擴充模型公式、自訂模型註冊、融合評估計畫與有效範圍檢查
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_af
+from af_engine import calculate_af_batch, AF_OUTPUT_KEYS, AF_DEFAULTS
+from af_models import (KB, ModelParam, StressModel, register_model, unregister_model,
+                       compile_plan, iter_models, MODEL_REGISTRY)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def test_registry_tables():
+    """測試由註冊表衍生的預設值與輸出欄位"""
+    print("\n=== 測試註冊表衍生查詢表 ===")
+
+    for key in ['temp', 'hum', 'voltage', 'tc', 'vib', 'uv', 'chem', 'rad', 'eyring',
+                'nl', 'em', 'lawson']:
+        assert key in MODEL_REGISTRY, f"缺少模型 {key}"
+    assert AF_OUTPUT_KEYS[-2:] == ['af_eyring_correction', 'af_total']
+    assert AF_OUTPUT_KEYS[:8] == ['af_t', 'af_rh', 'af_v', 'af_tc', 'af_vib', 'af_uv',
+                                  'af_chem', 'af_rad']
+    assert AF_DEFAULTS['ea'] == 1.0 and AF_DEFAULTS['f_use'] == 1/24
+
+    # 預設溫度 + 濕度
+    result = calculate_af({'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85,
+                           'ea': 0.7, 'n_hum': 2.0})
+    expected = np.exp((0.7 / KB) * (1/305.15 - 1/358.15)) * (85/60) ** 2
+    assert abs(result['af_total'] / expected - 1) < 1e-5
+    assert result['af_nl'] == 1.0 and result['af_em'] == 1.0 and result['af_lawson'] == 1.0
+
+    print(f"已註冊 {len(MODEL_REGISTRY)} 個模型，AF = {result['af_total']}")
+    print("✓ 查詢表測試通過")
+
+def test_extension_models():
+    """測試 Norris-Landzberg、Black 方程式與 Lawson 模型"""
+    print("\n=== 測試擴充模型 ===")
+
+    base = {'enable_temp': False, 'enable_hum': False}
+
+    nl = calculate_af({**base, 'enable_nl': True, 'nl_dt_use': 60, 'nl_dt_alt': 165,
+                       'nl_f_use': 1, 'nl_f_alt': 48, 'nl_tmax_use': 60, 'nl_tmax_alt': 125,
+                       'nl_n': 1.9, 'nl_m': 1/3, 'nl_ea_k': 1414})
+    expected = ((165/60) ** 1.9 * (1/48) ** (1/3) *
+                np.exp(1414 * (1/333.15 - 1/398.15)))
+    assert abs(nl['af_nl'] / expected - 1) < 1e-4 and abs(nl['af_total'] / expected - 1) < 1e-4
+    print(f"Norris-Landzberg AF = {nl['af_nl']}")
+
+    em = calculate_af({**base, 'enable_em': True, 't_use': 55, 't_alt': 150,
+                       'em_j_use': 0.5, 'em_j_alt': 2.0, 'em_n': 2.0, 'em_ea': 0.7})
+    expected = (2.0/0.5) ** 2 * np.exp((0.7 / KB) * (1/328.15 - 1/423.15))
+    assert abs(em['af_em'] / expected - 1) < 1e-5
+    print(f"Black's Equation AF = {em['af_em']}")
+
+    lawson = calculate_af({**base, 'enable_lawson': True, 'rh_use': 50, 'rh_alt': 85})
+    expected = np.exp(5.57e-4 * (85 ** 2 - 50 ** 2))
+    assert abs(lawson['af_lawson'] - round(expected, 4)) < 1e-9
+    print(f"Lawson AF = {lawson['af_lawson']}")
+
+    print("✓ 擴充模型測試通過")
+
+def test_custom_model_registration():
+    """測試執行期註冊自訂模型後 calculate_af 與報告列皆自動納入"""
+    print("\n=== 測試自訂模型註冊 ===")
+
+    model = register_model(StressModel(
+        'pressure', 'enable_pressure', 'af_p',
+        params=[ModelParam('p_use', 1.0, (0.0, float('inf')), 'atm', '使用壓力'),
+                ModelParam('p_alt', 2.0, (0.0, float('inf')), 'atm', '測試壓力'),
+                ModelParam('n_p', 3.0, (0.0, 10.0), '', '壓力指數 n')],
+        log_af=lambda c: c['n_p'] * np.log(c['p_alt'] / c['p_use']),
+        report_label='Pressure / 壓力', result_label='AF (Pressure) / 壓力',
+        report_use='{p_use} atm', report_alt='{p_alt} atm', report_model='IPL (n={n_p})'))
+    try:
+        assert 'af_p' in AF_OUTPUT_KEYS and AF_OUTPUT_KEYS[-1] == 'af_total'
+        params = {'enable_temp': False, 'enable_hum': False, 'enable_pressure': True, 'p_alt': 3.0}
+        result = calculate_af(params)
+        assert abs(result['af_p'] - 27.0) < 1e-9 and abs(result['af_total'] - 27.0) < 1e-9
+
+        rows = [m.report_row(params) for m in iter_models(params)]
+        assert rows == [['Pressure / 壓力', ' atm', '3.0 atm', 'IPL (n=)']]
+
+        client = app.test_client()
+        keys = [m['key'] for m in client.get('/af_models').get_json()['models']]
+        assert keys[-1] == 'pressure'
+        assert b'id="enable_pressure"' in client.get('/').data
+        print(f"自訂壓力模型 AF = {result['af_p']}")
+    finally:
+        unregister_model('pressure')
+
+    assert 'af_p' not in AF_OUTPUT_KEYS and 'p_use' not in AF_DEFAULTS
+    print("✓ 自訂模型註冊測試通過")
+
+def test_fused_plan():
+    """測試評估計畫只包含啟用的模型，未啟用模型的參數不會被解析"""
+    print("\n=== 測試融合評估計畫 ===")
+
+    models, corrections, inputs = compile_plan(frozenset({'enable_temp', 'enable_hum'}))
+    assert [m.key for m in models] == ['temp', 'hum'] and corrections == ()
+    assert set(inputs) == {'ea', 't_use', 't_alt', 'rh_use', 'rh_alt', 'n_hum'}
+
+    # 未啟用模型的無效參數不影響計算
+    result = calculate_af({'t_alt': 85, 'nl_n': 'abc', 'em_j_use': None})
+    assert "error" not in result, result
+
+    # 一般溫度 + 濕度路徑在擴充模型註冊後仍維持同樣速度等級
+    n = 1000000
+    rng = np.random.default_rng(0)
+    params = {'t_alt': rng.uniform(60, 150, n), 'ea': rng.uniform(0.3, 1.2, n)}
+    start = time.perf_counter()
+    batch = calculate_af_batch(params)
+    elapsed = time.perf_counter() - start
+    assert batch['valid'].all()
+    print(f"溫度 + 濕度 {n:,} 列: {elapsed:.3f} s")
+
+    print("✓ 融合評估計畫測試通過")
+
+def test_validity_ranges():
+    """測試參數超出註冊有效範圍時的警告"""
+    print("\n=== 測試有效範圍檢查 ===")
+
+    ok = calculate_af({'rh_alt': 85})
+    assert 'warnings' not in ok
+
+    result = calculate_af({'rh_alt': 120})
+    assert "error" not in result and result['warnings'], result
+    print(f"警告: {result['warnings'][0]}")
+
+    batch = calculate_af_batch({'rh_alt': [85, 120], 'enable_vib': [False, False],
+                                'g_alt': 20})
+    assert batch['in_range'].tolist() == [True, False]
+
+    client = app.test_client()
+    data = client.post('/calculate_af_batch', json={'af_params': {'rh_alt': [85, 120]}}).get_json()
+    assert data['in_range'] == [True, False]
+
+    print("✓ 有效範圍檢查測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("應力模型註冊表測試")
+    print("=" * 60)
+
+    try:
+        test_registry_tables()
+        test_extension_models()
+        test_custom_model_registration()
+        test_fused_plan()
+        test_validity_ranges()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有應力模型註冊表測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,146 @@
+"""
+測試 AF 參數掃描
+驗證網格結果、分塊計算與 .npy 串流輸出
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_af
+from af_sweep import (prepare_af_sweep, sweep_to_array, iter_af_sweep, write_af_sweep_npy,
+                      parse_chunk_size, DEFAULT_CHUNK_SIZE, MIN_CHUNK_SIZE, MAX_CHUNK_SIZE)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+BASE_PARAMS = {
+    't_use': 32, 'rh_use': 60, 'ea': 0.7, 'n_hum': 2.0,
+    'enable_temp': True, 'enable_hum': True, 'enable_voltage': True,
+    'v_use': 1.0, 'v_alt': 1.2
+}
+
+def test_sweep_grid_matches_scalar():
+    """測試網格中每一點與 calculate_af 一致"""
+    print("\n=== 測試掃描網格與 calculate_af 一致 ===")
+
+    axes = {
+        'ea': {'start': 0.5, 'stop': 1.0, 'num': 4},
+        't_alt': [70, 85, 105],
+        'beta_v': {'values': [1.0, 2.5]}
+    }
+    plan = prepare_af_sweep(BASE_PARAMS, axes)
+    assert "error" not in plan, plan
+    assert plan["shape"] == (4, 3, 2)
+
+    grid = sweep_to_array(plan, chunk_size=5)  # 刻意使用小區塊
+
+    for i, ea in enumerate(plan["values"][0]):
+        for j, t_alt in enumerate(plan["values"][1]):
+            for k, beta_v in enumerate(plan["values"][2]):
+                params = dict(BASE_PARAMS, ea=ea, t_alt=t_alt, beta_v=beta_v)
+                expected = calculate_af(params)['af_total']
+                assert abs(grid[i, j, k] - expected) < 1e-3, \
+                    f"網格點 ({i},{j},{k}) 不一致: {grid[i, j, k]} vs {expected}"
+
+    print(f"✓ {plan['size']} 個網格點全部一致")
+
+def test_sweep_errors():
+    """測試不合法的掃描設定"""
+    print("\n=== 測試不合法的掃描設定 ===")
+
+    assert "error" in prepare_af_sweep(BASE_PARAMS, {})
+    assert "error" in prepare_af_sweep(BASE_PARAMS, {'not_a_param': [1, 2]})
+    assert "error" in prepare_af_sweep(BASE_PARAMS, {'ea': []})
+
+    print("✓ 錯誤處理測試通過")
+
+def test_sweep_npy_stream():
+    """測試 .npy 串流輸出可被 np.load 讀回"""
+    print("\n=== 測試 .npy 串流輸出 ===")
+
+    axes = {'ea': {'start': 0.3, 'stop': 1.2, 'num': 30},
+            'rh_alt': {'start': 60, 'stop': 98, 'num': 20}}
+    plan = prepare_af_sweep(BASE_PARAMS, axes)
+
+    buffer = io.BytesIO()
+    write_af_sweep_npy(plan, buffer, chunk_size=64, dtype=np.float32)
+    buffer.seek(0)
+    loaded = np.load(buffer)
+
+    expected = sweep_to_array(plan, dtype=np.float32)
+    assert loaded.shape == (30, 20) and loaded.dtype == np.float32
+    assert np.array_equal(loaded, expected)
+
+    client = app.test_client()
+    resp = client.post('/af_sweep', json={'af_params': BASE_PARAMS, 'axes': axes})
+    assert resp.status_code == 200
+    assert resp.headers['X-Sweep-Shape'] == '30,20'
+    streamed = np.load(io.BytesIO(resp.data))
+    assert np.allclose(streamed, expected, rtol=1e-6)
+
+    resp = client.post('/af_sweep', json={'af_params': BASE_PARAMS, 'axes': axes, 'format': 'json'})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert np.allclose(np.array(data['af_total']), expected, rtol=1e-6)
+
+    # chunk_size 限制於上下限之間，非整數時回傳 400
+    assert parse_chunk_size(None) == DEFAULT_CHUNK_SIZE
+    assert parse_chunk_size(0) == parse_chunk_size(-5) == MIN_CHUNK_SIZE
+    assert parse_chunk_size(10 ** 12) == MAX_CHUNK_SIZE and parse_chunk_size('4096') == 4096
+    for bad in (1.5, 'abc', True, [1]):
+        resp = client.post('/af_sweep', json={'af_params': BASE_PARAMS, 'axes': axes, 'chunk_size': bad})
+        assert resp.status_code == 400 and resp.get_json()['error'].startswith('AF 掃描錯誤'), bad
+    resp = client.post('/af_sweep', json={'af_params': BASE_PARAMS, 'axes': axes, 'chunk_size': 0})
+    assert resp.status_code == 200 and np.allclose(np.load(io.BytesIO(resp.data)), expected, rtol=1e-6)
+
+    print("✓ .npy 串流輸出測試通過")
+
+def test_sweep_memory_bounded():
+    """測試大型網格以固定大小區塊計算"""
+    print("\n=== 測試大型網格分塊計算 ===")
+
+    axes = {
+        'ea': {'start': 0.3, 'stop': 1.2, 'num': 100},
+        't_alt': {'start': 60, 'stop': 150, 'num': 100},
+        'rh_alt': {'start': 60, 'stop': 98, 'num': 50},
+        'n_hum': {'start': 1, 'stop': 4, 'num': 20}
+    }
+    plan = prepare_af_sweep(BASE_PARAMS, axes)
+
+    chunk_size = 100000
+    start_time = time.perf_counter()
+    largest = 0
+    af_max = 0.0
+    for _, values in iter_af_sweep(plan, chunk_size=chunk_size):
+        largest = max(largest, values.size)
+        af_max = max(af_max, float(np.nanmax(values)))
+    elapsed = time.perf_counter() - start_time
+
+    assert largest <= chunk_size, "區塊大小超過上限"
+    print(f"{plan['size']:,} 個網格點: {elapsed:.2f} s, 最大 AF = {af_max:.4g}")
+    print("✓ 分塊計算測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("AF 參數掃描測試")
+    print("=" * 60)
+
+    try:
+        test_sweep_grid_matches_scalar()
+        test_sweep_errors()
+        test_sweep_npy_stream()
+        test_sweep_memory_bounded()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有參數掃描測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
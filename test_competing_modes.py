@@ -0,0 +1,170 @@
+"""
+測試競爭失效模式分析
+驗證各模式擬合等同於以其他模式為截尾的單獨擬合、系統可靠度、各模式 AF、批次速度與 /competing_modes
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_af, calculate_weibull
+from weibull_mle import fit_weibull_mle
+from competing_modes import (calculate_competing_modes, mode_af_totals, system_reliability,
+                             system_metrics, parse_mode_records)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+AF_PARAMS = {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85}
+
+def competing_data(rng, n, modes=(('EM', 0.9, 800.0), ('wear', 3.0, 2000.0))):
+    """各模式獨立的潛在壽命取最小值，加上隨機截尾"""
+    latent = np.stack([eta * rng.weibull(beta, n) for _, beta, eta in modes])
+    censor = rng.uniform(500, 3000, n)
+    first = latent.argmin(axis=0)
+    life = latent.min(axis=0)
+    failed = life <= censor
+    names = np.array([m[0] for m in modes])
+    records = [{'time': float(t), 'mode': str(m)} for t, m in zip(life[failed], names[first[failed]])]
+    return records, censor[~failed].tolist()
+
+def test_per_mode_fits():
+    """測試每個模式的擬合等於以其他模式失效為截尾的單獨擬合"""
+    print("\n=== 測試各模式擬合 ===")
+
+    rng = np.random.default_rng(0)
+    records, suspensions = competing_data(rng, 200)
+    times, modes = parse_mode_records(records)
+    for regression in ('mle', 'rry'):
+        result = calculate_competing_modes(records, suspensions, AF_PARAMS,
+                                           options={'regression_method': regression})
+        for mode in result['modes']:
+            own = times[modes == mode['mode']]
+            others = np.r_[times[modes != mode['mode']], suspensions]
+            if regression == 'mle':
+                single = fit_weibull_mle(own, others)
+                assert abs(mode['beta'] - single['beta']) < 1e-4 and abs(mode['eta_alt'] / single['eta'] - 1) < 1e-6
+            else:
+                single = calculate_weibull(own.tolist(), others.tolist(), {})
+                assert abs(mode['beta'] - single['beta']) < 1e-4, (mode, single['beta'])
+                assert abs(mode['eta_alt'] / single['eta_alt'] - 1) < 1e-5
+        print(f"{regression.upper()}: " + "，".join(f"{m['mode']} β={m['beta']} η={m['eta_alt']}"
+                                                    for m in result['modes']))
+
+    print("✓ 各模式擬合測試通過")
+
+def test_system_reliability():
+    """測試系統可靠度為各模式可靠度的乘積，以及系統 Bx 壽命與 MTTF"""
+    print("\n=== 測試系統可靠度 ===")
+
+    rng = np.random.default_rng(1)
+    records, suspensions = competing_data(rng, 300)
+    result = calculate_competing_modes(records, suspensions, AF_PARAMS, options={'regression_method': 'mle'})
+    product = np.prod([m['r_mission'] for m in result['modes']])
+    assert abs(result['system']['r_mission'] - product) < 1e-5
+    assert result['system']['bx_life'] <= min(m['bx_life'] for m in result['modes'])
+
+    beta, eta = np.array([0.9, 3.0]), np.array([5e5, 1e6])
+    metrics = system_metrics(beta, eta, 17520, 10)
+    assert abs(system_reliability(beta, eta, metrics['bx_life']) - 0.9) < 1e-8
+    t = np.geomspace(1e-3, 5e7, 400001)
+    R = system_reliability(beta, eta, t)
+    assert abs(metrics['mttf_use'] / np.sum((R[1:] + R[:-1]) / 2 * np.diff(t)) - 1) < 1e-4
+
+    # 單一模式時即為 Weibull
+    single = system_metrics([2.0], [1000.0], 500, 10)
+    assert abs(single['bx_life'] - 1000 * (-np.log(0.9)) ** 0.5) < 1e-6
+    assert abs(single['mttf_use'] - 1000 * 0.886226925) < 1e-3
+
+    print(f"系統 R = {result['system']['r_mission']}，B1 = {result['system']['bx_life']} hrs")
+    print("✓ 系統可靠度測試通過")
+
+def test_mode_af():
+    """測試各模式覆寫加速模型參數時的 AF"""
+    print("\n=== 測試各模式 AF ===")
+
+    af = mode_af_totals(AF_PARAMS, ['EM', 'corrosion', 'wear'],
+                        {'EM': {'ea': 0.9}, 'corrosion': {'ea': 0.5, 'n': 2.0}})
+    expected = [calculate_af({**AF_PARAMS, 'ea': 0.9})['af_total'],
+                calculate_af({**AF_PARAMS, 'ea': 0.5, 'n': 2.0})['af_total'],
+                calculate_af(AF_PARAMS)['af_total']]
+    assert np.allclose(af['af_total'], expected, rtol=1e-5), (af['af_total'], expected)
+
+    shared = mode_af_totals(AF_PARAMS, ['a', 'b'])
+    assert np.allclose(shared['af_total'], calculate_af(AF_PARAMS)['af_total'], rtol=1e-5)
+
+    rng = np.random.default_rng(2)
+    records, suspensions = competing_data(rng, 150)
+    result = calculate_competing_modes(records, suspensions, AF_PARAMS, {'EM': {'ea': 0.9}})
+    em = next(m for m in result['modes'] if m['mode'] == 'EM')
+    assert abs(em['af_total'] / expected[0] - 1) < 1e-5
+    assert abs(em['eta_use'] / (em['eta_alt'] * em['af_total']) - 1) < 1e-5
+
+    print(f"AF: {np.round(af['af_total'], 2).tolist()}")
+    print("✓ 各模式 AF 測試通過")
+
+def test_batch_speed_and_errors():
+    """測試多個模式以一次批次計算完成，以及輸入錯誤"""
+    print("\n=== 測試批次速度與錯誤處理 ===")
+
+    rng = np.random.default_rng(3)
+    modes = tuple((f"mode{k}", 1 + k % 3, 2000.0 + 100 * k) for k in range(20))
+    records, suspensions = competing_data(rng, 20000, modes)
+    start = time.perf_counter()
+    result = calculate_competing_modes(records, suspensions, AF_PARAMS, options={'regression_method': 'mle'})
+    elapsed = time.perf_counter() - start
+    assert "error" not in result, result
+    assert len(result['modes']) == 20 and elapsed < 2.0, elapsed
+    print(f"20 個模式、{len(records)} 筆失效 = {elapsed * 1000:.0f} ms")
+
+    assert "error" in calculate_competing_modes([{'time': 100, 'mode': 'a'}, {'time': 200, 'mode': 'a'},
+                                                 {'time': 300, 'mode': 'b'}])
+    assert "error" in calculate_competing_modes([[100, 'a'], [200, None]])
+    assert "error" in calculate_competing_modes({'times': [100, -5], 'modes': ['a', 'a']})
+
+    print("✓ 批次速度與錯誤處理測試通過")
+
+def test_endpoint():
+    """測試 /competing_modes"""
+    print("\n=== 測試 /competing_modes ===")
+
+    client = app.test_client()
+    rng = np.random.default_rng(4)
+    records, suspensions = competing_data(rng, 100)
+    resp = client.post('/competing_modes', json={
+        'failures': records, 'suspensions': suspensions, 'af_params': AF_PARAMS,
+        'mode_af_params': {'EM': {'ea': 0.9}}, 'options': {'bx_life_percent': 10}, 'mission_years': 5
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert {m['mode'] for m in data['modes']} == {'EM', 'wear'} and data['bx_percent'] == 10
+
+    resp = client.post('/competing_modes', json={'failures': [[100, 'a']]})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('失效模式分析錯誤')
+
+    print("✓ /competing_modes 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("競爭失效模式測試")
+    print("=" * 60)
+
+    try:
+        test_per_mode_fits()
+        test_system_reliability()
+        test_mode_af()
+        test_batch_speed_and_errors()
+        test_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有競爭失效模式測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,166 @@
+"""
+測試廣義 Eyring 模型擬合
+驗證解析梯度、參數回推、截尾、代回 calculate_af、速度與 API
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_af
+from eyring_fit import fit_eyring, _weibull_regression_derivatives
+from af_models import KB
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+TRUE = {'ln_a': -12.0, 'b': 2.0, 'ea': 0.7, 'd': 0.01}
+BETA = 2.5
+
+def simulate(rng, n=40, temps=(85, 105, 125), stresses=(3.0, 3.6, 4.2), censor=None):
+    """由 Eyring-Weibull 模型產生 溫度 × 電壓 試驗組數據 (可設定定時截尾)"""
+    cells = []
+    for temp in temps:
+        for stress in stresses:
+            temp_k = temp + 273.15
+            eta = np.exp(TRUE['ln_a'] - TRUE['b'] * np.log(stress) +
+                         TRUE['ea'] / (KB * temp_k) + TRUE['d'] * stress / temp_k)
+            times = eta * rng.weibull(BETA, n)
+            cell = {'temp': temp, 'stress': stress}
+            if censor is None:
+                cell['failures'] = times.tolist()
+            else:
+                cell['failures'] = times[times < censor].tolist()
+                cell['suspensions'] = [censor] * int((times >= censor).sum())
+            cells.append(cell)
+    return cells
+
+def test_gradient():
+    """測試解析梯度、Hessian 與數值差分一致"""
+    print("\n=== 測試解析梯度 ===")
+
+    rng = np.random.default_rng(0)
+    Z = np.concatenate([np.ones((1, 50, 1)), rng.normal(0, 1, (1, 50, 3))], axis=2)
+    Y = rng.normal(5, 1, (1, 50))
+    Dl = (rng.random((1, 50)) < 0.7).astype(float)
+    M = np.ones_like(Y)
+    theta = np.array([[5.0, 0.3, -0.2, 0.1, np.log(1.5)]])
+    _, grad, hess = _weibull_regression_derivatives(theta, Z, Y, Dl, M)
+    eps = 1e-6
+    for j in range(theta.shape[1]):
+        step = np.zeros_like(theta)
+        step[0, j] = eps
+        ll_p, g_p, _ = _weibull_regression_derivatives(theta + step, Z, Y, Dl, M)
+        ll_m, g_m, _ = _weibull_regression_derivatives(theta - step, Z, Y, Dl, M)
+        assert abs((ll_p - ll_m)[0] / (2 * eps) - grad[0, j]) < 1e-4 * (1 + abs(grad[0, j]))
+        assert np.allclose((g_p - g_m)[0] / (2 * eps), hess[0, j], rtol=1e-4, atol=1e-4)
+
+    print("✓ 解析梯度測試通過")
+
+def test_recovery_and_speed():
+    """測試大量數據下回推真值，且數十組、數千筆失效仍快速求解"""
+    print("\n=== 測試參數回推與速度 ===")
+
+    rng = np.random.default_rng(1)
+    cells = simulate(rng, n=100, temps=(65, 75, 85, 95, 105, 115, 125, 135),
+                     stresses=(2.5, 3.0, 3.5, 4.0, 4.5))
+    start = time.perf_counter()
+    result = fit_eyring(cells)
+    elapsed = time.perf_counter() - start
+
+    assert result['converged'] and result['n_cells'] == 40 and result['n_failures'] == 4000
+    for name, true in TRUE.items():
+        p = result['params'][name]
+        assert abs(p['value'] - true) < 4 * p['se'], f"{name} = {p['value']} ± {p['se']}"
+    assert abs(result['beta'] - BETA) < 0.1
+    assert elapsed < 1.0, f"擬合時間 {elapsed:.3f} s"
+
+    print(f"40 組 / 4000 筆失效: {elapsed:.3f} s，Ea = {result['params']['ea']['value']}，"
+          f"β = {result['beta']}")
+    print("✓ 參數回推與速度測試通過")
+
+def test_censoring_and_no_interaction():
+    """測試截尾數據與不含交互作用項 (D = 0) 的擬合"""
+    print("\n=== 測試截尾與無交互作用模型 ===")
+
+    rng = np.random.default_rng(2)
+    eas = []
+    for _ in range(30):
+        result = fit_eyring(simulate(rng, censor=3000.0), interaction=False)
+        assert result['converged'] and result['params']['d']['value'] == 0.0
+        assert len(result['cov']) == 4
+        eas.append(result['params']['ea']['value'])
+    assert result['n_suspensions'] > 0
+    assert abs(np.mean(eas) - TRUE['ea']) < 0.03, f"截尾平均 Ea = {np.mean(eas)}"
+
+    print(f"截尾數據 30 組平均 Ea = {np.mean(eas):.4f} (真值 {TRUE['ea']})")
+    print("✓ 截尾與無交互作用測試通過")
+
+def test_af_round_trip():
+    """測試擬合結果代回 calculate_af 與直接計算的 AF 一致"""
+    print("\n=== 測試代回 AF 計算 ===")
+
+    rng = np.random.default_rng(3)
+    use, alt = {'temp': 40, 'stress': 1.2}, {'temp': 125, 'stress': 4.2}
+    result = fit_eyring(simulate(rng), use=use, alt=alt)
+    af_params = dict(result['af_params'], t_use=40, t_alt=125, v_use=1.2, v_alt=4.2)
+    af = calculate_af(af_params)['af_total']
+    assert abs(af / result['af']['af'] - 1) < 1e-4, f"{af} vs {result['af']['af']}"
+    assert result['af']['lower'] < result['af']['af'] < result['af']['upper']
+
+    # 濕度應力：代回 rh_use / rh_alt
+    cells = [dict(cell, stress=cell['stress'] * 20) for cell in simulate(rng)]
+    result_rh = fit_eyring(cells, stress_type='humidity', use={'temp': 40, 'stress': 50},
+                           alt={'temp': 125, 'stress': 85})
+    af_rh = calculate_af(dict(result_rh['af_params'], t_use=40, t_alt=125, rh_use=50, rh_alt=85))['af_total']
+    assert abs(af_rh / result_rh['af']['af'] - 1) < 1e-4, f"{af_rh} vs {result_rh['af']['af']}"
+
+    print(f"AF = {result['af']['af']} [{result['af']['lower']}, {result['af']['upper']}]，"
+          f"calculate_af = {af}")
+    print("✓ 代回 AF 計算測試通過")
+
+def test_errors_and_endpoint():
+    """測試錯誤處理與 /fit_eyring API"""
+    print("\n=== 測試錯誤處理與 API ===")
+
+    assert "error" in fit_eyring([])
+    one_temp = [{'temp': 85, 'stress': s, 'failures': [100, 200]} for s in (3, 4)]
+    assert "error" in fit_eyring(one_temp), "單一溫度無法估計 Ea"
+    assert "error" in fit_eyring(simulate(np.random.default_rng(4)), stress_type='uv')
+
+    client = app.test_client()
+    resp = client.post('/fit_eyring', json={'cells': simulate(np.random.default_rng(5)),
+                                            'stress_type': 'voltage',
+                                            'use': {'temp': 40, 'stress': 1.2},
+                                            'alt': {'temp': 125, 'stress': 4.2}})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['af_params']['eyring_stress_type'] == 'voltage' and 'af' in data
+    assert client.post('/fit_eyring', json={'cells': one_temp}).status_code == 400
+
+    print("✓ 錯誤處理與 API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("廣義 Eyring 模型擬合測試")
+    print("=" * 60)
+
+    try:
+        test_gradient()
+        test_recovery_and_speed()
+        test_censoring_and_no_interaction()
+        test_af_round_trip()
+        test_errors_and_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有 Eyring 模型擬合測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
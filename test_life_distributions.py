@@ -0,0 +1,227 @@
+"""
+測試多分佈壽命擬合與模型排序
+驗證各分佈 MLE (封閉解與通用最佳化)、截尾 Anderson-Darling、排序結果、速度、
+可靠度指標的 AF 換算與 /calculate 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import optimize
+from app import app, calculate_reliability_results
+from weibull_mle import prepare_sample
+from life_distributions import (rank_distributions, frozen_distribution, distribution_reliability,
+                                anderson_darling, _sample_stats, DISTRIBUTIONS)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def candidates_by_name(ranking):
+    return {c['name']: c for c in ranking['candidates']}
+
+def test_closed_forms():
+    """測試無截尾時 lognormal / normal / exponential 與封閉解相同"""
+    print("\n=== 測試封閉解 ===")
+
+    rng = np.random.default_rng(0)
+    failures = np.exp(rng.normal(7, 0.8, 60))
+    fits = candidates_by_name(rank_distributions(failures))
+    log_t = np.log(failures)
+    assert abs(fits['lognormal']['params']['mu'] - log_t.mean()) < 1e-5
+    assert abs(fits['lognormal']['params']['sigma'] - log_t.std()) < 1e-5
+    assert abs(fits['normal']['params']['mu'] / failures.mean() - 1) < 1e-6
+    assert abs(fits['normal']['params']['sigma'] / failures.std() - 1) < 1e-6
+    assert abs(fits['exponential']['params']['mttf'] / failures.mean() - 1) < 1e-6
+
+    # AIC / BIC 與對數概似的關係
+    c = fits['gamma']
+    assert abs(c['aic'] - (4 - 2 * c['log_likelihood'])) < 1e-3
+    assert abs(c['bic'] - (2 * np.log(60) - 2 * c['log_likelihood'])) < 1e-3
+
+    print("✓ 封閉解測試通過")
+
+def test_censored_mle():
+    """測試右截尾數據的各分佈 MLE 與通用最佳化 (Nelder-Mead) 一致"""
+    print("\n=== 測試截尾 MLE ===")
+
+    rng = np.random.default_rng(1)
+    life = 1000 * rng.weibull(1.8, 80)
+    censor = rng.uniform(300, 2500, 80)
+    failures, suspensions = life[life <= censor], censor[life > censor]
+    fits = candidates_by_name(rank_distributions(failures, suspensions))
+
+    def neg_ll(name, keys, x):
+        params = dict(zip(keys, x))
+        for k in keys:
+            if k not in ('mu',):
+                params[k] = np.exp(params[k])
+        dist = frozen_distribution(name, params)
+        return -(dist.logpdf(failures).sum() + dist.logsf(suspensions).sum())
+
+    for name, keys in (('lognormal', ('mu', 'sigma')), ('normal', ('mu', 'sigma')),
+                       ('loglogistic', ('beta', 'alpha')), ('gamma', ('shape', 'scale')),
+                       ('weibull', ('beta', 'eta'))):
+        fit = fits[name]
+        start = [fit['params'][k] if k == 'mu' else np.log(fit['params'][k]) * 1.05 for k in keys]
+        best = optimize.minimize(lambda x: neg_ll(name, keys, x), start, method='Nelder-Mead',
+                                 options={'xatol': 1e-10, 'fatol': 1e-12, 'maxiter': 10000})
+        assert fit['log_likelihood'] >= -best.fun - 1e-3, (name, fit['log_likelihood'], -best.fun)
+        print(f"{name}: ℓ = {fit['log_likelihood']} (Nelder-Mead {-best.fun:.4f})")
+
+    print("✓ 截尾 MLE 測試通過")
+
+def test_anderson_darling():
+    """測試無截尾時 Anderson-Darling 統計量與標準公式相同，截尾時為有限正值"""
+    print("\n=== 測試 Anderson-Darling ===")
+
+    rng = np.random.default_rng(2)
+    failures = np.sort(1000 * rng.weibull(2.0, 40))
+    s = _sample_stats(*prepare_sample(failures))
+    dist = frozen_distribution('weibull', {'beta': 2.0, 'eta': 1000.0})
+    F = dist.cdf(failures)
+    i = np.arange(1, 41)
+    classic = -40 - np.sum((2 * i - 1) / 40 * (np.log(F) + np.log1p(-F[::-1])))
+    assert abs(anderson_darling(s, dist) - classic) < 1e-8, (anderson_darling(s, dist), classic)
+
+    s = _sample_stats(*prepare_sample(failures[:30], [failures[30]] * 10))
+    value = anderson_darling(s, dist)
+    assert np.isfinite(value) and value > 0
+    print(f"A² = {classic:.4f}，截尾後 A² = {value:.4f}")
+
+    print("✓ Anderson-Darling 測試通過")
+
+def test_ranking_and_speed():
+    """測試大樣本時排序第一者為真實分佈，以及一次完整擬合與排序只需數十毫秒"""
+    print("\n=== 測試排序與速度 ===")
+
+    rng = np.random.default_rng(3)
+    samples = {
+        'lognormal': np.exp(rng.normal(7, 0.5, 2000)),
+        'weibull': 1000 * rng.weibull(3.0, 2000),
+        'exponential': rng.exponential(1000, 2000),
+    }
+    for truth, failures in samples.items():
+        ranking = rank_distributions(failures, None, {'rank_by': 'bic'})
+        assert ranking['best'] == truth, (truth, ranking['best'])
+        assert [c['rank'] for c in ranking['candidates'] if c['rank']] == list(range(1, 1 + sum(
+            1 for c in ranking['candidates'] if c['rank'])))
+
+    ranking = rank_distributions(samples['weibull'][:50], None, {'rank_by': 'ad'})
+    ads = [c['ad'] for c in ranking['candidates'] if c['rank']]
+    assert ads == sorted(ads)
+
+    failures = np.exp(rng.normal(7, 0.8, 50))
+    rank_distributions(failures, [3000.0] * 10, {'n_total': 80})
+    start = time.perf_counter()
+    for _ in range(10):
+        ranking = rank_distributions(failures, [3000.0] * 10, {'n_total': 80})
+    elapsed = (time.perf_counter() - start) / 10
+    assert elapsed < 0.1, elapsed
+    assert len(ranking['candidates']) == len(DISTRIBUTIONS) and ranking['n_units'] == 80
+    print(f"{len(DISTRIBUTIONS)} 個分佈擬合與排序 = {elapsed * 1000:.1f} ms，最佳 {ranking['best']}")
+
+    assert "error" in rank_distributions([100.0])
+    assert "error" in rank_distributions(failures, None, {'rank_by': 'r2'})
+    assert "error" in rank_distributions(failures, None, {'candidates': ['cauchy']})
+    result = rank_distributions(failures, None, {'candidates': 'weibull'})
+    assert result['error'] == "候選分佈需為分佈名稱列表", result
+
+    # 相同時間的觀測合併為權重後，概似與逐筆計算相同
+    tied = np.repeat(np.round(failures[:10]), 3)
+    merged = rank_distributions(tied, [3000.0] * 5)
+    assert merged['n_units'] == 35 and merged['n_failures'] == 30
+    for c in merged['candidates']:
+        if c['rank'] and c['name'] != 'weibull_3p':
+            dist = frozen_distribution(c['name'], c['params'])
+            ll = dist.logpdf(tied).sum() + 5 * dist.logsf(3000.0)
+            assert abs(ll - c['log_likelihood']) < 1e-2, (c['name'], ll, c['log_likelihood'])
+
+    # 較大樣本 (n = 1000，含截尾) 仍維持數十毫秒
+    failures = np.exp(rng.normal(7, 0.8, 1000))
+    start = time.perf_counter()
+    ranking = rank_distributions(failures, [3000.0] * 200)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.1, elapsed
+    print(f"n = 1200 擬合與排序 = {elapsed * 1000:.1f} ms")
+
+    print("✓ 排序與速度測試通過")
+
+def test_reliability_metrics():
+    """測試選用分佈的可靠度指標以 AF 換算，Weibull 時與 calculate_reliability_results 相同"""
+    print("\n=== 測試選用分佈的可靠度指標 ===")
+
+    af, t_mission = 25.0, 17520
+    results = calculate_reliability_results(af, {"beta": 1.7, "eta_alt": 1200.0}, None, t_mission, 10,
+                                            {"name": "weibull", "params": {"beta": 1.7, "eta": 1200.0}})
+    weibull, dist = results['weibull'], results['distribution']
+    assert abs(dist['mttf_use'] - weibull['mttf_use']) < 0.02
+    assert abs(dist['bx_life'] - weibull['bx_life']) < 0.02
+    assert abs(dist['r_mission'] - weibull['r_mission']) < 1e-6
+
+    lognormal = distribution_reliability('lognormal', {'mu': 7.0, 'sigma': 0.5}, af, t_mission, 50)
+    assert abs(lognormal['bx_life'] - af * np.exp(7.0)) < 0.01
+    assert 'distribution' not in calculate_reliability_results(af, {"beta": 1.7, "eta_alt": 1200.0}, None)
+
+    print("✓ 選用分佈的可靠度指標測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 附帶分佈排序與選用分佈的可靠度"""
+    print("\n=== 測試 /calculate 多分佈擬合 ===")
+
+    client = app.test_client()
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': [420, 610, 700, 880, 950, 1100, 1240, 1500],
+                         'suspensions': [1600, 1600], 'options': {}},
+        'mission_years': 2
+    }
+    # 未要求時不進行多分佈擬合
+    data = client.post('/calculate', json=payload).get_json()
+    assert 'distribution_result' not in data and 'distribution' not in data['reliability_result']
+
+    payload['weibull_data']['options'] = {'rank_by': 'aic'}
+    data = client.post('/calculate', json=payload).get_json()
+    ranking = data['distribution_result']
+    assert ranking['rank_by'] == 'aic'
+    assert data['reliability_result']['distribution']['distribution'] == ranking['best']
+
+    payload['weibull_data']['options'] = {'distribution': 'gamma', 'rank_by': 'bic'}
+    data = client.post('/calculate', json=payload).get_json()
+    assert data['reliability_result']['distribution']['distribution'] == 'gamma'
+
+    payload['weibull_data']['options'] = {'distribution': 'cauchy'}
+    resp = client.post('/calculate', json=payload)
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('分佈擬合錯誤')
+
+    # 分組數據不進行多分佈擬合
+    payload['weibull_data'] = {'bins': [[0, 500, 3, 10], [500, 1000, 8, 12]]}
+    assert 'distribution_result' not in client.post('/calculate', json=payload).get_json()
+
+    print("✓ /calculate 多分佈擬合測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("多分佈擬合與排序測試")
+    print("=" * 60)
+
+    try:
+        test_closed_forms()
+        test_censored_mle()
+        test_anderson_darling()
+        test_ranking_and_speed()
+        test_reliability_metrics()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有多分佈擬合測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,243 @@
+"""
+測試壽命-應力模型聯合擬合
+驗證解析梯度、參數回推與速度 (Weibull / Lognormal)、與 fit_eyring 及數值最佳化一致、
+代回 calculate_af、使用條件壽命與 API
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import stats, optimize
+from app import app, calculate_af
+from eyring_fit import fit_eyring
+from life_stress import fit_life_stress, _regression_derivatives
+from af_models import KB
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+TRUE = {'ln_a': -10.0, 'ea': 0.7, 'n': 2.0}
+SHAPE = {'weibull': 2.0, 'lognormal': 0.6}
+
+def simulate(rng, distribution='weibull', n=50, temps=(85, 95, 105, 115, 125, 135), rhs=(60, 75, 85),
+             censor_quantile=None):
+    """由 Peck-Weibull (或 Lognormal) 模型產生 溫度 × 濕度 試驗組數據 (可設定定時截尾)"""
+    cells = []
+    for temp in temps:
+        for rh in rhs:
+            scale = np.exp(TRUE['ln_a'] + TRUE['ea'] / (KB * (temp + 273.15)) - TRUE['n'] * np.log(rh))
+            if distribution == 'weibull':
+                times = scale * rng.weibull(SHAPE['weibull'], n)
+            else:
+                times = scale * np.exp(SHAPE['lognormal'] * rng.standard_normal(n))
+            cell = {'temp': temp, 'rh': rh}
+            if censor_quantile is None:
+                cell['failures'] = times.tolist()
+            else:
+                censor = float(np.quantile(times, censor_quantile))
+                cell['failures'] = times[times < censor].tolist()
+                cell['suspensions'] = [censor] * int((times >= censor).sum())
+            cells.append(cell)
+    return cells
+
+def test_gradient():
+    """測試兩種分佈族的解析梯度、Hessian 與數值差分一致 (含權重與截尾)"""
+    print("\n=== 測試解析梯度 ===")
+
+    rng = np.random.default_rng(0)
+    Z = np.c_[np.ones(60), rng.normal(0, 1, (60, 2))]
+    y = rng.normal(5, 1, 60)
+    d = rng.random(60) < 0.7
+    w = rng.integers(1, 4, 60).astype(float)
+    theta = np.array([5.0, 0.3, -0.2, np.log(0.8)])
+    eps = 1e-6
+    for family in ('sev', 'normal'):
+        _, grad, hess = _regression_derivatives(theta, Z, y, d, w, family)
+        for j in range(theta.size):
+            step = np.zeros_like(theta)
+            step[j] = eps
+            ll_p, g_p, _ = _regression_derivatives(theta + step, Z, y, d, w, family)
+            ll_m, g_m, _ = _regression_derivatives(theta - step, Z, y, d, w, family)
+            assert abs((ll_p - ll_m) / (2 * eps) - grad[j]) < 1e-4 * (1 + abs(grad[j])), (family, j)
+            assert np.allclose((g_p - g_m) / (2 * eps), hess[j], rtol=1e-4, atol=1e-4), (family, j)
+
+    print("✓ 解析梯度測試通過")
+
+def test_recovery_and_speed():
+    """測試 18 組含截尾數據回推真值 (Weibull / Lognormal)，且擬合遠低於 1 秒"""
+    print("\n=== 測試參數回推與速度 ===")
+
+    for distribution, shape_name in (('weibull', 'beta'), ('lognormal', 'sigma')):
+        cells = simulate(np.random.default_rng(1), distribution, n=100, censor_quantile=0.7)
+        start = time.perf_counter()
+        result = fit_life_stress(cells, 'peck', distribution)
+        elapsed = time.perf_counter() - start
+
+        assert result['converged'] and result['n_cells'] == 18 and result['n_suspensions'] > 0
+        for name, true in TRUE.items():
+            p = result['params'][name]
+            assert abs(p['value'] - true) < 4 * p['se'], f"{distribution} {name} = {p['value']} ± {p['se']}"
+        assert result[f'{shape_name}_lower'] < SHAPE[distribution] < result[f'{shape_name}_upper']
+        assert elapsed < 0.2, f"擬合時間 {elapsed:.3f} s"
+
+        # 模型比較：正確的分佈 AIC 較小
+        other = 'lognormal' if distribution == 'weibull' else 'weibull'
+        assert result['aic'] < fit_life_stress(cells, 'peck', other)['aic']
+        print(f"{distribution}: 18 組 / {result['n_failures']} 筆失效 {elapsed * 1000:.1f} ms，"
+              f"Ea = {result['params']['ea']['value']}，n = {result['params']['n']['value']}，"
+              f"{shape_name} = {result[shape_name]}")
+
+    print("✓ 參數回推與速度測試通過")
+
+def test_matches_reference():
+    """測試 Eyring-Weibull 與 fit_eyring 相同，Lognormal 與數值最佳化相同"""
+    print("\n=== 測試與參考解一致 ===")
+
+    rng = np.random.default_rng(2)
+    cells = []
+    for temp in (85, 105, 125):
+        for stress in (3.0, 3.6, 4.2):
+            eta = np.exp(-12 - 2 * np.log(stress) + 0.7 / (KB * (temp + 273.15)) + 0.01 * stress / (temp + 273.15))
+            times = eta * rng.weibull(2.5, 30)
+            cells.append({'temp': temp, 'stress': stress, 'failures': times[times < 3000].tolist(),
+                          'suspensions': [3000.0] * int((times >= 3000).sum())})
+    result = fit_life_stress(cells, 'eyring', 'weibull')
+    reference = fit_eyring(cells)
+    for name in ('ln_a', 'b', 'ea', 'd'):
+        assert np.isclose(result['params'][name]['value'], reference['params'][name]['value'], rtol=1e-4, atol=1e-5), name
+        assert np.isclose(result['params'][name]['se'], reference['params'][name]['se'], rtol=1e-3), name
+    assert np.isclose(result['beta'], reference['beta'], rtol=1e-5)
+    assert np.isclose(result['log_likelihood'], reference['log_likelihood'], rtol=1e-6)
+    assert set(result['af_params']) == set(reference['af_params'])
+    for key, value in reference['af_params'].items():
+        assert result['af_params'][key] == value or np.isclose(result['af_params'][key], value, rtol=1e-4), key
+
+    # Lognormal-Arrhenius：直接以 scipy 最小化時間尺度的負對數概似
+    rng = np.random.default_rng(3)
+    cells = [{'temp': temp, 'failures': (np.exp(-11 + 0.6 / (KB * (temp + 273.15)) + 0.5 * z)).tolist()}
+             for temp, z in zip((100, 120, 140), rng.standard_normal((3, 20)))]
+    for cell in cells:
+        times = np.array(cell['failures'])
+        cell['failures'] = times[times < 2000].tolist()
+        cell['suspensions'] = [2000.0] * int((times >= 2000).sum())
+    result = fit_life_stress(cells, 'arrhenius', 'lognormal')
+
+    def neg_ll(x):
+        total = 0.0
+        for cell in cells:
+            mu = x[0] + x[1] / (KB * (cell['temp'] + 273.15))
+            total += stats.lognorm.logpdf(cell['failures'], x[2], scale=np.exp(mu)).sum()
+            total += stats.lognorm.logsf(cell['suspensions'], x[2], scale=np.exp(mu)).sum()
+        return -total
+    x0 = [result['params']['ln_a']['value'] + 0.3, result['params']['ea']['value'] - 0.01, 0.6]
+    opt = optimize.minimize(neg_ll, x0, method='Nelder-Mead',
+                            options={'xatol': 1e-8, 'fatol': 1e-10, 'maxiter': 20000})
+    assert abs(-opt.fun - result['log_likelihood']) < 1e-4, (-opt.fun, result['log_likelihood'])
+    assert abs(opt.x[1] - result['params']['ea']['value']) < 1e-3
+    assert abs(opt.x[2] - result['sigma']) < 1e-3
+
+    print(f"Eyring Ea = {reference['params']['ea']['value']}；Lognormal ln L = {result['log_likelihood']}"
+          f" (scipy {-opt.fun:.6f})")
+    print("✓ 參考解一致測試通過")
+
+def test_af_and_use_life():
+    """測試擬合結果代回 calculate_af，以及使用條件下的壽命與區間"""
+    print("\n=== 測試代回 AF 與使用條件壽命 ===")
+
+    cells = simulate(np.random.default_rng(4))
+    use, alt = {'temp': 30, 'rh': 50}, {'temp': 85, 'rh': 85}
+    result = fit_life_stress(cells, 'peck', use=use, alt=alt, bx_percent=10, t_mission=17520)
+    af_params = dict(result['af_params'], t_use=30, t_alt=85, rh_use=50, rh_alt=85)
+    af = calculate_af(af_params)['af_total']
+    assert abs(af / result['af']['af'] - 1) < 1e-4, f"{af} vs {result['af']['af']}"
+    assert result['af']['lower'] < result['af']['af'] < result['af']['upper']
+
+    u = result['use']
+    ln_eta = (result['params']['ln_a']['value'] + result['params']['ea']['value'] / (KB * 303.15)
+              - result['params']['n']['value'] * np.log(50))
+    assert abs(u['eta'] / np.exp(ln_eta) - 1) < 1e-4
+    assert abs(u['bx_life'] / (u['eta'] * (-np.log(0.9)) ** (1 / result['beta'])) - 1) < 1e-4
+    assert abs(u['r_mission'] - np.exp(-(17520 / u['eta']) ** result['beta'])) < 1e-5
+    assert u['bx_life_lower'] < u['bx_life'] < u['bx_life_upper']
+
+    # IPL 代回電壓 AF
+    rng = np.random.default_rng(5)
+    ipl = [{'stress': v, 'failures': (np.exp(20 - 3 * np.log(v)) * rng.weibull(1.5, 30)).tolist()}
+           for v in (5, 6, 7, 8)]
+    result = fit_life_stress(ipl, 'ipl', use={'stress': 1.2}, alt={'stress': 8})
+    af = calculate_af(dict(result['af_params'], v_use=1.2, v_alt=8))
+    assert abs(af['af_total'] / result['af']['af'] - 1) < 1e-4
+
+    # Arrhenius 代回時不計入預設啟用的濕度 AF
+    cells = [{'temp': temp, 'failures': (np.exp(-11 + 0.6 / (KB * (temp + 273.15))) * rng.weibull(2.0, 20)).tolist()}
+             for temp in (100, 120, 140)]
+    result = fit_life_stress(cells, 'arrhenius', use={'temp': 30}, alt={'temp': 120})
+    af = calculate_af(dict(result['af_params'], t_use=30, t_alt=120, rh_use=50, rh_alt=85))
+    assert abs(af['af_total'] / result['af']['af'] - 1) < 1e-4
+
+    print(f"Peck Ea = {af_params['ea']} eV / n = {af_params['n_hum']}；"
+          f"使用條件 B10 = {u['bx_life']} [{u['bx_life_lower']}, {u['bx_life_upper']}]")
+    print("✓ 代回 AF 與使用條件壽命測試通過")
+
+def test_errors_and_endpoint():
+    """測試錯誤處理與 /fit_life_stress API"""
+    print("\n=== 測試錯誤處理與 API ===")
+
+    cells = simulate(np.random.default_rng(6), n=20)
+    assert "error" in fit_life_stress([])
+    assert "error" in fit_life_stress(cells, model='coffin')
+    assert "error" in fit_life_stress(cells, distribution='gamma')
+    assert fit_life_stress(cells, model='ipl')['error'] == "第 1 個試驗組: 缺少應力欄位 'stress'"
+    missing_rh = [dict(cell) for cell in cells]
+    del missing_rh[2]['rh']
+    assert fit_life_stress(missing_rh, 'peck')['error'] == "第 3 個試驗組: 缺少相對濕度欄位 'rh'"
+    missing_rh[2]['rh'] = 'high'
+    assert fit_life_stress(missing_rh, 'peck')['error'] == "第 3 個試驗組: 相對濕度欄位 'rh' 需為數值"
+    assert fit_life_stress(cells, 'peck', use={'temp': 30})['error'] == "使用條件: 缺少相對濕度欄位 'rh'"
+    one_temp = [{'temp': 85, 'rh': rh, 'failures': [100, 200]} for rh in (60, 85)]
+    assert "error" in fit_life_stress(one_temp, 'peck'), "單一溫度無法估計 Ea"
+    assert "error" in fit_life_stress([{'temp': 85, 'failures': [-1]}])
+    assert "error" in fit_life_stress(cells, 'peck', conf_level=1.5)
+
+    client = app.test_client()
+    resp = client.post('/fit_life_stress', json={'cells': cells, 'model': 'peck', 'distribution': 'lognormal',
+                                                 'use': {'temp': 30, 'rh': 50}, 'alt': {'temp': 85, 'rh': 85},
+                                                 'weibull_data': {'options': {'bx_life_percent': 10}},
+                                                 'mission_years': 5})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['af_params']['n_hum'] > 0 and 'af' in data and 'sigma' in data
+    assert data['use']['bx_percent'] == 10 and data['use']['t_mission'] == 5 * 8760
+    resp = client.post('/fit_life_stress', json={'cells': one_temp, 'model': 'peck'})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('壽命-應力模型擬合錯誤')
+    resp = client.post('/fit_life_stress', json={'cells': [{'temp': 85, 'failures': [100, 200]}], 'model': 'peck'})
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == "壽命-應力模型擬合錯誤: 第 1 個試驗組: 缺少相對濕度欄位 'rh'"
+
+    print("✓ 錯誤處理與 API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("壽命-應力模型聯合擬合測試")
+    print("=" * 60)
+
+    try:
+        test_gradient()
+        test_recovery_and_speed()
+        test_matches_reference()
+        test_af_and_use_life()
+        test_errors_and_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有壽命-應力模型擬合測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
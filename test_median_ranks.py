@@ -0,0 +1,146 @@
+"""
+測試向量化中位秩引擎
+驗證各方法與逐點公式一致、Johnson 調整秩、Kaplan-Meier、秩表快取與大樣本效能
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import stats, special
+from app import calculate_weibull
+from median_ranks import median_ranks, rank_table, beta_median, RANK_CACHE_SIZE, EXACT_SWITCH
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def johnson_reference(failures, suspensions, n):
+    """逐點計算 Johnson 調整秩 (教科書迴圈寫法)"""
+    items = sorted([(t, 0) for t in failures] + [(t, 1) for t in suspensions])
+    order, out = 0.0, []
+    for position, (_, suspended) in enumerate(items, 1):
+        if not suspended:
+            reverse_rank = n - position + 1
+            order += (n + 1 - order) / (reverse_rank + 1)
+            out.append(order)
+    return np.array(out)
+
+def test_complete_data_formulas():
+    """測試無截尾時各方法與逐點公式一致"""
+    print("\n=== 測試無截尾中位秩 ===")
+
+    failures = [300, 100, 250, 150, 200]
+    n = 64
+    i = np.arange(1, 6)
+    expected = {
+        'benard': (i - 0.3) / (n + 0.4),
+        'exact': np.array([stats.beta.ppf(0.5, k, n - k + 1) for k in i]),
+        'mean': i / (n + 1),
+        'km': i / n,
+        'johnson': (i - 0.3) / (n + 0.4),
+    }
+    for method, values in expected.items():
+        t, f = median_ranks(failures, None, method, n)
+        assert list(t) == sorted(failures)
+        assert np.allclose(f, values, rtol=1e-12), method
+
+    print("✓ 無截尾中位秩測試通過")
+
+def test_suspensions():
+    """測試 Johnson 調整秩與 Kaplan-Meier 處理截尾"""
+    print("\n=== 測試截尾調整秩 ===")
+
+    failures, suspensions = [10, 30, 45, 60, 80], [20, 50, 70]
+    order = johnson_reference(failures, suspensions, 8)
+
+    _, f_mean = median_ranks(failures, suspensions, 'mean')
+    assert np.allclose(f_mean * 9, order)
+    _, f_johnson = median_ranks(failures, suspensions, 'johnson')
+    assert np.allclose(f_johnson, (order - 0.3) / 8.4)
+    _, f_exact = median_ranks(failures, suspensions, 'exact')
+    assert np.allclose(f_exact, stats.beta.ppf(0.5, order, 8 - order + 1))
+
+    # Kaplan-Meier: S = Π (1 - 1/r)，反向秩 r = 8, 6, 5, 3, 1
+    _, f_km = median_ranks(failures, suspensions, 'km')
+    survival = np.cumprod([7 / 8, 5 / 6, 4 / 5, 2 / 3, 0])
+    assert np.allclose(f_km, 1 - survival)
+
+    # 同時間的失效排在截尾之前
+    _, f_tie = median_ranks([10, 20], [10], 'mean')
+    assert np.allclose(f_tie * 4, johnson_reference([10, 20], [10.5], 3))
+
+    # calculate_weibull 以截尾數據調整秩次 (秩次上升 → F 上升)
+    base = calculate_weibull([100, 200, 300, 400], 0, {'median_rank_method': 'johnson'})
+    adjusted = calculate_weibull([100, 200, 300, 400], [150] * 30,
+                                 {'median_rank_method': 'johnson'})
+    assert adjusted['plot_data']['f'][-1] > base['plot_data']['f'][-1]
+
+    print(f"Johnson 調整秩 = {np.round(order, 4).tolist()}")
+    print("✓ 截尾調整秩測試通過")
+
+def test_cache_and_benchmark():
+    """測試秩表快取 (有上限) 與 n = 10^5 精確中位秩的效能"""
+    print("\n=== 測試秩表快取與效能 ===")
+
+    n = 100000
+    i = np.arange(1, n + 1, dtype=float)
+    reference = stats.beta.ppf(0.5, i, n - i + 1)
+    assert np.abs(beta_median(i, n - i + 1) - reference).max() < 1e-9
+
+    # 切換點的 Kerman 近似誤差 (最不利的 a、b 比例)
+    a = np.full(13, float(EXACT_SWITCH))
+    b = EXACT_SWITCH * np.logspace(0, 3, 13)
+    for x, y in ((a, b), (b, a)):
+        exact = special.betaincinv(x, y, 0.5)
+        kerman = (x - 1 / 3) / (x + y - 2 / 3)
+        assert np.abs(kerman - exact).max() < 1e-9
+        assert (np.abs(kerman - exact) / exact).max() < 5e-9
+
+    rank_table.cache_clear()
+    failures = np.random.default_rng(0).weibull(2.0, n) * 1000
+    start = time.perf_counter()
+    median_ranks(failures, None, 'exact')
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    _, f = median_ranks(failures, None, 'exact')
+    warm = time.perf_counter() - start
+    assert rank_table.cache_info().hits == 1
+    assert np.allclose(f, reference, atol=1e-9)
+    assert cold < 0.1 and warm < 0.05, f"cold {cold:.4f} s, warm {warm:.4f} s"
+
+    table = rank_table(n, 'exact')
+    assert not table.flags.writeable, "快取的秩表不可被修改"
+    for k in range(RANK_CACHE_SIZE + 10):
+        rank_table(10 + k, 'benard')
+    assert rank_table.cache_info().currsize == RANK_CACHE_SIZE
+
+    start = time.perf_counter()
+    for _ in range(5):
+        [stats.beta.ppf(0.5, k, n - k + 1) for k in range(1, 2001)]
+    loop = (time.perf_counter() - start) / 5 * n / 2000
+    print(f"n = {n} 精確中位秩: 首次 {cold * 1000:.1f} ms，快取 {warm * 1000:.1f} ms "
+          f"(逐點 beta.ppf 推估 {loop:.1f} s)")
+    print("✓ 秩表快取與效能測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("向量化中位秩引擎測試")
+    print("=" * 60)
+
+    try:
+        test_complete_data_formulas()
+        test_suspensions()
+        test_cache_and_benchmark()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有中位秩測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
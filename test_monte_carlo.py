@@ -0,0 +1,155 @@
+"""
+測試 Monte Carlo 不確定性傳播
+驗證分佈抽樣、可重現性、平行計算與可靠度指標
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_af, calculate_reliability_results
+from uncertainty import run_monte_carlo
+from jobs import MAX_JOB_PROCESSES, clamp_n_jobs
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+AF_PARAMS = {
+    't_use': 32, 'rh_use': 60, 't_alt': 85, 'rh_alt': 85,
+    'ea': 0.7, 'n_hum': 2.0,
+    'enable_temp': True, 'enable_hum': True
+}
+WEIBULL = {'beta': 2.0, 'eta_alt': 3000.0}
+
+def test_degenerate_distribution():
+    """測試極窄分佈時結果收斂到點估計"""
+    print("\n=== 測試極窄分佈收斂到點估計 ===")
+
+    result = run_monte_carlo(AF_PARAMS, {'ea': {'dist': 'uniform', 'low': 0.7, 'high': 0.7 + 1e-12}},
+                             weibull_params=WEIBULL, n_samples=1000, seed=1)
+    assert "error" not in result, result
+
+    af = calculate_af(AF_PARAMS)['af_total']
+    point = calculate_reliability_results(af, WEIBULL, None)['weibull']
+
+    metrics = result['metrics']
+    assert abs(metrics['af_total']['percentiles']['p50'] - af) < 1e-3
+    # calculate_af 的 af_total 已四捨五入至小數 4 位，故以相對誤差比較
+    for key in ['eta_use', 'mttf_use', 'bx_life']:
+        assert abs(metrics[key]['mean'] / point[key] - 1) < 1e-6, f"{key} 不一致"
+    assert abs(metrics['r_mission']['mean'] - point['r_mission']) < 1e-6
+
+    print(f"AF = {af}, R(mission) = {point['r_mission']}")
+    print("✓ 點估計一致")
+
+def test_distributions_and_reproducibility():
+    """測試四種分佈、種子可重現與平行計算一致"""
+    print("\n=== 測試分佈抽樣與可重現性 ===")
+
+    distributions = {
+        'ea': {'dist': 'normal', 'mean': 0.7, 'std': 0.05},
+        'n_hum': {'dist': 'triangular', 'low': 1.5, 'mode': 2.0, 'high': 3.0},
+        't_alt': {'dist': 'uniform', 'low': 83, 'high': 87},
+        'beta': {'dist': 'lognormal', 'median': 2.0, 'sigma': 0.1}
+    }
+
+    kwargs = dict(weibull_params=WEIBULL, n_samples=200000, seed=42,
+                  block_size=50000, return_samples=True)
+    serial = run_monte_carlo(AF_PARAMS, distributions, n_jobs=1, **kwargs)
+    again = run_monte_carlo(AF_PARAMS, distributions, n_jobs=1, **kwargs)
+    pooled = run_monte_carlo(AF_PARAMS, distributions, n_jobs=2, **kwargs)
+
+    for name in serial['samples']:
+        assert np.array_equal(serial['samples'][name], again['samples'][name]), f"{name} 不可重現"
+        assert np.array_equal(serial['samples'][name], pooled['samples'][name]), f"{name} 平行結果不同"
+
+    inputs = serial['inputs']
+    assert abs(inputs['ea']['mean'] - 0.7) < 1e-3
+    assert abs(inputs['ea']['std'] - 0.05) < 1e-3
+    assert abs(inputs['n_hum']['mean'] - (1.5 + 2.0 + 3.0) / 3) < 1e-2
+    assert abs(inputs['beta']['percentiles']['p50'] - 2.0) < 1e-2
+    assert 83 <= inputs['t_alt']['percentiles']['p2.5'] < inputs['t_alt']['percentiles']['p97.5'] <= 87
+
+    af = serial['metrics']['af_total']
+    assert af['percentiles']['p5'] < calculate_af(AF_PARAMS)['af_total'] < af['percentiles']['p95']
+    assert sum(af['histogram']['counts']) == af['n_valid']
+
+    print(f"AF Total 90% 區間: {af['percentiles']['p5']:.1f} ~ {af['percentiles']['p95']:.1f}")
+    print("✓ 分佈抽樣與可重現性測試通過")
+
+def test_invalid_specs():
+    """測試錯誤的分佈設定"""
+    print("\n=== 測試錯誤的分佈設定 ===")
+
+    assert "error" in run_monte_carlo(AF_PARAMS, {})
+    assert "error" in run_monte_carlo(AF_PARAMS, {'ea': {'dist': 'cauchy'}})
+    assert "error" in run_monte_carlo(AF_PARAMS, {'ea': {'dist': 'normal', 'mean': 0.7}})
+    assert "error" in run_monte_carlo(AF_PARAMS, {'beta': {'dist': 'normal', 'mean': 2, 'std': 0.1}}), \
+        "未提供 Weibull 參數時不可對 beta 設定分佈"
+    ea = {'ea': {'dist': 'normal', 'mean': 0.7, 'std': 0.05}}
+    assert "error" in run_monte_carlo(AF_PARAMS, ea, n_samples=100, percentiles=[101])
+    assert "error" in run_monte_carlo(AF_PARAMS, ea, n_samples=100, percentiles=['a'])
+    assert "error" in run_monte_carlo(AF_PARAMS, ea, n_samples=100, bins=0)
+    assert "p90" in run_monte_carlo(AF_PARAMS, ea, n_samples=100, percentiles=['90'])['metrics']['af_total']['percentiles']
+
+    print("✓ 錯誤處理測試通過")
+
+def test_endpoint_and_speed():
+    """測試 /monte_carlo API 與百萬樣本效能"""
+    print("\n=== 測試 /monte_carlo API ===")
+
+    client = app.test_client()
+    resp = client.post('/monte_carlo', json={
+        'af_params': AF_PARAMS,
+        'distributions': {'ea': {'dist': 'normal', 'mean': 0.7, 'std': 0.05}},
+        'weibull_data': {'failures': [1200, 1800, 2300, 2900, 3500],
+                         'options': {'bx_life_percent': 10}},
+        'zero_fail_params': {'n': 64, 't_test': 1196, 'cl': 0.6},
+        'mission_years': 2, 'n_samples': 20000, 'seed': 7
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    for key in ['af_total', 'eta_use', 'mttf_use', 'r_mission', 'bx_life', 'zf_r_mission']:
+        assert key in data['metrics'], f"缺少指標 {key}"
+    resp = client.post('/monte_carlo', json={'af_params': AF_PARAMS, 'percentiles': [101],
+                                             'distributions': {'ea': {'dist': 'normal', 'mean': 0.7, 'std': 0.05}}})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('Monte Carlo 計算錯誤')
+    for bad in ('abc', 1.5):
+        resp = client.post('/monte_carlo', json={'af_params': AF_PARAMS, 'n_jobs': bad, 'n_samples': 1000,
+                                                 'distributions': {'ea': {'dist': 'normal', 'mean': 0.7, 'std': 0.05}}})
+        assert resp.status_code == 400 and resp.get_json()['error'] == 'Monte Carlo 計算錯誤: n_jobs 需為整數', bad
+    assert clamp_n_jobs(-1) <= MAX_JOB_PROCESSES and clamp_n_jobs('2') == clamp_n_jobs(2)
+
+    start = time.perf_counter()
+    result = run_monte_carlo(AF_PARAMS, {'ea': {'dist': 'normal', 'mean': 0.7, 'std': 0.05},
+                                         'n_hum': {'dist': 'uniform', 'low': 1.5, 'high': 3.0}},
+                             weibull_params=WEIBULL, n_samples=1000000, seed=3)
+    elapsed = time.perf_counter() - start
+    assert result['metrics']['r_mission']['n_valid'] == 1000000
+
+    print(f"1,000,000 次抽樣: {elapsed:.2f} s")
+    print("✓ API 與效能測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Monte Carlo 不確定性傳播測試")
+    print("=" * 60)
+
+    try:
+        test_degenerate_distribution()
+        test_distributions_and_reproducibility()
+        test_invalid_specs()
+        test_endpoint_and_speed()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有 Monte Carlo 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,158 @@
+"""
+測試加速測試條件規劃 (反向 AF 求解)
+驗證方案 AF 達標、MTTF 換算、上限約束、不可行情況、速度與 API
+"""
+
+import sys
+import io
+import time
+from app import app, calculate_af, calculate_reliability_results
+from plan_optimizer import optimize_test_conditions, required_af_for_mttf
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+BASE = {'t_use': 32, 'rh_use': 60, 'ea': 0.7, 'n_hum': 2,
+        'enable_voltage': True, 'v_use': 1.0, 'beta_v': 2.0}
+CHAMBER = {'t_alt': {'min': 40, 'max': 150},
+           'rh_alt': {'min': 50, 'max': 95, 'num': 10},
+           'v_alt': {'min': 1.0, 'max': 1.5, 'num': 6}}
+
+def test_target_af():
+    """測試每個方案的 AF 以 calculate_af 驗算皆達到目標"""
+    print("\n=== 測試目標 AF ===")
+
+    result = optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_af=500)
+    assert "error" not in result, result
+    assert result['n_candidates'] == 60 and result['plans']
+    for plan in result['plans']:
+        af = calculate_af({**BASE, **{k: plan[k] for k in CHAMBER}})['af_total']
+        assert abs(af / 500 - 1) < 1e-3, f"方案 AF = {af}"
+
+    severities = [plan['severity'] for plan in result['plans']]
+    assert severities == sorted(severities), "方案應依嚴苛度排序"
+
+    best = result['plans'][0]
+    print(f"最溫和方案: {best}")
+    print("✓ 目標 AF 測試通過")
+
+def test_target_mttf():
+    """測試以 MTTF 規劃時與零失效公式一致"""
+    print("\n=== 測試目標 MTTF ===")
+
+    result = optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_mttf=2e6, n_samples=64,
+                                      max_test_hours=1000, cl=0.6)
+    assert "error" not in result, result
+    required, _ = required_af_for_mttf(2e6, 64, 1000, 0.6)
+    assert abs(result['required_af'] - round(required, 4)) < 1e-9
+
+    plan = result['plans'][0]
+    assert plan['test_hours'] <= 1000 + 1e-6
+    zf = calculate_reliability_results(plan['af_total'], None,
+                                       {'n': 64, 't_test': plan['test_hours'], 'cl': 0.6})
+    assert abs(zf['zero_failure']['mttf_use_lower'] / 2e6 - 1) < 1e-3
+
+    print(f"所需 AF = {result['required_af']}，方案: {plan}")
+    print("✓ 目標 MTTF 測試通過")
+
+def test_ceilings_and_infeasible():
+    """測試失效機制上限與不可行的目標"""
+    print("\n=== 測試上限約束與不可行目標 ===")
+
+    result = optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_af=300, ceilings={'t_alt': 110})
+    assert result['bounds']['t_alt'] == [40.0, 110.0]
+    assert all(plan['t_alt'] <= 110 for plan in result['plans'])
+    assert result['n_feasible'] < result['n_candidates'], "低濕低壓組合在 110°C 內無法達標"
+
+    none = optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_af=1e9)
+    assert none['n_feasible'] == 0 and none['plans'] == []
+
+    # 下限即達標時取下限
+    easy = optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_af=1.0)
+    assert easy['plans'][0]['t_alt'] == 40.0
+
+    assert "error" in optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt')
+    assert "error" in optimize_test_conditions(BASE, {'foo': {'min': 0, 'max': 1}}, target_af=10)
+    assert "error" in optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_af=10,
+                                               ceilings={'t_alt': 30})
+    assert "error" in optimize_test_conditions(BASE, CHAMBER, solve_for='t_alt', target_mttf=1e6)
+    # 求根變數需明確指定 (不依鍵順序)，且需為 variables 之一
+    assert "error" in optimize_test_conditions(BASE, CHAMBER, target_af=500)
+    assert "error" in optimize_test_conditions(BASE, CHAMBER, target_af=500, solve_for='v_use')
+    single = optimize_test_conditions(BASE, {'t_alt': CHAMBER['t_alt']}, target_af=5)
+    assert single['solve_for'] == 't_alt' and single['n_candidates'] == 1
+    reordered = optimize_test_conditions(BASE, dict(reversed(list(CHAMBER.items()))), target_af=500,
+                                         solve_for='t_alt')
+    assert reordered['plans'] == optimize_test_conditions(BASE, CHAMBER, target_af=500, solve_for='t_alt')['plans']
+
+    print("✓ 上限約束與不可行目標測試通過")
+
+def test_speed():
+    """測試大量候選組合的求解速度"""
+    print("\n=== 測試求解速度 ===")
+
+    variables = dict(CHAMBER, rh_alt={'min': 50, 'max': 95, 'num': 91},
+                     v_alt={'min': 1.0, 'max': 1.5, 'num': 101})
+    start = time.perf_counter()
+    result = optimize_test_conditions(BASE, variables, target_af=500, solve_for='t_alt')
+    elapsed = time.perf_counter() - start
+    assert result['n_candidates'] == 9191
+    assert elapsed < 1.0, f"求解時間 {elapsed:.3f} s"
+
+    print(f"{result['n_candidates']} 組候選條件: {elapsed:.3f} s")
+    print("✓ 求解速度測試通過")
+
+def test_endpoint():
+    """測試 /plan_test API"""
+    print("\n=== 測試 /plan_test API ===")
+
+    client = app.test_client()
+    resp = client.post('/plan_test', json={'af_params': BASE, 'variables': CHAMBER, 'solve_for': 't_alt',
+                                           'target_mttf': 2e6, 'max_test_hours': 1000,
+                                           'zero_fail_params': {'n': 64, 'cl': 0.6},
+                                           'top_k': 5})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert len(data['plans']) == 5 and 'chi_sq' in data
+    assert data['solve_for'] == 't_alt'
+
+    # 前端以字串送出數值
+    resp = client.post('/plan_test', json={'af_params': BASE, 'variables': CHAMBER, 'solve_for': 't_alt',
+                                           'target_mttf': '2e6', 'max_test_hours': '1000',
+                                           'zero_fail_params': {'n': '64', 'cl': '0.6'}})
+    strings = resp.get_json()
+    assert resp.status_code == 200, strings
+    assert strings['plans'][0]['test_hours'] == data['plans'][0]['test_hours']
+
+    resp = client.post('/plan_test', json={'af_params': BASE, 'variables': CHAMBER, 'target_af': 500})
+    assert resp.status_code == 400 and 'solve_for' in resp.get_json()['error']
+
+    resp = client.post('/plan_test', json={'af_params': BASE, 'variables': {}})
+    assert resp.status_code == 400
+
+    print("✓ API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("加速測試條件規劃測試")
+    print("=" * 60)
+
+    try:
+        test_target_af()
+        test_target_mttf()
+        test_ceilings_and_infeasible()
+        test_speed()
+        test_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有測試條件規劃測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,195 @@
+"""
+測試 /calculate 回應快取
+驗證正規化雜湊、LRU / TTL 淘汰、SQLite 共用後端、ETag 304 與統計數據
+"""
+
+import sys
+import io
+import os
+import time
+import tempfile
+import app as app_module
+import response_cache
+from app import app
+from response_cache import (canonical_key, MemoryBackend, SQLiteBackend, ResponseCache,
+                            cache_from_env, _source_digest)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+REQUEST = {
+    'af_params': {'t_use': '32', 'rh_use': '60', 't_alt': '85', 'rh_alt': '85',
+                  'ea': '0.7', 'n_hum': '2', 'enable_temp': True, 'enable_hum': True},
+    'weibull_data': {'failures': [1200, 1800, 2300, 2900, 3500],
+                     'options': {'median_rank_method': 'benard', 'regression_method': 'rry'}},
+    'zero_fail_params': {'n': '64', 't_test': '1196', 'cl': '0.6'},
+    'mission_years': 2
+}
+
+def test_canonical_key():
+    """測試鍵與欄位順序無關，但隨數值與型別改變"""
+    print("\n=== 測試正規化雜湊 ===")
+
+    a = canonical_key({'af_params': {'t_alt': '85', 'ea': 0.7}, 'mission_years': 2})
+    b = canonical_key({'mission_years': 2, 'af_params': {'ea': 0.7, 't_alt': '85'}})
+    c = canonical_key({'af_params': {'t_alt': 86, 'ea': 0.7}, 'mission_years': 2})
+    assert a == b, "相同內容應得到相同鍵"
+    assert a != c, "不同數值應得到不同鍵"
+    # 計算對字串與數值、前後空白的解讀不同，不可共用鍵
+    for x, y in (('0', 0), (' voltage', 'voltage'), ('85', 85)):
+        assert canonical_key({'v': x}) != canonical_key({'v': y}), (x, y)
+    assert a != canonical_key({'af_params': {'t_alt': '85', 'ea': 0.7}, 'mission_years': 2}, 'x')
+    assert len(a) == 64
+
+    # 程式碼版本 (計算模組內容的雜湊) 改變時舊鍵失效；測試檔不影響版本
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'calc.py'), 'w') as f:
+            f.write('x = 1\n')
+        before = _source_digest(directory)
+        with open(os.path.join(directory, 'test_calc.py'), 'w') as f:
+            f.write('assert True\n')
+        assert _source_digest(directory) == before
+        with open(os.path.join(directory, 'calc.py'), 'w') as f:
+            f.write('x = 2\n')
+        assert _source_digest(directory) != before
+    saved = response_cache.CODE_VERSION
+    try:
+        response_cache.CODE_VERSION = 'changed'
+        assert canonical_key({'af_params': {'t_alt': '85', 'ea': 0.7}, 'mission_years': 2}) != a
+    finally:
+        response_cache.CODE_VERSION = saved
+
+    print(f"key = {a[:16]}...")
+    print("✓ 正規化雜湊測試通過")
+
+def test_memory_backend():
+    """測試 LRU 與 TTL 淘汰"""
+    print("\n=== 測試記憶體後端 ===")
+
+    backend = MemoryBackend(max_entries=2, ttl=0)
+    backend.set('a', b'1')
+    backend.set('b', b'2')
+    assert backend.get('a') == b'1'      # a 變為最近使用
+    backend.set('c', b'3')               # 淘汰最久未使用的 b
+    assert backend.get('b') is None and backend.get('a') == b'1' and len(backend) == 2
+
+    backend = MemoryBackend(max_entries=10, ttl=0.05)
+    backend.set('a', b'1')
+    assert backend.get('a') == b'1'
+    time.sleep(0.1)
+    assert backend.get('a') is None, "過期項目應被移除"
+
+    print("✓ 記憶體後端測試通過")
+
+def test_sqlite_backend():
+    """測試 SQLite 後端在兩個實例 (模擬兩個 worker) 間共用"""
+    print("\n=== 測試 SQLite 共用後端 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        worker1 = SQLiteBackend(path, max_entries=3, ttl=0)
+        worker2 = SQLiteBackend(path, max_entries=3, ttl=0)
+
+        worker1.set('k1', b'{"x": 1}')
+        assert worker2.get('k1') == b'{"x": 1}', "另一個 worker 應讀到相同快取"
+
+        for i in range(2, 6):
+            worker2.set(f'k{i}', b'v')
+            time.sleep(0.01)
+        assert len(worker1) == 3
+        assert worker1.get('k1') is None, "超出上限時應淘汰最久未使用的項目"
+
+        cache = cache_from_env({'RELIABILITY_CACHE': 'sqlite', 'RELIABILITY_CACHE_PATH': path})
+        assert isinstance(cache.backend, SQLiteBackend)
+        assert cache_from_env({'RELIABILITY_CACHE': 'off'}).enabled is False
+
+    print("✓ SQLite 後端測試通過")
+
+def test_calculate_etag_and_stats():
+    """測試 /calculate 快取命中、ETag 304 與統計數據"""
+    print("\n=== 測試 /calculate 快取與 ETag ===")
+
+    app_module.response_cache = ResponseCache(MemoryBackend())
+    client = app.test_client()
+
+    first = client.post('/calculate', json=REQUEST)
+    assert first.status_code == 200 and first.headers['X-Cache'] == 'MISS'
+    etag = first.headers['ETag']
+
+    # 相同內容 (欄位順序不同) 應命中快取且回應相同
+    same = dict(reversed(list(REQUEST.items())))
+    second = client.post('/calculate', json=same)
+    assert second.headers['X-Cache'] == 'HIT' and second.data == first.data
+    assert second.headers['ETag'] == etag
+
+    third = client.post('/calculate', json=REQUEST, headers={'If-None-Match': etag})
+    assert third.status_code == 304 and third.data == b''
+
+    changed = dict(REQUEST, mission_years=3)
+    fourth = client.post('/calculate', json=changed, headers={'If-None-Match': etag})
+    assert fourth.status_code == 200 and fourth.headers['ETag'] != etag
+
+    # 錯誤回應不快取
+    bad = {'af_params': {'enable_temp': False, 'enable_hum': False,
+                         'enable_vib': True, 'g_use': 0}}
+    assert client.post('/calculate', json=bad).status_code == 400
+    assert client.post('/calculate', json=bad).status_code == 400
+
+    stats = client.get('/cache_stats').get_json()
+    assert stats['hits'] == 1 and stats['lookups'] == 5 and stats['not_modified'] == 1
+    assert abs(stats['hit_ratio'] - 0.2) < 1e-12 and stats['mean_lookup_ms'] >= 0
+    print(f"命中率 = {stats['hit_ratio']:.2f}, 平均查詢 = {stats['mean_lookup_ms']:.4f} ms")
+
+    # 計算解讀不同的值不可命中：字串 "0" 為真值，前後有空白的應力類型不套用 Eyring 修正
+    base = {'t_use': 30, 't_alt': 85, 'v_use': 1, 'v_alt': 8, 'beta_v': 1,
+            'enable_temp': False, 'enable_hum': False}
+    for first_params, second_params in (
+            ({'enable_voltage': '0'}, {'enable_voltage': 0}),
+            ({'enable_voltage': True, 'enable_eyring': True, 'eyring_stress_type': ' voltage'},
+             {'enable_voltage': True, 'enable_eyring': True, 'eyring_stress_type': 'voltage'})):
+        results = []
+        for params in (first_params, second_params):
+            resp = client.post('/calculate', json={'af_params': dict(base, **params)})
+            assert resp.status_code == 200 and resp.headers['X-Cache'] == 'MISS', params
+            results.append(resp.get_json()['af_result']['af_total'])
+        assert results[0] != results[1], (first_params, second_params, results)
+
+    # 快取命中時明顯快於重新計算
+    start = time.perf_counter()
+    for _ in range(50):
+        client.post('/calculate', json=REQUEST)
+    hit_time = (time.perf_counter() - start) / 50
+    app_module.response_cache = ResponseCache(None)
+    start = time.perf_counter()
+    for _ in range(50):
+        resp = client.post('/calculate', json=REQUEST)
+    miss_time = (time.perf_counter() - start) / 50
+    assert resp.headers['X-Cache'] == 'BYPASS'
+    print(f"命中: {hit_time * 1000:.2f} ms / 請求，未快取: {miss_time * 1000:.2f} ms / 請求")
+
+    app_module.response_cache = cache_from_env()
+    print("✓ /calculate 快取測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("/calculate 回應快取測試")
+    print("=" * 60)
+
+    try:
+        test_canonical_key()
+        test_memory_backend()
+        test_sqlite_backend()
+        test_calculate_etag_and_stats()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有回應快取測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,138 @@
+"""
+測試 Sobol 全域敏感度分析
+以可解析的加法模型驗證一階與總效應指數
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app
+from sensitivity import run_sobol_analysis, default_distributions, MAX_RESAMPLES
+from af_engine import KB
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+AF_PARAMS = {
+    't_use': 32, 'rh_use': 60, 't_alt': 85, 'rh_alt': 85,
+    'ea': 0.7, 'n_hum': 2.0,
+    'enable_temp': True, 'enable_hum': True
+}
+
+def test_additive_log_model():
+    """測試 log10(AF) 為 Ea 與 n 的線性加法模型時的解析指數"""
+    print("\n=== 測試加法模型的解析 Sobol 指數 ===")
+
+    distributions = {
+        'ea': {'dist': 'uniform', 'low': 0.5, 'high': 0.9},
+        'n_hum': {'dist': 'uniform', 'low': 1.0, 'high': 4.0}
+    }
+    result = run_sobol_analysis(AF_PARAMS, distributions, n_base=2 ** 14, seed=0, n_resamples=50)
+    assert "error" not in result, result
+
+    # log10 AF = ea × c1 + n × c2
+    c1 = (1 / (32 + 273.15) - 1 / (85 + 273.15)) / KB / np.log(10)
+    c2 = np.log10(85 / 60)
+    var_ea = (0.4 ** 2 / 12) * c1 ** 2
+    var_n = (3.0 ** 2 / 12) * c2 ** 2
+    expected = {'ea': var_ea / (var_ea + var_n), 'n_hum': var_n / (var_ea + var_n)}
+
+    log_out = result['outputs']['log10_af_total']
+    for name, value in expected.items():
+        print(f"{name}: S1 = {log_out['first_order'][name]:.4f}, "
+              f"ST = {log_out['total'][name]:.4f}, 解析值 = {value:.4f}")
+        assert abs(log_out['first_order'][name] - value) < 0.02
+        assert abs(log_out['total'][name] - value) < 0.02
+        low, high = log_out['total_conf'][name]
+        assert low <= log_out['total'][name] <= high
+
+    # 原始 af_total 為乘法模型，存在交互作用：總效應 ≥ 一階效應
+    raw = result['outputs']['af_total']
+    for name in expected:
+        assert raw['total'][name] >= raw['first_order'][name] - 0.02
+
+    print("✓ 解析指數驗證通過")
+
+def test_default_distributions_and_r_mission():
+    """測試預設分佈涵蓋所有啟用參數，並分析 r_mission"""
+    print("\n=== 測試預設分佈與 r_mission ===")
+
+    params = dict(AF_PARAMS, enable_voltage=True, v_use=1.0, v_alt=1.3, beta_v=3.0)
+    weibull = {'beta': 2.0, 'eta_alt': 3000}
+    dists = default_distributions(params, weibull)
+    assert set(dists) == {'ea', 't_use', 't_alt', 'rh_use', 'rh_alt', 'n_hum',
+                          'v_use', 'v_alt', 'beta_v', 'beta', 'eta_alt'}, dists.keys()
+
+    start = time.perf_counter()
+    result = run_sobol_analysis(params, weibull_params=weibull, n_base=2 ** 14, seed=1,
+                                n_resamples=0)
+    elapsed = time.perf_counter() - start
+
+    assert 'r_mission' in result['outputs']
+    top = max(result['outputs']['r_mission']['total'].items(), key=lambda kv: kv[1])
+    print(f"{result['n_evaluations']:,} 次模型評估: {elapsed:.2f} s")
+    print(f"r_mission 最敏感參數: {top[0]} (ST = {top[1]:.3f})")
+    assert elapsed < 10
+
+    pooled = run_sobol_analysis(params, weibull_params=weibull, n_base=2 ** 14, seed=1,
+                                n_resamples=0, n_jobs=2)
+    assert pooled['outputs']['r_mission']['total'] == result['outputs']['r_mission']['total']
+
+    print("✓ 預設分佈與 r_mission 測試通過")
+
+def test_endpoint():
+    """測試 /sensitivity API"""
+    print("\n=== 測試 /sensitivity API ===")
+
+    client = app.test_client()
+    resp = client.post('/sensitivity', json={
+        'af_params': AF_PARAMS,
+        'weibull_data': {'failures': [1200, 1800, 2300, 2900, 3500]},
+        'n_base': 1024, 'seed': 3, 'n_resamples': 20
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert set(data['parameters']) >= {'ea', 'n_hum', 'beta', 'eta_alt'}
+
+    resp = client.post('/sensitivity', json={
+        'af_params': AF_PARAMS, 'distributions': {'beta': {'dist': 'uniform', 'low': 1, 'high': 2}}
+    })
+    assert resp.status_code == 400
+
+    # 無效或過大的 n_resamples / n_jobs 回傳 400 (不執行計算)
+    for bad in ({'n_resamples': 'abc'}, {'n_resamples': 1.5}, {'n_resamples': -1},
+                {'n_resamples': MAX_RESAMPLES + 1}, {'n_jobs': 'all'}):
+        start = time.perf_counter()
+        resp = client.post('/sensitivity', json={'af_params': AF_PARAMS, 'n_base': 64, **bad})
+        assert resp.status_code == 400, bad
+        assert resp.get_json()['error'].startswith('敏感度分析錯誤'), bad
+        assert time.perf_counter() - start < 1.0, bad
+    resp = client.post('/sensitivity', json={'af_params': AF_PARAMS, 'n_base': 64, 'seed': 1,
+                                             'n_resamples': '10', 'n_jobs': -1})
+    assert resp.status_code == 200, resp.get_json()
+
+    print("✓ API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Sobol 敏感度分析測試")
+    print("=" * 60)
+
+    try:
+        test_additive_log_model()
+        test_default_distributions_and_r_mission()
+        test_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有敏感度分析測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
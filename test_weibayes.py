@@ -0,0 +1,154 @@
+"""
+測試 WeiBayes 零失效分析
+驗證 β = 1 時與指數分佈卡方公式相同、已知 β 的封閉解、β 先驗的格點積分 (與 Monte Carlo 比較)、
+速度、錯誤處理與 /calculate 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import stats, special
+from app import app, calculate_reliability_results
+from weibayes import weibayes
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def test_exponential_equivalence():
+    """測試 β = 1 時與既有的指數分佈零失效結果相同"""
+    print("\n=== 測試 β = 1 與指數分佈相同 ===")
+
+    results = calculate_reliability_results(50.0, None, {'n': 64, 't_test': 1196, 'cl': 0.6, 'beta': 1})
+    zf, wb = results['zero_failure'], results['weibayes']
+    assert abs(wb['eta_alt_lower'] - zf['mttf_alt_lower']) < 0.02
+    assert abs(wb['mttf_use_lower'] - zf['mttf_use_lower']) < 0.02
+    assert abs(wb['r_mission'] - zf['r_mission']) < 1e-6
+    assert 'weibayes' not in calculate_reliability_results(50.0, None, {'n': 64, 't_test': 1196, 'cl': 0.6})
+
+    print(f"η_alt 下限 = {wb['eta_alt_lower']} (卡方 MTTF 下限 {zf['mttf_alt_lower']})")
+    print("✓ β = 1 測試通過")
+
+def test_known_beta():
+    """測試已知 β 時的封閉解 (含少量失效與不同的試驗時間)"""
+    print("\n=== 測試已知 β ===")
+
+    af, t_mission, cl = 30.0, 17520, 0.9
+    times = np.r_[np.full(40, 1000.0), np.full(10, 600.0), [450.0, 800.0]]
+    for beta, r in ((2.0, 0), (3.5, 0), (2.5, 2)):
+        result = weibayes(times, r, beta=beta, cl=cl, af_total=af, t_mission=t_mission, bx_percent=10)
+        eta = (2 * np.sum(times ** beta) / stats.chi2.ppf(cl, 2 * r + 2)) ** (1 / beta)
+        assert abs(result['eta_alt_lower'] / eta - 1) < 1e-5, (result['eta_alt_lower'], eta)
+        assert abs(result['eta_use_lower'] / (af * eta) - 1) < 1e-5
+        assert abs(result['mttf_use_lower'] / (af * eta * special.gamma(1 + 1 / beta)) - 1) < 1e-5
+        assert abs(result['bx_life_lower'] / (af * eta * (-np.log(0.9)) ** (1 / beta)) - 1) < 1e-5
+        assert abs(result['r_mission'] - np.exp(-(t_mission / (af * eta)) ** beta)) < 1e-6
+        print(f"β = {beta}, r = {r}: η_alt 下限 = {result['eta_alt_lower']}，R = {result['r_mission']}")
+
+    print("✓ 已知 β 測試通過")
+
+def test_beta_prior():
+    """測試 β 先驗的格點積分：與 Monte Carlo 一致、退化先驗等於已知 β，以及速度"""
+    print("\n=== 測試 β 先驗 ===")
+
+    af, t_mission, cl = 30.0, 17520, 0.9
+    times = np.full(64, 1196.0)
+    prior = {'dist': 'lognormal', 'median': 2.0, 'sigma': 0.25}
+    result = weibayes(times, 0, beta_prior=prior, cl=cl, af_total=af, t_mission=t_mission)
+
+    # Monte Carlo：β ~ 先驗，λ | β ~ Gamma(1, T_β)
+    rng = np.random.default_rng(0)
+    beta = np.exp(np.log(2.0) + 0.25 * rng.standard_normal(400000))
+    lam = rng.exponential(1.0, beta.size) / (64 * 1196.0 ** beta)
+    eta = lam ** (-1 / beta)
+    r_mission = np.exp(-lam * (t_mission / af) ** beta)
+    assert abs(result['eta_alt_lower'] / np.quantile(eta, 1 - cl) - 1) < 0.01
+    assert abs(result['r_mission'] - np.quantile(r_mission, 1 - cl)) < 2e-4
+
+    # 下限介於先驗範圍內各 β 的條件下限之間
+    known = [weibayes(times, 0, beta=b, cl=cl)['eta_alt_lower'] for b in (1.2, 3.5)]
+    assert min(known) < result['eta_alt_lower'] < max(known)
+
+    narrow = weibayes(times, 0, beta_prior={'dist': 'uniform', 'low': 1.9999, 'high': 2.0001}, cl=cl)
+    assert abs(narrow['eta_alt_lower'] / weibayes(times, 0, beta=2.0, cl=cl)['eta_alt_lower'] - 1) < 1e-3
+
+    fine = weibayes(times, 0, beta_prior=prior, cl=cl, af_total=af, t_mission=t_mission, n_points=8192)
+    assert abs(fine['eta_alt_lower'] / result['eta_alt_lower'] - 1) < 1e-3
+
+    start = time.perf_counter()
+    for _ in range(10):
+        weibayes(np.full(5000, 1000.0), 0, beta_prior=prior, cl=cl, af_total=af, t_mission=t_mission)
+    elapsed = (time.perf_counter() - start) / 10
+    assert elapsed < 0.05, elapsed
+    print(f"η_alt 下限 = {result['eta_alt_lower']}，R = {result['r_mission']}；512 點格點 = {elapsed * 1000:.1f} ms")
+
+    print("✓ β 先驗測試通過")
+
+def test_errors():
+    """測試輸入錯誤"""
+    print("\n=== 測試錯誤處理 ===")
+
+    times = np.full(10, 1000.0)
+    assert "error" in weibayes(times, 0)
+    assert "error" in weibayes(times, 0, beta=-1)
+    assert "error" in weibayes(times, 0, beta_prior={'dist': 'normal', 'mean': 1.0, 'std': 1.0})
+    assert "error" in weibayes(times, 0, beta_prior={'dist': 'cauchy'})
+    assert "error" in weibayes(times, 0, beta=2, cl=1.5)
+    assert "error" in weibayes(times, 11, beta=2)
+    assert "error" in weibayes([1000, -1], 0, beta=2)
+
+    print("✓ 錯誤處理測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 的 WeiBayes 選項"""
+    print("\n=== 測試 /calculate WeiBayes ===")
+
+    client = app.test_client()
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': [], 'options': {'bx_life_percent': 10}},
+        'zero_fail_params': {'n': 64, 't_test': 1196, 'cl': 0.6, 'beta': '2'},
+        'mission_years': 2
+    }
+    data = client.post('/calculate', json=payload).get_json()
+    wb = data['reliability_result']['weibayes']
+    assert wb['beta'] == 2.0 and wb['bx_percent'] == 10
+    assert wb['r_mission'] > data['reliability_result']['zero_failure']['r_mission']
+
+    payload['zero_fail_params'] = {'n': 64, 't_test': 1196, 'cl': 0.6, 'beta': '',
+                                   'beta_prior': {'dist': 'triangular', 'low': 1.5, 'mode': 2, 'high': 3}}
+    assert client.post('/calculate', json=payload).get_json()['reliability_result']['weibayes']['beta'] is None
+
+    payload['zero_fail_params'] = {'n': 64, 't_test': 1196, 'cl': 0.6, 'beta': ''}
+    assert 'weibayes' not in client.post('/calculate', json=payload).get_json()['reliability_result']
+
+    payload['zero_fail_params']['beta'] = '-2'
+    resp = client.post('/calculate', json=payload)
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('WeiBayes 計算錯誤')
+
+    print("✓ /calculate WeiBayes 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("WeiBayes 測試")
+    print("=" * 60)
+
+    try:
+        test_exponential_equivalence()
+        test_known_beta()
+        test_beta_prior()
+        test_errors()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有 WeiBayes 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,170 @@
+"""
+測試三參數 Weibull (無失效期 γ)
+驗證 γ 的估計、剖面搜尋速度、邊界判定、可靠度指標的 γ 換算、與二參數結果相容及 /calculate 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import optimize
+from app import app, calculate_weibull, calculate_reliability_results
+from median_ranks import median_ranks
+from uncertainty import weibull_metrics
+from weibull_3p import fit_weibull_3p_rank, fit_weibull_3p_mle
+from weibull_bootstrap import run_bootstrap
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def shifted_sample(rng, n, gamma=800.0, beta=2.0, eta=1000.0):
+    """具無失效期的壽命數據"""
+    return np.sort(gamma + eta * rng.weibull(beta, n))
+
+def test_rank_regression():
+    """測試秩回歸的 γ 使相關係數最大，且能還原模擬的 γ"""
+    print("\n=== 測試三參數秩回歸 ===")
+
+    rng = np.random.default_rng(0)
+    failures = shifted_sample(rng, 200)
+    t, f = median_ranks(failures, [], 'benard', failures.size)
+    fit = fit_weibull_3p_rank(t, f)
+    assert not fit['gamma_at_bound']
+    assert abs(fit['gamma'] - 800) < 150, fit
+    assert abs(fit['beta'] - 2.0) < 0.4, fit
+
+    # 在細網格上比對：剖面搜尋找到的 γ 附近沒有更大的 R²
+    y = np.log(-np.log(1 - f))
+    grid = np.linspace(0, t.min() * (1 - 1e-6), 2001)
+    r2 = [np.corrcoef(np.log(t - g), y)[0, 1] ** 2 for g in grid]
+    assert fit['r_squared'] >= max(r2) - 1e-9
+
+    # 重新以 ln(t - γ) 回歸應得到相同的 β、η
+    x = np.log(t - fit['gamma'])
+    slope, intercept = np.polyfit(x, y, 1)
+    assert abs(slope - fit['beta']) < 1e-8 and abs(np.exp(-intercept / slope) - fit['eta']) < 1e-6
+    print(f"γ = {fit['gamma']:.1f}，β = {fit['beta']:.3f}，η = {fit['eta']:.1f}，R² = {fit['r_squared']:.5f}")
+
+    print("✓ 三參數秩回歸測試通過")
+
+def test_mle_and_speed():
+    """測試 MLE 與通用最佳化一致，以及一次擬合只需數毫秒"""
+    print("\n=== 測試三參數 MLE 與速度 ===")
+
+    rng = np.random.default_rng(1)
+    failures = shifted_sample(rng, 300, beta=2.5)
+    suspensions = np.full(20, failures.max())
+    fit = fit_weibull_3p_mle(failures, suspensions)
+    assert not fit['gamma_at_bound']
+
+    def neg_ll(p):
+        gamma, beta, eta = p[0], np.exp(p[1]), np.exp(p[2])
+        if gamma >= failures.min():
+            return np.inf
+        z, zs = (failures - gamma) / eta, (suspensions - gamma) / eta
+        return -(np.sum(np.log(beta / eta) + (beta - 1) * np.log(z) - z ** beta) - np.sum(zs ** beta))
+    best = optimize.minimize(neg_ll, [700, np.log(2), np.log(1000)], method='Nelder-Mead',
+                             options={'xatol': 1e-8, 'fatol': 1e-10, 'maxiter': 20000})
+    assert abs(fit['gamma'] - best.x[0]) < 0.01, (fit, best.x)
+    assert abs(fit['beta'] / np.exp(best.x[1]) - 1) < 1e-4
+    assert abs(fit['log_likelihood'] + best.fun) < 1e-6
+    print(f"γ = {fit['gamma']:.2f} (Nelder-Mead {best.x[0]:.2f})，β = {fit['beta']:.4f}")
+
+    small = shifted_sample(rng, 25)
+    for options in ({'three_parameter': True}, {'three_parameter': True, 'regression_method': 'mle'}):
+        calculate_weibull(small, [], options)
+        start = time.perf_counter()
+        for _ in range(20):
+            result = calculate_weibull(small, [], options)
+        elapsed = (time.perf_counter() - start) / 20
+        assert "error" not in result, result
+        assert elapsed < 0.02, elapsed
+        print(f"{result['method']}：{elapsed * 1000:.2f} ms，γ = {result['gamma']}")
+
+    print("✓ 三參數 MLE 與速度測試通過")
+
+def test_gamma_at_bound():
+    """測試 β < 1 時 MLE 的 γ 落在最小失效時間 (概似發散)，且二參數結果不受影響"""
+    print("\n=== 測試 γ 邊界 ===")
+
+    rng = np.random.default_rng(2)
+    failures = 1000 * rng.weibull(0.8, 40)
+    result = calculate_weibull(failures, [], {'three_parameter': True, 'regression_method': 'mle'})
+    assert result['gamma_at_bound'] and result['beta'] < 1
+    assert abs(result['gamma'] / failures.min() - 1) < 1e-5
+
+    two = calculate_weibull(failures, [], {})
+    assert 'gamma' not in two and not two['method'].endswith('(3P)')
+    assert calculate_weibull(failures, [], {'three_parameter': False}) == two
+
+    assert "error" in fit_weibull_3p_mle([100.0])
+    print(f"β < 1 的數據：γ = {result['gamma']} (邊界)")
+
+    print("✓ γ 邊界測試通過")
+
+def test_reliability_metrics():
+    """測試可靠度指標以 γ × AF 平移，並與向量化指標一致"""
+    print("\n=== 測試三參數可靠度指標 ===")
+
+    af, beta, eta, gamma = 20.0, 2.0, 1000.0, 500.0
+    params = {"beta": beta, "eta_alt": eta, "gamma": gamma}
+    results = calculate_reliability_results(af, params, None, t_mission=5000)['weibull']
+    assert results['gamma_use'] == 10000
+    assert results['r_mission'] == 1.0
+    metrics = weibull_metrics(af, beta, eta, 5000, 1, gamma)
+    assert abs(results['mttf_use'] - metrics['mttf_use']) < 1
+    assert abs(results['bx_life'] - metrics['bx_life']) < 1
+    assert results['bx_life'] > 10000
+
+    two = calculate_reliability_results(af, {"beta": beta, "eta_alt": eta}, None, t_mission=5000)['weibull']
+    assert 'gamma_use' not in two
+    assert abs(results['mttf_use'] - two['mttf_use'] - 10000) < 1
+
+    assert "error" in run_bootstrap([900.0, 1200, 1500], options={'three_parameter': True})
+
+    print("✓ 三參數可靠度指標測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 的三參數選項"""
+    print("\n=== 測試 /calculate 三參數 Weibull ===")
+
+    client = app.test_client()
+    rng = np.random.default_rng(3)
+    resp = client.post('/calculate', json={
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': shifted_sample(rng, 15).round(1).tolist(),
+                         'options': {'three_parameter': True}},
+        'mission_years': 2
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['weibull_result']['method'] == 'BENARD + RRY (3P)'
+    weibull = data['reliability_result']['weibull']
+    assert abs(weibull['gamma_use'] / data['weibull_result']['gamma'] - data['af_result']['af_total']) < 1e-3
+
+    print("✓ /calculate 三參數 Weibull 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("三參數 Weibull 測試")
+    print("=" * 60)
+
+    try:
+        test_rank_regression()
+        test_mle_and_speed()
+        test_gamma_at_bound()
+        test_reliability_metrics()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有三參數 Weibull 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
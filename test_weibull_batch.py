@@ -0,0 +1,136 @@
+"""
+測試批次 Weibull 擬合
+驗證與逐一呼叫 calculate_weibull 一致 (含截尾與樣品總數)、不等長數據、速度與 API
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_weibull
+from weibull_batch import calculate_weibull_batch
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def ragged(rng, n_groups, sizes, scale=1000.0):
+    """產生不等長的 Weibull 數據 (values, offsets, 各組列表)"""
+    groups = [scale * rng.weibull(rng.uniform(1.0, 4.0), size)
+              for size in rng.integers(*sizes, n_groups)]
+    offsets = np.r_[0, np.cumsum([g.size for g in groups])]
+    return np.concatenate(groups), offsets, groups
+
+def test_matches_single_fit():
+    """測試批次結果與逐一 calculate_weibull 相同"""
+    print("\n=== 測試與 calculate_weibull 一致 ===")
+
+    rng = np.random.default_rng(0)
+    values, offsets, groups = ragged(rng, 40, (2, 30))
+    susp_groups = [np.full(k, g.max() * 0.8) for k, g in zip(rng.integers(0, 4, 40), groups)]
+    suspensions = np.concatenate(susp_groups)
+    susp_offsets = np.r_[0, np.cumsum([s.size for s in susp_groups])]
+
+    for regression in ('rry', 'rrx', 'mle'):
+        for rank in ('benard', 'exact', 'mean', 'km', 'johnson'):
+            for n_total in (None, 80):
+                options = {'regression_method': regression, 'median_rank_method': rank}
+                if n_total:
+                    options['n_total'] = n_total
+                batch = calculate_weibull_batch(values, offsets, suspensions, susp_offsets, options)
+                for g in range(0, 40, 7):
+                    single = calculate_weibull(groups[g].tolist(), susp_groups[g].tolist(), options)
+                    assert batch['converged'][g], (regression, rank, g)
+                    assert abs(single['beta'] - round(batch['beta'][g], 4)) < 2e-4, (regression, rank)
+                    assert abs(single['eta_alt'] / batch['eta'][g] - 1) < 1e-4, (regression, rank)
+                    if regression != 'mle':
+                        assert abs(single['r_squared'] - batch['r_squared'][g]) < 1e-4
+
+    print("✓ 與 calculate_weibull 一致性測試通過")
+
+def test_rrx_and_invalid_groups():
+    """測試 RRX 回推理想數據的 η，以及失效點不足的組別"""
+    print("\n=== 測試 RRX 與無效組別 ===")
+
+    # 理想數據：t_i = η·(-ln(1-F_i))^(1/β)
+    f = (np.arange(1, 11) - 0.3) / 64.4
+    exact = 1000 * (-np.log(1 - f)) ** (1 / 2.0)
+    for regression in ('rry', 'rrx'):
+        single = calculate_weibull(exact.tolist(), 0, {'regression_method': regression})
+        assert abs(single['eta_alt'] - 1000) < 1e-6 and abs(single['beta'] - 2) < 1e-6
+
+    values = np.r_[exact, 500.0, 300.0, 400.0]
+    batch = calculate_weibull_batch(values, [0, 10, 11, 11, 13], options={'regression_method': 'rrx'})
+    assert batch['converged'].tolist() == [True, False, False, True]
+    assert abs(batch['eta'][0] - 1000) < 1e-6 and np.isnan(batch['beta'][1])
+
+    assert "error" in calculate_weibull_batch([1, 2, 3], [0, 2])
+    assert "error" in calculate_weibull_batch([1, 2, 3], [0, 3], options={'regression_method': 'lsq'})
+    assert "error" in calculate_weibull_batch([1, 2, 3], [0, 3], options={'n_total': 2})
+    assert "error" in calculate_weibull_batch([1, -2, 3], [0, 3])
+
+    print("✓ RRX 與無效組別測試通過")
+
+def test_speed():
+    """測試 10,000 個批次 × 50 點的擬合速度"""
+    print("\n=== 測試批次擬合速度 ===")
+
+    rng = np.random.default_rng(1)
+    n_groups, size = 10000, 50
+    values = (1000 * rng.weibull(2.0, (n_groups, size))).ravel()
+    offsets = np.arange(0, n_groups * size + 1, size)
+    for regression in ('rry', 'mle'):
+        start = time.perf_counter()
+        batch = calculate_weibull_batch(values, offsets, options={'regression_method': regression})
+        elapsed = time.perf_counter() - start
+        assert batch['converged'].all()
+        assert elapsed < 3.0, f"{regression}: {elapsed:.3f} s"
+        print(f"{regression.upper()}: {n_groups} 批次 × {size} 點 = {elapsed:.3f} s，"
+              f"平均 β = {np.mean(batch['beta']):.3f}")
+
+    print("✓ 批次擬合速度測試通過")
+
+def test_endpoint():
+    """測試 /calculate_weibull_batch API"""
+    print("\n=== 測試 /calculate_weibull_batch API ===")
+
+    client = app.test_client()
+    resp = client.post('/calculate_weibull_batch', json={
+        'values': [100, 200, 300, 400, 150, 250, 50],
+        'offsets': [0, 4, 6, 7],
+        'suspensions': [500, 500],
+        'suspension_offsets': [0, 2, 2, 2],
+        'options': {'regression_method': 'mle'}
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['n_groups'] == 3 and data['converged'] == [True, True, False]
+    assert data['beta'][2] is None and data['n_failures'] == [4, 2, 1]
+
+    resp = client.post('/calculate_weibull_batch', json={'values': [1, 2], 'offsets': [0, 1]})
+    assert resp.status_code == 400
+
+    print("✓ API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("批次 Weibull 擬合測試")
+    print("=" * 60)
+
+    try:
+        test_matches_single_fit()
+        test_rrx_and_invalid_groups()
+        test_speed()
+        test_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有批次 Weibull 擬合測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
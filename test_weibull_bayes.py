@@ -0,0 +1,216 @@
+"""
+測試貝氏 Weibull 後驗 (系綜 MCMC)
+驗證後驗分位數與數值格點積分一致 (平坦與資訊先驗、含截尾)、可重現性、收斂診斷、
+進度回報與取消，以及 /bayes 背景任務 API
+"""
+
+import sys
+import io
+import time
+import threading
+import numpy as np
+import app as app_module
+from app import app
+from parallel import BlocksCancelled
+from weibull_bayes import run_bayes, prepare_bayes, log_posterior, split_r_hat, autocorr_time
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+FAILURES = [520, 780, 910, 1150, 1400, 1620]
+SUSPENSIONS = [1000, 1800, 1800, 1800]
+
+def grid_quantiles(plan, probs, log_eta=(5, 10), log_beta=(-3, 2.5), n=800):
+    """以格點積分求 β 與 η 的後驗邊際分位數"""
+    le, lb = np.linspace(*log_eta, n), np.linspace(*log_beta, n)
+    E, B = np.meshgrid(le, lb, indexing='ij')
+    lp = log_posterior(np.c_[E.ravel(), B.ravel()], plan).reshape(E.shape)
+    p = np.exp(lp - lp.max())
+    p /= p.sum()
+    beta_cdf, eta_cdf = np.cumsum(p.sum(axis=0)), np.cumsum(p.sum(axis=1))
+    return (np.exp(lb[np.searchsorted(beta_cdf, probs)]), np.exp(le[np.searchsorted(eta_cdf, probs)]))
+
+def test_posterior_matches_grid():
+    """測試後驗中位數與可信區間和格點積分一致 (平坦先驗與資訊先驗)"""
+    print("\n=== 測試後驗與格點積分一致 ===")
+
+    probs = [0.05, 0.5, 0.95]
+    for priors in (None, {'beta': {'dist': 'lognormal', 'median': 2.0, 'sigma': 0.2}},
+                   {'beta': {'dist': 'uniform', 'low': 1.0, 'high': 4.0},
+                    'eta_alt': {'dist': 'normal', 'mean': 1500, 'std': 300}}):
+        result = run_bayes(FAILURES, SUSPENSIONS, priors=priors, n_steps=3000, seed=1)
+        assert "error" not in result, result
+        plan = prepare_bayes(FAILURES, SUSPENSIONS, priors=priors)
+        beta_q, eta_q = grid_quantiles(plan, probs)
+        b, e = result['intervals']['beta'], result['intervals']['eta_alt']
+        mcmc_beta = [b['lower'], b['value'], b['upper']]
+        mcmc_eta = [e['lower'], e['value'], e['upper']]
+        assert np.allclose(mcmc_beta, beta_q, rtol=0.04), (priors, mcmc_beta, beta_q)
+        assert np.allclose(mcmc_eta, eta_q, rtol=0.04), (priors, mcmc_eta, eta_q)
+        print(f"{'平坦' if not priors else list(priors)}: β 中位數 {b['value']:.3f} (格點 {beta_q[1]:.3f})，"
+              f"η 中位數 {e['value']:.1f} (格點 {eta_q[1]:.1f})")
+
+    print("✓ 後驗與格點積分一致測試通過")
+
+def test_derived_and_censoring():
+    """測試現場指標的後驗、未失效樣品數的影響與只有截尾時的資訊先驗分析"""
+    print("\n=== 測試現場指標與截尾 ===")
+
+    af = 30.0
+    result = run_bayes(FAILURES, SUSPENSIONS, af_total=af, bx_percent=10, seed=2, max_draws=500)
+    draws = result['draws']
+    assert all(len(v) == 500 for v in draws.values())
+    beta, eta = np.array(draws['beta']), np.array(draws['eta_alt'])
+    assert np.allclose(draws['r_mission'], np.exp(-(17520 / (af * eta)) ** beta))
+    assert np.allclose(draws['bx_life'], af * eta * (-np.log(0.9)) ** (1 / beta))
+    r = result['intervals']['r_mission']
+    assert r['lower'] <= r['lower_one_sided'] <= r['value'] <= r['upper_one_sided'] <= r['upper']
+
+    # 樣品總數較多 (更多未失效樣品) 時 η 的後驗往上移
+    more = run_bayes(FAILURES, SUSPENSIONS, options={'n_total': 40}, seed=2)
+    assert more['point']['eta_alt'] > 1.5 * result['point']['eta_alt']
+    assert more['n_suspensions'] == 34
+
+    # 零失效：兩個參數皆有先驗時仍可分析
+    priors = {'beta': {'dist': 'lognormal', 'median': 2.0, 'sigma': 0.1},
+              'eta_alt': {'dist': 'lognormal', 'median': 2000, 'sigma': 1.0}}
+    zero = run_bayes([], [1000] * 30, priors=priors, seed=3)
+    assert "error" not in zero, zero
+    assert zero['point']['eta_alt'] > 2000
+
+    print(f"R(2年) 中位數 {r['value']:.4f}，90% 區間 [{r['lower']:.4f}, {r['upper']:.4f}]")
+    print("✓ 現場指標與截尾測試通過")
+
+def test_reproducibility_and_diagnostics():
+    """測試種子可重現、與 n_jobs 無關，以及收斂診斷"""
+    print("\n=== 測試可重現性與收斂診斷 ===")
+
+    serial = run_bayes(FAILURES, SUSPENSIONS, n_steps=600, seed=5, n_jobs=1)
+    pooled = run_bayes(FAILURES, SUSPENSIONS, n_steps=600, seed=5, n_jobs=2)
+    assert serial['intervals'] == pooled['intervals']
+    assert serial['n_draws'] == 4 * 32 * 300
+
+    diag = run_bayes(FAILURES, SUSPENSIONS, n_steps=4000, seed=6)['diagnostics']
+    assert diag['converged'] and all(r < 1.05 for r in diag['r_hat'].values()), diag
+    assert all(0.2 < a < 0.9 for a in diag['acceptance_fraction'])
+    assert all(ess > 1000 for ess in diag['ess'].values())
+
+    # 自相關時間：AR(1) 的理論值為 (1 + φ) / (1 - φ)
+    rng = np.random.default_rng(0)
+    phi, x = 0.8, np.zeros((20000, 8))
+    for i in range(1, x.shape[0]):
+        x[i] = phi * x[i - 1] + rng.standard_normal(8)
+    assert abs(autocorr_time(x) / ((1 + phi) / (1 - phi)) - 1) < 0.15
+    # 未混合的序列 R̂ 遠大於 1
+    assert split_r_hat(rng.standard_normal((1000, 4)) + np.arange(4)) > 1.5
+    assert abs(split_r_hat(rng.standard_normal((1000, 4))) - 1) < 0.01
+
+    print(f"R̂ = {diag['r_hat']}，τ = {diag['autocorr_time']}，ESS = {diag['ess']}")
+
+    assert "error" in run_bayes([100], [])
+    assert "error" in run_bayes(FAILURES, [], n_walkers=7)
+    assert "error" in run_bayes(FAILURES, [], n_steps=100, burn_in=100)
+    assert "error" in run_bayes(FAILURES, [], priors={'gamma': {'dist': 'normal', 'mean': 0, 'std': 1}})
+    assert "error" in run_bayes(FAILURES, [], priors={'beta': {'dist': 'weibull'}})
+    assert "error" in run_bayes(FAILURES, [], conf_level=1.2)
+
+    print("✓ 可重現性與收斂診斷測試通過")
+
+def test_progress_and_cancel():
+    """測試每條鏈的進度回報與取消"""
+    print("\n=== 測試進度回報與取消 ===")
+
+    calls = []
+    run_bayes(FAILURES, SUSPENSIONS, n_steps=200, seed=1,
+              progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(i, 4) for i in range(1, 5)]
+
+    cancel = threading.Event()
+    calls.clear()
+    def progress(done, total):
+        calls.append(done)
+        if done == 2:
+            cancel.set()
+    try:
+        run_bayes(FAILURES, SUSPENSIONS, n_steps=200, seed=1, progress=progress, cancel=cancel)
+        assert False, "未取消"
+    except BlocksCancelled:
+        pass
+    assert calls == [1, 2]
+
+    print("✓ 進度回報與取消測試通過")
+
+def test_endpoint():
+    """測試 /bayes 同步、背景任務與錯誤"""
+    print("\n=== 測試 /bayes API ===")
+
+    client = app.test_client()
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': FAILURES, 'suspensions': SUSPENSIONS, 'options': {'bx_life_percent': 10}},
+        'priors': {'beta': {'dist': 'lognormal', 'median': 2.0, 'sigma': 0.3}},
+        'n_steps': 500, 'seed': 5, 'max_draws': 100
+    }
+    start = time.perf_counter()
+    resp = client.post('/bayes', json={**payload, 'wait': True})
+    elapsed = time.perf_counter() - start
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert len(data['draws']['beta']) == 100 and data['bx_percent'] == 10
+    assert 'r_hat' in data['diagnostics'] and 'mttf_use' in data['metrics']
+
+    resp = client.post('/bayes', json=payload)
+    assert resp.status_code == 202 and resp.headers['Location'].startswith('/bayes/')
+    job_id = resp.get_json()['job_id']
+    for _ in range(200):
+        status = client.get(f'/bayes/{job_id}').get_json()
+        if status['status'] != 'running':
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'done', status
+    assert status['result']['intervals'] == data['intervals']
+
+    assert client.get('/bayes/unknown').status_code == 404
+    resp = client.post('/bayes', json={**payload, 'n_walkers': 5})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('貝氏分析錯誤')
+    resp = client.post('/bayes', json={**payload, 'percentiles': [101]})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('貝氏分析錯誤')
+    resp = client.post('/bayes', json={**payload, 'n_jobs': 2.5})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('貝氏分析錯誤')
+    saved = app_module.background_jobs.max_running
+    app_module.background_jobs.max_running = 0
+    try:
+        resp = client.post('/bayes', json=payload)
+        assert resp.status_code == 429 and resp.get_json()['error'].startswith('貝氏分析錯誤')
+        resp = client.post('/bayes', json={**payload, 'wait': True})
+        assert resp.status_code == 429 and resp.get_json()['error'].startswith('貝氏分析錯誤')
+    finally:
+        app_module.background_jobs.max_running = saved
+    print(f"同步 4 條鏈 × 32 walkers × 500 步 = {elapsed:.2f} s")
+
+    print("✓ /bayes API 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("貝氏 Weibull 測試")
+    print("=" * 60)
+
+    try:
+        test_posterior_matches_grid()
+        test_derived_and_censoring()
+        test_reproducibility_and_diagnostics()
+        test_progress_and_cancel()
+        test_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有貝氏 Weibull 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
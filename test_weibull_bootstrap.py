@@ -0,0 +1,265 @@
+"""
+測試 Weibull bootstrap 信賴區間
+驗證重抽後以相同方法擬合、種子可重現、進度回報與取消、速度與背景任務 API
+"""
+
+import sys
+import io
+import time
+import threading
+import numpy as np
+import app as app_module
+from app import app, calculate_weibull, calculate_reliability_results
+from jobs import JobRegistry, JobLimitExceeded, MAX_JOB_PROCESSES, clamp_n_jobs
+from parallel import BlocksCancelled, spawn_seeds
+from weibull_bootstrap import run_bootstrap
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+FAILURES = [1200, 1800, 2300, 2900, 3500, 4100, 4800, 5600]
+SUSPENSIONS = [5000, 6000, 6000]
+
+def test_refit_matches_calculate_weibull():
+    """測試每個重抽樣本以 calculate_weibull 相同的方法擬合，指標與 calculate_reliability_results 相同"""
+    print("\n=== 測試重抽樣本擬合一致 ===")
+
+    for options in ({'regression_method': 'rry', 'median_rank_method': 'johnson'},
+                    {'regression_method': 'rrx', 'median_rank_method': 'exact', 'n_total': 20},
+                    {'regression_method': 'mle'}):
+        result = run_bootstrap(FAILURES, SUSPENSIONS, options, af_total=30, n_resamples=50,
+                               seed=7, block_size=50, return_samples=True)
+        assert "error" not in result, result
+        single = calculate_weibull(FAILURES, SUSPENSIONS, options)
+        assert abs(result['point']['beta'] - single['beta']) < 1e-4
+        assert abs(result['point']['eta_alt'] / single['eta_alt'] - 1) < 1e-4
+
+        # 以相同的子種子重建第一個重抽樣本
+        rng = np.random.default_rng(spawn_seeds(7, 1)[0])
+        times = np.array(FAILURES + SUSPENSIONS, dtype=float)
+        is_failure = np.arange(times.size) < len(FAILURES)
+        index = rng.integers(0, times.size, (50, times.size))[0]
+        refit = calculate_weibull(times[index][is_failure[index]].tolist(),
+                                  times[index][~is_failure[index]].tolist(), options)
+        samples = result['samples']
+        assert abs(samples['beta'][0] - refit['beta']) < 1e-4, (options, samples['beta'][0], refit['beta'])
+
+        point = calculate_reliability_results(30, {'beta': samples['beta'][0],
+                                                   'eta_alt': samples['eta_alt'][0]}, None)['weibull']
+        assert abs(samples['r_mission'][0] - point['r_mission']) < 1e-6
+        assert abs(samples['mttf_use'][0] / point['mttf_use'] - 1) < 1e-6
+        print(f"{single['method']}: β = {single['beta']}，第一個重抽樣本 β = {refit['beta']}")
+
+    print("✓ 重抽樣本擬合一致性測試通過")
+
+def test_reproducibility_and_intervals():
+    """測試種子可重現、與 n_jobs 無關，以及區間順序"""
+    print("\n=== 測試可重現性與信賴區間 ===")
+
+    kwargs = dict(options={'regression_method': 'mle'}, af_total=30, method='parametric',
+                  n_resamples=3000, seed=11, block_size=500)
+    serial = run_bootstrap(FAILURES, SUSPENSIONS, n_jobs=1, **kwargs)
+    pooled = run_bootstrap(FAILURES, SUSPENSIONS, n_jobs=2, **kwargs)
+    assert serial['intervals'] == pooled['intervals']
+    assert serial['n_valid'] == 3000
+
+    for name, b in serial['intervals'].items():
+        assert b['lower'] <= b['lower_one_sided'] <= b['upper_one_sided'] <= b['upper'], name
+        assert b['lower'] < b['value'] < b['upper'], name
+    print(f"參數 bootstrap 90% β 區間: [{serial['intervals']['beta']['lower']:.3f}, "
+          f"{serial['intervals']['beta']['upper']:.3f}]，點估計 {serial['point']['beta']:.3f}")
+
+    assert "error" in run_bootstrap(FAILURES, [], method='jackknife')
+    assert "error" in run_bootstrap([100], [])
+    assert "error" in run_bootstrap(FAILURES, [], n_resamples=1)
+    assert "error" in run_bootstrap(FAILURES, [], options={'regression_method': 'lsq'})
+
+    print("✓ 可重現性與信賴區間測試通過")
+
+def test_progress_and_cancel():
+    """測試區塊進度回報與取消"""
+    print("\n=== 測試進度回報與取消 ===")
+
+    calls = []
+    run_bootstrap(FAILURES, SUSPENSIONS, n_resamples=1000, seed=1, block_size=200,
+                  progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(i, 5) for i in range(1, 6)]
+
+    cancel = threading.Event()
+    calls.clear()
+    def progress(done, total):
+        calls.append(done)
+        if done == 2:
+            cancel.set()
+    try:
+        run_bootstrap(FAILURES, SUSPENSIONS, n_resamples=1000, seed=1, block_size=200,
+                      progress=progress, cancel=cancel)
+        assert False, "未取消"
+    except BlocksCancelled:
+        pass
+    assert calls == [1, 2]
+
+    print("✓ 進度回報與取消測試通過")
+
+def test_speed():
+    """測試 10,000 次重抽 × 100 點的速度"""
+    print("\n=== 測試 bootstrap 速度 ===")
+
+    data = (1000 * np.random.default_rng(0).weibull(2.0, 100)).tolist()
+    for regression in ('rry', 'mle'):
+        start = time.perf_counter()
+        result = run_bootstrap(data, [], {'regression_method': regression}, n_resamples=10000, seed=3)
+        elapsed = time.perf_counter() - start
+        assert result['n_valid'] == 10000
+        assert elapsed < 10.0, f"{regression}: {elapsed:.2f} s"
+        print(f"{regression.upper()}: 10000 次重抽 × 100 點 = {elapsed:.2f} s")
+
+    print("✓ bootstrap 速度測試通過")
+
+def test_endpoint():
+    """測試 /bootstrap 同步、背景任務、進度查詢與取消"""
+    print("\n=== 測試 /bootstrap API ===")
+
+    client = app.test_client()
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': FAILURES, 'suspensions': SUSPENSIONS,
+                         'options': {'regression_method': 'mle'}},
+        'n_resamples': 400, 'seed': 5
+    }
+
+    resp = client.post('/bootstrap', json={**payload, 'wait': True})
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['n_resamples'] == 400 and 'r_mission' in data['intervals']
+
+    resp = client.post('/bootstrap', json=payload)
+    assert resp.status_code == 202 and resp.headers['Location'].startswith('/bootstrap/')
+    job_id = resp.get_json()['job_id']
+    for _ in range(200):
+        status = client.get(f'/bootstrap/{job_id}').get_json()
+        if status['status'] != 'running':
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'done', status
+    assert status['progress']['fraction'] == 1.0
+    assert status['result']['intervals'] == data['intervals']
+
+    resp = client.post('/bootstrap', json={**payload, 'n_resamples': 1000000})
+    job_id = resp.get_json()['job_id']
+    time.sleep(0.2)
+    assert client.delete(f'/bootstrap/{job_id}').status_code == 200
+    for _ in range(200):
+        status = client.get(f'/bootstrap/{job_id}').get_json()
+        if status['status'] != 'running':
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'cancelled', status
+    assert status['progress']['done'] < status['progress']['total']
+    print(f"取消於 {status['progress']['done']} / {status['progress']['total']} 個區塊")
+
+    assert client.get('/bootstrap/unknown').status_code == 404
+    assert client.post('/bootstrap', json={**payload, 'method': 'jackknife'}).status_code == 400
+    for bad in ({'percentiles': [101]}, {'percentiles': [-1, 50]}, {'bins': 'many'}):
+        resp = client.post('/bootstrap', json={**payload, **bad})
+        assert resp.status_code == 400 and resp.get_json()['error'].startswith('Bootstrap 計算錯誤'), bad
+
+    print("✓ /bootstrap API 測試通過")
+
+def test_job_limits():
+    """測試背景任務數上限、已結束任務逾時移除與 n_jobs 限制"""
+    print("\n=== 測試背景任務上限 ===")
+
+    release = threading.Event()
+    def blocking(progress=None, cancel=None):
+        release.wait(5)
+        return {"ok": True}
+
+    registry = JobRegistry(max_running=2, finished_ttl=60)
+    jobs = [registry.start('test', blocking) for _ in range(2)]
+    try:
+        registry.start('test', blocking)
+        assert False, "未拒絕超過上限的任務"
+    except JobLimitExceeded:
+        pass
+    assert registry.running() == 2
+    release.set()
+    for _ in range(100):
+        if registry.running() == 0:
+            break
+        time.sleep(0.02)
+    assert all(j.status == 'done' for j in jobs)
+    registry.start('test', blocking)
+
+    # 同步執行與背景任務共用名額
+    shared = JobRegistry(max_running=1)
+    with shared.slot():
+        assert shared.running() == 1
+        for acquire in (lambda: shared.start('test', blocking), shared.slot().__enter__):
+            try:
+                acquire()
+                assert False, "同步執行占用名額時未拒絕"
+            except JobLimitExceeded:
+                pass
+    assert shared.running() == 0
+
+    jobs[0].finished -= 120
+    assert registry.get(jobs[0].id) is None, "逾時的已結束任務未移除"
+    assert registry.get(jobs[1].id) is jobs[1]
+
+    assert clamp_n_jobs(1) == 1
+    assert 1 <= clamp_n_jobs(-1) <= MAX_JOB_PROCESSES
+    assert clamp_n_jobs(1000) <= MAX_JOB_PROCESSES
+    assert clamp_n_jobs(2.0) == clamp_n_jobs(2)
+    for bad in (1.5, 'abc'):
+        try:
+            clamp_n_jobs(bad)
+            assert False, f"未拒絕 n_jobs={bad!r}"
+        except (TypeError, ValueError):
+            pass
+
+    client = app.test_client()
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': FAILURES, 'suspensions': SUSPENSIONS},
+        'n_resamples': 400, 'seed': 5
+    }
+    resp = client.post('/bootstrap', json={**payload, 'n_jobs': 'all'})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('Bootstrap 計算錯誤')
+    saved = app_module.background_jobs.max_running
+    app_module.background_jobs.max_running = 0
+    try:
+        resp = client.post('/bootstrap', json=payload)
+        assert resp.status_code == 429 and resp.get_json()['error'].startswith('Bootstrap 計算錯誤')
+        resp = client.post('/bootstrap', json={**payload, 'wait': True})
+        assert resp.status_code == 429, "同步執行也需占用執行名額"
+    finally:
+        app_module.background_jobs.max_running = saved
+
+    print("✓ 背景任務上限測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Weibull bootstrap 測試")
+    print("=" * 60)
+
+    try:
+        test_refit_matches_calculate_weibull()
+        test_reproducibility_and_intervals()
+        test_progress_and_cancel()
+        test_speed()
+        test_endpoint()
+        test_job_limits()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有 bootstrap 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""
+測試 Weibull 信賴界限
+驗證觀測資訊矩陣、概似比等高線、Fisher 界限涵蓋率、R(t) 曲線與 /calculate 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import stats, optimize
+from app import app, calculate_weibull, calculate_reliability_results
+from weibull_mle import fit_weibull_mle, prepare_sample
+from weibull_bounds import (information_matrix, fisher_bounds, likelihood_contour, lr_bounds,
+                            _log_likelihood)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+FAILURES = [1200, 1800, 2300, 2900, 3500]
+SUSPENSIONS = [4000, 4000, 4000]
+
+def sample():
+    fit = fit_weibull_mle(FAILURES, SUSPENSIONS)
+    times, is_failure, weights = prepare_sample(FAILURES, SUSPENSIONS)
+    return fit['beta'], fit['eta'], times, is_failure, weights
+
+def test_information_matrix():
+    """測試解析資訊矩陣與數值 Hessian 一致，且計算成本極低"""
+    print("\n=== 測試觀測資訊矩陣 ===")
+
+    beta, eta, times, is_failure, weights = sample()
+    info, cov = information_matrix(beta, eta, times, is_failure, weights)
+
+    def ll(p):
+        return _log_likelihood(np.array([p[0]]), np.array([p[1]]), np.log(times),
+                               is_failure, weights)[0]
+    center, h = np.array([np.log(eta), np.log(beta)]), 1e-4
+    numeric = np.empty((2, 2))
+    for i in range(2):
+        for j in range(2):
+            ei, ej = np.eye(2)[i] * h, np.eye(2)[j] * h
+            numeric[i, j] = -(ll(center + ei + ej) - ll(center + ei - ej) -
+                              ll(center - ei + ej) + ll(center - ei - ej)) / (4 * h * h)
+    assert np.allclose(info, numeric, rtol=1e-5), (info, numeric)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        fisher_bounds(beta, eta, information_matrix(beta, eta, times, is_failure)[1], 0.9)
+    elapsed = (time.perf_counter() - start) / 1000
+    assert elapsed < 1e-3
+    print(f"Fisher 界限: {elapsed * 1e6:.0f} µs / 次")
+    print("✓ 觀測資訊矩陣測試通過")
+
+def test_lr_matches_profile():
+    """測試 LR 等高線的 β 界限與剖面概似求根一致"""
+    print("\n=== 測試概似比界限 ===")
+
+    beta, eta, times, is_failure, weights = sample()
+    _, cov = information_matrix(beta, eta, times, is_failure, weights)
+    contours = likelihood_contour(beta, eta, cov, times, is_failure, weights, 0.9, n_points=720)
+    bounds = lr_bounds(beta, eta, contours)
+
+    # 剖面概似：固定 β 時 η 有封閉解
+    log_t, r = np.log(times), is_failure.sum()
+    def profile(b):
+        log_eta = np.log(np.sum(weights * times ** b) / r) / b
+        return _log_likelihood(np.array([log_eta]), np.array([np.log(b)]), log_t,
+                               is_failure, weights)[0]
+    target = profile(beta) - stats.chi2.ppf(0.9, 1) / 2
+    lower = optimize.brentq(lambda b: profile(b) - target, 0.1, beta)
+    upper = optimize.brentq(lambda b: profile(b) - target, beta, 50)
+    assert abs(bounds['beta']['lower'] / lower - 1) < 1e-4, (bounds['beta'], lower)
+    assert abs(bounds['beta']['upper'] / upper - 1) < 1e-4, (bounds['beta'], upper)
+    assert bounds['beta']['lower'] < bounds['beta']['lower_one_sided'] < beta
+
+    print(f"β = {beta:.4f}，LR 90% 界限 [{bounds['beta']['lower']:.4f}, "
+          f"{bounds['beta']['upper']:.4f}] (剖面概似 [{lower:.4f}, {upper:.4f}])")
+    print("✓ 概似比界限測試通過")
+
+def test_fisher_coverage():
+    """測試 Fisher 界限的模擬涵蓋率"""
+    print("\n=== 測試 Fisher 界限涵蓋率 ===")
+
+    rng = np.random.default_rng(0)
+    hits = {'beta': 0, 'eta_alt': 0, 'r': 0}
+    true_r = np.exp(-(500 / 1000) ** 2)
+    n_sim = 400
+    for _ in range(n_sim):
+        data = 1000 * rng.weibull(2.0, 40)
+        fit = fit_weibull_mle(data)
+        _, cov = information_matrix(fit['beta'], fit['eta'], data, np.ones(40))
+        b = fisher_bounds(fit['beta'], fit['eta'], cov, 0.9, t=500)
+        hits['beta'] += b['beta']['lower'] < 2.0 < b['beta']['upper']
+        hits['eta_alt'] += b['eta_alt']['lower'] < 1000 < b['eta_alt']['upper']
+        hits['r'] += b['r']['lower'] < true_r < b['r']['upper']
+    for key, count in hits.items():
+        assert 0.85 < count / n_sim < 0.95, f"{key} 涵蓋率 {count / n_sim}"
+        print(f"{key}: 90% 界限涵蓋率 = {count / n_sim:.3f}")
+
+    print("✓ Fisher 界限涵蓋率測試通過")
+
+def test_reliability_results_and_curve():
+    """測試 calculate_reliability_results 的現場指標界限與 R(t) 曲線"""
+    print("\n=== 測試可靠度指標界限 ===")
+
+    for method in ('fisher', 'lr'):
+        weibull = calculate_weibull(FAILURES, SUSPENSIONS,
+                                    {'regression_method': 'mle', 'bounds_method': method,
+                                     'conf_level': 0.9})
+        assert weibull['r_squared'] != 0.999 and 0 < weibull['r_squared'] <= 1
+        result = calculate_reliability_results(50, weibull, None, 17520, 10)['weibull']
+        bounds = result['bounds']
+        for key in ('eta_use', 'mttf_use', 'bx_life', 'r_mission'):
+            b = bounds[key]
+            assert b['lower'] <= b['lower_one_sided'] <= b['value'] <= b['upper_one_sided'] <= b['upper'], (method, key, b)
+        assert bounds['r_mission']['value'] == result['r_mission']
+
+        curve = result['r_curve']
+        assert len(curve['t']) == 100 and curve['t'][-1] == 17520
+        assert np.all(np.diff(curve['value']) <= 0) and np.all(np.diff(curve['lower']) <= 0)
+        assert abs(curve['lower'][-1] - bounds['r_mission']['lower']) < 1e-6
+        print(f"{method.upper()}: R(2 年) = {result['r_mission']} "
+              f"[{bounds['r_mission']['lower']}, {bounds['r_mission']['upper']}]")
+
+    rry = calculate_weibull(FAILURES, SUSPENSIONS, {'regression_method': 'rry'})
+    assert 'bounds' not in calculate_reliability_results(50, rry, None)['weibull']
+    assert 'error' in calculate_weibull(FAILURES, [], {'regression_method': 'mle',
+                                                        'bounds_method': 'bayes'})
+
+    print("✓ 可靠度指標界限測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 回傳信賴界限"""
+    print("\n=== 測試 /calculate 信賴界限 ===")
+
+    client = app.test_client()
+    resp = client.post('/calculate', json={
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': FAILURES, 'suspensions': SUSPENSIONS,
+                         'options': {'regression_method': 'mle', 'bounds_method': 'lr'}},
+        'mission_years': 2
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['weibull_result']['bounds_method'] == 'lr'
+    assert len(data['weibull_result']['contour']['two_sided']['beta']) == 360
+    assert 'r_curve' in data['reliability_result']['weibull']
+
+    print("✓ /calculate 信賴界限測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Weibull 信賴界限測試")
+    print("=" * 60)
+
+    try:
+        test_information_matrix()
+        test_lr_matches_profile()
+        test_fisher_coverage()
+        test_reliability_results_and_curve()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有信賴界限測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
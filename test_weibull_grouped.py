@@ -0,0 +1,213 @@
+"""
+測試分組 (區間) Weibull 數據
+驗證區間概似的解析導數、細分區間收斂到逐點 MLE、串流彙總、精算秩、百萬筆數據速度與 /calculate
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_weibull
+from weibull_mle import fit_weibull_mle
+from weibull_grouped import (bin_life_data, parse_bins, fit_weibull_grouped,
+                             calculate_weibull_grouped, _grouped_derivatives, log_edges)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def field_data(rng, n, beta=1.5, eta=1000.0, t_end=3000.0, readout=None):
+    """現場數據：隨機上線時間造成的右截尾 (readout 指定時截尾只發生在檢查時間的倍數)"""
+    life = eta * rng.weibull(beta, n)
+    censor = rng.uniform(0, t_end, n)
+    if readout:
+        censor = np.ceil(censor / readout) * readout
+    return life[life <= censor], censor[life > censor]
+
+def test_derivatives():
+    """測試區間對數概似的解析梯度與 Hessian (含 start = 0 與 end = ∞ 的區間)"""
+    print("\n=== 測試區間概似導數 ===")
+
+    start = np.array([0.0, 100, 300, 800, 2000])
+    end = np.array([100.0, 300, 800, 2000, np.inf])
+    fail = np.array([3.0, 10, 25, 30, 5])
+    susp = np.array([2.0, 0, 4, 7, 0])
+    f, s = fail > 0, susp > 0
+    args = (np.log(start[f], where=start[f] > 0, out=np.full(int(f.sum()), -np.inf)),
+            np.log(end[f]), fail[f], np.log(end[s]), susp[s])
+
+    theta, h = np.array([np.log(900.0), np.log(1.3)]), 1e-6
+    _, grad, hess = _grouped_derivatives(theta, *args)
+    for i in range(2):
+        e = np.eye(2)[i] * h
+        up, down = _grouped_derivatives(theta + e, *args), _grouped_derivatives(theta - e, *args)
+        assert abs((up[0] - down[0]) / (2 * h) - grad[i]) < 1e-5 * (1 + abs(grad[i]))
+        assert np.allclose((up[1] - down[1]) / (2 * h), hess[i], rtol=1e-5, atol=1e-5)
+
+    print("✓ 區間概似導數測試通過")
+
+def test_fine_bins_match_exact_mle():
+    """測試極細的區間收斂到逐點右截尾 MLE"""
+    print("\n=== 測試細分區間與逐點 MLE 一致 ===")
+
+    rng = np.random.default_rng(0)
+    failures, suspensions = field_data(rng, 400)
+    bins = bin_life_data(failures, suspensions, np.linspace(0, 3001, 30001))
+    grouped = calculate_weibull_grouped(bins)
+    exact = fit_weibull_mle(failures, np.floor(suspensions * 10) / 10)
+    assert abs(grouped['beta'] / exact['beta'] - 1) < 2e-3, (grouped['beta'], exact['beta'])
+    assert abs(grouped['eta_alt'] / exact['eta'] - 1) < 2e-3
+    print(f"分組 β = {grouped['beta']}，逐點 β = {exact['beta']:.4f}")
+
+    print("✓ 細分區間測試通過")
+
+def test_streaming_binning():
+    """測試分塊串流彙總與一次彙總相同，及截尾的保守歸類"""
+    print("\n=== 測試串流彙總 ===")
+
+    rng = np.random.default_rng(1)
+    failures, suspensions = field_data(rng, 100000)
+    edges = log_edges(10, 3000, 40)
+    whole = bin_life_data(failures, suspensions, edges)
+
+    def chunks(values, size=7777):
+        for i in range(0, values.size, size):
+            yield values[i:i + size]
+    streamed = bin_life_data(chunks(failures), chunks(suspensions), edges)
+    assert np.array_equal(whole['failures'], streamed['failures'])
+    assert np.array_equal(whole['suspensions'], streamed['suspensions'])
+    assert np.array_equal(whole['failures'], np.histogram(failures, edges)[0])
+    assert whole['failures'].sum() + whole['suspensions'].sum() + whole['n_out_of_range'] == 100000
+
+    # 截尾歸入結束時間不晚於截尾時間的區間；早於第一個區間結束者無法歸入
+    small = bin_life_data([5, 15], [5, 10, 25, 99], [0, 10, 20, 30])
+    assert small['failures'].tolist() == [1, 1, 0]
+    assert small['suspensions'].tolist() == [1, 1, 1] and small['n_out_of_range'] == 1
+
+    print("✓ 串流彙總測試通過")
+
+def test_rank_regression_matches_km():
+    """測試每個失效時間各自成區間時，精算秩與 Kaplan-Meier 中位秩的秩回歸相同"""
+    print("\n=== 測試精算秩回歸 ===")
+
+    failures = [120.0, 250, 310, 480, 600, 750]
+    suspensions = [300.0, 500, 800, 800]
+    ends = np.unique(failures + suspensions)
+    starts = np.r_[0.0, ends[:-1]]
+    bins = {'start': starts, 'end': ends,
+            'failures': [failures.count(e) for e in ends],
+            'suspensions': [suspensions.count(e) for e in ends]}
+    for regression in ('rry', 'rrx'):
+        grouped = calculate_weibull_grouped(bins, {'regression_method': regression})
+        single = calculate_weibull(failures, suspensions, {'regression_method': regression,
+                                                           'median_rank_method': 'km', 'n_total': 10})
+        assert abs(grouped['beta'] - single['beta']) < 1e-4, regression
+        assert abs(grouped['eta_alt'] - single['eta_alt']) < 1e-3, regression
+        assert np.allclose(grouped['plot_data']['f'], single['plot_data']['f'], rtol=1e-12)
+
+    print("✓ 精算秩回歸測試通過")
+
+def test_million_units():
+    """測試兩百萬筆定期檢查的現場數據：彙總一次、擬合成本只與區間數有關"""
+    print("\n=== 測試百萬筆數據 ===")
+
+    rng = np.random.default_rng(2)
+    failures, suspensions = field_data(rng, 2000000, readout=30.0)
+    start = time.perf_counter()
+    bins = bin_life_data(failures, suspensions, np.arange(0, 3001, 30.0))
+    binned = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = calculate_weibull_grouped(bins, {'regression_method': 'mle', 'conf_level': 0.99})
+    fitted = time.perf_counter() - start
+    assert fitted < 0.1, fitted
+    b = result['bounds']['beta']
+    assert b['lower'] < 1.5 < b['upper'], b
+    assert abs(result['eta_alt'] / 1000 - 1) < 0.01
+
+    print(f"彙總 {failures.size + suspensions.size} 筆 = {binned:.3f} s，"
+          f"擬合 {result['n_bins']} 個區間 = {fitted * 1000:.1f} ms，β = {result['beta']}")
+
+    start, end, fail, susp = parse_bins(bins)
+    fit = fit_weibull_grouped(start, end, fail, susp)
+    assert fit['converged'] and fit['iterations'] < 20
+
+    assert "error" in calculate_weibull_grouped({'start': [0], 'end': [10], 'failures': [5]})
+    assert "error" in calculate_weibull_grouped([[10, 5, 1, 0], [20, 30, 2, 0]])
+    assert "error" in calculate_weibull_grouped([[0, 10, 1, 0], [10, 20, 2, 0]],
+                                                {'bounds_method': 'lr'})
+
+    print("✓ 百萬筆數據測試通過")
+
+def test_overlapping_bins_mle():
+    """測試重疊與巢狀區間：MLE 直接以區間概似擬合，秩回歸拒絕"""
+    print("\n=== 測試重疊區間 MLE ===")
+
+    bins = [[0, 100, 5, 0], [50, 200, 8, 0], [100, 300, 10, 0], [0, 500, 3, 20]]
+    result = calculate_weibull_grouped(bins)
+    assert 'error' not in result, result
+    fit = fit_weibull_grouped(*parse_bins(bins))
+    assert abs(result['beta'] - fit['beta']) < 1e-4 and abs(result['eta_alt'] - fit['eta']) < 1e-3
+    assert result['r_squared'] is None and result['plot_data']['x'] == []
+    assert 'bounds' in result
+    for method in ('rry', 'rrx'):
+        assert 'error' in calculate_weibull_grouped(bins, {'regression_method': method})
+
+    client = app.test_client()
+    resp = client.post('/calculate', json={
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'bins': bins, 'options': {'regression_method': 'mle'}}})
+    data = resp.get_json()
+    assert resp.status_code == 200 and data['weibull_result']['beta'] == result['beta'], data
+
+    print(f"β = {result['beta']}, η = {result['eta_alt']}")
+    print("✓ 重疊區間 MLE 測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 接受分組數據並回傳可靠度界限"""
+    print("\n=== 測試 /calculate 分組數據 ===")
+
+    client = app.test_client()
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'bins': [[0, 500, 3, 10], [500, 1000, 8, 12], [1000, 2000, 15, 20],
+                                  [2000, 4000, 9, 0]],
+                         'options': {'regression_method': 'mle', 'n_total': 100}},
+        'mission_years': 2
+    }
+    resp = client.post('/calculate', json=payload)
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['weibull_result']['method'] == 'GROUPED + MLE'
+    assert 'bounds' in data['reliability_result']['weibull']
+
+    payload['weibull_data']['bins'] = [[0, 500, -1, 0]]
+    assert client.post('/calculate', json=payload).get_json()['weibull_result'].get('error')
+
+    print("✓ /calculate 分組數據測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("分組 Weibull 數據測試")
+    print("=" * 60)
+
+    try:
+        test_derivatives()
+        test_fine_bins_match_exact_mle()
+        test_streaming_binning()
+        test_rank_regression_matches_km()
+        test_million_units()
+        test_overlapping_bins_mle()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有分組數據測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,167 @@
+"""
+測試區間截尾 (定期檢查) Weibull 估計
+驗證確切失效時與逐點 MLE 一致、Turnbull 估計、定期檢查數據的估計與速度、/calculate 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import optimize
+from app import app
+from median_ranks import median_ranks
+from weibull_mle import fit_weibull_mle
+from weibull_grouped import actuarial_ranks, _grouped_derivatives
+from weibull_interval import parse_intervals, turnbull, calculate_weibull_interval
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+READOUTS = np.array([24, 48, 96, 168, 250, 336, 500, 750, 1000, 1250, 1500, 2000], dtype=float)
+
+def readout_data(rng, n, beta=1.8, eta=1000.0):
+    """定期檢查數據：失效只知落在兩次檢查之間，部分樣品於中途檢查時移出"""
+    life = eta * rng.weibull(beta, n)
+    removal = rng.choice(READOUTS[3:], n)
+    index = np.searchsorted(READOUTS, life)
+    lower = np.where(index > 0, READOUTS[np.maximum(index - 1, 0)], 0.0)
+    upper = np.where(index < READOUTS.size, READOUTS[np.minimum(index, READOUTS.size - 1)], np.inf)
+    failed = life <= removal
+    return np.where(failed, lower, removal), np.where(failed, upper, np.inf)
+
+def test_exact_data():
+    """測試確切失效 + 右截尾時，MLE 與逐點 MLE 相同、Turnbull 與 Kaplan-Meier 相同"""
+    print("\n=== 測試確切失效數據 ===")
+
+    rng = np.random.default_rng(0)
+    failures = 1000 * rng.weibull(2.0, 30)
+    suspensions = [900.0] * 5
+    rows = np.r_[np.c_[failures, failures], np.c_[suspensions, [np.inf] * 5]]
+    result = calculate_weibull_interval(rows)
+    exact = fit_weibull_mle(failures, suspensions)
+    assert abs(result['beta'] - exact['beta']) < 1e-4 and abs(result['eta_alt'] - exact['eta']) < 1e-3
+
+    _, km = median_ranks(failures, suspensions, 'km', 35)
+    assert np.allclose(result['plot_data']['f'], km[km < 1])
+    print(f"β = {result['beta']} (逐點 MLE {exact['beta']:.4f})")
+
+    print("✓ 確切失效數據測試通過")
+
+def test_interval_likelihood():
+    """測試含左截尾、區間與確切失效的概似梯度，以及 MLE 與通用最佳化一致"""
+    print("\n=== 測試區間截尾概似 ===")
+
+    rows = [[0, 24, 2], [24, 168, 5], [168, 500, 7], [300, 300, 1], [420, 420, 1],
+            [500, 1000, 6], [1000, None, 9], [750, None, 3]]
+    result = calculate_weibull_interval(rows)
+    assert result['n_left_censored'] == 2 and result['n_exact'] == 2
+    assert result['n_right_censored'] == 12 and result['n_interval'] == 18
+
+    left, right, count = parse_intervals(rows)
+    exact, censored = left == right, np.isinf(right)
+    failed = ~exact & ~censored
+
+    def neg_ll(theta):
+        args = (np.log(left[failed], where=left[failed] > 0, out=np.full(int(failed.sum()), -np.inf)),
+                np.log(right[failed]), count[failed], np.log(left[censored]), count[censored],
+                np.log(left[exact]), count[exact])
+        return -_grouped_derivatives(theta, *args)[0]
+    best = optimize.minimize(neg_ll, [np.log(800), 0.0], method='Nelder-Mead',
+                             options={'xatol': 1e-10, 'fatol': 1e-12, 'maxiter': 5000})
+    assert abs(np.exp(best.x[1]) / result['beta'] - 1) < 1e-4
+    assert abs(np.exp(best.x[0]) / result['eta_alt'] - 1) < 1e-4
+
+    print("✓ 區間截尾概似測試通過")
+
+def test_turnbull_readouts():
+    """測試定期檢查數據的 Turnbull 估計等於分組精算估計"""
+    print("\n=== 測試 Turnbull 估計 ===")
+
+    rng = np.random.default_rng(1)
+    left, right = readout_data(rng, 2000)
+    left_u, right_u, count = parse_intervals({'left': left, 'right': right})
+    npmle = turnbull(left_u, right_u, count)
+    assert npmle['converged']
+    assert np.array_equal(npmle['right'][:-1], READOUTS)
+
+    # 以分組方式表示：失效於 (前次檢查, 本次檢查]，移出者於該次檢查結束時截尾
+    starts = np.r_[0.0, READOUTS[:-1]]
+    failed = np.isfinite(right)
+    fail = np.array([np.sum(failed & (right == r)) for r in READOUTS], dtype=float)
+    susp = np.array([np.sum(~failed & (left == r)) for r in READOUTS], dtype=float)
+    t_ref, f_ref = actuarial_ranks(starts, READOUTS, fail, susp)
+    assert np.allclose(npmle['F'][:-1], f_ref, atol=1e-8), (npmle['F'][:-1], f_ref)
+
+    print(f"Turnbull 迭代 {npmle['iterations']} 次，F(2000 h) = {npmle['F'][-2]:.4f}")
+    print("✓ Turnbull 估計測試通過")
+
+def test_readout_speed():
+    """測試數千個樣品、十餘次檢查的區間截尾擬合速度與估計"""
+    print("\n=== 測試定期檢查數據擬合 ===")
+
+    rng = np.random.default_rng(2)
+    left, right = readout_data(rng, 5000)
+    start = time.perf_counter()
+    result = calculate_weibull_interval({'left': left.tolist(),
+                                         'right': [None if np.isinf(r) else r for r in right]},
+                                        {'conf_level': 0.99})
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5, elapsed
+    assert result['bounds']['beta']['lower'] < 1.8 < result['bounds']['beta']['upper']
+    assert result['bounds']['eta_alt']['lower'] < 1000 < result['bounds']['eta_alt']['upper']
+    print(f"5000 個樣品 = {elapsed * 1000:.1f} ms，β = {result['beta']}，η = {result['eta_alt']}")
+
+    for regression in ('rry', 'rrx'):
+        rr = calculate_weibull_interval({'left': left, 'right': right},
+                                        {'regression_method': regression})
+        assert abs(rr['beta'] - 1.8) < 0.2, (regression, rr['beta'])
+
+    assert "error" in calculate_weibull_interval([[0, None, 5]])
+    assert "error" in calculate_weibull_interval([[100, 50, 1], [10, 20, 1]])
+    assert "error" in calculate_weibull_interval([[10, 20, 1], [30, None, 1]])
+
+    print("✓ 定期檢查數據擬合測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 接受區間截尾數據"""
+    print("\n=== 測試 /calculate 區間截尾數據 ===")
+
+    client = app.test_client()
+    resp = client.post('/calculate', json={
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'intervals': {'left': [0, 168, 168, 500, 500, 1000],
+                                       'right': [168, 500, 500, 1000, 1000, None],
+                                       'count': [1, 2, 1, 3, 1, 12]}},
+        'mission_years': 2
+    })
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['weibull_result']['method'] == 'INTERVAL + MLE'
+    assert 'bounds' in data['reliability_result']['weibull']
+
+    print("✓ /calculate 區間截尾數據測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("區間截尾 Weibull 測試")
+    print("=" * 60)
+
+    try:
+        test_exact_data()
+        test_interval_likelihood()
+        test_turnbull_readouts()
+        test_readout_speed()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有區間截尾測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,163 @@
+"""
+測試混合 Weibull (多失效模式) EM 估計
+驗證參數還原、對數概似一致、多起始點、混合 R/h/f 與可靠度指標、/calculate 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_reliability_results
+from weibull_mle import prepare_sample
+from weibull_mixture import (calculate_weibull_mixture, fit_weibull_mixture, mixture_functions,
+                             mixture_reliability, mixture_curves)
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def two_mode_data(rng, n, p_early=0.3):
+    """早期失效 (β < 1) 與磨耗 (β > 1) 混合，隨機截尾"""
+    early = rng.random(n) < p_early
+    life = np.where(early, 200 * rng.weibull(0.7, n), 3000 * rng.weibull(3.5, n))
+    censor = rng.uniform(1000, 6000, n)
+    return life[life <= censor], censor[life > censor]
+
+def test_parameter_recovery():
+    """測試兩個失效模式的參數還原與速度"""
+    print("\n=== 測試混合 Weibull 參數還原 ===")
+
+    rng = np.random.default_rng(0)
+    failures, suspensions = two_mode_data(rng, 1000)
+    start = time.perf_counter()
+    result = calculate_weibull_mixture(failures, suspensions)
+    elapsed = time.perf_counter() - start
+    assert result['converged'], result
+    early, wear = result['components']
+    assert abs(early['beta'] - 0.7) < 0.15 and abs(early['eta_alt'] / 200 - 1) < 0.3, early
+    assert abs(wear['beta'] - 3.5) < 0.4 and abs(wear['eta_alt'] / 3000 - 1) < 0.05, wear
+    assert abs(early['weight'] - 0.3) < 0.05
+    assert abs(early['weight'] + wear['weight'] - 1) < 1e-3
+    assert elapsed < 1.0, elapsed
+    for key in ('log_likelihood', 'aic', 'bic'):
+        assert type(result[key]) is float and result[key] == round(result[key], 4), key
+    print(f"早期失效 β={early['beta']}, η={early['eta_alt']}, p={early['weight']}；"
+          f"磨耗 β={wear['beta']}, η={wear['eta_alt']}；{result['iterations']} 次迭代 = {elapsed * 1000:.0f} ms")
+
+    print("✓ 混合 Weibull 參數還原測試通過")
+
+def test_likelihood_and_restarts():
+    """測試回傳的對數概似與混合密度一致、多起始點不劣於單一起始點且結果可重現"""
+    print("\n=== 測試對數概似與多起始點 ===")
+
+    rng = np.random.default_rng(1)
+    failures, suspensions = two_mode_data(rng, 300)
+    times, is_failure, weights = prepare_sample(failures, suspensions)
+    fit = fit_weibull_mixture(times, is_failure, weights, 2, 8, seed=3)
+    components = [{"beta": b, "eta_alt": e, "weight": p}
+                  for b, e, p in zip(fit['beta'], fit['eta'], fit['weight'])]
+    R, _, f = mixture_functions(components, times)
+    direct = np.sum(np.where(is_failure > 0, np.log(f), np.log(R)))
+    assert abs(direct - fit['log_likelihood']) < 1e-6 * abs(direct), (direct, fit['log_likelihood'])
+
+    single = fit_weibull_mixture(times, is_failure, weights, 2, 1)
+    assert fit['log_likelihood'] >= single['log_likelihood'] - 1e-3
+    again = fit_weibull_mixture(times, is_failure, weights, 2, 8, seed=3)
+    assert np.array_equal(again['beta'], fit['beta'])
+
+    three = calculate_weibull_mixture(failures, suspensions, {'n_modes': 3, 'n_restarts': 4})
+    assert len(three['components']) == 3
+    assert three['log_likelihood'] >= calculate_weibull_mixture(failures, suspensions)['log_likelihood'] - 1e-2
+    assert np.all(np.diff(three['plot_data']['t']) >= 0)
+
+    print(f"ℓ = {fit['log_likelihood']:.4f}，有效起始點 {fit['n_valid']}/8")
+    print("✓ 對數概似與多起始點測試通過")
+
+def test_mixture_functions():
+    """測試混合 R/h/f 的關係、單一模式時與 Weibull 相同，以及可靠度指標"""
+    print("\n=== 測試混合分佈函數 ===")
+
+    components = [{"beta": 0.8, "eta_alt": 300.0, "weight": 0.2},
+                  {"beta": 3.0, "eta_alt": 2500.0, "weight": 0.8}]
+    t = np.linspace(100, 6000, 2000)
+    R, h, f = mixture_functions(components, t)
+    assert np.allclose(h, f / R)
+    # f = -dR/dt
+    assert np.allclose(f[1:-1], -(R[2:] - R[:-2]) / (t[2:] - t[:-2]), rtol=1e-3, atol=1e-9)
+
+    af, t_mission = 20.0, 17520
+    metrics = mixture_reliability(components, af, t_mission, 10)
+    R_bx = mixture_functions(components, [metrics['bx_life']], af)[0][0]
+    assert abs(R_bx - 0.9) < 1e-6
+    assert abs(metrics['r_mission'] - mixture_functions(components, [t_mission], af)[0][0]) < 1e-6
+
+    same = [{"beta": 1.7, "eta_alt": 1200.0, "weight": 0.5}] * 2
+    weibull = calculate_reliability_results(af, {"beta": 1.7, "eta_alt": 1200.0}, None, t_mission, 10)['weibull']
+    single = mixture_reliability(same, af, t_mission, 10)
+    assert abs(single['mttf_use'] - weibull['mttf_use']) < 0.02
+    assert abs(single['bx_life'] - weibull['bx_life']) < 0.02
+    assert abs(single['r_mission'] - weibull['r_mission']) < 1e-6
+
+    curves = mixture_curves(components, af)
+    assert len(curves['t']) == len(curves['R']) == len(curves['h']) == 101 and curves['R'][0] == 1
+
+    assert "error" in calculate_weibull_mixture([100, 200, 300, 400, 500, 600], None, {'n_modes': 4})
+    assert "error" in calculate_weibull_mixture([100, 200, 300, 400], None)
+
+    print("✓ 混合分佈函數測試通過")
+
+def test_calculate_endpoint():
+    """測試 /calculate 的混合 Weibull 選項"""
+    print("\n=== 測試 /calculate 混合 Weibull ===")
+
+    client = app.test_client()
+    rng = np.random.default_rng(2)
+    failures, suspensions = two_mode_data(rng, 120)
+    payload = {
+        'af_params': {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85},
+        'weibull_data': {'failures': failures.round(1).tolist(), 'suspensions': suspensions.round(1).tolist(),
+                         'options': {'mixture_modes': 2}},
+        'mission_years': 2
+    }
+    resp = client.post('/calculate', json=payload)
+    data = resp.get_json()
+    assert resp.status_code == 200, data
+    assert data['mixture_result']['n_modes'] == 2
+    assert len(data['mixture_result']['curves']['R']) == 101
+    assert 0 < data['reliability_result']['mixture']['r_mission'] <= 1
+
+    payload['weibull_data']['options'] = {'mixture_modes': 5}
+    resp = client.post('/calculate', json=payload)
+    failed = resp.get_json()
+    assert resp.status_code == 200, failed
+    assert 'error' in failed['mixture_result'] and 'mixture' not in failed['reliability_result']
+    assert failed['weibull_result'] == data['weibull_result']
+    assert failed['reliability_result']['weibull'] == data['reliability_result']['weibull']
+
+    payload['weibull_data']['options'] = {}
+    assert 'mixture_result' not in client.post('/calculate', json=payload).get_json()
+
+    print("✓ /calculate 混合 Weibull 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("混合 Weibull 測試")
+    print("=" * 60)
+
+    try:
+        test_parameter_recovery()
+        test_likelihood_and_restarts()
+        test_mixture_functions()
+        test_calculate_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有混合 Weibull 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,139 @@
+"""
+測試右截尾 Weibull 最大概似估計
+驗證與 scipy 結果一致、截尾概似、實際樣品總數、批次求解、效能與 calculate_weibull 整合
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from scipy import stats, optimize
+from app import calculate_weibull
+from weibull_mle import fit_weibull_mle, fit_weibull_mle_batch, prepare_sample, _pack
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def censored_reference(failures, suspensions):
+    """以通用最佳化求解截尾 Weibull 概似 (參考值)"""
+    def nll(p):
+        beta, eta = np.exp(p)
+        return -(stats.weibull_min.logpdf(failures, beta, scale=eta).sum() +
+                 stats.weibull_min.logsf(suspensions, beta, scale=eta).sum())
+    start = [0.0, np.log(np.mean(failures))]
+    res = optimize.minimize(nll, start, method='Nelder-Mead',
+                            options={'xatol': 1e-10, 'fatol': 1e-12, 'maxiter': 5000})
+    return np.exp(res.x), -res.fun
+
+def test_complete_data():
+    """測試完整數據與 scipy weibull_min.fit 一致"""
+    print("\n=== 測試完整數據 ===")
+
+    rng = np.random.default_rng(0)
+    for beta in (0.7, 2.0, 6.0):
+        failures = 1000 * rng.weibull(beta, 30)
+        fit = fit_weibull_mle(failures)
+        shape, _, scale = stats.weibull_min.fit(failures, floc=0)
+        assert abs(fit['beta'] / shape - 1) < 1e-6 and abs(fit['eta'] / scale - 1) < 1e-6
+        ll = stats.weibull_min.logpdf(failures, fit['beta'], scale=fit['eta']).sum()
+        assert abs(fit['log_likelihood'] - ll) < 1e-8
+        print(f"β = {fit['beta']:.4f} (scipy {shape:.4f})，{fit['iterations']} 次迭代")
+
+    print("✓ 完整數據測試通過")
+
+def test_censoring_and_sample_size():
+    """測試截尾概似與實際樣品總數"""
+    print("\n=== 測試截尾與樣品總數 ===")
+
+    rng = np.random.default_rng(1)
+    times = 1000 * rng.weibull(2.0, 40)
+    failures = times[times < 900]
+    suspensions = np.full(int((times >= 900).sum()), 900.0)
+    fit = fit_weibull_mle(failures, suspensions)
+    (beta, eta), ll = censored_reference(failures, suspensions)
+    assert abs(fit['beta'] / beta - 1) < 1e-6 and abs(fit['eta'] / eta - 1) < 1e-6
+    assert abs(fit['log_likelihood'] - ll) < 1e-6
+    print(f"截尾 MLE: β = {fit['beta']:.4f}, η = {fit['eta']:.1f} (參考 {beta:.4f}, {eta:.1f})")
+
+    # 樣品總數多於觀測數：其餘樣品視為在最後觀測時間仍未失效
+    implied = fit_weibull_mle([100, 200, 300], [250], n_total=64)
+    explicit = fit_weibull_mle([100, 200, 300], [250] + [300] * 60)
+    assert abs(implied['beta'] - explicit['beta']) < 1e-9 and implied['n_suspensions'] == 61
+
+    assert "error" in fit_weibull_mle([100, 200], n_total=1)
+    assert "error" in fit_weibull_mle([100, 100, 100]), "失效時間全部相同時無有限解"
+    assert "error" in fit_weibull_mle([], [100])
+
+    print("✓ 截尾與樣品總數測試通過")
+
+def test_batch_and_benchmark():
+    """測試批次求解與逐一求解一致，並比較 weibull_min.fit 的速度"""
+    print("\n=== 測試批次求解與效能 ===")
+
+    rng = np.random.default_rng(2)
+    samples = [1000 * rng.weibull(rng.uniform(0.8, 4), rng.integers(5, 60)) for _ in range(200)]
+    T, D, W = _pack([prepare_sample(s, [s.max()] * 3) for s in samples])
+    batch = fit_weibull_mle_batch(T, D, W)
+    assert batch['converged'].all()
+    for k in (0, 57, 199):
+        single = fit_weibull_mle(samples[k], [samples[k].max()] * 3)
+        assert abs(batch['beta'][k] - single['beta']) < 1e-9 * single['beta']
+
+    failures = 1000 * rng.weibull(2.0, 50)
+    start = time.perf_counter()
+    for _ in range(50):
+        fit_weibull_mle(failures)
+    ours = (time.perf_counter() - start) / 50
+    start = time.perf_counter()
+    for _ in range(50):
+        stats.weibull_min.fit(failures, floc=0)
+    reference = (time.perf_counter() - start) / 50
+    assert reference / ours > 5, f"僅快 {reference / ours:.1f} 倍"
+
+    print(f"單一樣本: {ours * 1000:.3f} ms，weibull_min.fit: {reference * 1000:.3f} ms "
+          f"({reference / ours:.0f} 倍)")
+    print("✓ 批次求解與效能測試通過")
+
+def test_calculate_weibull_mle():
+    """測試 calculate_weibull 的 MLE 計入截尾數據與樣品總數"""
+    print("\n=== 測試 calculate_weibull 整合 ===")
+
+    failures = [1200, 1800, 2300, 2900, 3500]
+    options = {'regression_method': 'mle'}
+    complete = calculate_weibull(failures, 0, options)
+    censored = calculate_weibull(failures, [4000] * 5, options)
+    sized = calculate_weibull(failures, [], dict(options, n_total=10))
+    assert censored['eta_alt'] > complete['eta_alt'], "截尾樣品應延長特徵壽命"
+    assert complete['eta_alt'] < sized['eta_alt'] < censored['eta_alt'], "未失效樣品停在最後觀測時間"
+    assert "error" in calculate_weibull(failures, [], dict(options, n_total=3))
+
+    # 未提供樣品總數時秩回歸沿用預設 64
+    rry = calculate_weibull(failures, 0, {'regression_method': 'rry'})
+    assert abs(rry['plot_data']['f'][0] - 0.7 / 64.4) < 1e-12
+
+    print(f"完整: η = {complete['eta_alt']}，含 5 個截尾: η = {censored['eta_alt']}")
+    print("✓ calculate_weibull 整合測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("右截尾 Weibull MLE 測試")
+    print("=" * 60)
+
+    try:
+        test_complete_data()
+        test_censoring_and_sample_size()
+        test_batch_and_benchmark()
+        test_calculate_weibull_mle()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有 Weibull MLE 測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
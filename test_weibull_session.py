@@ -0,0 +1,184 @@
+"""
+測試進行中試驗的增量 Weibull 分析
+驗證逐次附加數據後的結果與 calculate_weibull 相同 (含亂序重建)、MLE 熱啟動、每次更新的成本、
+工作階段登錄表的淘汰，以及 /weibull_session
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from app import app, calculate_weibull
+from weibull_session import WeibullSession, SessionRegistry
+
+# 設置標準輸出編碼為 UTF-8
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+AF_PARAMS = {'t_use': 32, 't_alt': 85, 'rh_use': 60, 'rh_alt': 85}
+
+def readouts(rng, n_units=200, n_readouts=10, step=150.0):
+    """模擬定期讀值：每次讀值回報該區間的失效，偶爾移出樣品 (截尾)"""
+    life = 1000 * rng.weibull(2.0, n_units)
+    out = []
+    for k in range(n_readouts):
+        lo, hi = k * step, (k + 1) * step
+        failures = np.sort(life[(life > lo) & (life <= hi)])
+        out.append((failures.tolist(), [hi] * (k % 3 == 0)))
+    return out
+
+def test_matches_full_refit():
+    """測試每次附加後的結果與以全部數據呼叫 calculate_weibull 相同"""
+    print("\n=== 測試增量結果與完整重新擬合一致 ===")
+
+    rng = np.random.default_rng(0)
+    data = readouts(rng)
+    for options in ({}, {'regression_method': 'rrx', 'median_rank_method': 'exact', 'n_total': 200},
+                    {'median_rank_method': 'km', 'n_total': 200}, {'median_rank_method': 'mean'},
+                    {'regression_method': 'mle', 'n_total': 200}, {'regression_method': 'mle'}):
+        session = WeibullSession(options)
+        failures, suspensions = [], []
+        for new_failures, new_suspensions in data:
+            failures += new_failures
+            suspensions += new_suspensions
+            result = session.append(new_failures, new_suspensions)
+            if len(failures) < 2:
+                assert 'pending' in result
+                continue
+            full = calculate_weibull(failures, suspensions, options)
+            weibull = result['weibull_result']
+            for key in ('beta', 'eta_alt', 'r_squared'):
+                assert abs(weibull[key] - full[key]) <= 1e-4 * max(1, abs(full[key])), (options, key)
+            if options.get('regression_method') == 'mle':
+                assert weibull['bounds'] == full['bounds']
+        # 提供樣品總數時全程增量更新 (不重建)
+        assert 'n_total' not in options or result['rebuilds'] == 0, result['rebuilds']
+        print(f"{options or '預設'}: β = {weibull['beta']}, η = {weibull['eta_alt']}，重建 {result['rebuilds']} 次")
+
+    # 亂序附加 (補登較早的失效) 時重建，結果仍一致
+    session = WeibullSession({'n_total': 200})
+    session.append([300, 500, 800], [900])
+    result = session.append([450, 1000])
+    full = calculate_weibull([300, 450, 500, 800, 1000], [900], {'n_total': 200})
+    assert result['rebuilds'] == 1
+    assert result['weibull_result']['beta'] == full['beta']
+    assert result['weibull_result']['eta_alt'] == full['eta_alt']
+
+    print("✓ 增量結果測試通過")
+
+def test_update_cost():
+    """測試 MLE 熱啟動的迭代數，以及逐筆附加時每次更新的成本"""
+    print("\n=== 測試更新成本 ===")
+
+    rng = np.random.default_rng(1)
+    life = np.sort(1000 * rng.weibull(2.0, 2000))
+    session = WeibullSession({'regression_method': 'mle', 'n_total': 2000})
+    session.append(life[:1000])
+    iterations = [session.append([t])['iterations'] for t in life[1000:1050]]
+    assert max(iterations) <= 3, iterations
+
+    session = WeibullSession({'n_total': 2000})
+    session.append(life[:1000])
+    start = time.perf_counter()
+    for t in life[1000:1500]:
+        result = session.append([t])
+    incremental = (time.perf_counter() - start) / 500
+    start = time.perf_counter()
+    for k in range(1490, 1500):
+        calculate_weibull(life[:k + 1], None, {'n_total': 2000})
+    full = (time.perf_counter() - start) / 10
+    assert result['rebuilds'] == 0 and incremental < full, (incremental, full)
+    print(f"MLE 熱啟動迭代 {min(iterations)}~{max(iterations)} 次；秩回歸每次更新 {incremental * 1e6:.0f} µs"
+          f" (完整重新擬合 {full * 1e6:.0f} µs)")
+
+    print("✓ 更新成本測試通過")
+
+def test_registry():
+    """測試工作階段登錄表的上限與閒置逾時，以及錯誤輸入不改變工作階段"""
+    print("\n=== 測試工作階段登錄表 ===")
+
+    registry = SessionRegistry(max_sessions=100, ttl=3600)
+    sessions = [registry.add(WeibullSession({'n_total': 50})) for _ in range(150)]
+    for s in sessions:
+        s.append([100.0, 200.0, 300.0])
+    assert len(registry) == 100
+    assert registry.get(sessions[0].id) is None and registry.get(sessions[-1].id) is sessions[-1]
+
+    sessions[-1].updated -= 7200
+    assert registry.get(sessions[-1].id) is None
+    assert registry.remove(sessions[-2].id) is sessions[-2]
+
+    session = sessions[-3]
+    before = session.snapshot()
+    for failures in ([-5.0], [400.0] * 48):
+        try:
+            session.append(failures)
+            assert False, "應拋出 ValueError"
+        except ValueError:
+            pass
+    assert session.snapshot() is before and before['n_failures'] == 3
+
+    try:
+        WeibullSession({'three_parameter': True})
+        assert False, "應拋出 ValueError"
+    except ValueError:
+        pass
+
+    print("✓ 工作階段登錄表測試通過")
+
+def test_endpoint():
+    """測試 /weibull_session 的建立、附加、查詢與刪除"""
+    print("\n=== 測試 /weibull_session ===")
+
+    client = app.test_client()
+    resp = client.post('/weibull_session', json={
+        'af_params': AF_PARAMS, 'mission_years': 2,
+        'weibull_data': {'failures': [420], 'options': {'regression_method': 'mle', 'n_total': 20}}
+    })
+    data = resp.get_json()
+    assert resp.status_code == 201 and 'pending' in data
+    url = resp.headers['Location']
+
+    data = client.post(url, json={'failures': [610, 700, 880], 'suspensions': [900]}).get_json()
+    full = client.post('/calculate', json={
+        'af_params': AF_PARAMS, 'mission_years': 2,
+        'weibull_data': {'failures': [420, 610, 700, 880], 'suspensions': [900],
+                         'options': {'regression_method': 'mle', 'n_total': 20}}
+    }).get_json()
+    assert data['weibull_result']['beta'] == full['weibull_result']['beta']
+    assert data['reliability_result']['r_mission'] == full['reliability_result']['weibull']['r_mission']
+    assert data['reliability_result']['bounds'] == full['reliability_result']['weibull']['bounds']
+    assert client.get(url).get_json() == data
+
+    resp = client.post(url, json={'failures': [0]})
+    assert resp.status_code == 400 and resp.get_json()['error'].startswith('即時分析錯誤')
+    assert client.delete(url).get_json()['deleted']
+    assert client.get(url).status_code == 404
+
+    resp = client.post('/weibull_session', json={'weibull_data': {'options': {'three_parameter': True}}})
+    assert resp.status_code == 400
+
+    print("✓ /weibull_session 測試通過")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("增量 Weibull 分析測試")
+    print("=" * 60)
+
+    try:
+        test_matches_full_refit()
+        test_update_cost()
+        test_registry()
+        test_endpoint()
+
+        print("\n" + "=" * 60)
+        print("✓ 所有增量 Weibull 分析測試通過！")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ 測試失敗: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ 發生錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,295 @@
+"""
+Monte Carlo 不確定性傳播
+對任意 AF / Weibull 輸入參數指定機率分佈 (normal, lognormal, uniform, triangular)，
+以向量化抽樣傳播至 AF Total、eta_use、MTTF、R(t_mission) 與 Bx% 壽命
+"""
+
+import numpy as np
+from scipy import stats, special
+from af_engine import AF_DEFAULTS, calculate_af_batch
+from parallel import split_blocks, spawn_seeds, run_blocks
+
+DEFAULT_PERCENTILES = [2.5, 5, 25, 50, 75, 95, 97.5]
+DEFAULT_BLOCK_SIZE = 250000      # 每個亂數串流區塊的樣本數
+MAX_SAMPLES = 20000000
+MAX_BINS = 1000
+
+WEIBULL_PARAMS = ('beta', 'eta_alt')
+DISTRIBUTIONS = ('normal', 'lognormal', 'uniform', 'triangular')
+
+
+def sample_distribution(spec, size, rng):
+    """
+    依分佈規格抽樣
+
+    spec 格式:
+        {'dist': 'normal', 'mean': m, 'std': s}
+        {'dist': 'lognormal', 'median': m (或 'mu': ln m), 'sigma': s}
+        {'dist': 'uniform', 'low': a, 'high': b}
+        {'dist': 'triangular', 'low': a, 'mode': c, 'high': b}
+    """
+    dist = spec.get('dist', 'normal')
+    if dist == 'normal':
+        return rng.normal(float(spec['mean']), float(spec['std']), size)
+    if dist == 'lognormal':
+        mu = np.log(float(spec['median'])) if 'median' in spec else float(spec['mu'])
+        return rng.lognormal(mu, float(spec['sigma']), size)
+    if dist == 'uniform':
+        return rng.uniform(float(spec['low']), float(spec['high']), size)
+    if dist == 'triangular':
+        return rng.triangular(float(spec['low']), float(spec['mode']), float(spec['high']), size)
+    raise ValueError(f"不支援的分佈: {dist}")
+
+
+def distribution_ppf(spec, u):
+    """以反累積分佈函數將 [0, 1) 均勻樣本轉換為指定分佈 (規格同 sample_distribution)"""
+    dist = spec.get('dist', 'normal')
+    if dist == 'normal':
+        return stats.norm.ppf(u, float(spec['mean']), float(spec['std']))
+    if dist == 'lognormal':
+        mu = np.log(float(spec['median'])) if 'median' in spec else float(spec['mu'])
+        return np.exp(mu + float(spec['sigma']) * stats.norm.ppf(u))
+    if dist == 'uniform':
+        low, high = float(spec['low']), float(spec['high'])
+        return low + (high - low) * u
+    if dist == 'triangular':
+        low, mode, high = float(spec['low']), float(spec['mode']), float(spec['high'])
+        return stats.triang.ppf(u, (mode - low) / (high - low), loc=low, scale=high - low)
+    raise ValueError(f"不支援的分佈: {dist}")
+
+
+def distribution_logpdf(spec, x):
+    """
+    分佈的對數機率密度 (規格同 sample_distribution；支撐之外為 -inf)
+    以封閉式計算 (MCMC 每步呼叫，避免 scipy.stats 的逐次呼叫開銷)
+    """
+    dist = spec.get('dist', 'normal')
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if dist == 'normal':
+            mean, std = float(spec['mean']), float(spec['std'])
+            return -0.5 * ((x - mean) / std) ** 2 - np.log(std * np.sqrt(2 * np.pi))
+        if dist == 'lognormal':
+            mu = np.log(float(spec['median'])) if 'median' in spec else float(spec['mu'])
+            sigma = float(spec['sigma'])
+            log_x = np.log(x)
+            density = -0.5 * ((log_x - mu) / sigma) ** 2 - np.log(sigma * np.sqrt(2 * np.pi)) - log_x
+            return np.where(x > 0, density, -np.inf)
+        if dist == 'uniform':
+            low, high = float(spec['low']), float(spec['high'])
+            return np.where((x >= low) & (x <= high), -np.log(high - low), -np.inf)
+        if dist == 'triangular':
+            low, mode, high = float(spec['low']), float(spec['mode']), float(spec['high'])
+            rising = 2 * (x - low) / ((high - low) * (mode - low))
+            falling = 2 * (high - x) / ((high - low) * (high - mode))
+            density = np.where(x < mode, rising, falling)
+            return np.where((x >= low) & (x <= high), np.log(density), -np.inf)
+    raise ValueError(f"不支援的分佈: {dist}")
+
+
+def validate_distributions(distributions, allowed):
+    """檢查分佈規格，回傳錯誤訊息或 None"""
+    rng = np.random.default_rng(0)
+    for name, spec in distributions.items():
+        if name not in allowed:
+            return f"不支援的不確定參數: {name}"
+        if not isinstance(spec, dict) or spec.get('dist', 'normal') not in DISTRIBUTIONS:
+            return f"參數 {name} 的分佈設定錯誤"
+        try:
+            sample_distribution(spec, 1, rng)
+        except (KeyError, ValueError, TypeError) as e:
+            return f"參數 {name} 的分佈設定錯誤: {e}"
+    return None
+
+
+def weibull_metrics(af_total, beta, eta_alt, t_mission, bx_percent=1, gamma=0.0):
+    """
+    向量化計算 Weibull 可靠度指標 (公式與 calculate_reliability_results 相同；
+    gamma 為三參數 Weibull 的無失效期，與 η 同樣依 AF 換算)
+
+    Returns:
+        dict: eta_use, mttf_use, r_mission, bx_life 陣列
+    """
+    with np.errstate(all='ignore'):
+        eta_use = eta_alt * af_total
+        gamma_use = gamma * af_total
+        return {
+            "eta_use": eta_use,
+            "mttf_use": gamma_use + eta_use * special.gamma(1 + 1/beta),
+            "r_mission": np.exp(-((np.maximum(t_mission - gamma_use, 0.0) / eta_use) ** beta)),
+            "bx_life": gamma_use + eta_use * ((-np.log(1 - bx_percent / 100)) ** (1/beta)),
+        }
+
+
+def zero_failure_metrics(af_total, n_samples, t_test, cl, t_mission):
+    """向量化計算零失效模式 (指數分佈) 的現場 MTTF 下限與任務可靠度"""
+    chi_sq = stats.chi2.ppf(cl, 2)
+    mttf_alt_lower = (2 * n_samples * t_test) / chi_sq
+    with np.errstate(all='ignore'):
+        mttf_use_lower = mttf_alt_lower * af_total
+        return {
+            "zf_mttf_use_lower": mttf_use_lower,
+            "zf_r_mission": np.exp(-t_mission / mttf_use_lower),
+        }
+
+
+def _monte_carlo_block(task):
+    """單一區塊的抽樣與模型計算 (模組層級函式，供行程池使用)"""
+    config, seed_seq, size = task
+    rng = np.random.default_rng(seed_seq)
+
+    draws = {name: sample_distribution(spec, size, rng)
+             for name, spec in config["distributions"].items()}
+
+    columns = dict(config["af_params"])
+    columns.update({k: v for k, v in draws.items() if k not in WEIBULL_PARAMS})
+    batch = calculate_af_batch(columns)
+    if "error" in batch:
+        raise ValueError(batch["error"])
+
+    af_total = np.where(batch["valid"], batch["af_total"], np.nan)
+    outputs = {"af_total": af_total}
+
+    weibull = config["weibull_params"]
+    if weibull:
+        beta = draws.get('beta', float(weibull['beta']))
+        eta_alt = draws.get('eta_alt', float(weibull['eta_alt']))
+        outputs.update(weibull_metrics(af_total, beta, eta_alt, config["t_mission"],
+                                       config["bx_percent"], weibull.get('gamma', 0.0)))
+
+    zero_fail = config["zero_fail_params"]
+    if zero_fail:
+        outputs.update(zero_failure_metrics(af_total, int(zero_fail.get('n', 64)),
+                                            float(zero_fail.get('t_test', 1196)),
+                                            float(zero_fail.get('cl', 0.6)),
+                                            config["t_mission"]))
+
+    return draws, outputs
+
+
+def parse_summary_options(percentiles=None, bins=50):
+    """
+    檢查 summarize_samples 的百分位數與直方圖組數 (Monte Carlo、bootstrap 與貝氏分析共用)
+
+    Returns:
+        (percentiles, bins)：未提供百分位數時為 DEFAULT_PERCENTILES
+
+    Raises:
+        ValueError: 百分位數不在 [0, 100] 或組數不是 1 ~ MAX_BINS 的整數
+    """
+    if percentiles is None or (isinstance(percentiles, (list, tuple)) and len(percentiles) == 0):
+        percentiles = DEFAULT_PERCENTILES
+    if not isinstance(percentiles, (list, tuple)):
+        raise ValueError("percentiles 需為數值列表")
+    try:
+        percentiles = [float(p) for p in percentiles]
+    except (TypeError, ValueError):
+        raise ValueError("percentiles 需為數值列表")
+    if not all(0 <= p <= 100 for p in percentiles):
+        raise ValueError("百分位數需介於 0 與 100 之間")
+    if isinstance(bins, bool):
+        raise ValueError(f"直方圖組數需為 1 ~ {MAX_BINS} 的整數")
+    try:
+        number = float(bins)
+    except (TypeError, ValueError):
+        raise ValueError(f"直方圖組數需為 1 ~ {MAX_BINS} 的整數")
+    if not (1 <= number <= MAX_BINS and number == int(number)):
+        raise ValueError(f"直方圖組數需為 1 ~ {MAX_BINS} 的整數")
+    return percentiles, int(number)
+
+
+def summarize_samples(values, percentiles=DEFAULT_PERCENTILES, bins=50, log_hist=False):
+    """計算樣本的平均、標準差、百分位數與直方圖 (忽略非有限值)"""
+    finite = values[np.isfinite(values)]
+    if log_hist:
+        finite = finite[finite > 0]
+    if finite.size == 0:
+        return {"n_valid": 0}
+
+    hist_values = np.log10(finite) if log_hist else finite
+    counts, edges = np.histogram(hist_values, bins=bins)
+    pct = np.percentile(finite, percentiles)
+    return {
+        "n_valid": int(finite.size),
+        "mean": float(np.mean(finite)),
+        "std": float(np.std(finite)),
+        "percentiles": {f"p{p:g}": float(v) for p, v in zip(percentiles, pct)},
+        "histogram": {
+            "scale": "log10" if log_hist else "linear",
+            "edges": edges.tolist(),
+            "counts": counts.tolist()
+        }
+    }
+
+
+def run_monte_carlo(af_params, distributions, weibull_params=None, zero_fail_params=None,
+                    t_mission=17520, bx_percent=1, n_samples=100000, seed=None,
+                    percentiles=None, bins=50, n_jobs=1, block_size=DEFAULT_BLOCK_SIZE,
+                    return_samples=False):
+    """
+    Monte Carlo 不確定性傳播
+
+    Args:
+        af_params: 固定 AF 參數 (與 calculate_af 相同格式)
+        distributions: {參數名稱: 分佈規格}，參數可為任何 AF 數值參數或 'beta' / 'eta_alt'
+        weibull_params: {'beta', 'eta_alt'} 點估計 (提供時計算 Weibull 指標)
+        zero_fail_params: {'n', 't_test', 'cl'} (提供時計算零失效指標)
+        n_samples: 抽樣數
+        seed: 主亂數種子 (相同種子與 block_size 的結果完全相同，與 n_jobs 無關)
+        n_jobs: 平行行程數
+        return_samples: 是否回傳原始樣本陣列
+
+    Returns:
+        dict: {'n_samples', 'seed', 'metrics': {...}, 'inputs': {...}} 或 {'error': ...}
+    """
+    distributions = distributions or {}
+    allowed = set(AF_DEFAULTS) | (set(WEIBULL_PARAMS) if weibull_params else set())
+    error = validate_distributions(distributions, allowed)
+    if error:
+        return {"error": error}
+    if not distributions:
+        return {"error": "至少需要一個不確定參數"}
+
+    try:
+        n_samples = int(n_samples)
+        if n_samples < 2 or n_samples > MAX_SAMPLES:
+            return {"error": f"抽樣數需介於 2 與 {MAX_SAMPLES} 之間"}
+        if weibull_params:
+            weibull_params = {**{k: float(weibull_params[k]) for k in WEIBULL_PARAMS},
+                              'gamma': float(weibull_params.get('gamma', 0.0))}
+
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+        percentiles, bins = parse_summary_options(percentiles, bins)
+
+        config = {
+            "af_params": af_params or {},
+            "distributions": distributions,
+            "weibull_params": weibull_params,
+            "zero_fail_params": zero_fail_params,
+            "t_mission": float(t_mission),
+            "bx_percent": float(bx_percent),
+        }
+        sizes = split_blocks(n_samples, block_size)
+        seeds = spawn_seeds(seed, len(sizes))
+        blocks = run_blocks(_monte_carlo_block,
+                            [(config, s, size) for s, size in zip(seeds, sizes)], n_jobs)
+    except Exception as e:
+        return {"error": str(e)}
+
+    draws = {name: np.concatenate([b[0][name] for b in blocks]) for name in distributions}
+    outputs = {name: np.concatenate([b[1][name] for b in blocks]) for name in blocks[0][1]}
+
+    # 跨數量級的指標以 log10 直方圖呈現
+    log_metrics = {"af_total", "eta_use", "mttf_use", "bx_life", "zf_mttf_use_lower"}
+    result = {
+        "n_samples": n_samples,
+        "seed": seed,
+        "metrics": {name: summarize_samples(values, percentiles, bins, name in log_metrics)
+                    for name, values in outputs.items()},
+        "inputs": {name: summarize_samples(values, percentiles, bins)
+                   for name, values in draws.items()}
+    }
+    if return_samples:
+        result["samples"] = {**draws, **outputs}
+    return result
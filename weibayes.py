@@ -0,0 +1,124 @@
+"""
+WeiBayes 零失效 (或少量失效) 分析
+已知 (或假設) 形狀參數 β 時，λ = η^-β 的後驗 (對 λ 取均勻先驗) 為
+    λ ~ Gamma(r + 1, T_β)，T_β = Σ t_i^β  (t_i 為各樣品的試驗時間)
+即 2 λ T_β ~ χ²(2r + 2)；β = 1 時與指數分佈的卡方公式相同
+β 不確定時以先驗分佈表示 (規格同 uncertainty.sample_distribution)，在等機率分位數格點
+β_k = F⁻¹((k + 0.5) / K) 上向量化積分：指標 Y 的後驗 CDF 為各格點條件 CDF 的平均
+    P(Y ≤ y) = (1/K) Σ_k Q(r + 1, T_β_k · g_k(y))     (Q 為正規化上不完全 Gamma 函數)
+信賴下限為 P(Y ≤ y) = 1 - CL 的根 (介於各格點的條件下限之間，以 Brent 法求解)
+零失效數據幾乎不含 β 的資訊，先驗不以數據更新
+"""
+
+import numpy as np
+from scipy import optimize, special
+from uncertainty import distribution_ppf, validate_distributions
+
+DEFAULT_GRID_POINTS = 512
+MAX_GRID_POINTS = 100000
+
+
+def beta_grid(beta=None, beta_prior=None, n_points=DEFAULT_GRID_POINTS):
+    """
+    β 的積分格點：已知 β 時為單點；有先驗時為等機率分位數格點 (權重相同)
+
+    Raises:
+        ValueError: 未提供 β、先驗設定錯誤或格點含非正值
+    """
+    if beta_prior:
+        error = validate_distributions({'beta': beta_prior}, ('beta',))
+        if error:
+            raise ValueError(error)
+        n_points = int(n_points)
+        if not 2 <= n_points <= MAX_GRID_POINTS:
+            raise ValueError(f"格點數需介於 2 與 {MAX_GRID_POINTS} 之間")
+        betas = distribution_ppf(beta_prior, (np.arange(n_points) + 0.5) / n_points)
+    elif beta not in (None, ''):
+        betas = np.array([float(beta)])
+    else:
+        raise ValueError("需提供形狀參數 β 或其先驗分佈")
+    if not np.all(np.isfinite(betas) & (betas > 0)):
+        raise ValueError("形狀參數 β 需為正數 (先驗分佈的支撐需在 β > 0)")
+    return betas
+
+
+def _lower_bound(shape, log_a, slope, cl):
+    """
+    解 mean_k Q(shape, exp(log_a_k + slope_k · v)) = 1 - CL (slope 同號，故對 v 單調)
+
+    Returns:
+        v: 單一 β 時為封閉解；多個格點時以 Brent 法於各格點條件解之間求根
+    """
+    log_q = np.log(special.gammainccinv(shape, 1 - cl))
+    v_k = (log_q - log_a) / slope
+    lo, hi = v_k.min(), v_k.max()
+    if hi - lo <= 1e-12 * max(1.0, abs(hi)):
+        return float(v_k.mean())
+    target = lambda v: special.gammaincc(shape, np.exp(log_a + slope * v)).mean() - (1 - cl)
+    return optimize.brentq(target, lo, hi, xtol=1e-12)
+
+
+def weibayes(test_times, n_failures=0, beta=None, beta_prior=None, cl=0.6, af_total=1.0,
+             t_mission=17520, bx_percent=1, n_points=DEFAULT_GRID_POINTS):
+    """
+    WeiBayes 信賴下限
+
+    Args:
+        test_times: 各樣品的試驗時間 (失效樣品為其失效時間)
+        n_failures: 失效數 r (零失效試驗為 0)
+        beta: 已知形狀參數；beta_prior: β 的先驗分佈 (提供時優先)
+        cl: 信賴水準
+        af_total: 加速因子 (現場換算)
+
+    Returns:
+        dict: eta_alt_lower, eta_use_lower, mttf_use_lower, bx_life_lower, r_mission (下限) 等，
+              或 {'error': ...}
+    """
+    try:
+        times = np.asarray(test_times, dtype=float).ravel()
+        r = int(n_failures)
+        cl = float(cl)
+        betas = beta_grid(beta, beta_prior, n_points)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "參數格式錯誤"}
+    if times.size == 0 or np.any(~(times > 0)):
+        return {"error": "試驗時間需為正數"}
+    if not 0 <= r <= times.size:
+        return {"error": "失效數需介於 0 與樣品數之間"}
+    if not 0 < cl < 1:
+        return {"error": "信賴水準需介於 0 與 1 之間"}
+
+    # ln T_β (相同試驗時間合併為一欄以減少格點 × 樣品的計算量)
+    unique, counts = np.unique(times, return_counts=True)
+    log_T = special.logsumexp(betas[:, None] * np.log(unique), axis=1, b=counts)
+    shape = r + 1
+    log_af = np.log(af_total)
+    x = bx_percent / 100
+
+    # 正值指標 Y = AF · η · κ_β：P(Y ≤ y) = Q(r+1, T_β (AF κ_β / y)^β)，以 v = ln y 求解
+    def quantity_lower(log_kappa, log_scale):
+        return float(np.exp(_lower_bound(shape, log_T + betas * (log_scale + log_kappa), -betas, cl)))
+
+    eta_alt = quantity_lower(0.0, 0.0)
+    mttf = quantity_lower(special.gammaln(1 + 1 / betas), log_af)
+    bx_life = quantity_lower(np.log(-np.log1p(-x)) / betas, log_af)
+    # R(t) = exp(-λ (t / AF)^β)：P(R ≤ e^-u) = Q(r+1, T_β u / (t/AF)^β)，以 v = ln u 求解
+    log_u = _lower_bound(shape, log_T - betas * (np.log(t_mission) - log_af), np.ones_like(betas), cl)
+
+    return {
+        "method": "WeiBayes" + (" (β prior)" if beta_prior else f" (β = {betas[0]:g})"),
+        "beta": None if beta_prior else round(float(betas[0]), 4),
+        "beta_prior": beta_prior or None,
+        "beta_mean": round(float(betas.mean()), 4),
+        "grid_points": int(betas.size),
+        "n_units": int(times.size),
+        "n_failures": r,
+        "total_hours_alt": round(float(times.sum()), 2),
+        "cl": cl,
+        "eta_alt_lower": round(eta_alt, 2),
+        "eta_use_lower": round(eta_alt * af_total, 2),
+        "mttf_use_lower": round(mttf, 2),
+        "bx_life_lower": round(bx_life, 2),
+        "bx_percent": bx_percent,
+        "r_mission": round(float(np.exp(-np.exp(log_u))), 6),
+    }
@@ -0,0 +1,117 @@
+"""
+三參數 Weibull (含無失效期 γ)
+F(t) = 1 - exp(-((t - γ)/η)^β)，t > γ
+γ 以一維有界剖面搜尋求得：在 [0, 最小失效時間) 上以向量化網格一次評估多個 γ，
+每個 γ 的二參數子問題為封閉解 (秩回歸) 或批次剖面概似 MLE，再逐層縮小區間
+  - RRY / RRX：最大化 ln(t - γ) 與 ln(-ln(1-F)) 的相關係數平方
+  - MLE：最大化剖面對數概似 (截尾時間不大於 γ 的樣品不提供資訊)
+"""
+
+import numpy as np
+from weibull_mle import prepare_sample, fit_weibull_mle_batch
+
+GRID_POINTS = 32                 # 每層網格的 γ 數
+GRID_LEVELS = 5                  # 縮小區間的層數 (解析度約為 最小失效時間 × 1e-6)
+UPPER_MARGIN = 1e-6              # γ 上界 = 最小失效時間 × (1 - UPPER_MARGIN)
+
+
+def _profile_search(evaluate, upper, n_grid=GRID_POINTS, n_levels=GRID_LEVELS):
+    """
+    有界一維剖面搜尋：evaluate(γ 陣列) 回傳目標值陣列 (越大越好)
+
+    Returns:
+        (γ, 最大目標值, 是否落在邊界)
+    """
+    lo, hi = 0.0, upper
+    best_gamma, best_value = 0.0, -np.inf
+    for _ in range(n_levels):
+        grid = np.linspace(lo, hi, n_grid)
+        values = evaluate(grid)
+        values = np.where(np.isfinite(values), values, -np.inf)
+        k = int(np.argmax(values))
+        if values[k] > best_value:
+            best_gamma, best_value = grid[k], values[k]
+        lo, hi = grid[max(k - 1, 0)], grid[min(k + 1, n_grid - 1)]
+    at_bound = best_gamma <= 0 or best_gamma >= upper * (1 - 1e-9)
+    return float(best_gamma), float(best_value), bool(at_bound)
+
+
+def fit_weibull_3p_rank(t, f, regression_method='rry'):
+    """
+    三參數 Weibull 秩回歸
+
+    Args:
+        t: 失效時間 (已排序)；f: 對應的中位秩 F (與 γ 無關)
+        regression_method: 'rry' | 'rrx'
+
+    Returns:
+        dict: gamma, beta, eta, r_squared, gamma_at_bound
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.log(-np.log(1 - np.asarray(f, dtype=float)))
+    dy = y - y.mean()
+    syy = dy @ dy
+
+    def stats_for(gammas):
+        x = np.log(t[None, :] - gammas[:, None])
+        dx = x - x.mean(axis=1, keepdims=True)
+        sxx = (dx * dx).sum(axis=1)
+        sxy = dx @ dy
+        return x, sxx, sxy
+
+    def r_squared(gammas):
+        _, sxx, sxy = stats_for(gammas)
+        return sxy ** 2 / (sxx * syy)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma, r2, at_bound = _profile_search(r_squared, t.min() * (1 - UPPER_MARGIN))
+        x, sxx, sxy = stats_for(np.array([gamma]))
+    mean_x = x.mean()
+    if regression_method == 'rrx':
+        slope = sxy[0] / syy
+        beta, eta = 1 / slope, np.exp(mean_x - slope * y.mean())
+    else:
+        beta = sxy[0] / sxx[0]
+        eta = np.exp(mean_x - y.mean() / beta)
+    return {"gamma": gamma, "beta": float(beta), "eta": float(eta), "r_squared": r2,
+            "gamma_at_bound": at_bound}
+
+
+def fit_weibull_3p_mle(failures, suspensions=None, n_total=None):
+    """
+    三參數 Weibull 最大概似估計 (γ 的剖面概似)
+
+    Returns:
+        dict: gamma, beta, eta, log_likelihood, gamma_at_bound 或 {'error': ...}
+        (β < 1 時概似隨 γ 趨近最小失效時間而發散，結果會落在上界)
+    """
+    try:
+        times, is_failure, weights = prepare_sample(failures, suspensions, n_total)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+    return fit_weibull_3p_sample(times, is_failure, weights)
+
+
+def fit_weibull_3p_sample(times, is_failure, weights):
+    """
+    以已整理的樣本 (prepare_sample 格式：時間、失效標記 0/1、權重) 進行三參數 MLE
+    (供已整理樣本的呼叫端重複使用，結果同 fit_weibull_3p_mle)
+    """
+    if is_failure.sum() < 2:
+        return {"error": "失效數據不足，無法進行三參數 Weibull 擬合 (至少需要 2 點)"}
+
+    def fit(gammas):
+        shifted = times[None, :] - gammas[:, None]
+        # 截尾時間不大於 γ 的樣品 R = 1，不影響概似
+        W = np.where(shifted > 0, weights[None, :], 0.0)
+        T = np.where(shifted > 0, shifted, 1.0)
+        D = np.broadcast_to(is_failure, T.shape)
+        return fit_weibull_mle_batch(T, D, W)
+
+    upper = times[is_failure > 0].min() * (1 - UPPER_MARGIN)
+    gamma, log_likelihood, at_bound = _profile_search(lambda g: fit(g)["log_likelihood"], upper)
+    best = fit(np.array([gamma]))
+    if not best["converged"][0]:
+        return {"error": "三參數最大概似估計未收斂"}
+    return {"gamma": gamma, "beta": float(best["beta"][0]), "eta": float(best["eta"][0]),
+            "log_likelihood": log_likelihood, "gamma_at_bound": at_bound}
@@ -0,0 +1,216 @@
+"""
+批次 Weibull 擬合
+一次擬合數千個批次 (lot / 試驗箱 / 供應商) 的 Weibull 參數：
+數據以不等長 (ragged) 格式傳入 (offsets + 扁平 values)，
+中位秩、RRX / RRY 迴歸以分段 (segmented) 加總一次完成，MLE 以補齊陣列向量化迭代
+"""
+
+import numpy as np
+from median_ranks import RANK_METHODS, ranks_from_order, rank_table
+from weibull_mle import fit_weibull_mle_batch
+
+DEFAULT_N_TOTAL = 64             # 未提供樣品總數時的秩回歸預設 (與 calculate_weibull 相同)
+MAX_VALUES = 5000000             # 單次請求的數據點上限
+REGRESSION_METHODS = ('rry', 'rrx', 'mle')
+
+
+def _segments(values, offsets, name):
+    """檢查 offsets 並回傳 (數值, 組別索引, 各組數量)"""
+    values = np.asarray(values, dtype=float).ravel()
+    offsets = np.asarray(offsets, dtype=np.int64).ravel()
+    if offsets.size < 2 or offsets[0] != 0 or offsets[-1] != values.size:
+        raise ValueError(f"{name} 的 offsets 需以 0 開始、以數據總數 ({values.size}) 結束")
+    counts = np.diff(offsets)
+    if np.any(counts < 0):
+        raise ValueError(f"{name} 的 offsets 需為非遞減")
+    if np.any(~(values > 0)):
+        raise ValueError("失效與截尾時間需為正數")
+    return values, np.repeat(np.arange(counts.size), counts), counts
+
+
+def _segment_sum(weights, group, n_groups):
+    return np.bincount(group, weights=weights, minlength=n_groups)
+
+
+def _segment_cumsum(values, group):
+    """分段累加 (values 依組別連續排列)"""
+    index = np.arange(group.size)
+    first = np.r_[True, group[1:] != group[:-1]]
+    starts = np.maximum.accumulate(np.where(first, index, 0))
+    total = np.cumsum(values)
+    return total - np.r_[0.0, total][starts]
+
+
+def calculate_weibull_batch(values, offsets, suspensions=None, suspension_offsets=None,
+                            options=None):
+    """
+    批次 Weibull 擬合
+
+    Args:
+        values: 所有批次失效時間的扁平陣列
+        offsets: 第 g 組為 values[offsets[g]:offsets[g+1]] (長度 = 組數 + 1)
+        suspensions, suspension_offsets: 截尾時間 (同樣的 ragged 格式，選填)
+        options: {'median_rank_method', 'regression_method': 'rry' | 'rrx' | 'mle',
+                  'n_total': 樣品總數 (純量或各組陣列，選填)}
+
+    Returns:
+        dict: n_groups, beta, eta, r_squared, log_likelihood, n_failures, n_points,
+              converged (皆為各組陣列) 或 {'error': ...}
+    """
+    options = options or {}
+    median_rank_method = options.get('median_rank_method', 'benard')
+    regression_method = options.get('regression_method', 'rry')
+    if median_rank_method not in RANK_METHODS:
+        median_rank_method = 'benard'
+    if regression_method not in REGRESSION_METHODS:
+        return {"error": f"不支援的回歸方法: {regression_method}"}
+
+    try:
+        fail_t, fail_g, fail_counts = _segments(values, offsets, 'values')
+        n_groups = fail_counts.size
+        if suspensions is None or suspension_offsets is None:
+            susp_t, susp_g = np.empty(0), np.empty(0, dtype=np.int64)
+            susp_counts = np.zeros(n_groups, dtype=np.int64)
+        else:
+            susp_t, susp_g, susp_counts = _segments(suspensions, suspension_offsets,
+                                                    'suspensions')
+            if susp_counts.size != n_groups:
+                return {"error": "suspension_offsets 的組數需與 offsets 相同"}
+        if fail_t.size + susp_t.size > MAX_VALUES:
+            return {"error": f"數據點數超過上限 {MAX_VALUES}"}
+
+        observed = fail_counts + susp_counts
+        n_total = options.get('n_total')
+        if n_total is None:
+            n_total = np.maximum(observed, DEFAULT_N_TOTAL)
+            explicit_n = False
+        else:
+            n_total = np.broadcast_to(np.asarray(n_total, dtype=np.int64), (n_groups,)).copy()
+            explicit_n = True
+            if np.any(n_total < observed):
+                return {"error": "樣品總數不可小於失效數與截尾數之和"}
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    # 合併排序：依組別、時間排序，同時間時失效排在截尾之前
+    times = np.concatenate([fail_t, susp_t])
+    group = np.concatenate([fail_g, susp_g])
+    is_failure = np.r_[np.ones(fail_t.size, dtype=bool), np.zeros(susp_t.size, dtype=bool)]
+    order = np.lexsort((~is_failure, times, group))
+    times, group, is_failure = times[order], group[order], is_failure[order]
+    group_start = np.r_[0, np.cumsum(observed)[:-1]]
+    position = np.arange(times.size) - group_start[group]
+
+    enough = fail_counts >= 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if regression_method == 'mle':
+            fit = _mle(times, group, is_failure, position, observed, n_total, explicit_n)
+            beta, eta, log_likelihood = fit["beta"], fit["eta"], fit["log_likelihood"]
+            r_squared = np.full(n_groups, np.nan)
+            n_points = fail_counts.astype(float)
+            converged = enough & fit["converged"]
+        else:
+            f, t, g = _ranks(times, group, is_failure, position, fail_counts, susp_counts,
+                             n_total, median_rank_method)
+            beta, eta, r_squared, n_points = _rank_regression(f, t, g, n_groups,
+                                                              regression_method)
+            log_likelihood = np.full(n_groups, np.nan)
+            converged = enough & (n_points >= 2) & np.isfinite(beta) & np.isfinite(eta)
+
+    nan = np.full(n_groups, np.nan)
+    return {
+        "n_groups": n_groups,
+        "method": f"{median_rank_method.upper()} + {regression_method.upper()}",
+        "beta": np.where(converged, beta, nan),
+        "eta": np.where(converged, eta, nan),
+        "r_squared": np.where(converged, r_squared, nan),
+        "log_likelihood": np.where(converged, log_likelihood, nan),
+        "n_failures": fail_counts,
+        "n_points": n_points.astype(int),
+        "converged": converged,
+    }
+
+
+def _ranks(times, group, is_failure, position, fail_counts, susp_counts, n_total, method):
+    """分段計算失效點的 F (有截尾的組別使用 Johnson 調整秩 / Kaplan-Meier)"""
+    t = times[is_failure]
+    g = group[is_failure]
+    n_g = n_total[g].astype(float)
+    reverse_rank = n_g - position[is_failure]
+    fail_start = np.r_[0, np.cumsum(fail_counts)[:-1]]
+    k = np.arange(t.size) - fail_start[g] + 1
+
+    f = np.empty(t.size)
+    censored = susp_counts[g] > 0
+    if censored.any():
+        rr, rg = reverse_rank[censored], g[censored]
+        if method == 'km':
+            f[censored] = 1 - np.exp(_segment_cumsum(np.log((rr - 1) / rr), rg))
+        else:
+            # Johnson 調整秩 (分段累積乘積以對數累加實作)
+            adjusted = (n_g[censored] + 1) * (
+                1 - np.exp(_segment_cumsum(np.log(rr / (rr + 1)), rg)))
+            f[censored] = ranks_from_order(adjusted, n_g[censored], method)
+    # 無截尾的組別直接查詢快取的整數秩表 (各組樣品總數通常僅有少數幾種)
+    complete = ~censored
+    for n in np.unique(n_g[complete]):
+        rows = complete & (n_g == n)
+        f[rows] = rank_table(int(n), method)[k[rows] - 1]
+    return f, t, g
+
+
+def _rank_regression(f, t, g, n_groups, regression_method):
+    """分段 RRY / RRX 迴歸：y = ln(-ln(1-F)) = β ln t - β ln η"""
+    keep = (f > 0) & (f < 1)
+    x = np.log(t)
+    y = np.log(-np.log(1 - np.where(keep, f, 0.5)))
+    w = keep.astype(float)
+
+    n_points = _segment_sum(w, g, n_groups)
+    mean_x = _segment_sum(w * x, g, n_groups) / n_points
+    mean_y = _segment_sum(w * y, g, n_groups) / n_points
+    dx, dy = (x - mean_x[g]) * w, (y - mean_y[g]) * w
+    sxx = _segment_sum(dx * dx, g, n_groups)
+    syy = _segment_sum(dy * dy, g, n_groups)
+    sxy = _segment_sum(dx * dy, g, n_groups)
+    r_squared = sxy ** 2 / (sxx * syy)
+
+    if regression_method == 'rrx':
+        # ln t = y / β + ln η
+        slope = sxy / syy
+        beta = 1 / slope
+        eta = np.exp(mean_x - slope * mean_y)
+    else:
+        beta = sxy / sxx
+        eta = np.exp(mean_x - mean_y / beta)
+    return beta, eta, r_squared, n_points
+
+
+def _mle(times, group, is_failure, position, observed, n_total, explicit_n):
+    """將排序後的扁平數據補齊為 (組數 × 最大觀測數 [+1]) 陣列後批次求解 MLE"""
+    n_groups = observed.size
+    width = int(observed.max()) + (1 if explicit_n else 0)
+    T = np.ones((n_groups, max(width, 1)))
+    D = np.zeros_like(T)
+    W = np.zeros_like(T)
+    T[group, position] = times
+    D[group, position] = is_failure
+    W[group, position] = 1.0
+    if explicit_n:
+        # 其餘樣品視為在最後觀測時間仍未失效 (與 weibull_mle.prepare_sample 相同)
+        rows = np.flatnonzero(observed > 0)
+        last = observed[rows]
+        T[rows, last] = T[rows, last - 1]
+        W[rows, last] = (n_total - observed)[rows]
+    return fit_weibull_mle_batch(T, D, W)
+
+
+def weibull_batch_to_json(result, decimals=4):
+    """將批次擬合結果轉為可 JSON 序列化的欄位 (NaN 轉為 None)"""
+    out = {"n_groups": int(result["n_groups"]), "method": result["method"],
+           "converged": result["converged"].tolist(),
+           "n_failures": result["n_failures"].tolist(), "n_points": result["n_points"].tolist()}
+    for key in ('beta', 'eta', 'r_squared', 'log_likelihood'):
+        arr = np.round(result[key], decimals)
+        out[key] = [float(v) if np.isfinite(v) else None for v in arr]
+    return out
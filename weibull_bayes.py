@@ -0,0 +1,327 @@
+"""
+貝氏 Weibull 後驗分佈 (仿射不變系綜 MCMC)
+以 Goodman & Weare (2010) 的 stretch move 在 θ = (ln η, ln β) 上抽樣：
+walkers 分為兩半交替更新，每半步的所有提議以一次向量化的右截尾對數概似計算；
+β、η 的先驗規格同 uncertainty.sample_distribution (未指定時為 ln β、ln η 上的均勻先驗)
+多條獨立鏈 (各自的亂數串流) 可於行程池平行執行，回報進度與取消，結果與 n_jobs 無關；
+收斂診斷為 split-R̂、積分自相關時間 (Sokal 自動視窗) 與有效樣本數
+"""
+
+import numpy as np
+from parallel import spawn_seeds, run_blocks, BlocksCancelled
+from uncertainty import (weibull_metrics, summarize_samples, sample_distribution, distribution_logpdf,
+                         validate_distributions, parse_summary_options, WEIBULL_PARAMS)
+from weibull_mle import prepare_sample, fit_weibull_mle
+from weibull_bounds import information_matrix
+
+DIM = 2
+STRETCH = 2.0                    # stretch move 的尺度參數 a
+DEFAULT_WALKERS = 32
+DEFAULT_STEPS = 2000
+DEFAULT_CHAINS = 4
+DEFAULT_MAX_DRAWS = 2000         # 回傳的後驗抽樣數上限 (均勻間隔取樣)
+DEFAULT_CONF_LEVEL = 0.9
+MAX_EVALUATIONS = 50000000       # walkers × 步數 × 鏈數 的上限
+R_HAT_THRESHOLD = 1.05
+INIT_RETRIES = 20
+
+# 跨數量級的指標以 log10 直方圖呈現
+LOG_METRICS = ('eta_alt', 'eta_use', 'mttf_use', 'bx_life')
+
+
+def log_posterior(theta, plan):
+    """
+    walkers 的對數後驗 (向量化)
+
+    Args:
+        theta: (walkers × 2) 的 (ln η, ln β)
+        plan: prepare_bayes 的計畫 (log_t, is_failure, weights 為合併相同觀測後的數據)
+    """
+    log_eta, log_beta = theta[:, 0], theta[:, 1]
+    log_t, is_failure, weights = plan["log_t"], plan["is_failure"], plan["weights"]
+    with np.errstate(all='ignore'):
+        w = np.exp(log_beta)[:, None] * (log_t - log_eta[:, None])
+        lp = np.sum(weights * (is_failure * (log_beta[:, None] - log_t + w) - np.exp(w)), axis=1)
+        # 先驗定義在 β、η 上，換算至對數尺度需乘上 Jacobian (加上 ln β、ln η)
+        for name, column in (('eta_alt', 0), ('beta', 1)):
+            spec = plan["priors"].get(name)
+            if spec:
+                lp = lp + distribution_logpdf(spec, np.exp(theta[:, column])) + theta[:, column]
+    return np.where(np.isfinite(lp), lp, -np.inf)
+
+
+def prepare_bayes(failures, suspensions=None, options=None, af_total=1.0, t_mission=17520,
+                  bx_percent=1, priors=None, n_walkers=DEFAULT_WALKERS, n_steps=DEFAULT_STEPS,
+                  burn_in=None, n_chains=DEFAULT_CHAINS, thin=1, seed=None,
+                  conf_level=DEFAULT_CONF_LEVEL, max_draws=DEFAULT_MAX_DRAWS):
+    """
+    檢查輸入並決定起始點，回傳 MCMC 計畫 (或 {'error': ...})
+
+    Args:
+        failures, suspensions: 失效與截尾時間
+        options: {'n_total': 實際樣品總數} (其餘樣品視為在最後觀測時間仍未失效)
+        af_total: 加速因子 (視為已知)
+        priors: {'beta': 分佈規格, 'eta_alt': 分佈規格} (選填)
+        n_walkers: 每條鏈的 walker 數 (偶數)
+        n_steps, burn_in, thin: 每條鏈的步數、捨棄的預燒步數 (預設一半) 與抽樣間隔
+        n_chains: 獨立鏈數
+        seed: 主亂數種子 (相同種子的結果完全相同)
+    """
+    options = options or {}
+    priors = {k: v for k, v in (priors or {}).items() if v}
+    error = validate_distributions(priors, WEIBULL_PARAMS)
+    if error:
+        return {"error": error}
+
+    try:
+        failures = np.asarray(failures, dtype=float).ravel()
+        suspensions = np.asarray(suspensions if isinstance(suspensions, (list, tuple, np.ndarray))
+                                 else [], dtype=float).ravel()
+        n_total = options.get('n_total')
+        n_total = int(n_total) if n_total not in (None, '') else None
+        times, is_failure, weights = prepare_sample(failures, suspensions, n_total)
+        n_walkers, n_steps, n_chains, thin = int(n_walkers), int(n_steps), int(n_chains), int(thin)
+        burn_in = n_steps // 2 if burn_in is None else int(burn_in)
+        conf_level, max_draws = float(conf_level), int(max_draws)
+        af_total, t_mission, bx_percent = float(af_total), float(t_mission), float(bx_percent)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    both_priors = all(name in priors for name in WEIBULL_PARAMS)
+    if failures.size < 2 and not both_priors:
+        return {"error": "失效數據不足 (至少需要 2 點，或同時指定 β 與 η 的先驗分佈)"}
+    if n_walkers % 2 or not 8 <= n_walkers <= 1024:
+        return {"error": "walker 數需為 8 ~ 1024 之間的偶數"}
+    if not 1 <= n_chains <= 64:
+        return {"error": "鏈數需介於 1 與 64 之間"}
+    if not (thin >= 1 and 0 <= burn_in and n_steps - burn_in >= 10 * thin):
+        return {"error": "步數需大於預燒步數 (預燒後至少保留 10 個抽樣)"}
+    if n_walkers * n_steps * n_chains > MAX_EVALUATIONS:
+        return {"error": f"walker 數 × 步數 × 鏈數不可超過 {MAX_EVALUATIONS}"}
+    if not 0.5 < conf_level < 1:
+        return {"error": "信賴水準需介於 0.5 與 1 之間"}
+
+    # 起始點：MLE 附近 (以 Fisher 共變異為尺度)；無法擬合時由先驗抽樣
+    init_mean = init_cov = None
+    if failures.size >= 2:
+        mle = fit_weibull_mle(failures, suspensions, n_total)
+        if "error" not in mle:
+            _, cov = information_matrix(mle["beta"], mle["eta"], times, is_failure, weights)
+            if np.all(np.isfinite(cov)) and np.all(np.linalg.eigvalsh(cov) > 0):
+                init_mean, init_cov = np.log([mle["eta"], mle["beta"]]), cov
+    if init_mean is None and not both_priors:
+        return {"error": "無法決定起始點 (MLE 未收斂且未同時指定 β 與 η 的先驗分佈)"}
+
+    # 相同 (時間, 失效標記) 的觀測合併為一欄 (權重相加)
+    pairs, inverse = np.unique(np.c_[times, is_failure], axis=0, return_inverse=True)
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+    return {
+        "log_t": np.log(pairs[:, 0]),
+        "is_failure": pairs[:, 1],
+        "weights": np.bincount(inverse.ravel(), weights=weights),
+        "n_failures": int(failures.size),
+        "n_suspensions": int(weights.sum() - failures.size),
+        "priors": priors,
+        "init_mean": init_mean,
+        "init_cov": init_cov,
+        "af_total": af_total,
+        "t_mission": t_mission,
+        "bx_percent": bx_percent,
+        "n_walkers": n_walkers,
+        "n_steps": n_steps,
+        "burn_in": burn_in,
+        "thin": thin,
+        "n_chains": n_chains,
+        "seed": seed,
+        "conf_level": conf_level,
+        "max_draws": max_draws,
+    }
+
+
+def _initial_walkers(plan, rng):
+    """起始 walkers (對數後驗需為有限值；超出支撐者重新抽樣)"""
+    n = plan["n_walkers"]
+
+    def draw(size):
+        if plan["init_mean"] is not None:
+            return rng.multivariate_normal(plan["init_mean"], plan["init_cov"], size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.log(np.c_[sample_distribution(plan["priors"]["eta_alt"], size, rng),
+                                sample_distribution(plan["priors"]["beta"], size, rng)])
+
+    theta = draw(n)
+    lp = log_posterior(theta, plan)
+    for _ in range(INIT_RETRIES):
+        bad = ~np.isfinite(lp)
+        if not bad.any():
+            return theta, lp
+        theta[bad] = draw(int(bad.sum()))
+        lp[bad] = log_posterior(theta[bad], plan)
+    raise ValueError("無法產生對數後驗為有限值的起始點 (請確認先驗分佈與數據相容)")
+
+
+def _bayes_chain(task):
+    """單一條鏈的系綜 MCMC (模組層級函式，供行程池使用)"""
+    plan, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    theta, lp = _initial_walkers(plan, rng)
+    half = plan["n_walkers"] // 2
+    halves = ((slice(0, half), slice(half, None)), (slice(half, None), slice(0, half)))
+    kept = range(plan["burn_in"], plan["n_steps"], plan["thin"])
+    chain = np.empty((len(kept), plan["n_walkers"], DIM))
+    accepted = 0
+
+    for step in range(plan["n_steps"]):
+        for active, other in halves:
+            # stretch move：z ~ g(z) ∝ 1/√z (1/a ≤ z ≤ a)，夥伴取自另一半的 walkers
+            z = ((STRETCH - 1) * rng.random(half) + 1) ** 2 / STRETCH
+            partner = theta[other][rng.integers(0, half, half)]
+            proposal = partner + z[:, None] * (theta[active] - partner)
+            lp_new = log_posterior(proposal, plan)
+            accept = np.log(rng.random(half)) < (DIM - 1) * np.log(z) + lp_new - lp[active]
+            theta[active][accept] = proposal[accept]
+            lp[active][accept] = lp_new[accept]
+            if step >= plan["burn_in"]:
+                accepted += int(accept.sum())
+        if step >= plan["burn_in"] and (step - plan["burn_in"]) % plan["thin"] == 0:
+            chain[(step - plan["burn_in"]) // plan["thin"]] = theta
+
+    return chain, accepted / ((plan["n_steps"] - plan["burn_in"]) * plan["n_walkers"])
+
+
+def split_r_hat(x):
+    """
+    split-R̂ (Gelman-Rubin)：x 為 (抽樣數 × 序列數)，每個序列切成前後兩半
+    """
+    n = x.shape[0] // 2
+    seqs = np.concatenate([x[:n], x[-n:]], axis=1)
+    within = seqs.var(axis=0, ddof=1).mean()
+    between = n * seqs.mean(axis=0).var(ddof=1)
+    if within <= 0:
+        return float('nan')
+    return float(np.sqrt(((n - 1) / n * within + between / n) / within))
+
+
+def autocorr_time(x, c=5.0):
+    """
+    積分自相關時間：x 為 (抽樣數 × walkers)，以 FFT 求各 walker 自相關函數的平均，
+    Sokal 自動視窗取第一個 M ≥ c·τ(M) 的位置
+    """
+    n = x.shape[0]
+    centered = x - x.mean(axis=0)
+    f = np.fft.rfft(centered, n=2 * n, axis=0)
+    acov = np.fft.irfft(f * np.conj(f), axis=0)[:n]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rho = np.nanmean(acov / acov[0], axis=1)
+    tau = 2 * np.cumsum(rho) - 1
+    window = np.arange(n) >= c * tau
+    return float(tau[np.argmax(window)] if window.any() else tau[-1])
+
+
+def _credible_interval(samples, conf_level):
+    """等尾可信區間 (雙邊與單邊)，value 為後驗中位數"""
+    finite = samples[np.isfinite(samples)]
+    if finite.size == 0:
+        return {"value": None, "lower": None, "upper": None,
+                "lower_one_sided": None, "upper_one_sided": None}
+    alpha = 1 - conf_level
+    q = np.percentile(finite, [50, 50 * alpha, 100 - 50 * alpha, 100 * alpha, 100 * conf_level])
+    return {"value": float(q[0]), "lower": float(q[1]), "upper": float(q[2]),
+            "lower_one_sided": float(q[3]), "upper_one_sided": float(q[4])}
+
+
+def execute_bayes(plan, n_jobs=1, percentiles=None, bins=50, return_samples=False,
+                  progress=None, cancel=None):
+    """
+    執行 prepare_bayes 的計畫
+
+    Args:
+        n_jobs: 平行行程數 (每條鏈一個區塊)
+        progress: 回呼函式 progress(已完成鏈數, 總鏈數) (選填)
+        cancel: 取消事件 (threading.Event)；設定後拋出 BlocksCancelled
+
+    Returns:
+        dict: method, priors, n_chains, n_walkers, n_steps, burn_in, thin, n_draws, seed, conf_level,
+              point (後驗中位數)，intervals ({指標: 可信區間})，metrics ({指標: 後驗分佈摘要})，
+              diagnostics (acceptance_fraction, r_hat, autocorr_time, ess, converged, warnings)，
+              draws (均勻取樣的後驗抽樣) 或 {'error': ...}
+    """
+    try:
+        percentiles, bins = parse_summary_options(percentiles, bins)
+    except ValueError as e:
+        return {"error": str(e)}
+    seeds = spawn_seeds(plan["seed"], plan["n_chains"])
+    try:
+        chains = run_blocks(_bayes_chain, [(plan, s) for s in seeds], n_jobs,
+                            progress=progress, cancel=cancel)
+    except BlocksCancelled:
+        raise
+    except Exception as e:
+        return {"error": str(e)}
+
+    # (抽樣數 × 鏈數 × walkers × 2)
+    trace = np.stack([c[0] for c in chains], axis=1)
+    n_kept = trace.shape[0]
+    diagnostics = {"acceptance_fraction": [round(c[1], 4) for c in chains],
+                   "r_hat": {}, "autocorr_time": {}, "ess": {}, "warnings": []}
+    for name, column in (('eta_alt', 0), ('beta', 1)):
+        values = trace[..., column]
+        tau = float(np.mean([autocorr_time(values[:, k]) for k in range(plan["n_chains"])]))
+        tau = max(tau, 1.0)
+        diagnostics["r_hat"][name] = round(split_r_hat(values.reshape(n_kept, -1)), 4)
+        diagnostics["autocorr_time"][name] = round(tau * plan["thin"], 2)
+        diagnostics["ess"][name] = int(values.size / tau)
+        if n_kept < 50 * tau:
+            diagnostics["warnings"].append(f"{name} 的保留步數少於 50 倍自相關時間，請增加步數")
+    r_hats = list(diagnostics["r_hat"].values())
+    diagnostics["converged"] = bool(all(np.isfinite(r) and r < R_HAT_THRESHOLD for r in r_hats))
+    if not diagnostics["converged"]:
+        diagnostics["warnings"].append(f"R̂ 超過 {R_HAT_THRESHOLD}，鏈可能尚未收斂")
+    if min(diagnostics["acceptance_fraction"]) < 0.1:
+        diagnostics["warnings"].append("接受率偏低 (< 0.1)")
+
+    flat = trace.reshape(-1, DIM)
+    samples = {"beta": np.exp(flat[:, 1]), "eta_alt": np.exp(flat[:, 0])}
+    samples.update(weibull_metrics(plan["af_total"], samples["beta"], samples["eta_alt"],
+                                   plan["t_mission"], plan["bx_percent"]))
+    intervals = {name: _credible_interval(values, plan["conf_level"]) for name, values in samples.items()}
+    pick = np.linspace(0, flat.shape[0] - 1, min(plan["max_draws"], flat.shape[0])).astype(int)
+
+    result = {
+        "method": "Bayesian (affine-invariant ensemble MCMC)",
+        "priors": {name: plan["priors"].get(name, "flat (log scale)") for name in WEIBULL_PARAMS},
+        "n_failures": plan["n_failures"],
+        "n_suspensions": plan["n_suspensions"],
+        "n_chains": plan["n_chains"],
+        "n_walkers": plan["n_walkers"],
+        "n_steps": plan["n_steps"],
+        "burn_in": plan["burn_in"],
+        "thin": plan["thin"],
+        "n_draws": int(flat.shape[0]),
+        "seed": plan["seed"],
+        "conf_level": plan["conf_level"],
+        "bx_percent": plan["bx_percent"],
+        "point": {name: interval["value"] for name, interval in intervals.items()},
+        "intervals": intervals,
+        "metrics": {name: summarize_samples(values, percentiles, bins, name in LOG_METRICS)
+                    for name, values in samples.items()},
+        "diagnostics": diagnostics,
+        "draws": {name: values[pick].tolist() for name, values in samples.items()},
+    }
+    if return_samples:
+        result["samples"] = samples
+    return result
+
+
+def run_bayes(failures, suspensions=None, options=None, af_total=1.0, t_mission=17520, bx_percent=1,
+              priors=None, n_walkers=DEFAULT_WALKERS, n_steps=DEFAULT_STEPS, burn_in=None,
+              n_chains=DEFAULT_CHAINS, thin=1, seed=None, conf_level=DEFAULT_CONF_LEVEL,
+              max_draws=DEFAULT_MAX_DRAWS, n_jobs=1, percentiles=None, bins=50, return_samples=False,
+              progress=None, cancel=None):
+    """貝氏 Weibull 後驗 (prepare_bayes + execute_bayes)，參數說明見兩者"""
+    plan = prepare_bayes(failures, suspensions, options, af_total, t_mission, bx_percent, priors,
+                         n_walkers, n_steps, burn_in, n_chains, thin, seed, conf_level, max_draws)
+    if "error" in plan:
+        return plan
+    return execute_bayes(plan, n_jobs, percentiles, bins, return_samples, progress, cancel)
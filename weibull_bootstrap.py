@@ -0,0 +1,194 @@
+"""
+Weibull bootstrap 信賴區間
+對失效 / 截尾數據做參數 (由擬合的 Weibull 模擬) 或非參數 (成對重抽) bootstrap：
+每個區塊的重抽樣本以 ragged 格式一次交給 calculate_weibull_batch，
+沿用 options 中的中位秩 / 迴歸方法重新擬合，再向量化重算各項可靠度指標；
+區塊使用獨立亂數串流，可平行執行、回報進度與取消，結果與 n_jobs 無關
+"""
+
+import numpy as np
+from parallel import split_blocks, spawn_seeds, run_blocks, BlocksCancelled
+from uncertainty import weibull_metrics, summarize_samples, parse_summary_options
+from weibull_batch import calculate_weibull_batch, REGRESSION_METHODS
+
+BOOTSTRAP_METHODS = ('nonparametric', 'parametric')
+DEFAULT_BLOCK_SIZE = 1000        # 每個區塊的重抽次數
+MAX_RESAMPLES = 1000000
+DEFAULT_CONF_LEVEL = 0.9
+
+# 跨數量級的指標以 log10 直方圖呈現
+LOG_METRICS = ('eta_alt', 'eta_use', 'mttf_use', 'bx_life')
+
+
+def prepare_bootstrap(failures, suspensions=None, options=None, af_total=1.0, t_mission=17520,
+                      bx_percent=1, method='nonparametric', n_resamples=1000, seed=None,
+                      conf_level=DEFAULT_CONF_LEVEL, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    檢查輸入並擬合點估計，回傳 bootstrap 計畫 (或 {'error': ...})
+
+    Args:
+        failures, suspensions: 失效與截尾時間
+        options: calculate_weibull 的選項 (median_rank_method, regression_method, n_total)
+        af_total: 加速因子 (視為已知)
+        method: 'nonparametric' (成對重抽) | 'parametric' (由點估計模擬，保留截尾時間)
+        n_resamples: 重抽次數
+        seed: 主亂數種子 (相同種子與 block_size 的結果完全相同)
+    """
+    options = options or {}
+    if method not in BOOTSTRAP_METHODS:
+        return {"error": f"不支援的 bootstrap 方法: {method}"}
+    regression_method = options.get('regression_method', 'rry')
+    if regression_method not in REGRESSION_METHODS:
+        return {"error": f"不支援的回歸方法: {regression_method}"}
+    if options.get('three_parameter'):
+        return {"error": "bootstrap 目前僅支援二參數 Weibull"}
+
+    try:
+        failures = np.asarray(failures, dtype=float).ravel()
+        suspensions = np.asarray(suspensions if isinstance(suspensions, (list, tuple, np.ndarray))
+                                 else [], dtype=float).ravel()
+        n_resamples = int(n_resamples)
+        conf_level = float(conf_level)
+        af_total, t_mission, bx_percent = float(af_total), float(t_mission), float(bx_percent)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+    if failures.size < 2:
+        return {"error": "失效數據不足，無法進行 Weibull 擬合 (至少需要 2 點)"}
+    if not 2 <= n_resamples <= MAX_RESAMPLES:
+        return {"error": f"重抽次數需介於 2 與 {MAX_RESAMPLES} 之間"}
+    if not 0.5 < conf_level < 1:
+        return {"error": "信賴水準需介於 0.5 與 1 之間"}
+
+    fit_options = {'median_rank_method': options.get('median_rank_method', 'benard'),
+                   'regression_method': regression_method}
+    if options.get('n_total') not in (None, ''):
+        fit_options['n_total'] = int(options['n_total'])
+    point = calculate_weibull_batch(failures, [0, failures.size], suspensions,
+                                    [0, suspensions.size], fit_options)
+    if "error" in point:
+        return point
+    if not point["converged"][0]:
+        return {"error": "點估計擬合失敗"}
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+    return {
+        "times": np.concatenate([failures, suspensions]),
+        "is_failure": np.r_[np.ones(failures.size, dtype=bool), np.zeros(suspensions.size, dtype=bool)],
+        "options": fit_options,
+        "method": method,
+        "beta": float(point["beta"][0]),
+        "eta": float(point["eta"][0]),
+        "af_total": af_total,
+        "t_mission": t_mission,
+        "bx_percent": bx_percent,
+        "n_resamples": n_resamples,
+        "seed": seed,
+        "conf_level": conf_level,
+        "block_size": int(block_size),
+    }
+
+
+def _bootstrap_block(task):
+    """單一區塊的重抽與批次擬合 (模組層級函式，供行程池使用)"""
+    plan, seed_seq, size = task
+    rng = np.random.default_rng(seed_seq)
+    times, is_failure = plan["times"], plan["is_failure"]
+
+    if plan["method"] == 'parametric':
+        # 由點估計模擬壽命；原截尾樣品在其截尾時間截尾，原失效樣品不截尾
+        life = plan["eta"] * rng.weibull(plan["beta"], (size, times.size))
+        censor = np.where(is_failure, np.inf, times)
+        fail = life <= censor
+        sample = np.where(fail, life, censor)
+    else:
+        index = rng.integers(0, times.size, (size, times.size))
+        sample, fail = times[index], is_failure[index]
+
+    # 每列為一組重抽樣本：失效與截尾各自轉為 ragged 格式
+    fit = calculate_weibull_batch(sample[fail], np.r_[0, np.cumsum(fail.sum(axis=1))],
+                                  sample[~fail], np.r_[0, np.cumsum((~fail).sum(axis=1))],
+                                  plan["options"])
+    if "error" in fit:
+        raise ValueError(fit["error"])
+    return fit["beta"], fit["eta"]
+
+
+def _percentile_bounds(value, samples, conf_level):
+    """百分位數信賴區間 (雙邊與單邊；忽略非有限值)"""
+    finite = samples[np.isfinite(samples)]
+    if finite.size == 0:
+        return {"value": value, "lower": None, "upper": None,
+                "lower_one_sided": None, "upper_one_sided": None}
+    alpha = 1 - conf_level
+    q = np.percentile(finite, [50 * alpha, 100 - 50 * alpha, 100 * alpha, 100 * conf_level])
+    return {"value": value, "lower": float(q[0]), "upper": float(q[1]),
+            "lower_one_sided": float(q[2]), "upper_one_sided": float(q[3])}
+
+
+def execute_bootstrap(plan, n_jobs=1, percentiles=None, bins=50, return_samples=False,
+                      progress=None, cancel=None):
+    """
+    執行 prepare_bootstrap 的計畫
+
+    Args:
+        n_jobs: 平行行程數
+        progress: 回呼函式 progress(已完成區塊數, 總區塊數) (選填)
+        cancel: 取消事件 (threading.Event)；設定後拋出 BlocksCancelled
+
+    Returns:
+        dict: method, n_resamples, n_valid, seed, conf_level, point (點估計指標),
+              intervals ({指標: 百分位數界限})，metrics ({指標: 分佈摘要}) 或 {'error': ...}
+    """
+    try:
+        percentiles, bins = parse_summary_options(percentiles, bins)
+    except ValueError as e:
+        return {"error": str(e)}
+    sizes = split_blocks(plan["n_resamples"], plan["block_size"])
+    seeds = spawn_seeds(plan["seed"], len(sizes))
+    try:
+        blocks = run_blocks(_bootstrap_block, [(plan, s, size) for s, size in zip(seeds, sizes)],
+                            n_jobs, progress=progress, cancel=cancel)
+    except BlocksCancelled:
+        raise
+    except Exception as e:
+        return {"error": str(e)}
+
+    beta = np.concatenate([b[0] for b in blocks])
+    eta = np.concatenate([b[1] for b in blocks])
+    samples = {"beta": beta, "eta_alt": eta}
+    samples.update(weibull_metrics(plan["af_total"], beta, eta, plan["t_mission"],
+                                   plan["bx_percent"]))
+    point = {"beta": plan["beta"], "eta_alt": plan["eta"]}
+    point.update({k: float(v) for k, v in weibull_metrics(
+        plan["af_total"], plan["beta"], plan["eta"], plan["t_mission"], plan["bx_percent"]).items()})
+
+    result = {
+        "method": plan["method"],
+        "fit_method": (f"{plan['options']['median_rank_method'].upper()} + "
+                       f"{plan['options']['regression_method'].upper()}"),
+        "n_resamples": plan["n_resamples"],
+        "n_valid": int(np.isfinite(beta).sum()),
+        "seed": plan["seed"],
+        "conf_level": plan["conf_level"],
+        "point": point,
+        "intervals": {name: _percentile_bounds(point[name], values, plan["conf_level"])
+                      for name, values in samples.items()},
+        "metrics": {name: summarize_samples(values, percentiles, bins, name in LOG_METRICS)
+                    for name, values in samples.items()},
+    }
+    if return_samples:
+        result["samples"] = samples
+    return result
+
+
+def run_bootstrap(failures, suspensions=None, options=None, af_total=1.0, t_mission=17520,
+                  bx_percent=1, method='nonparametric', n_resamples=1000, seed=None,
+                  conf_level=DEFAULT_CONF_LEVEL, n_jobs=1, block_size=DEFAULT_BLOCK_SIZE,
+                  percentiles=None, bins=50, return_samples=False, progress=None, cancel=None):
+    """Weibull bootstrap (prepare_bootstrap + execute_bootstrap)，參數說明見兩者"""
+    plan = prepare_bootstrap(failures, suspensions, options, af_total, t_mission, bx_percent,
+                             method, n_resamples, seed, conf_level, block_size)
+    if "error" in plan:
+        return plan
+    return execute_bootstrap(plan, n_jobs, percentiles, bins, return_samples, progress, cancel)
@@ -0,0 +1,257 @@
+"""
+Weibull 參數與可靠度指標的信賴界限
+  1. Fisher 矩陣界限：由解析的觀測資訊矩陣 (ln η, ln β) 以 delta method 計算，
+     正值量在對數尺度、R(t) 在 u = β(ln t - ln η) 尺度取常態近似
+  2. 概似比 (LR) 界限：以向量化射線求根求得 2(ℓ_max - ℓ) = χ²₁ 的概似等高線，
+     各指標的界限為等高線上的最小 / 最大值
+雙邊界限與單邊界限 (同一信賴水準) 一併回傳；R(t) 可傳入整條時間陣列供繪圖
+"""
+
+import numpy as np
+from scipy import stats, special
+from weibull_mle import prepare_sample
+
+DEFAULT_CONF_LEVEL = 0.9
+BOUNDS_METHODS = ('fisher', 'lr')
+CONTOUR_POINTS = 360
+CURVE_POINTS = 100
+
+
+def information_matrix(beta, eta, times, is_failure, weights=None):
+    """
+    右截尾 Weibull 對數概似在 (ln η, ln β) 的觀測資訊矩陣與其反矩陣 (共變異)
+
+    ℓ = Σ W [δ (ln β - ln t + w) - e^w]，w = β (ln t - ln η)
+    """
+    times = np.asarray(times, dtype=float)
+    is_failure = np.asarray(is_failure, dtype=float)
+    weights = np.ones_like(times) if weights is None else np.asarray(weights, dtype=float)
+    w = beta * (np.log(times) - np.log(eta))
+    ew = np.exp(w)
+    r = weights * (is_failure - ew)
+    mew = weights * ew
+
+    info = np.empty((2, 2))
+    info[0, 0] = beta ** 2 * mew.sum()
+    info[0, 1] = info[1, 0] = beta * r.sum() - beta * (mew * w).sum()
+    info[1, 1] = (mew * w * w).sum() - (r * w).sum()
+    return info, np.linalg.inv(info)
+
+
+def _z_values(conf_level):
+    """雙邊與單邊常態分位數"""
+    return stats.norm.ppf(0.5 + conf_level / 2), stats.norm.ppf(conf_level)
+
+
+def _log_quantities(log_eta, log_beta, af_total, bx_percent):
+    """正值指標的 ln 值 (可向量化於等高線點)"""
+    beta = np.exp(log_beta)
+    out = {
+        "beta": log_beta,
+        "eta_alt": log_eta,
+        "eta_use": log_eta + np.log(af_total),
+        "mttf_use": log_eta + np.log(af_total) + special.gammaln(1 + 1 / beta),
+    }
+    if bx_percent is not None:
+        out["bx_life"] = (log_eta + np.log(af_total) +
+                          np.log(-np.log(1 - bx_percent / 100)) / beta)
+    return out
+
+
+def _bound(value, lower, upper, lower_one, upper_one):
+    return {"value": value, "lower": lower, "upper": upper,
+            "lower_one_sided": lower_one, "upper_one_sided": upper_one}
+
+
+def fisher_bounds(beta, eta, cov, conf_level=DEFAULT_CONF_LEVEL, af_total=1.0,
+                  bx_percent=None, t=None):
+    """
+    Fisher 矩陣信賴界限
+
+    Args:
+        beta, eta: 參數估計值 (測試條件)
+        cov: (ln η, ln β) 的共變異矩陣 (information_matrix 的第二個回傳值)
+        af_total: 加速因子 (視為已知)，用於 eta_use / MTTF / Bx / R(t)
+        bx_percent: Bx% 壽命的百分比 (選填)
+        t: 現場時間 (純量或陣列，選填)，計算 R(t) 界限
+
+    Returns:
+        dict: {指標: {'value', 'lower', 'upper', 'lower_one_sided', 'upper_one_sided'}}
+    """
+    cov = np.asarray(cov, dtype=float)
+    z2, z1 = _z_values(conf_level)
+    beta = float(beta)
+    gradients = {
+        "beta": (0.0, 1.0),
+        "eta_alt": (1.0, 0.0),
+        "eta_use": (1.0, 0.0),
+        "mttf_use": (1.0, -special.digamma(1 + 1 / beta) / beta),
+    }
+    if bx_percent is not None:
+        gradients["bx_life"] = (1.0, -np.log(-np.log(1 - bx_percent / 100)) / beta)
+
+    logs = _log_quantities(np.log(eta), np.log(beta), af_total, bx_percent)
+    out = {}
+    for key, grad in gradients.items():
+        g = np.array(grad)
+        se = float(np.sqrt(g @ cov @ g))
+        center = logs[key]
+        out[key] = _bound(*np.exp([center, center - z2 * se, center + z2 * se,
+                                   center - z1 * se, center + z1 * se]))
+
+    if t is not None:
+        # u = β (ln t - ln η_use)；R = exp(-e^u)，u 越大可靠度越低
+        u = beta * (np.log(np.asarray(t, dtype=float)) - np.log(eta * af_total))
+        var_u = beta ** 2 * cov[0, 0] - 2 * beta * u * cov[0, 1] + u ** 2 * cov[1, 1]
+        se_u = np.sqrt(var_u)
+        reliability = lambda x: np.exp(-np.exp(x))
+        out["r"] = _bound(reliability(u), reliability(u + z2 * se_u), reliability(u - z2 * se_u),
+                          reliability(u + z1 * se_u), reliability(u - z1 * se_u))
+    return out
+
+
+def _log_likelihood(log_eta, log_beta, log_t, is_failure, weights):
+    """多組 (ln η, ln β) 的對數概似 (向量化)"""
+    beta = np.exp(log_beta)[:, None]
+    w = beta * (log_t - log_eta[:, None])
+    with np.errstate(over='ignore', invalid='ignore'):
+        ll = np.sum(weights * (is_failure * (np.log(beta) - log_t + w) - np.exp(w)), axis=1)
+    return np.where(np.isfinite(ll), ll, -np.inf)
+
+
+def likelihood_contour(beta, eta, cov, times, is_failure, weights=None,
+                       conf_level=DEFAULT_CONF_LEVEL, n_points=CONTOUR_POINTS):
+    """
+    概似比等高線：以 Fisher 共變異的 Cholesky 分解定義射線方向，
+    沿每條射線同時以二分法求解 ℓ(θ) = ℓ_max - χ²₁(α)/2
+
+    Returns:
+        dict: {'two_sided': (ln η, ln β) 陣列, 'one_sided': (ln η, ln β) 陣列}
+              (單邊等高線對應 χ²₁ 的 2·CL - 1 分位數)
+    """
+    log_t = np.log(np.asarray(times, dtype=float))
+    is_failure = np.asarray(is_failure, dtype=float)
+    weights = np.ones_like(log_t) if weights is None else np.asarray(weights, dtype=float)
+    center = np.array([np.log(eta), np.log(beta)])
+    ll_max = _log_likelihood(center[:1], center[1:], log_t, is_failure, weights)[0]
+
+    angles = np.linspace(0, 2 * np.pi, n_points, endpoint=False)
+    directions = np.linalg.cholesky(cov) @ np.vstack([np.cos(angles), np.sin(angles)])
+
+    contours = {}
+    for name, level in (("two_sided", conf_level), ("one_sided", 2 * conf_level - 1)):
+        target = ll_max - stats.chi2.ppf(level, 1) / 2
+        radius0 = np.sqrt(stats.chi2.ppf(level, 1))
+
+        def drop(radius):
+            points = center[:, None] + directions * radius
+            return _log_likelihood(points[0], points[1], log_t, is_failure, weights) - target
+
+        lo = np.zeros(n_points)
+        hi = np.full(n_points, 2 * radius0)
+        for _ in range(60):
+            outside = drop(hi) > 0
+            if not outside.any():
+                break
+            lo = np.where(outside, hi, lo)
+            hi = np.where(outside, hi * 2, hi)
+        for _ in range(60):
+            mid = 0.5 * (lo + hi)
+            inside = drop(mid) > 0
+            lo, hi = np.where(inside, mid, lo), np.where(inside, hi, mid)
+            if np.all(hi - lo <= 1e-10 * (1 + hi)):
+                break
+        contours[name] = center[:, None] + directions * (0.5 * (lo + hi))
+    return contours
+
+
+def lr_bounds(beta, eta, contours, af_total=1.0, bx_percent=None, t=None):
+    """由概似比等高線計算各指標的界限 (等高線上的最小 / 最大值)"""
+    two, one = contours["two_sided"], contours["one_sided"]
+    logs_two = _log_quantities(two[0], two[1], af_total, bx_percent)
+    logs_one = _log_quantities(one[0], one[1], af_total, bx_percent)
+    logs = _log_quantities(np.log(eta), np.log(beta), af_total, bx_percent)
+
+    out = {}
+    for key in logs:
+        out[key] = _bound(*np.exp([logs[key], logs_two[key].min(), logs_two[key].max(),
+                                   logs_one[key].min(), logs_one[key].max()]))
+
+    if t is not None:
+        log_t = np.log(np.atleast_1d(np.asarray(t, dtype=float)))[:, None]
+
+        def reliability(c):
+            eta_use = c[0] + np.log(af_total)
+            return np.exp(-np.exp(np.exp(c[1]) * (log_t - eta_use)))
+
+        r_two, r_one = reliability(two), reliability(one)
+        r = np.exp(-(np.exp(log_t[:, 0]) / (eta * af_total)) ** beta)
+        bound = _bound(r, r_two.min(axis=1), r_two.max(axis=1),
+                       r_one.min(axis=1), r_one.max(axis=1))
+        if np.ndim(t) == 0:
+            bound = {k: v[0] for k, v in bound.items()}
+        out["r"] = bound
+    return out
+
+
+def mle_bounds(beta, eta, failures, suspensions=None, n_total=None,
+               conf_level=DEFAULT_CONF_LEVEL, method='fisher'):
+    """
+    MLE 參數 (β, η) 的信賴界限，供 calculate_weibull 附加於結果
+
+    Returns:
+        dict: conf_level, bounds_method, cov ((ln η, ln β) 共變異)，bounds (beta / eta_alt)，
+              LR 時另含 contour (等高線的 β, η 陣列，可直接繪圖)
+    """
+    if method not in BOUNDS_METHODS:
+        raise ValueError(f"不支援的信賴界限方法: {method}")
+    if not 0.5 < conf_level < 1:
+        raise ValueError("信賴水準需介於 0.5 與 1 之間")
+    times, is_failure, weights = prepare_sample(failures, suspensions, n_total)
+    _, cov = information_matrix(beta, eta, times, is_failure, weights)
+
+    out = {"conf_level": conf_level, "bounds_method": method, "cov": cov.tolist()}
+    if method == 'lr':
+        contours = likelihood_contour(beta, eta, cov, times, is_failure, weights, conf_level)
+        bounds = lr_bounds(beta, eta, contours)
+        out["contour"] = {name: {"eta": np.exp(c[0]).tolist(), "beta": np.exp(c[1]).tolist()}
+                          for name, c in contours.items()}
+    else:
+        bounds = fisher_bounds(beta, eta, cov, conf_level)
+    out["bounds"] = {"beta": round_bound(bounds["beta"], 4),
+                     "eta_alt": round_bound(bounds["eta_alt"], 4)}
+    return out
+
+
+def reliability_bounds(weibull_params, af_total, t_mission, bx_percent):
+    """
+    依 calculate_weibull 的結果 (含 cov / bounds_method / conf_level) 計算現場指標界限
+
+    Returns:
+        dict: {'eta_use', 'mttf_use', 'bx_life', 'r_mission', 'r_curve'} 或 None (無共變異時)
+    """
+    if not weibull_params or "cov" not in weibull_params:
+        return None
+    beta, eta = weibull_params["beta"], weibull_params["eta_alt"]
+    conf_level = weibull_params.get("conf_level", DEFAULT_CONF_LEVEL)
+    curve_t = np.linspace(0, t_mission, CURVE_POINTS + 1)[1:]
+    times = np.r_[t_mission, curve_t]
+
+    if weibull_params.get("bounds_method") == 'lr' and "contour" in weibull_params:
+        contours = {name: np.log([c["eta"], c["beta"]])
+                    for name, c in weibull_params["contour"].items()}
+        bounds = lr_bounds(beta, eta, contours, af_total, bx_percent, times)
+    else:
+        bounds = fisher_bounds(beta, eta, weibull_params["cov"], conf_level, af_total,
+                               bx_percent, times)
+
+    r = bounds.pop("r")
+    bounds.pop("beta"), bounds.pop("eta_alt")
+    bounds["r_mission"] = {k: float(v[0]) for k, v in r.items()}
+    bounds["r_curve"] = {"t": curve_t.tolist(), **{k: v[1:].tolist() for k, v in r.items()}}
+    return bounds
+
+
+def round_bound(bound, decimals):
+    """將界限字典四捨五入 (非有限值轉為 None)"""
+    return {k: (round(float(v), decimals) if np.isfinite(v) else None) for k, v in bound.items()}
@@ -0,0 +1,350 @@
+"""
+分組 (區間) Weibull 數據
+大量現場退貨數據以區間彙總：每個區間 [start, end) 記錄失效數與截尾數，
+計算成本只與區間數有關，與樣品數無關：
+  - 失效：ln P = ln[R(start) - R(end)] (區間概似)
+  - 截尾：於區間結束時仍未失效，ln R(end)
+MLE 以 (ln η, ln β) 的解析梯度與 Hessian 進行 Levenberg-Marquardt 阻尼牛頓法；
+秩回歸以區間結束時的精算 (actuarial / Kaplan-Meier) 累積失效機率作圖
+原始時間可用 bin_life_data 以分塊串流方式彙總為區間
+"""
+
+import numpy as np
+from scipy import stats
+from weibull_mle import fit_weibull_mle_batch
+from weibull_bounds import fisher_bounds, round_bound, DEFAULT_CONF_LEVEL
+
+DEFAULT_CHUNK_SIZE = 1000000     # 串流彙總時每塊的數據點數
+MAX_ITER = 200
+TOL = 1e-10
+REGRESSION_METHODS = ('rry', 'rrx', 'mle')
+
+
+def log_edges(t_min, t_max, n_bins):
+    """對數等距的區間邊界 (第一個邊界為 0，涵蓋 [0, t_max])"""
+    return np.r_[0.0, np.geomspace(float(t_min), float(t_max), int(n_bins))]
+
+
+def _iter_chunks(data, chunk_size):
+    """將陣列切塊，或逐一取出可疊代物件 (如逐塊讀檔的產生器) 的各塊"""
+    if data is None:
+        return
+    if isinstance(data, (list, tuple, np.ndarray)):
+        data = np.asarray(data, dtype=float).ravel()
+        for start in range(0, data.size, chunk_size):
+            yield data[start:start + chunk_size]
+    else:
+        for chunk in data:
+            yield np.asarray(chunk, dtype=float).ravel()
+
+
+def bin_life_data(failures, suspensions=None, edges=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    以單次串流將原始失效 / 截尾時間彙總為區間計數
+
+    Args:
+        failures, suspensions: 時間陣列，或逐塊產生陣列的可疊代物件
+        edges: 遞增的區間邊界 (最後一個可為 np.inf)
+        chunk_size: 陣列輸入時每塊的數據點數
+
+    Returns:
+        dict: start, end, failures, suspensions (各區間陣列)，n_out_of_range (無法歸入的數據數)
+        失效歸入包含該時間的區間；截尾保守地歸入結束時間不晚於截尾時間的最後一個區間
+    """
+    edges = np.asarray(edges, dtype=float).ravel()
+    if edges.size < 2 or np.any(np.diff(edges) <= 0) or edges[0] < 0:
+        raise ValueError("區間邊界需為非負且嚴格遞增 (至少 2 個)")
+    n_bins = edges.size - 1
+    fail_counts = np.zeros(n_bins, dtype=np.int64)
+    susp_counts = np.zeros(n_bins, dtype=np.int64)
+    out_of_range = 0
+
+    for chunk in _iter_chunks(failures, chunk_size):
+        index = np.searchsorted(edges, chunk, side='right') - 1
+        ok = (index >= 0) & (index < n_bins)
+        fail_counts += np.bincount(index[ok], minlength=n_bins)
+        out_of_range += int(chunk.size - ok.sum())
+    for chunk in _iter_chunks(suspensions, chunk_size):
+        index = np.minimum(np.searchsorted(edges[1:], chunk, side='right') - 1, n_bins - 1)
+        ok = index >= 0
+        susp_counts += np.bincount(index[ok], minlength=n_bins)
+        out_of_range += int(chunk.size - ok.sum())
+
+    return {"start": edges[:-1], "end": edges[1:], "failures": fail_counts,
+            "suspensions": susp_counts, "n_out_of_range": out_of_range}
+
+
+def parse_bins(bins):
+    """
+    解析區間數據：{'start', 'end', 'failures', 'suspensions'} 欄位字典，
+    或 [start, end, failures(, suspensions)] 的列
+
+    Returns:
+        (start, end, failures, suspensions) 陣列 (略去空區間)
+
+    Raises:
+        ValueError: 區間或計數無效
+    """
+    if isinstance(bins, dict):
+        start = np.asarray(bins.get('start', []), dtype=float).ravel()
+        end = np.asarray(bins.get('end', []), dtype=float).ravel()
+        fail = np.asarray(bins.get('failures', np.zeros(start.size)), dtype=float).ravel()
+        susp = np.asarray(bins.get('suspensions', np.zeros(start.size)), dtype=float).ravel()
+    else:
+        rows = np.asarray(bins, dtype=float)
+        if rows.ndim != 2 or rows.shape[1] not in (3, 4):
+            raise ValueError("區間數據需為 [start, end, failures, suspensions] 的列")
+        start, end, fail = rows[:, 0], rows[:, 1], rows[:, 2]
+        susp = rows[:, 3] if rows.shape[1] == 4 else np.zeros(rows.shape[0])
+    if not start.size == end.size == fail.size == susp.size:
+        raise ValueError("區間欄位長度不一致")
+    if np.any(~(start >= 0)) or np.any(~(end > start)):
+        raise ValueError("區間需滿足 0 ≤ start < end")
+    if np.any(~(fail >= 0)) or np.any(~(susp >= 0)):
+        raise ValueError("失效數與截尾數需為非負")
+    if np.any((susp > 0) & np.isinf(end)):
+        raise ValueError("截尾數據的區間結束時間需為有限值")
+
+    used = (fail > 0) | (susp > 0)
+    return start[used], end[used], fail[used], susp[used]
+
+
+def _boundary(log_t, theta):
+    """邊界時間的 u = (t/η)^β 及其對 (ln η, ln β) 的一、二階導數 (t = 0 或 ∞ 時導數為 0)"""
+    beta = np.exp(theta[1])
+    finite = np.isfinite(log_t)
+    z = np.where(finite, beta * (log_t - theta[0]), 0.0)
+    u = np.where(finite, np.exp(z), np.where(log_t > 0, np.inf, 0.0))
+    ur = np.where(finite, u, 0.0)
+    dz = np.stack([np.full_like(z, -beta), z], axis=1)
+    d2z = np.zeros((z.size, 2, 2))
+    d2z[:, 0, 1] = d2z[:, 1, 0] = -beta
+    d2z[:, 1, 1] = z
+    du = ur[:, None] * dz
+    d2u = ur[:, None, None] * (dz[:, :, None] * dz[:, None, :] + d2z)
+    return u, du, d2u
+
+
+def _grouped_derivatives(theta, log_a, log_b, fail, log_c, susp, log_e=None, exact=None):
+    """
+    分組對數概似及其梯度、Hessian
+
+    log_a, log_b, fail: 有失效區間的 ln start、ln end 與失效數；log_c, susp: 截尾時間 (ln end) 與截尾數；
+    log_e, exact: 確切失效時間與其數量 (選填，密度項 ln f = ln β - ln t + z - u)
+    """
+    with np.errstate(all='ignore'):
+        u_a, du_a, d2u_a = _boundary(log_a, theta)
+        u_b, du_b, d2u_b = _boundary(log_b, theta)
+        u_c, du_c, d2u_c = _boundary(log_c, theta)
+        # ln P = -u_a + ln(1 - e^{-D})，D = u_b - u_a；h = d/dD ln(1 - e^{-D}) = 1 / (e^D - 1)
+        D = u_b - u_a
+        log_p = -u_a + np.log(-np.expm1(-D))
+        h = np.where(np.isfinite(D), 1 / np.expm1(D), 0.0)
+        dD = du_b - du_a
+        d2D = d2u_b - d2u_a
+        ll = np.sum(fail * log_p) - np.sum(susp * u_c)
+        grad = (fail[:, None] * (-du_a + h[:, None] * dD)).sum(axis=0) - (susp[:, None] * du_c).sum(axis=0)
+        hess = (fail[:, None, None] * (-d2u_a + h[:, None, None] * d2D
+                                       - (h * (1 + h))[:, None, None] * dD[:, :, None] * dD[:, None, :])
+                ).sum(axis=0) - (susp[:, None, None] * d2u_c).sum(axis=0)
+        if exact is not None and exact.size:
+            u_e, du_e, d2u_e = _boundary(log_e, theta)
+            beta = np.exp(theta[1])
+            z_e = beta * (log_e - theta[0])
+            ll += np.sum(exact * (theta[1] - log_e + z_e - u_e))
+            dz = np.stack([np.full_like(z_e, -beta), z_e], axis=1)
+            grad += (exact[:, None] * (dz - du_e)).sum(axis=0) + np.array([0.0, exact.sum()])
+            d2z = np.zeros((z_e.size, 2, 2))
+            d2z[:, 0, 1] = d2z[:, 1, 0] = -beta
+            d2z[:, 1, 1] = z_e
+            hess += (exact[:, None, None] * (d2z - d2u_e)).sum(axis=0)
+    return ll, grad, hess
+
+
+def _starting_values(start, end, fail, susp, exact_t, exact):
+    """初始值：失效取區間幾何中點、截尾取區間結束時間的加權 MLE"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mid = np.where(start > 0, np.sqrt(start * end), end / 2)
+    mid = np.where(np.isfinite(end), mid, 2 * start)
+    T = np.r_[mid[fail > 0], exact_t, end[susp > 0]]
+    D = np.r_[np.ones(int((fail > 0).sum()) + exact_t.size), np.zeros(int((susp > 0).sum()))]
+    W = np.r_[fail[fail > 0], exact, susp[susp > 0]]
+    fit = fit_weibull_mle_batch(T[None], D[None], W[None])
+    if fit["converged"][0]:
+        return np.array([np.log(fit["eta"][0]), np.log(fit["beta"][0])])
+    return np.array([np.log(np.average(T, weights=W)), 0.0])
+
+
+def fit_weibull_grouped(start, end, fail, susp, exact_t=None, exact=None,
+                        max_iter=MAX_ITER, tol=TOL):
+    """
+    分組數據的 Weibull MLE
+
+    Args:
+        start, end, fail, susp: 區間與其失效數、截尾數 (截尾於 end)
+        exact_t, exact: 確切失效時間與其數量 (選填，供區間截尾數據混合確切失效時使用)
+
+    Returns:
+        dict: beta, eta, log_likelihood, cov ((ln η, ln β) 共變異), converged, iterations
+    """
+    exact_t = np.empty(0) if exact_t is None else np.asarray(exact_t, dtype=float)
+    exact = np.ones(exact_t.size) if exact is None else np.asarray(exact, dtype=float)
+    f, s = fail > 0, susp > 0
+    args = (np.log(start[f], where=start[f] > 0, out=np.full(int(f.sum()), -np.inf)),
+            np.log(end[f]), fail[f], np.log(end[s]), susp[s], np.log(exact_t), exact)
+    theta = _starting_values(start, end, fail, susp, exact_t, exact)
+    ll, grad, hess = _grouped_derivatives(theta, *args)
+
+    lam, converged, iterations = 1e-3, False, 0
+    for iterations in range(1, max_iter + 1):
+        # (−H + λ·diag|H|) Δ = g
+        info = -hess
+        system = info + (lam * np.abs(np.diag(info)) + 1e-12) * np.eye(2)
+        try:
+            step = np.linalg.solve(system, grad)
+        except np.linalg.LinAlgError:
+            step = np.linalg.lstsq(system, grad, rcond=None)[0]
+        candidate = theta + step
+        ll_new, grad_new, hess_new = _grouped_derivatives(candidate, *args)
+        if np.isfinite(ll_new) and ll_new >= ll - 1e-12 * abs(ll):
+            small_change = abs(ll_new - ll) <= tol * (1 + abs(ll))
+            theta, ll, grad, hess = candidate, ll_new, grad_new, hess_new
+            lam = max(lam / 10, 1e-12)
+            if small_change or np.abs(step).max() < tol:
+                converged = True
+                break
+        else:
+            lam = min(lam * 10, 1e12)
+
+    try:
+        cov = np.linalg.inv(-hess)
+    except np.linalg.LinAlgError:
+        cov = np.full((2, 2), np.nan)
+    return {"beta": float(np.exp(theta[1])), "eta": float(np.exp(theta[0])),
+            "log_likelihood": float(ll), "cov": cov, "converged": converged,
+            "iterations": iterations}
+
+
+def _overlapping(start, end):
+    """區間是否重疊或巢狀 (依起點排序後比較相鄰區間)"""
+    order = np.argsort(start, kind='stable')
+    return bool(np.any(start[order][1:] < end[order][:-1]))
+
+
+def _plot_points(start, end, fail, susp):
+    """精算估計的機率圖點 (0 < F < 1)"""
+    t_vals, f_vals = actuarial_ranks(start, end, fail, susp)
+    keep = (f_vals > 0) & (f_vals < 1)
+    return t_vals[keep], f_vals[keep]
+
+
+def actuarial_ranks(start, end, fail, susp, n_total=None):
+    """
+    區間結束時的累積失效機率 (Kaplan-Meier / 精算估計，截尾於區間結束時移出)
+
+    Returns:
+        (t, F): 有失效的區間結束時間與 F
+    """
+    order = np.argsort(start, kind='stable')
+    start, end, fail, susp = start[order], end[order], fail[order], susp[order]
+    if _overlapping(start, end):
+        raise ValueError("秩回歸需要不重疊的區間")
+    n = fail.sum() + susp.sum()
+    if n_total is not None:
+        n = max(float(n_total), n)
+    at_risk = n - np.r_[0.0, np.cumsum(fail + susp)[:-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        F = 1 - np.cumprod(1 - fail / at_risk)
+    keep = (fail > 0) & np.isfinite(end)
+    return end[keep], F[keep]
+
+
+def calculate_weibull_grouped(bins, options=None):
+    """
+    分組數據的 Weibull 分析 (結果格式與 calculate_weibull 相同)
+
+    Args:
+        bins: 區間數據 (見 parse_bins)
+        options: {'regression_method': 'rry' | 'rrx' | 'mle',
+                  'n_total': 實際樣品總數 (選填；其餘樣品視為在最後一個區間結束時仍未失效),
+                  'conf_level': 信賴水準 (MLE 的 Fisher 矩陣信賴界限)}
+
+    Returns:
+        dict: beta, eta_alt, r_squared, method, plot_data, n_bins, n_failures, n_suspensions，
+              (MLE 且區間重疊時無作圖點，r_squared 為 None)，MLE 時另含 log_likelihood、cov 與信賴界限；或 {'error': ...}
+    """
+    options = options or {}
+    regression_method = options.get('regression_method', 'mle')
+    if regression_method not in REGRESSION_METHODS:
+        return {"error": f"不支援的回歸方法: {regression_method}"}
+    if options.get('bounds_method', 'fisher') != 'fisher':
+        return {"error": "分組數據僅支援 Fisher 矩陣信賴界限"}
+
+    try:
+        start, end, fail, susp = parse_bins(bins)
+        n_total = options.get('n_total')
+        n_total = float(n_total) if n_total not in (None, '') else None
+        conf_level = float(options.get('conf_level', DEFAULT_CONF_LEVEL))
+        if n_total is not None:
+            extra = n_total - fail.sum() - susp.sum()
+            if extra < 0:
+                raise ValueError("樣品總數不可小於失效數與截尾數之和")
+            if extra > 0:
+                # 其餘樣品於最後一個有限區間結束時截尾
+                susp = susp.copy()
+                susp[np.argmax(np.where(np.isfinite(end), end, -np.inf))] += extra
+        if np.count_nonzero(fail) < 2:
+            return {"error": "失效數據不足，無法進行 Weibull 擬合 (至少需要 2 個有失效的區間)"}
+
+        if regression_method == 'mle':
+            fit = fit_weibull_grouped(start, end, fail, susp)
+            if not fit["converged"]:
+                return {"error": "分組數據最大概似估計未收斂"}
+            beta, eta_alt = fit["beta"], fit["eta"]
+            # 重疊或巢狀區間沒有精算作圖點，MLE 仍直接以區間概似擬合，作圖點與 R² 從缺
+            if _overlapping(start, end):
+                t_vals, f_vals = np.empty(0), np.empty(0)
+            else:
+                t_vals, f_vals = _plot_points(start, end, fail, susp)
+            x_vals, y_vals = np.log(t_vals), np.log(-np.log(1 - f_vals))
+            r_squared = stats.linregress(x_vals, y_vals)[2] ** 2 if x_vals.size >= 2 else np.nan
+        else:
+            t_vals, f_vals = _plot_points(start, end, fail, susp)
+            x_vals, y_vals = np.log(t_vals), np.log(-np.log(1 - f_vals))
+            if x_vals.size < 2:
+                return {"error": "有效的機率圖點不足 (至少需要 2 點)"}
+            if regression_method == 'rrx':
+                slope, intercept, r_value, _, _ = stats.linregress(y_vals, x_vals)
+                beta, eta_alt, r_squared = 1 / slope, np.exp(intercept), r_value ** 2
+            else:
+                slope, intercept, r_value, _, _ = stats.linregress(x_vals, y_vals)
+                beta, eta_alt, r_squared = slope, np.exp(-intercept / slope), r_value ** 2
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    result = {
+        "beta": round(float(beta), 4),
+        "eta_alt": round(float(eta_alt), 4),
+        "r_squared": round(float(r_squared), 4) if np.isfinite(r_squared) else None,
+        "method": f"GROUPED + {regression_method.upper()}",
+        "n_bins": int(start.size),
+        "n_failures": float(fail.sum()),
+        "n_suspensions": float(susp.sum()),
+        "plot_data": {
+            "x": x_vals.tolist(),
+            "y": y_vals.tolist(),
+            "t": t_vals.tolist(),
+            "f": f_vals.tolist()
+        }
+    }
+    if regression_method == 'mle':
+        bounds = fisher_bounds(fit["beta"], fit["eta"], fit["cov"], conf_level)
+        result.update({
+            "log_likelihood": round(fit["log_likelihood"], 4),
+            "conf_level": conf_level,
+            "bounds_method": "fisher",
+            "cov": fit["cov"].tolist(),
+            "bounds": {"beta": round_bound(bounds["beta"], 4),
+                       "eta_alt": round_bound(bounds["eta_alt"], 4)},
+        })
+    return result
@@ -0,0 +1,190 @@
+"""
+區間截尾 (定期檢查) Weibull 估計
+每個樣品以 (left, right] 表示失效發生的區間：
+  - left = right：確切失效時間
+  - left = 0：左截尾 (第一次檢查時已失效)
+  - right = ∞ (或 null)：右截尾 (最後一次檢查時仍正常)
+相同 (left, right) 的樣品合併計數後，以 weibull_grouped 的區間概似 (CDF 差值向量化)
+在 (ln η, ln β) 上以 LM 阻尼牛頓法求 MLE；成本只與相異區間數有關
+無母數 Turnbull 估計 (自洽 EM) 提供機率圖的作圖點
+"""
+
+import numpy as np
+from scipy import stats
+from weibull_grouped import fit_weibull_grouped, REGRESSION_METHODS
+from weibull_bounds import fisher_bounds, round_bound, DEFAULT_CONF_LEVEL
+
+TURNBULL_MAX_ITER = 10000
+TURNBULL_TOL = 1e-10
+
+
+def parse_intervals(intervals):
+    """
+    解析區間截尾數據：{'left', 'right', 'count'} 欄位字典，或 [left, right(, count)] 的列
+    (right 為 null / NaN / ∞ 表示右截尾)
+
+    Returns:
+        (left, right, count) 陣列 (相同區間已合併)
+
+    Raises:
+        ValueError: 區間或數量無效
+    """
+    if isinstance(intervals, dict):
+        left = np.asarray(intervals.get('left', []), dtype=float).ravel()
+        right = np.asarray(intervals.get('right', []), dtype=float).ravel()
+        count = np.asarray(intervals.get('count', np.ones(left.size)), dtype=float).ravel()
+    else:
+        rows = np.asarray(intervals, dtype=float)
+        if rows.ndim != 2 or rows.shape[1] not in (2, 3):
+            raise ValueError("區間數據需為 [left, right, count] 的列")
+        left, right = rows[:, 0], rows[:, 1]
+        count = rows[:, 2] if rows.shape[1] == 3 else np.ones(rows.shape[0])
+    if not left.size == right.size == count.size:
+        raise ValueError("區間欄位長度不一致")
+    right = np.where(np.isnan(right), np.inf, right)
+    if np.any(~(left >= 0)) or np.any(~(right >= left)):
+        raise ValueError("區間需滿足 0 ≤ left ≤ right")
+    if np.any(right <= 0):
+        raise ValueError("失效時間需為正數")
+    if np.any((left == 0) & np.isinf(right)):
+        raise ValueError("區間 (0, ∞) 不含任何資訊")
+    if np.any(~(count > 0)):
+        raise ValueError("樣品數需為正數")
+
+    pairs, inverse = np.unique(np.c_[left, right], axis=0, return_inverse=True)
+    return pairs[:, 0], pairs[:, 1], np.bincount(inverse.ravel(), weights=count)
+
+
+def turnbull(left, right, count, tol=TURNBULL_TOL, max_iter=TURNBULL_MAX_ITER):
+    """
+    Turnbull 無母數最大概似估計 (自洽 EM)
+
+    Returns:
+        dict: left, right (Turnbull 最內區間)，mass (各區間機率)，F (區間右端的累積失效機率)，
+              iterations, converged
+    """
+    left, right, count = (np.asarray(a, dtype=float) for a in (left, right, count))
+    exact = left == right
+    # 最內區間：排序後左端點緊接右端點者；同值時 (a, t] 的右端點排在 (t, b] 的左端點之前，
+    # 確切失效 [t, t] 的左端點排在最前
+    values = np.r_[left, right]
+    kind = np.r_[np.where(exact, -1, 1), np.zeros(right.size, dtype=int)]
+    order = np.lexsort((kind, values))
+    is_left = (kind != 0)[order]
+    starts = np.flatnonzero(is_left[:-1] & ~is_left[1:])
+    q, p = values[order][starts], values[order][starts + 1]
+
+    # A[i, j]：最內區間 j 是否包含於觀測 i；單點區間 {t} 需 left < t (確切失效本身除外)
+    point = q == p
+    A = (q[None, :] >= left[:, None]) & (p[None, :] <= right[:, None])
+    A &= ~(point[None, :] & ~exact[:, None] & (q[None, :] <= left[:, None]))
+    A = A.astype(float)
+
+    total = count.sum()
+    mass = np.full(q.size, 1.0 / q.size)
+    converged, iterations = False, 0
+    for iterations in range(1, max_iter + 1):
+        # 自洽方程：p_j = Σ_i w_i A_ij p_j / Σ_k A_ik p_k / Σ w
+        denom = A @ mass
+        new = mass * ((count / denom) @ A) / total
+        change = np.abs(new - mass).max()
+        mass = new
+        if change < tol:
+            converged = True
+            break
+    return {"left": q, "right": p, "mass": mass, "F": np.minimum(np.cumsum(mass), 1.0),
+            "iterations": iterations, "converged": converged}
+
+
+def calculate_weibull_interval(intervals, options=None):
+    """
+    區間截尾數據的 Weibull 分析 (結果格式與 calculate_weibull 相同)
+
+    Args:
+        intervals: 區間截尾數據 (見 parse_intervals)
+        options: {'regression_method': 'mle' (預設) | 'rry' | 'rrx' (Turnbull 作圖點的秩回歸),
+                  'conf_level': 信賴水準 (MLE 的 Fisher 矩陣信賴界限)}
+
+    Returns:
+        dict: beta, eta_alt, r_squared, method, plot_data, turnbull, n_units 與各類樣品數，
+              MLE 時另含 log_likelihood、cov 與信賴界限；或 {'error': ...}
+    """
+    options = options or {}
+    regression_method = options.get('regression_method', 'mle')
+    if regression_method not in REGRESSION_METHODS:
+        return {"error": f"不支援的回歸方法: {regression_method}"}
+    if options.get('bounds_method', 'fisher') != 'fisher':
+        return {"error": "區間截尾數據僅支援 Fisher 矩陣信賴界限"}
+
+    try:
+        left, right, count = parse_intervals(intervals)
+        conf_level = float(options.get('conf_level', DEFAULT_CONF_LEVEL))
+        exact = left == right
+        censored = np.isinf(right)
+        failed = ~exact & ~censored
+        if count[~censored].sum() < 2 or np.count_nonzero(~censored) < 2:
+            return {"error": "失效數據不足，無法進行 Weibull 擬合 (至少需要 2 個相異的失效區間)"}
+
+        npmle = turnbull(left, right, count)
+        keep = np.isfinite(npmle["right"]) & (npmle["F"] > 0) & (npmle["F"] < 1 - 1e-12)
+        t_vals, f_vals = npmle["right"][keep], npmle["F"][keep]
+        x_vals = np.log(t_vals)
+        y_vals = np.log(-np.log(1 - f_vals))
+
+        if regression_method == 'mle':
+            # 右截尾樣品以「截尾於 left」計入 (區間 [0, left] 的截尾數)
+            fit = fit_weibull_grouped(np.r_[left[failed], np.zeros(int(censored.sum()))],
+                                      np.r_[right[failed], left[censored]],
+                                      np.r_[count[failed], np.zeros(int(censored.sum()))],
+                                      np.r_[np.zeros(int(failed.sum())), count[censored]],
+                                      left[exact], count[exact])
+            if not fit["converged"]:
+                return {"error": "區間截尾最大概似估計未收斂"}
+            beta, eta_alt = fit["beta"], fit["eta"]
+            r_squared = stats.linregress(x_vals, y_vals)[2] ** 2 if x_vals.size >= 2 else np.nan
+        else:
+            if x_vals.size < 2:
+                return {"error": "Turnbull 作圖點不足 (至少需要 2 點)"}
+            if regression_method == 'rrx':
+                slope, intercept, r_value, _, _ = stats.linregress(y_vals, x_vals)
+                beta, eta_alt, r_squared = 1 / slope, np.exp(intercept), r_value ** 2
+            else:
+                slope, intercept, r_value, _, _ = stats.linregress(x_vals, y_vals)
+                beta, eta_alt, r_squared = slope, np.exp(-intercept / slope), r_value ** 2
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+
+    result = {
+        "beta": round(float(beta), 4),
+        "eta_alt": round(float(eta_alt), 4),
+        "r_squared": round(float(r_squared), 4) if np.isfinite(r_squared) else None,
+        "method": f"INTERVAL + {regression_method.upper()}",
+        "n_units": float(count.sum()),
+        "n_exact": float(count[exact].sum()),
+        "n_interval": float(count[failed & (left > 0)].sum()),
+        "n_left_censored": float(count[failed & (left == 0)].sum()),
+        "n_right_censored": float(count[censored].sum()),
+        "plot_data": {
+            "x": x_vals.tolist(),
+            "y": y_vals.tolist(),
+            "t": t_vals.tolist(),
+            "f": f_vals.tolist()
+        },
+        "turnbull": {
+            "left": npmle["left"].tolist(),
+            "right": [float(v) if np.isfinite(v) else None for v in npmle["right"]],
+            "F": npmle["F"].tolist(),
+            "converged": npmle["converged"]
+        }
+    }
+    if regression_method == 'mle':
+        bounds = fisher_bounds(fit["beta"], fit["eta"], fit["cov"], conf_level)
+        result.update({
+            "log_likelihood": round(fit["log_likelihood"], 4),
+            "conf_level": conf_level,
+            "bounds_method": "fisher",
+            "cov": fit["cov"].tolist(),
+            "bounds": {"beta": round_bound(bounds["beta"], 4),
+                       "eta_alt": round_bound(bounds["eta_alt"], 4)},
+        })
+    return result
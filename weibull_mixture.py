@@ -0,0 +1,244 @@
+"""
+混合 Weibull (多失效模式) 估計
+F(t) = Σ_k p_k [1 - exp(-(t/η_k)^β_k)]，k = 1..K (K = 2 或 3)
+以 EM 演算法求最大概似估計 (含右截尾)：
+  - E 步：失效樣品的責任 ∝ p_k f_k(t)，截尾樣品 ∝ p_k R_k(t)，於對數域向量化計算
+  - M 步：p_k 為責任的加權平均；各子母體為以責任加權的右截尾 Weibull MLE
+    (weibull_mle.fit_weibull_mle_batch 一次求解所有子母體)
+多個隨機起始點 (依失效時間分位數隨機切分) 作為批次的一個維度同時迭代，取對數概似最大者
+"""
+
+import numpy as np
+from scipy import special, optimize
+from median_ranks import median_ranks
+from weibull_mle import prepare_sample, fit_weibull_mle_batch
+
+MODE_RANGE = (2, 3)
+DEFAULT_RESTARTS = 8
+MAX_EM_ITER = 500
+EM_TOL = 1e-7
+MAX_BETA = 100.0                 # 子母體 β 超過此值視為退化 (集中在單一時間點)
+MIN_MODE_FAILURES = 1.0          # 每個子母體至少需承擔的有效失效數
+CURVE_POINTS = 101
+
+
+def _component_log_terms(log_t, beta, eta):
+    """各子母體的 ln f 與 ln R (restarts × K × n)"""
+    z = log_t[None, None, :] - np.log(eta)[:, :, None]
+    b = beta[:, :, None]
+    log_r = -np.exp(b * z)
+    log_f = np.log(b) + (b - 1) * z - np.log(eta)[:, :, None] + log_r
+    return log_f, log_r
+
+
+def _initial_responsibilities(log_t, is_failure, n_modes, n_restarts, rng):
+    """依失效時間的分位數切分為 K 段 (第一個起始點等分，其餘隨機)，作為初始責任"""
+    q = np.sort(rng.uniform(0.05, 0.95, (n_restarts, n_modes - 1)), axis=1)
+    q[0] = np.arange(1, n_modes) / n_modes
+    cuts = np.quantile(log_t[is_failure > 0], q)
+    mode = (log_t[None, :, None] > cuts[:, None, :]).sum(axis=2)
+    one_hot = mode[:, None, :] == np.arange(n_modes)[None, :, None]
+    return np.where(one_hot, 0.9, 0.1 / (n_modes - 1))
+
+
+def fit_weibull_mixture(times, is_failure, weights, n_modes=2, n_restarts=DEFAULT_RESTARTS, seed=0,
+                        max_iter=MAX_EM_ITER, tol=EM_TOL):
+    """
+    混合 Weibull 的 EM 估計 (所有起始點同時向量化迭代)
+
+    Args:
+        times, is_failure, weights: weibull_mle.prepare_sample 的輸出
+        n_modes: 子母體數
+        n_restarts: 起始點數
+        seed: 隨機起始點的亂數種子
+
+    Returns:
+        dict: beta, eta, weight (依 η 排序)，log_likelihood, converged, iterations, n_valid
+              或 {'error': ...}
+    """
+    rng = np.random.default_rng(seed)
+    n_obs = times.size
+    log_t = np.log(times)
+    tau = _initial_responsibilities(log_t, is_failure, n_modes, n_restarts, rng)
+    beta = np.full((n_restarts, n_modes), np.nan)
+    eta = np.full((n_restarts, n_modes), np.nan)
+    p = np.full((n_restarts, n_modes), np.nan)
+
+    ll = np.full(n_restarts, -np.inf)
+    valid = np.ones(n_restarts, dtype=bool)
+    converged = np.zeros(n_restarts, dtype=bool)
+    iterations = 0
+    with np.errstate(all='ignore'):
+        for iterations in range(1, max_iter + 1):
+            # 只迭代尚未收斂的起始點
+            idx = np.flatnonzero(valid & ~converged)
+            if idx.size == 0:
+                break
+            m = idx.size
+
+            # M 步
+            wk = weights[None, None, :] * tau[idx]
+            fit = fit_weibull_mle_batch(np.broadcast_to(times, (m * n_modes, n_obs)),
+                                        np.broadcast_to(is_failure, (m * n_modes, n_obs)),
+                                        wk.reshape(-1, n_obs))
+            beta[idx] = fit["beta"].reshape(m, n_modes)
+            eta[idx] = fit["eta"].reshape(m, n_modes)
+            p[idx] = wk.sum(axis=2) / weights.sum()
+            mode_failures = (wk * is_failure).sum(axis=2)
+            valid[idx] = (np.isfinite(beta[idx]).all(axis=1) & (beta[idx] <= MAX_BETA).all(axis=1)
+                          & (mode_failures >= MIN_MODE_FAILURES).all(axis=1))
+
+            # E 步
+            log_f, log_r = _component_log_terms(log_t, beta[idx], eta[idx])
+            log_c = np.log(p[idx])[:, :, None] + np.where(is_failure > 0, log_f, log_r)
+            log_mix = special.logsumexp(log_c, axis=1)
+            ll_new = (weights * log_mix).sum(axis=1)
+            tau[idx] = np.exp(log_c - log_mix[:, None, :])
+
+            converged[idx] = np.abs(ll_new - ll[idx]) <= tol * (1 + np.abs(ll_new))
+            ll[idx] = ll_new
+
+    if not valid.any():
+        return {"error": "所有起始點皆退化 (子母體失效數不足或集中於單一時間)"}
+    best = int(np.argmax(np.where(valid, ll, -np.inf)))
+    order = np.argsort(eta[best])
+    return {
+        "beta": beta[best][order],
+        "eta": eta[best][order],
+        "weight": p[best][order],
+        "log_likelihood": float(ll[best]),
+        "converged": bool(converged[best]),
+        "iterations": iterations,
+        "n_valid": int(valid.sum()),
+    }
+
+
+def mixture_functions(components, t, af_total=1.0):
+    """
+    混合分佈的 R(t)、h(t)、f(t) (向量化；af_total 將各子母體的 η 換算至現場)
+
+    Args:
+        components: [{'beta', 'eta_alt', 'weight'}]
+        t: 時間陣列
+    """
+    t = np.asarray(t, dtype=float)
+    R, f = np.zeros(t.shape), np.zeros(t.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for c in components:
+            beta, eta = c["beta"], c["eta_alt"] * af_total
+            r_k = np.exp(-(t / eta) ** beta)
+            R += c["weight"] * r_k
+            f += c["weight"] * np.where(t > 0, beta / eta * (t / eta) ** (beta - 1) * r_k, 0.0)
+        h = np.where(R > 0, f / R, np.nan)
+    return R, h, f
+
+
+def mixture_curves(components, af_total=1.0, max_time=50000, n_points=CURVE_POINTS):
+    """現場條件下 0 ~ max_time 的 R(t)、h(t)、f(t) 曲線 (供圖表使用；無法計算的點為 None)"""
+    t = np.linspace(0, max_time, n_points)
+    R, h, f = mixture_functions(components, t, af_total)
+    return {"t": t.tolist(), "R": R.tolist(), "f": f.tolist(),
+            "h": [float(v) if np.isfinite(v) else None for v in h]}
+
+
+def mixture_reliability(components, af_total, t_mission, bx_percent=1):
+    """
+    混合分佈的現場可靠度指標 (對應 calculate_reliability_results 的 Weibull 指標)
+    Bx 壽命以 Brent 法求解 F(t) = x%：混合 F 介於各子母體 F 之間，故根落在各子母體 Bx 壽命之間
+
+    Returns:
+        dict: mttf_use, r_mission, bx_life, bx_percent
+    """
+    mttf = sum(c["weight"] * c["eta_alt"] * af_total * special.gamma(1 + 1 / c["beta"])
+               for c in components)
+    r_mission = mixture_functions(components, [t_mission], af_total)[0][0]
+    x = bx_percent / 100
+    bounds = [c["eta_alt"] * af_total * (-np.log(1 - x)) ** (1 / c["beta"]) for c in components]
+    lo, hi = min(bounds), max(bounds)
+    if hi > lo:
+        bx_life = optimize.brentq(lambda t: 1 - mixture_functions(components, [t], af_total)[0][0] - x,
+                                  lo, hi, xtol=1e-10 * hi)
+    else:
+        bx_life = lo
+    return {"mttf_use": round(float(mttf), 2), "r_mission": round(float(r_mission), 6),
+            "bx_life": round(float(bx_life), 2), "bx_percent": bx_percent}
+
+
+def calculate_weibull_mixture(failures, suspensions=None, options=None):
+    """
+    混合 Weibull 分析
+
+    Args:
+        failures, suspensions: 失效與截尾時間
+        options: {'n_modes': 2 | 3, 'n_restarts': 起始點數, 'seed': 亂數種子,
+                  'n_total': 實際樣品總數, 'median_rank_method': 機率圖作圖點的中位秩方法}
+
+    Returns:
+        dict: n_modes, components ([{'beta', 'eta_alt', 'weight'}]，依 η 排序)，log_likelihood, aic, bic,
+              converged, iterations, n_restarts, n_valid_restarts, method, plot_data (中位秩作圖點)，
+              probability_curve (混合分佈在 Weibull 機率紙上的曲線) 或 {'error': ...}
+    """
+    options = options or {}
+    try:
+        n_modes = int(options.get('n_modes', 2))
+        n_restarts = int(options.get('n_restarts', DEFAULT_RESTARTS))
+        seed = int(options.get('seed', 0))
+        n_total = options.get('n_total')
+        n_total = int(n_total) if n_total not in (None, '') else None
+        failures = np.sort(np.asarray(failures, dtype=float).ravel())
+        suspensions = (np.asarray(suspensions, dtype=float).ravel()
+                       if isinstance(suspensions, (list, tuple, np.ndarray)) else np.empty(0))
+        times, is_failure, weights = prepare_sample(failures, suspensions, n_total)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+    if n_modes not in MODE_RANGE:
+        return {"error": f"子母體數需為 {MODE_RANGE[0]} 或 {MODE_RANGE[1]}"}
+    if not 1 <= n_restarts <= 256:
+        return {"error": "起始點數需介於 1 與 256 之間"}
+    if np.unique(failures).size < 3 * n_modes:
+        return {"error": f"失效數據不足，{n_modes} 個子母體至少需要 {3 * n_modes} 個相異的失效時間"}
+
+    fit = fit_weibull_mixture(times, is_failure, weights, n_modes, n_restarts, seed)
+    if "error" in fit:
+        return fit
+
+    components = [{"beta": round(float(b), 4), "eta_alt": round(float(e), 4), "weight": round(float(p), 4)}
+                  for b, e, p in zip(fit["beta"], fit["eta"], fit["weight"])]
+    exact = [{"beta": b, "eta_alt": e, "weight": p}
+             for b, e, p in zip(fit["beta"], fit["eta"], fit["weight"])]
+    n_params = 3 * n_modes - 1
+    n_units = weights.sum()
+
+    # 作圖點與 calculate_weibull 相同 (未提供樣品總數時沿用 max(觀測數, 64))
+    t_rank, f_rank = median_ranks(failures, suspensions, options.get('median_rank_method', 'benard'),
+                                  n_total if n_total is not None else max(times.size, 64))
+    keep = (f_rank > 0) & (f_rank < 1)
+    t_rank, f_rank = t_rank[keep], f_rank[keep]
+    t_curve = np.geomspace(times.min() / 2, times.max() * 2, CURVE_POINTS)
+    R_curve = mixture_functions(exact, t_curve)[0]
+    with np.errstate(divide='ignore'):
+        y_curve = np.log(-np.log(R_curve))
+    finite = np.isfinite(y_curve)
+
+    return {
+        "n_modes": n_modes,
+        "components": components,
+        "log_likelihood": round(float(fit["log_likelihood"]), 4),
+        "aic": round(float(2 * n_params - 2 * fit["log_likelihood"]), 4),
+        "bic": round(float(n_params * np.log(n_units) - 2 * fit["log_likelihood"]), 4),
+        "converged": fit["converged"],
+        "iterations": fit["iterations"],
+        "n_restarts": n_restarts,
+        "n_valid_restarts": fit["n_valid"],
+        "method": f"MIXED WEIBULL ({n_modes} modes, EM)",
+        "plot_data": {
+            "x": np.log(t_rank).tolist(),
+            "y": np.log(-np.log(1 - f_rank)).tolist(),
+            "t": t_rank.tolist(),
+            "f": f_rank.tolist()
+        },
+        "probability_curve": {
+            "x": np.log(t_curve[finite]).tolist(),
+            "y": y_curve[finite].tolist()
+        }
+    }
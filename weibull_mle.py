@@ -0,0 +1,171 @@
+"""
+右截尾 Weibull 最大概似估計
+以 β 的剖面概似 (profile likelihood) 求解：固定 β 時 η 有封閉解
+    η^β = Σ t^β / r        (t 含失效與截尾時間，r 為失效數)
+將 η 代回後，β 滿足單調遞增的剖面得分方程
+    g(β) = Σ t^β ln t / Σ t^β - 1/β - (1/r) Σ_fail ln t = 0
+以 Halley 法 (解析一、二階導數) 搭配區間二分保護求根；
+多個數據集以補齊 (padded) 陣列一次向量化求解，權重 W 為樣品數 (頻率)
+"""
+
+import numpy as np
+
+MAX_ITER = 100
+TOL = 1e-12
+
+
+def _pack(rows):
+    """將不等長的 (times, is_failure, weights) 補齊為二維陣列"""
+    m = max(len(r[0]) for r in rows)
+    shape = (len(rows), m)
+    T, D, W = np.ones(shape), np.zeros(shape), np.zeros(shape)
+    for i, (times, is_failure, weights) in enumerate(rows):
+        k = len(times)
+        T[i, :k], D[i, :k], W[i, :k] = times, is_failure, weights
+    return T, D, W
+
+
+def prepare_sample(failures, suspensions=None, n_total=None):
+    """
+    整理單一樣本為 (times, is_failure, weights)
+
+    Args:
+        failures: 失效時間
+        suspensions: 截尾時間
+        n_total: 實際樣品總數；多於失效數 + 截尾數的樣品視為在最後觀測時間仍未失效
+
+    Raises:
+        ValueError: 時間非正數或樣品總數小於觀測數
+    """
+    failures = np.asarray(failures, dtype=float).ravel()
+    suspensions = np.asarray(suspensions if suspensions is not None else [], dtype=float).ravel()
+    times = np.concatenate([failures, suspensions])
+    if times.size and np.any(~(times > 0)):
+        raise ValueError("失效與截尾時間需為正數")
+    is_failure = np.r_[np.ones(failures.size), np.zeros(suspensions.size)]
+    weights = np.ones(times.size)
+
+    if n_total is not None:
+        extra = int(n_total) - times.size
+        if extra < 0:
+            raise ValueError(f"樣品總數 ({int(n_total)}) 小於失效數與截尾數之和 ({times.size})")
+        if extra > 0:
+            times = np.r_[times, times.max()]
+            is_failure = np.r_[is_failure, 0.0]
+            weights = np.r_[weights, extra]
+    return times, is_failure, weights
+
+
+def _profile_score(beta, U, D, W, c):
+    """剖面得分 g(β) 與其一、二階導數 (以 ln t 的加權累積量表示)"""
+    # U = ln(t / t_max) ≤ 0，t^β 縮放後不會溢位
+    e = W * np.exp(beta[:, None] * U)
+    s0 = e.sum(axis=1)
+    eu = e * U
+    eu2 = eu * U
+    m1 = eu.sum(axis=1) / s0
+    m2 = eu2.sum(axis=1) / s0
+    m3 = (eu2 * U).sum(axis=1) / s0
+    g = m1 - 1 / beta - c
+    g1 = m2 - m1 ** 2 + 1 / beta ** 2
+    g2 = m3 - 3 * m1 * m2 + 2 * m1 ** 3 - 2 / beta ** 3
+    return g, g1, g2, s0
+
+
+def fit_weibull_mle_batch(T, D, W, max_iter=MAX_ITER, tol=TOL, beta0=None):
+    """
+    向量化右截尾 Weibull MLE
+
+    Args:
+        T: 時間 (數據集數 × 觀測數)；D: 失效標記 (1 失效 / 0 截尾)；
+        W: 權重 (樣品數，補齊位置為 0)
+        beta0: β 的初始值 (選填，純量或每列一個；例如前一次擬合的解，用於熱啟動)
+
+    Returns:
+        dict: beta, eta, log_likelihood, n_failures, converged, iterations 陣列
+    """
+    T, D, W = (np.asarray(a, dtype=float) for a in (T, D, W))
+    n_rows = T.shape[0]
+    with np.errstate(all='ignore'):
+        log_t = np.where(W > 0, np.log(T), 0.0)
+        log_t_max = np.where(W > 0, log_t, -np.inf).max(axis=1)
+        U = np.where(W > 0, log_t - log_t_max[:, None], 0.0)
+        r = (W * D).sum(axis=1)
+        c = (W * D * U).sum(axis=1) / r
+
+        # 初始值：失效點 ln t 的標準差 (極值分佈 σ = sd·√6/π)
+        sd = np.sqrt((W * D * (U - c[:, None]) ** 2).sum(axis=1) / r)
+        beta = np.clip(np.pi / (np.sqrt(6) * np.where(sd > 0, sd, 1.0)), 0.05, 50.0)
+        if beta0 is not None:
+            warm = np.broadcast_to(np.asarray(beta0, dtype=float), (n_rows,))
+            beta = np.where(np.isfinite(warm) & (warm > 0), warm, beta)
+
+        lo, hi = np.zeros(n_rows), np.full(n_rows, np.inf)
+        converged = ~(r > 0)
+        iterations = np.zeros(n_rows, dtype=int)
+        for _ in range(max_iter):
+            active = ~converged
+            if not active.any():
+                break
+            iterations[active] += 1
+
+            g, g1, g2, _ = _profile_score(beta, U, D, W, c)
+            # g 單調遞增：g < 0 時根在右側
+            lo = np.where(active & (g < 0), beta, lo)
+            hi = np.where(active & (g > 0), beta, hi)
+
+            step = 2 * g * g1 / (2 * g1 ** 2 - g * g2)
+            step = np.where(np.isfinite(step), step, g / g1)
+            proposal = beta - step
+            # 超出保護區間時改用二分 (上界未知時加倍)
+            outside = ~np.isfinite(proposal) | (proposal <= lo) | (proposal >= hi)
+            fallback = np.where(np.isfinite(hi), 0.5 * (lo + hi), 2 * beta)
+            proposal = np.where(outside, fallback, proposal)
+
+            done = active & ((np.abs(proposal - beta) <= tol * beta) | (g == 0))
+            beta = np.where(active, proposal, beta)
+            converged |= done
+            # β 發散 (例如所有失效時間相同) 時停止
+            converged |= active & (beta > 1e6)
+
+        _, _, _, s0 = _profile_score(beta, U, D, W, c)
+        log_eta = log_t_max + np.log(s0 / r) / beta
+        sum_log_fail = (W * D * log_t).sum(axis=1)
+        log_likelihood = r * np.log(beta) - r * beta * log_eta + (beta - 1) * sum_log_fail - r
+        valid = converged & (r > 0) & (beta < 1e6)
+
+    return {
+        "beta": np.where(valid, beta, np.nan),
+        "eta": np.where(valid, np.exp(log_eta), np.nan),
+        "log_likelihood": np.where(valid, log_likelihood, np.nan),
+        "n_failures": r,
+        "converged": valid,
+        "iterations": iterations,
+    }
+
+
+def fit_weibull_mle(failures, suspensions=None, n_total=None):
+    """
+    單一樣本的右截尾 Weibull MLE
+
+    Returns:
+        dict: beta, eta, log_likelihood, n_failures, n_suspensions, iterations 或 {'error': ...}
+    """
+    try:
+        times, is_failure, weights = prepare_sample(failures, suspensions, n_total)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e) or "數據格式錯誤"}
+    if is_failure.sum() < 1:
+        return {"error": "至少需要一筆失效數據"}
+
+    fit = fit_weibull_mle_batch(times[None], is_failure[None], weights[None])
+    if not fit["converged"][0]:
+        return {"error": "最大概似估計未收斂 (失效時間可能全部相同)"}
+    return {
+        "beta": float(fit["beta"][0]),
+        "eta": float(fit["eta"][0]),
+        "log_likelihood": float(fit["log_likelihood"][0]),
+        "n_failures": int(is_failure.sum()),
+        "n_suspensions": int(weights.sum() - is_failure.sum()),
+        "iterations": int(fit["iterations"][0]),
+    }
@@ -0,0 +1,280 @@
+"""
+即時 (進行中) 試驗的增量 Weibull 分析
+試驗進行中每次讀值只附加新的失效與截尾，不必重新排序、重算中位秩與重新擬合全部數據：
+  - 秩回歸：依時間順序附加時，先前各點的 (Johnson 調整) 秩不變，
+    只需延續調整秩的累積乘積並以合併公式更新 ln t 與 ln(-ln(1-F)) 的平均與共變動量
+  - MLE：以前一次的 β 熱啟動 Halley 法 (通常 1~2 次迭代收斂)
+新數據早於既有數據，或秩所用的樣品總數改變 (未提供 n_total 而觀測數超過 64) 時，
+改為依全部數據重建；結果與 calculate_weibull 相同
+工作階段只保存在目前的 worker 行程 (LRU + 閒置逾時淘汰)
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+from median_ranks import ranks_from_order
+from weibull_mle import fit_weibull_mle_batch
+from weibull_bounds import mle_bounds, DEFAULT_CONF_LEVEL
+
+DEFAULT_N_TOTAL = 64             # 未提供樣品總數時的秩回歸預設 (與 calculate_weibull 相同)
+INITIAL_CAPACITY = 32
+MAX_SESSIONS = 1000              # 保留的工作階段數 (超過時移除最久未使用者)
+SESSION_TTL = 7 * 24 * 3600      # 秒；閒置超過此時間的工作階段移除
+
+
+def _merge_moments(moments, x, y):
+    """以平行合併公式 (Chan et al.) 將新點併入 (n, x̄, ȳ, Sxx, Syy, Sxy)"""
+    k = x.size
+    if k == 0:
+        return moments
+    n_a, mx_a, my_a, sxx_a, syy_a, sxy_a = moments
+    mx_b, my_b = x.mean(), y.mean()
+    dx, dy = x - mx_b, y - my_b
+    n = n_a + k
+    delta_x, delta_y = mx_b - mx_a, my_b - my_a
+    factor = n_a * k / n
+    return (n, mx_a + delta_x * k / n, my_a + delta_y * k / n,
+            sxx_a + dx @ dx + delta_x ** 2 * factor,
+            syy_a + dy @ dy + delta_y ** 2 * factor,
+            sxy_a + dx @ dy + delta_x * delta_y * factor)
+
+
+class WeibullSession:
+    """單一進行中試驗的累積數據與增量擬合狀態"""
+
+    __slots__ = ('id', 'median_rank_method', 'regression_method', 'n_total', 'conf_level',
+                 'bounds_method', 'reliability', 'lock', 'created', 'updated',
+                 'updates', 'rebuilds', '_times', '_is_failure', '_size', '_n_rank', '_survival',
+                 '_moments', '_beta', '_snapshot')
+
+    def __init__(self, options=None, reliability=None):
+        """
+        Args:
+            options: 與 calculate_weibull 相同 (median_rank_method, regression_method, n_total,
+                     conf_level, bounds_method；不支援 three_parameter)
+            reliability: 選填的 reliability(weibull_result) 函式，回傳現場可靠度指標
+                         (例如以 calculate_reliability_results 換算 AF 與任務時間)
+
+        Raises:
+            ValueError: 選項錯誤
+        """
+        options = options or {}
+        if options.get('three_parameter'):
+            raise ValueError("即時分析不支援三參數 Weibull")
+        n_total = options.get('n_total')
+        self.id = uuid.uuid4().hex
+        self.median_rank_method = options.get('median_rank_method', 'benard')
+        self.regression_method = options.get('regression_method', 'rry')
+        self.n_total = int(n_total) if n_total not in (None, '') else None
+        self.conf_level = float(options.get('conf_level', DEFAULT_CONF_LEVEL))
+        self.bounds_method = options.get('bounds_method', 'fisher')
+        if self.regression_method == 'mle' and not 0.5 < self.conf_level < 1:
+            raise ValueError("信賴水準需介於 0.5 與 1 之間")
+        self.reliability = reliability
+        self.lock = threading.Lock()
+        self.created = self.updated = time.time()
+        self.updates = 0
+        self.rebuilds = 0
+        # 依 (時間, 失效優先) 排序保存的觀測數據 (容量倍增)
+        self._times = np.empty(INITIAL_CAPACITY)
+        self._is_failure = np.empty(INITIAL_CAPACITY, dtype=bool)
+        self._size = 0
+        self._reset_ranks(self._rank_n(0))
+        self._beta = None
+        self._snapshot = None
+
+    def _rank_n(self, n_observed):
+        """中位秩使用的樣品總數 (與 calculate_weibull 相同)"""
+        return self.n_total if self.n_total is not None else max(n_observed, DEFAULT_N_TOTAL)
+
+    def _reset_ranks(self, n_rank):
+        self._n_rank = n_rank
+        self._survival = 1.0     # Johnson: Π r/(r+1)；KM: Π (r-1)/r
+        self._moments = (0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def _accumulate(self, start, times, is_failure):
+        """將已排序、位於第 start 個觀測之後的新數據併入秩回歸的充分統計量"""
+        n = self._n_rank
+        reverse_rank = (n - start - np.arange(times.size))[is_failure].astype(float)
+        if reverse_rank.size == 0:
+            return
+        if self.median_rank_method == 'km':
+            survival = self._survival * np.cumprod((reverse_rank - 1) / reverse_rank)
+            f = 1 - survival
+        else:
+            survival = self._survival * np.cumprod(reverse_rank / (reverse_rank + 1))
+            f = ranks_from_order((n + 1) * (1 - survival), n, self.median_rank_method)
+        self._survival = float(survival[-1])
+        t = times[is_failure]
+        keep = (f > 0) & (f < 1)
+        self._moments = _merge_moments(self._moments, np.log(t[keep]), np.log(-np.log(1 - f[keep])))
+
+    def append(self, failures=None, suspensions=None):
+        """
+        附加新的失效與截尾時間並更新擬合結果
+
+        Returns:
+            dict: snapshot() 的內容
+
+        Raises:
+            ValueError: 時間非正數或觀測數超過樣品總數 (此時不改變工作階段)
+        """
+        failures = np.asarray(failures if failures is not None else [], dtype=float).ravel()
+        suspensions = np.asarray(suspensions if suspensions is not None else [], dtype=float).ravel()
+        times = np.concatenate([failures, suspensions])
+        if np.any(~(times > 0)):
+            raise ValueError("失效與截尾時間需為正數")
+        is_failure = np.r_[np.ones(failures.size, dtype=bool), np.zeros(suspensions.size, dtype=bool)]
+
+        with self.lock:
+            size = self._size + times.size
+            if self.n_total is not None and size > self.n_total:
+                raise ValueError(f"樣品總數 ({self.n_total}) 小於失效數與截尾數之和 ({size})")
+            order = np.lexsort((~is_failure, times))
+            times, is_failure = times[order], is_failure[order]
+
+            # 依時間順序附加 (同時間時失效排在截尾之前) 且秩的樣品總數不變時增量更新
+            in_order = (self._size == 0 or times.size == 0 or
+                        (times[0], not is_failure[0]) >=
+                        (self._times[self._size - 1], not self._is_failure[self._size - 1]))
+            n_rank = self._rank_n(size)
+            start = self._size
+            self._store(times, is_failure)
+            if in_order and n_rank == self._n_rank:
+                self._accumulate(start, times, is_failure)
+            else:
+                self._rebuild(n_rank)
+
+            self.updates += 1
+            self.updated = time.time()
+            self._snapshot = self._evaluate()
+            return self._snapshot
+
+    def _store(self, times, is_failure):
+        size = self._size + times.size
+        if size > self._times.size:
+            capacity = max(size, 2 * self._times.size)
+            self._times = np.r_[self._times[:self._size], np.empty(capacity - self._size)]
+            self._is_failure = np.r_[self._is_failure[:self._size],
+                                     np.empty(capacity - self._size, dtype=bool)]
+        self._times[self._size:size] = times
+        self._is_failure[self._size:size] = is_failure
+        self._size = size
+
+    def _rebuild(self, n_rank):
+        """依全部數據重新排序並重算秩回歸的統計量"""
+        times, is_failure = self._times[:self._size], self._is_failure[:self._size]
+        order = np.lexsort((~is_failure, times))
+        times[:], is_failure[:] = times[order], is_failure[order]
+        self._reset_ranks(n_rank)
+        self._accumulate(0, times, is_failure)
+        self.rebuilds += 1
+
+    def _regression(self):
+        """由充分統計量求秩回歸的 β、η 與 R²"""
+        n, mx, my, sxx, syy, sxy = self._moments
+        if n < 2 or not (sxx > 0 and syy > 0):
+            return None
+        if self.regression_method == 'rrx':
+            slope = sxy / syy
+            beta, eta = 1 / slope, np.exp(mx - slope * my)
+        else:
+            beta = sxy / sxx
+            eta = np.exp(-(my - beta * mx) / beta)
+        return beta, eta, sxy ** 2 / (sxx * syy)
+
+    def _evaluate(self):
+        """計算目前數據的 Weibull 參數 (與 calculate_weibull 相同的四捨五入) 與現場可靠度"""
+        times, is_failure = self._times[:self._size], self._is_failure[:self._size]
+        n_failures = int(is_failure.sum())
+        out = {
+            "session_id": self.id,
+            "n_failures": n_failures,
+            "n_suspensions": int(self._size - n_failures),
+            "updates": self.updates,
+            "rebuilds": self.rebuilds,
+        }
+        regression = self._regression() if n_failures >= 2 else None
+        if regression is None:
+            out["pending"] = "失效數據不足，無法進行 Weibull 擬合 (至少需要 2 點)"
+            return out
+        beta, eta, r_squared = regression
+
+        interval = None
+        if self.regression_method == 'mle':
+            T, D, W = times, is_failure.astype(float), np.ones(self._size)
+            if self.n_total is not None and self.n_total > self._size:
+                T, D, W = np.r_[T, T.max()], np.r_[D, 0.0], np.r_[W, self.n_total - self._size]
+            fit = fit_weibull_mle_batch(T[None], D[None], W[None], beta0=self._beta)
+            if not fit["converged"][0]:
+                out["pending"] = "最大概似估計未收斂 (失效時間可能全部相同)"
+                return out
+            beta, eta = float(fit["beta"][0]), float(fit["eta"][0])
+            self._beta = beta
+            out["iterations"] = int(fit["iterations"][0])
+            interval = mle_bounds(beta, eta, times[is_failure], times[~is_failure], self.n_total,
+                                  self.conf_level, self.bounds_method)
+
+        weibull = {
+            "beta": round(float(beta), 4),
+            "eta_alt": round(float(eta), 4),
+            "r_squared": round(float(r_squared), 4),
+            "method": f"{self.median_rank_method.upper()} + {self.regression_method.upper()}",
+        }
+        if interval:
+            weibull.update(interval)
+        out["weibull_result"] = weibull
+        if self.reliability is not None:
+            out["reliability_result"] = self.reliability(weibull)
+        return out
+
+    def snapshot(self):
+        """最近一次更新的結果"""
+        with self.lock:
+            if self._snapshot is None:
+                self._snapshot = self._evaluate()
+            return self._snapshot
+
+
+class SessionRegistry:
+    """即時分析工作階段登錄表 (執行緒安全，LRU + 閒置逾時)"""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        with self._lock:
+            self._sessions[session.id] = session
+            self._prune()
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if self.ttl and session.updated + self.ttl < time.time():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _prune(self):
+        if self.ttl:
+            expired = [k for k, s in self._sessions.items() if s.updated + self.ttl < time.time()]
+            for key in expired:
+                del self._sessions[key]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
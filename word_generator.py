@@ -13,6 +13,7 @@ import io
 import re
 import base64
 from PIL import Image as PILImage
+from af_models import iter_models
 
 # 導入圖表生成模組
 try:
@@ -337,60 +338,14 @@ def generate_word_report(data, output_file):
     af_params = data.get('af_params', {})
     table_data = []
 
-    # 溫度
-    if af_params.get('enable_temp', False):
-        table_data.append([
-            '溫度加速 (Temperature)',
-            format_af_value(af_result.get('af_t', 'N/A')),
-            f"T_use={af_params.get('t_use', 'N/A')}°C, T_alt={af_params.get('t_alt', 'N/A')}°C, Ea={af_params.get('ea', 'N/A')} eV"
-        ])
-
-    # 濕度
-    if af_params.get('enable_hum', False):
-        table_data.append([
-            '濕度加速 (Humidity)',
-            format_af_value(af_result.get('af_rh', 'N/A')),
-            f"RH_use={af_params.get('rh_use', 'N/A')}%, RH_alt={af_params.get('rh_alt', 'N/A')}%, n={af_params.get('n_hum', 'N/A')}"
-        ])
-
-    # 電壓
-    if af_params.get('enable_voltage', False):
-        table_data.append([
-            '電壓加速 (Voltage)',
-            format_af_value(af_result.get('af_v', 'N/A')),
-            f"V_use={af_params.get('v_use', 'N/A')}V, V_alt={af_params.get('v_alt', 'N/A')}V, β={af_params.get('beta_v', 'N/A')}"
-        ])
-
-    # 熱循環
-    if af_params.get('enable_tc', False):
-        table_data.append([
-            '熱循環加速 (Thermal Cycling)',
-            format_af_value(af_result.get('af_tc', 'N/A')),
-            f"ΔT_use={af_params.get('dt_use', 'N/A')}°C, ΔT_alt={af_params.get('dt_alt', 'N/A')}°C"
-        ])
-
-    # 振動
-    if af_params.get('enable_vib', False):
-        table_data.append([
-            '振動加速 (Vibration)',
-            format_af_value(af_result.get('af_vib', 'N/A')),
-            f"G_use={af_params.get('g_use', 'N/A')}g, G_alt={af_params.get('g_alt', 'N/A')}g, n={af_params.get('n_vib', 'N/A')}"
-        ])
-
-    # UV
-    if af_params.get('enable_uv', False):
-        table_data.append([
-            'UV 輻射加速 (UV Radiation)',
-            format_af_value(af_result.get('af_uv', 'N/A')),
-            f"t_field={af_params.get('t_field_uv', 'N/A')}h, t_accel={af_params.get('t_accel_uv', 'N/A')}h"
-        ])
-
-    # 化學
-    if af_params.get('enable_chem', False):
+    # 各啟用模型的分項 (由 af_models 註冊表提供)
+    for model in iter_models(af_params):
+        if model.is_correction:
+            continue
         table_data.append([
-            '化學濃度加速 (Chemical)',
-            format_af_value(af_result.get('af_chem', 'N/A')),
-            f"C_use={af_params.get('c_use', 'N/A')}, C_alt={af_params.get('c_alt', 'N/A')}, n={af_params.get('n_chem', 'N/A')}"
+            model.result_label,
+            format_af_value(af_result.get(model.output, 'N/A')),
+            model.summary(af_params)
         ])
 
     if table_data:
@@ -460,7 +415,8 @@ def generate_word_report(data, output_file):
         weibull_data = [
             ('形狀參數 (β)', f"{weibull_result.get('beta', 'N/A'):.4f}"),
             ('特性壽命 - ALT (η_alt)', f"{weibull_result.get('eta_alt', 'N/A'):.2f} 小時"),
-            ('擬合優度 (R²)', f"{weibull_result.get('r_squared', 'N/A'):.4f}"),
+            ('擬合優度 (R²)', f"{weibull_result['r_squared']:.4f}"
+             if weibull_result.get('r_squared') is not None else 'N/A'),
             ('分析方法', weibull_result.get('method', 'BENARD + RRY'))
         ]
 
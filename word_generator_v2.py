@@ -10,6 +10,7 @@ from docx.oxml import OxmlElement
 from datetime import datetime
 import io
 import re
+from af_models import iter_models
 
 def format_af_value(value):
     """安全格式化 AF 值"""
@@ -298,50 +299,9 @@ def generate_word_report_v2(data, output_file):
     af_params = data.get('af_params', {})
     af_param_table_data = [['Parameter / 參數', 'Use Condition / 使用條件', 'Test Condition / 測試條件', 'Model / 模型']]
 
-    # 温度
-    if af_params.get('enable_temp', True):
-        af_param_table_data.append([
-            'Temperature / 溫度',
-            f"{af_params.get('t_use', '')}°C",
-            f"{af_params.get('t_alt', '')}°C",
-            f"Arrhenius (Ea={af_params.get('ea', '')} eV)"
-        ])
-
-    # 湿度
-    if af_params.get('enable_hum', True):
-        af_param_table_data.append([
-            'Humidity / 濕度',
-            f"{af_params.get('rh_use', '')}%",
-            f"{af_params.get('rh_alt', '')}%",
-            f"Peck (n={af_params.get('n_hum', '')})"
-        ])
-
-    # 电压
-    if af_params.get('enable_voltage', False):
-        af_param_table_data.append([
-            'Voltage / 電壓',
-            f"{af_params.get('v_use', '')}V",
-            f"{af_params.get('v_alt', '')}V",
-            f"IPL (β={af_params.get('beta_v', '')})"
-        ])
-
-    # 热循环
-    if af_params.get('enable_tc', False):
-        af_param_table_data.append([
-            'Thermal Cycling / 熱循環',
-            f"ΔT={af_params.get('dt_use', '')}°C, f={af_params.get('f_use', '')}/hr",
-            f"ΔT={af_params.get('dt_alt', '')}°C, f={af_params.get('f_alt', '')}/hr",
-            f"Coffin-Manson"
-        ])
-
-    # 振动
-    if af_params.get('enable_vib', False):
-        af_param_table_data.append([
-            'Vibration / 機械振動',
-            f"{af_params.get('g_use', '')}G",
-            f"{af_params.get('g_alt', '')}G",
-            f"IPL (n={af_params.get('n_vib', '')})"
-        ])
+    # 各启用模型的参数列 (由 af_models 注册表提供，与 PDF 相同)
+    for model in iter_models(af_params):
+        af_param_table_data.append(model.report_row(af_params))
 
     # 创建表格
     af_param_table = doc.add_table(rows=len(af_param_table_data), cols=4)
@@ -384,12 +344,12 @@ def generate_word_report_v2(data, output_file):
     af_result = data.get('results', {}).get('af_result', {})
     af_result_table_data = [['Factor / 因子', 'Value / 數值']]
 
-    if af_params.get('enable_temp', True):
-        af_result_table_data.append(['AF (Temperature) / 溫度', format_af_value(af_result.get('af_t', 'N/A'))])
-    if af_params.get('enable_hum', True):
-        af_result_table_data.append(['AF (Humidity) / 濕度', format_af_value(af_result.get('af_rh', 'N/A'))])
-    if af_params.get('enable_voltage', False):
-        af_result_table_data.append(['AF (Voltage) / 電壓', format_af_value(af_result.get('af_v', 'N/A'))])
+    for model in iter_models(af_params):
+        value = af_result.get(model.output)
+        # 修正因子仅在实际套用时列出
+        if model.is_correction and not value:
+            continue
+        af_result_table_data.append([model.result_label, format_af_value(value)])
 
     # 空行
     af_result_table_data.append(['', ''])